@@ -3,9 +3,10 @@
 
 from __future__ import annotations
 
+import concurrent.futures
 import copy
 from pathlib import Path
-from typing import TYPE_CHECKING, Any, Generator, List, Optional, Tuple, Union
+from typing import TYPE_CHECKING, Any, Dict, Generator, List, Optional, Tuple, Union
 
 import pandas as pd
 
@@ -16,7 +17,7 @@ if TYPE_CHECKING:
     from .executor import BaseExecutor
     from .decision import BaseTradeDecision
 
-from ..config import C
+from ..config import C, QlibConfig
 from ..log import get_module_logger
 from ..utils import init_instance_by_config
 from .backtest import INDICATOR_METRIC, PORT_METRIC, backtest_loop, collect_data_loop
@@ -345,4 +346,150 @@ def format_decisions(
     return res
 
 
-__all__ = ["Order", "backtest", "get_strategy_executor"]
+# the attributes of `Exchange` that can be changed without rebuilding the quote
+SWEEP_EXCHANGE_ATTRS = {"open_cost", "close_cost", "min_cost", "impact_cost", "trade_unit"}
+
+# the read-only objects shared by all the configs executed in the same worker process of `backtest_sweep`
+_sweep_shared: dict = {}
+
+
+def _init_sweep_worker(shared: dict, qlib_config: Optional[QlibConfig] = None) -> None:
+    """initialize a worker process of `backtest_sweep`
+
+    With the `fork` start method (the default on Linux), `shared` is inherited from the parent process and the memory
+    of the quote is shared copy-on-write. Otherwise, it is unpickled only once per worker instead of once per config.
+    """
+    if qlib_config is not None:
+        # NOTE: This is compatible with the `spawn` start method (e.g. Windows & MacOS)
+        C.register_from_C(qlib_config)
+    _sweep_shared.update(shared)
+
+
+def _merge_kwargs(config: Union[str, dict, object, Path], kwargs: dict) -> Union[str, dict, object, Path]:
+    if len(kwargs) == 0:
+        return config
+    if not isinstance(config, dict):
+        raise TypeError("Only a dict config can be overridden by the sweep config")
+    config = copy.copy(config)
+    config["kwargs"] = {**config.get("kwargs", {}), **kwargs}
+    return config
+
+
+def _run_sweep_config(sweep_config: dict) -> Dict[str, float]:
+    """run the backtest of a single config in `backtest_sweep` and summarize it into flat metrics"""
+    # NOTE: for avoiding recursive import
+    from ..contrib.evaluate import risk_analysis  # pylint: disable=C0415
+
+    shared = _sweep_shared
+    exchange_attrs = sweep_config.get("exchange", {})
+    unknown_attrs = set(exchange_attrs) - SWEEP_EXCHANGE_ATTRS
+    if len(unknown_attrs) > 0:
+        raise ValueError(f"{unknown_attrs} can't be swept because the quote must be rebuilt.")
+    # the shallow copy shares the read-only quote with the exchange built in `backtest_sweep`
+    trade_exchange = copy.copy(shared["exchange"])
+    for attr, value in exchange_attrs.items():
+        setattr(trade_exchange, attr, value)
+
+    trade_strategy, trade_executor = get_strategy_executor(
+        shared["start_time"],
+        shared["end_time"],
+        _merge_kwargs(shared["strategy"], sweep_config.get("strategy", {})),
+        _merge_kwargs(shared["executor"], sweep_config.get("executor", {})),
+        shared["benchmark"],
+        copy.deepcopy(sweep_config.get("account", shared["account"])),
+        {"exchange": trade_exchange},
+        pos_type=shared["pos_type"],
+    )
+    portfolio_dict, indicator_dict = backtest_loop(
+        shared["start_time"], shared["end_time"], trade_strategy, trade_executor
+    )
+
+    metrics: Dict[str, float] = {}
+    for freq, (report_normal, _) in portfolio_dict.items():
+        for name, excess_return in (
+            ("excess_return_without_cost", report_normal["return"] - report_normal["bench"]),
+            ("excess_return_with_cost", report_normal["return"] - report_normal["bench"] - report_normal["cost"]),
+        ):
+            risk = risk_analysis(excess_return, freq=freq)["risk"]
+            metrics.update({f"{freq}.{name}.{k}": v for k, v in risk.items()})
+    for freq, (indicator_df, _) in indicator_dict.items():
+        if not indicator_df.empty:
+            metrics.update({f"{freq}.{k}": v for k, v in indicator_df.mean().items()})
+    return metrics
+
+
+def backtest_sweep(
+    start_time: Union[pd.Timestamp, str],
+    end_time: Union[pd.Timestamp, str],
+    strategy: Union[str, dict, object, Path],
+    executor: Union[str, dict, object, Path],
+    sweep_configs: List[dict],
+    benchmark: str = "SH000300",
+    account: Union[float, int, dict] = 1e9,
+    exchange_kwargs: dict = {},
+    pos_type: str = "Position",
+    n_jobs: Optional[int] = None,
+) -> pd.DataFrame:
+    """run independent backtests over a list of configs in parallel.
+
+    The exchange (and its quote) is built only once. Every worker process of the pool reuses it read-only, so the
+    quote is not queried from qlib repeatedly for each config.
+
+    Parameters
+    ----------
+    start_time, end_time, benchmark, account, exchange_kwargs, pos_type :
+        please refer to the docs of `backtest`. They are shared by all the configs.
+    strategy : Union[str, dict, object, Path]
+        the base config of the outermost strategy. It must be a dict if any config overrides its kwargs.
+    executor : Union[str, dict, object, Path]
+        the base config of the outermost executor. It must be a dict if any config overrides its kwargs.
+    sweep_configs : List[dict]
+        each config may contain following keys (all of them are optional)
+
+        .. code-block:: python
+
+            {
+                "strategy": {"topk": 50, "n_drop": 5},  # update the kwargs of the strategy
+                "executor": {},  # update the kwargs of the executor
+                "exchange": {"open_cost": 0.0005, "close_cost": 0.0015},  # see `SWEEP_EXCHANGE_ATTRS`
+                "account": 1e8,  # replace the account
+            }
+    n_jobs : Optional[int]
+        the number of worker processes. `None` means `C.get_kernels`; 1 runs the configs in the current process.
+
+    Returns
+    -------
+    pd.DataFrame
+        the portfolio metrics (risk analysis of the excess returns and the mean of the trade indicators); one row for
+        each config, indexed by the position of the config in `sweep_configs`.
+    """
+    exchange_kwargs = copy.copy(exchange_kwargs)
+    if "start_time" not in exchange_kwargs:
+        exchange_kwargs["start_time"] = start_time
+    if "end_time" not in exchange_kwargs:
+        exchange_kwargs["end_time"] = end_time
+    shared = {
+        "exchange": get_exchange(**exchange_kwargs),
+        "start_time": start_time,
+        "end_time": end_time,
+        "strategy": strategy,
+        "executor": executor,
+        "benchmark": benchmark,
+        "account": account,
+        "pos_type": pos_type,
+    }
+
+    if n_jobs is None:
+        n_jobs = C.get_kernels(exchange_kwargs.get("freq", "day"))
+    if n_jobs == 1:
+        _init_sweep_worker(shared)
+        metrics = [_run_sweep_config(cfg) for cfg in sweep_configs]
+    else:
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=n_jobs, initializer=_init_sweep_worker, initargs=(shared, C)
+        ) as pool:
+            metrics = list(pool.map(_run_sweep_config, sweep_configs))
+    return pd.DataFrame(metrics, index=pd.RangeIndex(len(sweep_configs), name="config"))
+
+
+__all__ = ["Order", "backtest", "backtest_sweep", "get_strategy_executor"]
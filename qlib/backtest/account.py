@@ -13,6 +13,7 @@ from .decision import BaseTradeDecision, Order
 from .exchange import Exchange
 from .high_performance_ds import BaseOrderIndicator
 from .position import BasePosition
+from .profiler import PROFILER
 from .report import Indicator, PortfolioMetrics
 
 """
@@ -312,26 +313,27 @@ class Account:
         """update trade indicators and order indicators in each bar end"""
         # TODO: will skip empty decisions make it faster?  `outer_trade_decision.empty():`
 
-        # indicator is trading (e.g. high-frequency order execution) related analysis
-        self.indicator.reset()
+        with PROFILER.timer("account.update_indicator"):
+            # indicator is trading (e.g. high-frequency order execution) related analysis
+            self.indicator.reset()
 
-        # aggregate the information for each order
-        if atomic:
-            self.indicator.update_order_indicators(trade_info)
-        else:
-            self.indicator.agg_order_indicators(
-                inner_order_indicators,
-                decision_list=decision_list,
-                outer_trade_decision=outer_trade_decision,
-                trade_exchange=trade_exchange,
-                indicator_config=indicator_config,
-            )
+            # aggregate the information for each order
+            if atomic:
+                self.indicator.update_order_indicators(trade_info)
+            else:
+                self.indicator.agg_order_indicators(
+                    inner_order_indicators,
+                    decision_list=decision_list,
+                    outer_trade_decision=outer_trade_decision,
+                    trade_exchange=trade_exchange,
+                    indicator_config=indicator_config,
+                )
 
-        # aggregate all the order metrics a single step
-        self.indicator.cal_trade_indicators(trade_start_time, self.freq, indicator_config)
+            # aggregate all the order metrics a single step
+            self.indicator.cal_trade_indicators(trade_start_time, self.freq, indicator_config)
 
-        # record the metrics
-        self.indicator.record(trade_start_time)
+            # record the metrics
+            self.indicator.record(trade_start_time)
 
     def update_bar_end(
         self,
@@ -375,30 +377,31 @@ class Account:
         indicator_config : dict, optional
             config of calculating indicators, by default {}
         """
-        if atomic is True and trade_info is None:
-            raise ValueError("trade_info is necessary in atomic executor")
-        elif atomic is False and inner_order_indicators is None:
-            raise ValueError("inner_order_indicators is necessary in un-atomic executor")
-
-        # update current position and hold bar count in each bar end
-        self.update_current_position(trade_start_time, trade_end_time, trade_exchange)
-
-        if self.is_port_metr_enabled():
-            # portfolio_metrics is portfolio related analysis
-            self.update_portfolio_metrics(trade_start_time, trade_end_time)
-            self.update_hist_positions(trade_start_time)
-
-        # update indicator in each bar end
-        self.update_indicator(
-            trade_start_time=trade_start_time,
-            trade_exchange=trade_exchange,
-            atomic=atomic,
-            outer_trade_decision=outer_trade_decision,
-            trade_info=trade_info,
-            inner_order_indicators=inner_order_indicators,
-            decision_list=decision_list,
-            indicator_config=indicator_config,
-        )
+        with PROFILER.timer("account.update_bar_end"):
+            if atomic is True and trade_info is None:
+                raise ValueError("trade_info is necessary in atomic executor")
+            elif atomic is False and inner_order_indicators is None:
+                raise ValueError("inner_order_indicators is necessary in un-atomic executor")
+
+            # update current position and hold bar count in each bar end
+            self.update_current_position(trade_start_time, trade_end_time, trade_exchange)
+
+            if self.is_port_metr_enabled():
+                # portfolio_metrics is portfolio related analysis
+                self.update_portfolio_metrics(trade_start_time, trade_end_time)
+                self.update_hist_positions(trade_start_time)
+
+            # update indicator in each bar end
+            self.update_indicator(
+                trade_start_time=trade_start_time,
+                trade_exchange=trade_exchange,
+                atomic=atomic,
+                outer_trade_decision=outer_trade_decision,
+                trade_info=trade_info,
+                inner_order_indicators=inner_order_indicators,
+                decision_list=decision_list,
+                indicator_config=indicator_config,
+            )
 
     def get_portfolio_metrics(self) -> Tuple[pd.DataFrame, dict]:
         """get the history portfolio_metrics and positions instance"""
@@ -17,6 +17,7 @@ if TYPE_CHECKING:
 from tqdm.auto import tqdm
 
 from ..utils.time import Freq
+from .profiler import PROFILER
 
 
 PORT_METRIC = Dict[str, Tuple[pd.DataFrame, dict]]
@@ -86,7 +87,8 @@ def collect_data_loop(
     with tqdm(total=trade_executor.trade_calendar.get_trade_len(), desc="backtest loop") as bar:
         _execute_result = None
         while not trade_executor.finished():
-            _trade_decision: BaseTradeDecision = trade_strategy.generate_trade_decision(_execute_result)
+            with PROFILER.timer("strategy.generate_trade_decision", level=0):
+                _trade_decision: BaseTradeDecision = trade_strategy.generate_trade_decision(_execute_result)
             _execute_result = yield from trade_executor.collect_data(_trade_decision, level=0)
             trade_strategy.post_exe_step(_execute_result)
             bar.update(1)
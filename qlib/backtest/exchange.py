@@ -23,6 +23,7 @@ from ..data.data import D
 from ..log import get_module_logger
 from .decision import Order, OrderDir, OrderHelper
 from .high_performance_ds import BaseQuote, NumpyQuote
+from .profiler import PROFILER
 
 
 class Exchange:
@@ -198,6 +199,9 @@ class Exchange:
         self.quote_cls = quote_cls
         self.quote: BaseQuote = self.quote_cls(self.quote_df, freq)
 
+        # the tradability masks are built lazily when `tradable_mask` & etc. are called for the first time
+        self._masks: Optional[Dict[str, Any]] = None
+
     def get_quote_from_qlib(self) -> None:
         # get stock data from qlib
         if len(self.codes) == 0:
@@ -335,6 +339,142 @@ class Exchange:
 
         return buy_vol_limit, sell_vol_limit, fields
 
+    def _build_masks(self) -> Dict[str, Any]:
+        """
+        Precompute the boolean `(time, instrument)` masks for checking the trading limitation and the suspension of
+        a batch of stocks with array operations.
+
+        - `present`: there is a quote record of the stock at the time
+        - `traded`: the $close is not NaN (i.e. not suspended)
+        - `limit_buy` / `limit_sell`: the buying/selling is limited (only meaningful when `present`)
+        """
+        if self._masks is None:
+            quote_df = self.quote_df[["$close", "limit_buy", "limit_sell"]]
+            # NOTE: NaN in the limit fields indicates that the stock is limited, which is the same as `NumpyQuote`
+            mask_df = pd.DataFrame(
+                {
+                    "present": True,
+                    "traded": quote_df["$close"].notna(),
+                    "limit_buy": quote_df["limit_buy"].astype(float) != 0,
+                    "limit_sell": quote_df["limit_sell"].astype(float) != 0,
+                },
+                index=quote_df.index,
+            )
+            mask_df = mask_df[~mask_df.index.duplicated(keep="first")].unstack(level="instrument", fill_value=False)
+            mask_df = mask_df.sort_index()
+            self._masks = {
+                "times": mask_df.index,
+                "stocks": mask_df["present"].columns,
+                **{
+                    name: mask_df[name].values.astype(bool) for name in ("present", "traded", "limit_buy", "limit_sell")
+                },
+            }
+        return self._masks
+
+    def _get_mask_slice(
+        self,
+        stocks: List[str],
+        start_time: pd.Timestamp,
+        end_time: pd.Timestamp,
+    ) -> Tuple[Dict[str, Any], slice, np.ndarray]:
+        masks = self._build_masks()
+        times = masks["times"]
+        # closed time range [start_time, end_time] like `BaseQuote.get_data`
+        time_slc = slice(
+            times.searchsorted(pd.Timestamp(start_time), side="left"),
+            times.searchsorted(pd.Timestamp(end_time), side="right"),
+        )
+        return masks, time_slc, masks["stocks"].get_indexer(stocks)
+
+    def suspended_mask(
+        self,
+        stocks: List[str],
+        start_time: pd.Timestamp,
+        end_time: pd.Timestamp,
+    ) -> np.ndarray:
+        """the vectorized version of `check_stock_suspended`.
+
+        Returns
+        -------
+        np.ndarray
+            boolean array aligned with `stocks`; True indicates the stock is suspended (hence not tradable)
+        """
+        masks, time_slc, idx = self._get_mask_slice(stocks, start_time, end_time)
+        # stocks not in the stock list are regarded as suspended
+        res = np.ones(len(idx), dtype=bool)
+        valid = idx >= 0
+        res[valid] = ~masks["traded"][time_slc, idx[valid]].any(axis=0)
+        return res
+
+    def limit_mask(
+        self,
+        stocks: List[str],
+        start_time: pd.Timestamp,
+        end_time: pd.Timestamp,
+        direction: int = None,
+    ) -> np.ndarray:
+        """the vectorized version of `check_stock_limit`.
+
+        Returns
+        -------
+        np.ndarray
+            boolean array aligned with `stocks`; True indicates the trading of the stock is limited
+        """
+        masks, time_slc, idx = self._get_mask_slice(stocks, start_time, end_time)
+        if direction is None:
+            fields = ["limit_buy", "limit_sell"]
+        elif direction == Order.BUY:
+            fields = ["limit_buy"]
+        elif direction == Order.SELL:
+            fields = ["limit_sell"]
+        else:
+            raise ValueError(f"direction {direction} is not supported!")
+
+        res = np.zeros(len(idx), dtype=bool)
+        valid = idx >= 0
+        present = masks["present"][time_slc, idx[valid]]
+        # **all** the existing records are limited. The stock is not limited if there is no record
+        has_record = present.any(axis=0)
+        for field in fields:
+            res[valid] |= has_record & (masks[field][time_slc, idx[valid]] | ~present).all(axis=0)
+        return res
+
+    def tradable_mask(
+        self,
+        stocks: List[str],
+        start_time: pd.Timestamp,
+        end_time: pd.Timestamp,
+        direction: int = None,
+    ) -> np.ndarray:
+        """the vectorized version of `is_stock_tradable`.
+
+        It is useful for filtering a whole list of candidate stocks with one array operation.
+
+        .. code-block:: python
+
+            candidates = np.array(candidates)
+            candidates = candidates[trade_exchange.tradable_mask(candidates, start_time, end_time, Order.BUY)]
+
+        Parameters
+        ----------
+        stocks : List[str]
+            the stock ids to check.
+        start_time : pd.Timestamp
+            closed start time
+        end_time : pd.Timestamp
+            closed end time
+        direction : int, optional
+            please refer to the docs of `check_stock_limit`
+
+        Returns
+        -------
+        np.ndarray
+            boolean array aligned with `stocks`; True indicates the stock is tradable
+        """
+        return ~(
+            self.suspended_mask(stocks, start_time, end_time) | self.limit_mask(stocks, start_time, end_time, direction)
+        )
+
     def check_stock_limit(
         self,
         stock_id: str,
@@ -434,33 +574,36 @@ class Exchange:
         :param dealt_order_amount: the dealt order amount dict with the format of {stock_id: float}
         :return: trade_val, trade_cost, trade_price
         """
-        # check order first.
-        if not self.check_order(order):
-            order.deal_amount = 0.0
-            # using np.nan instead of None to make it more convenient to show the value in format string
-            self.logger.debug(f"Order failed due to trading limitation: {order}")
-            return 0.0, 0.0, np.nan
-
-        if trade_account is not None and position is not None:
-            raise ValueError("trade_account and position can only choose one")
-
-        # NOTE: order will be changed in this function
-        trade_price, trade_val, trade_cost = self._calc_trade_info_by_order(
-            order,
-            trade_account.current_position if trade_account else position,
-            dealt_order_amount,
-        )
-        if trade_val > 1e-5:
-            # If the order can only be deal 0 value. Nothing to be updated
-            # Otherwise, it will result in
-            # 1) some stock with 0 value in the position
-            # 2) `trade_unit` of trade_cost will be lost in user account
-            if trade_account:
-                trade_account.update_order(order=order, trade_val=trade_val, cost=trade_cost, trade_price=trade_price)
-            elif position:
-                position.update_order(order=order, trade_val=trade_val, cost=trade_cost, trade_price=trade_price)
-
-        return trade_val, trade_cost, trade_price
+        with PROFILER.timer("exchange.deal_order"):
+            # check order first.
+            if not self.check_order(order):
+                order.deal_amount = 0.0
+                # using np.nan instead of None to make it more convenient to show the value in format string
+                self.logger.debug(f"Order failed due to trading limitation: {order}")
+                return 0.0, 0.0, np.nan
+
+            if trade_account is not None and position is not None:
+                raise ValueError("trade_account and position can only choose one")
+
+            # NOTE: order will be changed in this function
+            trade_price, trade_val, trade_cost = self._calc_trade_info_by_order(
+                order,
+                trade_account.current_position if trade_account else position,
+                dealt_order_amount,
+            )
+            if trade_val > 1e-5:
+                # If the order can only be deal 0 value. Nothing to be updated
+                # Otherwise, it will result in
+                # 1) some stock with 0 value in the position
+                # 2) `trade_unit` of trade_cost will be lost in user account
+                if trade_account:
+                    trade_account.update_order(
+                        order=order, trade_val=trade_val, cost=trade_cost, trade_price=trade_price
+                    )
+                elif position:
+                    position.update_order(order=order, trade_val=trade_val, cost=trade_cost, trade_price=trade_price)
+
+            return trade_val, trade_cost, trade_price
 
     def get_quote_info(
         self,
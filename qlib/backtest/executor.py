@@ -16,6 +16,7 @@ from ..strategy.base import BaseStrategy
 from ..utils import init_instance_by_config
 from .decision import BaseTradeDecision, Order
 from .exchange import Exchange
+from .profiler import PROFILER
 from .utils import CommonInfrastructure, LevelInfrastructure, TradeCalendarManager, get_start_end_idx
 
 
@@ -262,45 +263,46 @@ class BaseExecutor:
         if self.track_data:
             yield trade_decision
 
-        atomic = not issubclass(self.__class__, NestedExecutor)  # issubclass(A, A) is True
+        with PROFILER.timer("executor.collect_data", level=level):
+            atomic = not issubclass(self.__class__, NestedExecutor)  # issubclass(A, A) is True
 
-        if atomic and trade_decision.get_range_limit(default_value=None) is not None:
-            raise ValueError("atomic executor doesn't support specify `range_limit`")
+            if atomic and trade_decision.get_range_limit(default_value=None) is not None:
+                raise ValueError("atomic executor doesn't support specify `range_limit`")
 
-        if self._settle_type != BasePosition.ST_NO:
-            self.trade_account.current_position.settle_start(self._settle_type)
+            if self._settle_type != BasePosition.ST_NO:
+                self.trade_account.current_position.settle_start(self._settle_type)
 
-        obj = self._collect_data(trade_decision=trade_decision, level=level)
+            obj = self._collect_data(trade_decision=trade_decision, level=level)
 
-        if isinstance(obj, GeneratorType):
-            yield_res = yield from obj
-            assert isinstance(yield_res, tuple) and len(yield_res) == 2
-            res, kwargs = yield_res
-        else:
-            # Some concrete executor don't have inner decisions
-            res, kwargs = obj
-
-        trade_start_time, trade_end_time = self.trade_calendar.get_step_time()
-        # Account will not be changed in this function
-        self.trade_account.update_bar_end(
-            trade_start_time,
-            trade_end_time,
-            self.trade_exchange,
-            atomic=atomic,
-            outer_trade_decision=trade_decision,
-            indicator_config=self.indicator_config,
-            **kwargs,
-        )
+            if isinstance(obj, GeneratorType):
+                yield_res = yield from obj
+                assert isinstance(yield_res, tuple) and len(yield_res) == 2
+                res, kwargs = yield_res
+            else:
+                # Some concrete executor don't have inner decisions
+                res, kwargs = obj
+
+            trade_start_time, trade_end_time = self.trade_calendar.get_step_time()
+            # Account will not be changed in this function
+            self.trade_account.update_bar_end(
+                trade_start_time,
+                trade_end_time,
+                self.trade_exchange,
+                atomic=atomic,
+                outer_trade_decision=trade_decision,
+                indicator_config=self.indicator_config,
+                **kwargs,
+            )
 
-        self.trade_calendar.step()
+            self.trade_calendar.step()
 
-        if self._settle_type != BasePosition.ST_NO:
-            self.trade_account.current_position.settle_commit()
+            if self._settle_type != BasePosition.ST_NO:
+                self.trade_account.current_position.settle_commit()
 
-        if return_value is not None:
-            return_value.update({"execute_result": res})
+            if return_value is not None:
+                return_value.update({"execute_result": res})
 
-        return res
+            return res
 
     def get_all_executors(self) -> List[BaseExecutor]:
         """get all executors"""
@@ -415,6 +417,9 @@ class NestedExecutor(BaseExecutor):
         # - this is necessary to calculating the steps in sub level
         # - more detailed information will be set into trade decision
         self._init_sub_trading(trade_decision)
+        # the inner order indicators are aggregated incrementally when each inner step is done
+        trade_indicator = self.trade_account.get_trade_indicator()
+        trade_indicator.reset_inner_acc(self.trade_exchange, pa_config=self.indicator_config.get("pa_config", {}))
 
         _inner_execute_result = None
         while not self.inner_executor.finished():
@@ -433,7 +438,8 @@ class NestedExecutor(BaseExecutor):
             if not self._align_range_limit or start_idx <= sub_cal.get_trade_step() <= end_idx:
                 # if force align the range limit, skip the steps outside the decision range limit
 
-                res = self.inner_strategy.generate_trade_decision(_inner_execute_result)
+                with PROFILER.timer("strategy.generate_trade_decision", level=level + 1):
+                    res = self.inner_strategy.generate_trade_decision(_inner_execute_result)
 
                 # NOTE: !!!!!
                 # the two lines below is for a special case in RL
@@ -459,7 +465,8 @@ class NestedExecutor(BaseExecutor):
                 trade_decision.mod_inner_decision(_inner_trade_decision)  # propagate part of decision information
 
                 # NOTE sub_cal.get_step_time() must be called before collect_data in case of step shifting
-                decision_list.append((_inner_trade_decision, *sub_cal.get_step_time()))
+                inner_step_time = sub_cal.get_step_time()
+                decision_list.append((_inner_trade_decision, *inner_step_time))
 
                 # NOTE: Trade Calendar will step forward in the follow line
                 _inner_execute_result = yield from self.inner_executor.collect_data(
@@ -470,9 +477,11 @@ class NestedExecutor(BaseExecutor):
                 self.post_inner_exe_step(_inner_execute_result)
                 execute_result.extend(_inner_execute_result)
 
-                inner_order_indicators.append(
-                    self.inner_executor.trade_account.get_trade_indicator().get_order_indicator(raw=True),
+                inner_order_indicator = self.inner_executor.trade_account.get_trade_indicator().get_order_indicator(
+                    raw=True
                 )
+                inner_order_indicators.append(inner_order_indicator)
+                trade_indicator.update_inner_acc(inner_order_indicator, _inner_trade_decision, *inner_step_time)
             else:
                 # do nothing and just step forward
                 sub_cal.step()
@@ -0,0 +1,161 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+"""
+Opt-in instrumentation of the hot paths of the backtest.
+
+The profiler is disabled by default and the timers only cost a function call and a flag check in that case.
+When it is enabled, the cumulative time and the call count of each (level, component) are recorded. The level is
+the level of the executor in the nested decision execution (0 indicates the outermost level).
+
+.. code-block:: python
+
+    from qlib.backtest.profiler import PROFILER
+
+    with PROFILER.profiling(trace=True):
+        portfolio_dict, indicator_dict = backtest(...)
+    print(PROFILER.to_dataframe())
+    PROFILER.dump_chrome_trace("backtest_trace.json")  # open it with chrome://tracing or https://ui.perfetto.dev
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from time import perf_counter
+from typing import ContextManager, Dict, Iterator, List, Optional, Tuple, Union
+
+import pandas as pd
+
+_NULL_TIMER = nullcontext()
+
+
+class _Timer:
+    __slots__ = ("profiler", "component", "level", "push_level", "start")
+
+    def __init__(self, profiler: BacktestProfiler, component: str, level: Optional[int]) -> None:
+        self.profiler = profiler
+        self.component = component
+        self.push_level = level is not None
+        self.level = level if level is not None else profiler.current_level()
+
+    def __enter__(self) -> None:
+        if self.push_level:
+            self.profiler.level_stack.append(self.level)
+        self.start = perf_counter()
+
+    def __exit__(self, *args) -> None:
+        end = perf_counter()
+        if self.push_level:
+            self.profiler.level_stack.pop()
+        self.profiler.record(self.component, self.level, self.start, end)
+
+
+class BacktestProfiler:
+    """cumulative timers and call counts for each (level, component) of the backtest"""
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self.trace = False
+        self.reset()
+
+    def reset(self) -> None:
+        """clear all the records"""
+        # <(level, component), [call count, cumulative time in seconds]>
+        self.stats: Dict[Tuple[int, str], List[Union[int, float]]] = {}
+        # the events in the Chrome trace event format
+        self.events: List[dict] = []
+        self.level_stack: List[int] = []
+        self._origin = perf_counter()
+
+    def enable(self, trace: bool = False) -> None:
+        """
+        Parameters
+        ----------
+        trace : bool
+            record every timed call as a Chrome trace event besides the cumulative statistics.
+            It takes memory proportional to the number of calls.
+        """
+        self.enabled = True
+        self.trace = trace
+
+    def disable(self) -> None:
+        self.enabled = False
+
+    @contextmanager
+    def profiling(self, trace: bool = False, reset: bool = True) -> Iterator[BacktestProfiler]:
+        """enable the profiler in the context"""
+        if reset:
+            self.reset()
+        self.enable(trace=trace)
+        try:
+            yield self
+        finally:
+            self.disable()
+
+    def current_level(self) -> int:
+        return self.level_stack[-1] if len(self.level_stack) > 0 else 0
+
+    def timer(self, component: str, level: Optional[int] = None) -> ContextManager:
+        """
+        Time the code in the context.
+
+        Parameters
+        ----------
+        component : str
+            the name of the timed component, e.g. "exchange.deal_order"
+        level : Optional[int]
+            the level of the executor. If it is given, the level will be the default level of the timers inside the
+            context; otherwise, the level of the enclosing timer is used.
+        """
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self, component, level)
+
+    def record(self, component: str, level: int, start: float, end: float) -> None:
+        stat = self.stats.setdefault((level, component), [0, 0.0])
+        stat[0] += 1
+        stat[1] += end - start
+        if self.trace:
+            self.events.append(
+                {
+                    "name": component,
+                    "cat": f"level{level}",
+                    "ph": "X",
+                    "ts": (start - self._origin) * 1e6,
+                    "dur": (end - start) * 1e6,
+                    "pid": os.getpid(),
+                    "tid": threading.get_ident(),
+                    "args": {"level": level},
+                }
+            )
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """
+        Returns
+        -------
+        pd.DataFrame
+            index: MultiIndex[level, component]; columns: count, total (seconds), mean (seconds).
+            NOTE: the time of a component includes the time of the components called inside it.
+        """
+        df = pd.DataFrame.from_dict(self.stats, orient="index", columns=["count", "total"])
+        if df.empty:
+            df.index = pd.MultiIndex.from_tuples([], names=["level", "component"])
+        else:
+            df.index = pd.MultiIndex.from_tuples(df.index, names=["level", "component"])
+        df["mean"] = df["total"] / df["count"]
+        return df.sort_index()
+
+    def to_chrome_trace(self) -> dict:
+        """the recorded events in the Chrome trace event format; `trace=True` is required when profiling"""
+        return {"traceEvents": self.events, "displayTimeUnit": "ms"}
+
+    def dump_chrome_trace(self, path: Union[str, Path]) -> None:
+        with Path(path).open("w") as f:
+            json.dump(self.to_chrome_trace(), f)
+
+
+# the global profiler used by the backtest
+PROFILER = BacktestProfiler()
@@ -4,7 +4,7 @@
 
 import pathlib
 from collections import OrderedDict
-from typing import Any, Dict, List, Optional, Text, Tuple, Type, Union, cast
+from typing import Any, Dict, List, Optional, Set, Text, Tuple, Type, Union, cast
 
 import numpy as np
 import pandas as pd
@@ -241,6 +241,132 @@ class PortfolioMetrics:
             )
 
 
+class InnerOrderIndicatorAccumulator:
+    """
+    Running accumulators of the inner order indicators of a nested executor.
+
+    The inner order indicators are folded in one by one right after each inner step is executed. So the order
+    indicators of the outer step can be produced in O(#stocks) at the end of the outer step instead of re-aggregating
+    all the inner order indicators.
+
+    The results are the same as aggregating the list of inner order indicators by `Indicator._agg_order_trade_info`
+    and `Indicator._agg_base_price`.
+    """
+
+    # the metrics summed directly
+    SUM_METRICS = ["inner_amount", "deal_amount", "trade_value", "trade_cost", "trade_dir"]
+
+    def __init__(self, indicator: "Indicator", trade_exchange: Exchange, pa_config: dict = {}) -> None:
+        self.indicator = indicator
+        self.trade_exchange = trade_exchange
+        self.pa_config = pa_config
+
+        self.n_step = 0
+        self.sums: Dict[str, Dict[str, float]] = {metric: {} for metric in self.SUM_METRICS}
+        # the sum of deal_amount * trade_price
+        self.trade_amount: Dict[str, float] = {}
+
+        # <step, (decision, start_time, end_time, base_price, base_volume)> for backfilling the base price
+        self._steps: List[Tuple[BaseTradeDecision, pd.Timestamp, pd.Timestamp, dict, dict]] = []
+        # the sum of base_price * base_volume and base_volume
+        self.base_pv: Dict[str, float] = {}
+        self.base_volume: Dict[str, float] = {}
+        # the stocks with any valid base price
+        self.has_base: Set[str] = set()
+        # the direction used when accumulating the base price of each stock
+        self._base_dir: Dict[str, OrderDir] = {}
+
+    @staticmethod
+    def _add(acc: Dict[str, float], data: idd.SingleData) -> None:
+        for inst, value in zip(data.index, data.data):
+            # NaN is treated as 0 like `sum_all_indicators(..., fill_value=0)`
+            acc[inst] = acc.get(inst, 0) + (0 if np.isnan(value) else value)
+
+    def _base_vol_pri(
+        self,
+        inst: str,
+        step: Tuple[BaseTradeDecision, pd.Timestamp, pd.Timestamp, dict, dict],
+        direction: OrderDir,
+    ) -> Tuple[Optional[float], Optional[float]]:
+        dec, start, end, bp_d, bv_d = step
+        bp = bp_d.get(inst, np.nan)
+        if not np.isnan(bp):
+            return bp, bv_d.get(inst, np.nan)
+        return self.indicator._get_base_vol_pri(
+            inst,
+            start,
+            end,
+            decision=dec,
+            direction=direction,
+            trade_exchange=self.trade_exchange,
+            pa_config=self.pa_config,
+        )
+
+    def _add_base(self, inst: str, bp: Optional[float], bv: Optional[float]) -> None:
+        if (bp is None) or (bv is None):
+            return
+        self.has_base.add(inst)
+        # NaN values are skipped like `np.nansum`
+        pv = bp * bv
+        if not np.isnan(pv):
+            self.base_pv[inst] = self.base_pv.get(inst, 0) + pv
+        if not np.isnan(bv):
+            self.base_volume[inst] = self.base_volume.get(inst, 0) + bv
+
+    def _reset_base(self, inst: str, direction: OrderDir) -> None:
+        self.base_pv.pop(inst, None)
+        self.base_volume.pop(inst, None)
+        self.has_base.discard(inst)
+        self._base_dir[inst] = direction
+
+    def update(
+        self,
+        inner_order_indicator: BaseOrderIndicator,
+        decision: BaseTradeDecision,
+        start_time: pd.Timestamp,
+        end_time: pd.Timestamp,
+    ) -> None:
+        """fold the order indicator of an inner step into the accumulators"""
+        new_insts = [
+            inst for inst in inner_order_indicator.get_index_data("inner_amount").index if inst not in self._base_dir
+        ]
+
+        for metric in self.SUM_METRICS:
+            self._add(self.sums[metric], inner_order_indicator.get_index_data(metric))
+        deal_amount = inner_order_indicator.get_index_data("deal_amount").to_dict()
+        for inst, price in inner_order_indicator.get_index_data("trade_price").to_dict().items():
+            value = deal_amount.get(inst, np.nan) * price
+            self.trade_amount[inst] = self.trade_amount.get(inst, 0) + (0 if np.isnan(value) else value)
+
+        step = (
+            decision,
+            start_time,
+            end_time,
+            inner_order_indicator.get_index_data("base_price").to_dict(),
+            inner_order_indicator.get_index_data("base_volume").to_dict(),
+        )
+        self._steps.append(step)
+        self.n_step += 1
+
+        for inst in new_insts:
+            # backfill the base price of the previous steps for the stocks that appear for the first time
+            self._reset_base(inst, Order.parse_dir(self.sums["trade_dir"][inst]))
+            for prev_step in self._steps[:-1]:
+                self._add_base(inst, *self._base_vol_pri(inst, prev_step, self._base_dir[inst]))
+        for inst, direction in self._base_dir.items():
+            self._add_base(inst, *self._base_vol_pri(inst, step, direction))
+
+    def finalize(self) -> None:
+        """make sure the base price is accumulated with the final trading direction of each stock"""
+        for inst, direction in list(self._base_dir.items()):
+            final_direction = Order.parse_dir(self.sums["trade_dir"][inst])
+            if final_direction != direction:
+                # rare case: the direction changes when both buying and selling happens in the inner steps
+                self._reset_base(inst, final_direction)
+                for step in self._steps:
+                    self._add_base(inst, *self._base_vol_pri(inst, step, final_direction))
+
+
 class Indicator:
     """
     `Indicator` is implemented in a aggregate way.
@@ -283,6 +409,9 @@ class Indicator:
 
         self._trade_calendar = None
 
+        # the running accumulators of the inner order indicators in the current outer step (nested executors only)
+        self.inner_acc: Optional[InnerOrderIndicatorAccumulator] = None
+
     # def reset(self, trade_calendar: TradeCalendarManager):
     def reset(self) -> None:
         self.order_indicator = self.order_indicator_cls()
@@ -335,22 +464,58 @@ class Indicator:
         self._update_order_trade_info(trade_info=trade_info)
         self._update_order_fulfill_rate()
 
-    def _agg_order_trade_info(self, inner_order_indicators: List[BaseOrderIndicator]) -> None:
-        # calculate total trade amount with each inner order indicator.
-        def trade_amount_func(deal_amount, trade_price):
-            return deal_amount * trade_price
+    def reset_inner_acc(self, trade_exchange: Exchange, pa_config: dict = {}) -> None:
+        """start accumulating the inner order indicators of a new outer step"""
+        self.inner_acc = InnerOrderIndicatorAccumulator(self, trade_exchange, pa_config=pa_config)
 
-        for indicator in inner_order_indicators:
-            indicator.transfer(trade_amount_func, "trade_price")
-
-        # sum inner order indicators with same metric.
-        all_metric = ["inner_amount", "deal_amount", "trade_price", "trade_value", "trade_cost", "trade_dir"]
-        self.order_indicator_cls.sum_all_indicators(
-            self.order_indicator,
-            inner_order_indicators,
-            all_metric,
-            fill_value=0,
-        )
+    def update_inner_acc(
+        self,
+        inner_order_indicator: BaseOrderIndicator,
+        decision: BaseTradeDecision,
+        start_time: pd.Timestamp,
+        end_time: pd.Timestamp,
+    ) -> None:
+        """fold the order indicator of an inner step into the accumulators of current outer step"""
+        if self.inner_acc is not None:
+            self.inner_acc.update(inner_order_indicator, decision, start_time, end_time)
+
+    def _pop_inner_acc(self, n_step: int) -> Optional[InnerOrderIndicatorAccumulator]:
+        """get the accumulators if they are consistent with the `n_step` inner order indicators to aggregate"""
+        acc, self.inner_acc = self.inner_acc, None
+        if acc is not None and acc.n_step == n_step:
+            acc.finalize()
+            return acc
+        return None
+
+    def _agg_order_trade_info(
+        self,
+        inner_order_indicators: List[BaseOrderIndicator],
+        inner_acc: Optional[InnerOrderIndicatorAccumulator] = None,
+    ) -> None:
+        if inner_acc is not None:
+            # the inner order indicators have been summed when they are executed
+            for metric in inner_acc.SUM_METRICS:
+                self.order_indicator.assign(metric, dict(sorted(inner_acc.sums[metric].items())))
+            self.order_indicator.assign(
+                "trade_price",
+                {inst: inner_acc.trade_amount.get(inst, 0) for inst in sorted(inner_acc.sums["inner_amount"])},
+            )
+        else:
+            # calculate total trade amount with each inner order indicator.
+            def trade_amount_func(deal_amount, trade_price):
+                return deal_amount * trade_price
+
+            for indicator in inner_order_indicators:
+                indicator.transfer(trade_amount_func, "trade_price")
+
+            # sum inner order indicators with same metric.
+            all_metric = ["inner_amount", "deal_amount", "trade_price", "trade_value", "trade_cost", "trade_dir"]
+            self.order_indicator_cls.sum_all_indicators(
+                self.order_indicator,
+                inner_order_indicators,
+                all_metric,
+                fill_value=0,
+            )
 
         def func(trade_price, deal_amount):
             # trade_price is np.NaN instead of inf when deal_amount is zero.
@@ -449,6 +614,7 @@ class Indicator:
         decision_list: List[Tuple[BaseTradeDecision, pd.Timestamp, pd.Timestamp]],
         trade_exchange: Exchange,
         pa_config: dict = {},
+        inner_acc: Optional[InnerOrderIndicatorAccumulator] = None,
     ) -> None:
         """
         # NOTE:!!!!
@@ -470,11 +636,25 @@ class Indicator:
                 "price": "$close",  # TODO: this is not supported now!!!!!
                                     # default to use deal price of the exchange
             }
+        inner_acc : Optional[InnerOrderIndicatorAccumulator]
+            the running accumulators of the inner order indicators. The base price will be taken from it directly if
+            it is given.
         """
 
-        # TODO: I think there are potentials to be optimized
         trade_dir = self.order_indicator.get_index_data("trade_dir")
-        if len(trade_dir) > 0:
+        if inner_acc is not None:
+            if len(trade_dir) > 0:
+                insts = sorted(inner_acc.has_base)
+                base_volume = {inst: inner_acc.base_volume.get(inst, 0.0) for inst in insts}
+                self.order_indicator.assign("base_volume", base_volume)
+                self.order_indicator.assign(
+                    "base_price",
+                    {
+                        inst: inner_acc.base_pv.get(inst, 0.0) / base_volume[inst] if base_volume[inst] != 0 else np.nan
+                        for inst in insts
+                    },
+                )
+        elif len(trade_dir) > 0:
             bp_all, bv_all = [], []
             # <step, inst, (base_volume | base_price)>
             for oi, (dec, start, end) in zip(inner_order_indicators, decision_list):
@@ -535,11 +715,18 @@ class Indicator:
         trade_exchange: Exchange,
         indicator_config: dict = {},
     ) -> None:
-        self._agg_order_trade_info(inner_order_indicators)
+        inner_acc = self._pop_inner_acc(len(inner_order_indicators))
+        self._agg_order_trade_info(inner_order_indicators, inner_acc=inner_acc)
         self._update_trade_amount(outer_trade_decision)
         self._update_order_fulfill_rate()
         pa_config = indicator_config.get("pa_config", {})
-        self._agg_base_price(inner_order_indicators, decision_list, trade_exchange, pa_config=pa_config)  # TODO
+        self._agg_base_price(
+            inner_order_indicators,
+            decision_list,
+            trade_exchange,
+            pa_config=pa_config,
+            inner_acc=inner_acc,
+        )
         self._agg_order_price_advantage()
 
     def _cal_trade_fulfill_rate(self, method: str = "mean") -> Optional[BaseSingleMetric]:
@@ -1,8 +1,9 @@
 # Copyright (c) Microsoft Corporation.
 # Licensed under the MIT License.
 import abc
-from typing import Dict, List, Text, Tuple, Union
+from typing import Dict, List, Optional, Text, Tuple, Union
 
+import numpy as np
 import pandas as pd
 
 from qlib.utils import init_instance_by_config
@@ -33,10 +34,86 @@ class Signal(metaclass=abc.ABCMeta):
         """
 
 
+class IndexedSignalStore:
+    """
+    An indexed store of the signal for retrieving the last valid signal of each instrument in a time range quickly.
+
+    The rows are sorted by (instrument, datetime) and encoded into integer keys. For each row and each column, the
+    position of the last valid (non-NaN) row of the same instrument up to that row is precomputed. So the query of
+    `resam_ts_data(signal, start_time, end_time, method="last")` becomes a vectorized binary search over the
+    instruments instead of slicing, grouping and aggregating the whole MultiIndex frame.
+    """
+
+    def __init__(self, signal: Union[pd.Series, pd.DataFrame]) -> None:
+        """
+        Parameters
+        ----------
+        signal : Union[pd.Series, pd.DataFrame]
+            the signal with MultiIndex[datetime, instrument] and float values
+        """
+        self.is_series = isinstance(signal, pd.Series)
+        self.name = signal.name if self.is_series else None
+        self.columns = None if self.is_series else signal.columns
+
+        date_codes, self.dates = pd.factorize(signal.index.get_level_values("datetime"), sort=True)
+        inst_codes, self.instruments = pd.factorize(signal.index.get_level_values("instrument"), sort=True)
+        self.instruments = pd.Index(self.instruments, name="instrument")
+        n_dates = len(self.dates)
+
+        key = inst_codes.astype(np.int64) * n_dates + date_codes
+        order = np.argsort(key, kind="stable")
+        self.key = key[order]
+        values = signal.values.astype(np.float64)
+        self.values = (values.reshape(-1, 1) if self.is_series else values)[order]
+
+        # the first row of the instrument of each row
+        inst_start = np.searchsorted(self.key, inst_codes[order].astype(np.int64) * n_dates, side="left")
+        row_pos = np.arange(len(self.key)).reshape(-1, 1)
+        last_valid = np.maximum.accumulate(np.where(np.isnan(self.values), -1, row_pos), axis=0)
+        last_valid[last_valid < inst_start.reshape(-1, 1)] = -1
+        self.last_valid = last_valid
+
+    def get_last(
+        self,
+        start_time: Optional[pd.Timestamp] = None,
+        end_time: Optional[pd.Timestamp] = None,
+    ) -> Union[pd.Series, pd.DataFrame, None]:
+        """
+        The same as `resam_ts_data(signal, start_time, end_time, method="last")`: the last valid value of each
+        instrument in the closed range [start_time, end_time]. Instruments with records only of NaN in the range are
+        kept with NaN values.
+        """
+        n_dates = len(self.dates)
+        d_start = 0 if start_time is None else self.dates.searchsorted(pd.Timestamp(start_time), side="left")
+        d_end = n_dates - 1 if end_time is None else self.dates.searchsorted(pd.Timestamp(end_time), side="right") - 1
+        if d_end < d_start or len(self.key) == 0:
+            return None
+
+        inst_idx = np.arange(len(self.instruments), dtype=np.int64)
+        # the last row of each instrument up to `end_time`
+        pos = np.searchsorted(self.key, inst_idx * n_dates + d_end, side="right") - 1
+        pos_c = np.maximum(pos, 0)
+        present = (pos >= 0) & (self.key[pos_c] // n_dates == inst_idx) & (self.key[pos_c] % n_dates >= d_start)
+        if not present.any():
+            return None
+
+        last_valid = self.last_valid[pos[present]]
+        lv_c = np.maximum(last_valid, 0)
+        valid = (last_valid >= 0) & (self.key[lv_c] % n_dates >= d_start)
+        values = np.where(valid, np.take_along_axis(self.values, lv_c, axis=0), np.nan)
+
+        index = self.instruments[present]
+        if self.is_series:
+            return pd.Series(values[:, 0], index=index, name=self.name)
+        return pd.DataFrame(values, index=index, columns=self.columns)
+
+
 class SignalWCache(Signal):
     """
     Signal With pandas with based Cache
     SignalWCache will store the prepared signal as a attribute and give the according signal based on input query
+
+    For numerical signals, an `IndexedSignalStore` is built for retrieving the signal in O(#instruments) each step.
     """
 
     def __init__(self, signal: Union[pd.Series, pd.DataFrame]) -> None:
@@ -56,11 +133,19 @@ class SignalWCache(Signal):
                            2008-01-08  0.395004
         """
         self.signal_cache = convert_index_format(signal, level="datetime")
+        dtypes = [self.signal_cache.dtype] if isinstance(signal, pd.Series) else self.signal_cache.dtypes
+        if all(np.issubdtype(dtype, np.floating) for dtype in dtypes):
+            self.signal_store: Optional[IndexedSignalStore] = IndexedSignalStore(self.signal_cache)
+        else:
+            # the resampled non-float values may not be the same type after being casted to float
+            self.signal_store = None
 
     def get_signal(self, start_time: pd.Timestamp, end_time: pd.Timestamp) -> Union[pd.Series, pd.DataFrame]:
         # the frequency of the signal may not align with the decision frequency of strategy
         # so resampling from the data is necessary
         # the latest signal leverage more recent data and therefore is used in trading.
+        if self.signal_store is not None:
+            return self.signal_store.get_last(start_time=start_time, end_time=end_time)
         signal = resam_ts_data(self.signal_cache, start_time=start_time, end_time=end_time, method="last")
         return signal
 
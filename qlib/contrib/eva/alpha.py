@@ -3,13 +3,106 @@ Here is a batch of evaluation functions.
 
 The interface should be redesigned carefully in the future.
 """
+import numpy as np
 import pandas as pd
 from typing import Tuple
 from qlib import get_module_logger
-from qlib.utils.paral import complex_parallel, DelayedDict
+from qlib.utils.paral import complex_parallel
 from joblib import Parallel, delayed
 
 
+class _DateGroups:
+    """
+    The rows of a cross-sectional data grouped by date.
+
+    The rows are sorted by date (stably, so the original order is kept in each date) only once; then the reductions
+    over the dates are segment reductions (`np.add.reduceat`) over the sorted arrays.
+    """
+
+    def __init__(self, index: pd.MultiIndex, date_col: str = "datetime"):
+        codes, self.dates = pd.factorize(index.get_level_values(date_col), sort=True)
+        # the rows with NaN date are dropped like `groupby`
+        order = np.flatnonzero(codes >= 0)
+        self.order = order[np.argsort(codes[order], kind="stable")]
+        # the group id of the sorted rows. Every date has one row at least, so the ids are 0, 1, ..., n_dates - 1
+        self.gid = codes[self.order]
+        is_start = np.ones(len(self.gid), dtype=bool)
+        is_start[1:] = self.gid[1:] != self.gid[:-1]
+        self.starts = np.flatnonzero(is_start)
+        self.sizes = np.diff(np.append(self.starts, len(self.gid)))
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def take(self, values: np.ndarray) -> np.ndarray:
+        """sort the values aligned with the index by date"""
+        return values[self.order]
+
+    def sum(self, values: np.ndarray) -> np.ndarray:
+        """the sum of the sorted values in each date"""
+        if len(values) == 0:
+            return np.zeros(0, dtype=values.dtype)
+        return np.add.reduceat(values, self.starts)
+
+    @staticmethod
+    def _argsort_in_groups(values: np.ndarray, gid: np.ndarray) -> np.ndarray:
+        """
+        stable argsort of the values in each group; the values are grouped by the sorted `gid`.
+        NOTE: sorting the small segments one by one is much faster than `np.lexsort` over all the values
+        """
+        bounds = np.flatnonzero(np.diff(gid)) + 1
+        starts, ends = np.append(0, bounds), np.append(bounds, len(values))
+        if len(values) == 0:
+            return np.zeros(0, dtype=int)
+        return np.concatenate([s + np.argsort(values[s:e], kind="stable") for s, e in zip(starts, ends)])
+
+    def rank(self, values: np.ndarray, valid: np.ndarray) -> np.ndarray:
+        """the average rank (starting from 1) of the valid sorted values in each date; NaN for the invalid ones"""
+        idx = np.flatnonzero(valid)
+        vals, gid = values[idx], self.gid[idx]
+        order = self._argsort_in_groups(vals, gid)
+        vals, gid = vals[order], gid[order]
+        # the runs of equal values in the same date share the average rank
+        is_start = np.ones(len(order), dtype=bool)
+        is_start[1:] = (gid[1:] != gid[:-1]) | (vals[1:] != vals[:-1])
+        run_starts = np.flatnonzero(is_start)
+        run_lens = np.diff(np.append(run_starts, len(order)))
+        group_starts = np.searchsorted(gid, np.arange(len(self)))
+        run_id = np.cumsum(is_start) - 1
+        rank_in_run = run_starts[run_id] - group_starts[gid] + (run_lens[run_id] + 1) / 2
+        res = np.full(len(values), np.nan)
+        res[idx[order]] = rank_in_run
+        return res
+
+    def corr(self, x: np.ndarray, y: np.ndarray, valid: np.ndarray) -> np.ndarray:
+        """the Pearson correlation of the valid sorted values in each date"""
+        w = valid.astype(float)
+        x, y = np.where(valid, x, 0.0), np.where(valid, y, 0.0)
+        n = self.sum(w)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            dx = np.where(valid, x - (self.sum(x) / n)[self.gid], 0.0)
+            dy = np.where(valid, y - (self.sum(y) / n)[self.gid], 0.0)
+            denom = np.sqrt(self.sum(dx * dx) * self.sum(dy * dy))
+            res = self.sum(dx * dy) / denom
+        res[(n < 2) | (denom == 0)] = np.nan
+        return np.clip(res, -1.0, 1.0)
+
+    def top_n(self, values: np.ndarray, n: np.ndarray, ascending: bool = False) -> np.ndarray:
+        """
+        select the first `n[date]` sorted values in each date like `pd.DataFrame.nlargest`/`nsmallest`
+        (keep="first"; NaN values are placed at the end)
+
+        Returns
+        -------
+        np.ndarray
+            boolean mask of the selected values
+        """
+        order = self._argsort_in_groups(values if ascending else -values, self.gid)
+        rank = np.empty(len(values), dtype=int)
+        rank[order] = np.arange(len(values)) - self.starts[self.gid[order]]
+        return rank < n[self.gid]
+
+
 def calc_long_short_prec(
     pred: pd.Series, label: pd.Series, date_col="datetime", quantile: float = 0.2, dropna=False, is_alpha=False
 ) -> Tuple[pd.Series, pd.Series]:
@@ -46,23 +139,22 @@ def calc_long_short_prec(
     if dropna:
         df.dropna(inplace=True)
 
-    group = df.groupby(level=date_col)
-
-    def N(x):
-        return int(len(x) * quantile)
-
+    groups = _DateGroups(df.index, date_col)
+    pred_s, label_s = groups.take(df["pred"].values.astype(float)), groups.take(df["label"].values.astype(float))
     # find the top/low quantile of prediction and treat them as long and short target
-    long = group.apply(lambda x: x.nlargest(N(x), columns="pred").label).reset_index(level=0, drop=True)
-    short = group.apply(lambda x: x.nsmallest(N(x), columns="pred").label).reset_index(level=0, drop=True)
-
-    groupll = long.groupby(date_col)
-    l_dom = groupll.apply(lambda x: x > 0)
-    l_c = groupll.count()
-
-    groups = short.groupby(date_col)
-    s_dom = groups.apply(lambda x: x < 0)
-    s_c = groups.count()
-    return (l_dom.groupby(date_col).sum() / l_c), (s_dom.groupby(date_col).sum() / s_c)
+    n = (groups.sizes * quantile).astype(int)
+    res = []
+    for selected, dom in [
+        (groups.top_n(pred_s, n), label_s > 0),
+        (groups.top_n(pred_s, n, ascending=True), label_s < 0),
+    ]:
+        count = groups.sum((selected & ~np.isnan(label_s)).astype(float))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            prec = groups.sum((selected & dom).astype(float)) / count
+        # the dates without any selected stock are skipped
+        has_selected = groups.sum(selected.astype(int)) > 0
+        res.append(pd.Series(prec[has_selected], index=groups.dates[has_selected].rename(date_col), name="label"))
+    return res[0], res[1]
 
 
 def calc_long_short_return(
@@ -99,15 +191,23 @@ def calc_long_short_return(
     df = pd.DataFrame({"pred": pred, "label": label})
     if dropna:
         df.dropna(inplace=True)
-    group = df.groupby(level=date_col)
 
-    def N(x):
-        return int(len(x) * quantile)
+    groups = _DateGroups(df.index, date_col)
+    pred_s, label_s = groups.take(df["pred"].values.astype(float)), groups.take(df["label"].values.astype(float))
+    label_valid = ~np.isnan(label_s)
+    label_0 = np.where(label_valid, label_s, 0.0)
 
-    r_long = group.apply(lambda x: x.nlargest(N(x), columns="pred").label.mean())
-    r_short = group.apply(lambda x: x.nsmallest(N(x), columns="pred").label.mean())
-    r_avg = group.label.mean()
-    return (r_long - r_short) / 2, r_avg
+    def mean(selected):
+        # NaN labels are skipped like `pd.Series.mean`
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return groups.sum(np.where(selected, label_0, 0.0)) / groups.sum((selected & label_valid).astype(float))
+
+    n = (groups.sizes * quantile).astype(int)
+    r_long = mean(groups.top_n(pred_s, n))
+    r_short = mean(groups.top_n(pred_s, n, ascending=True))
+    r_avg = mean(np.ones(len(label_s), dtype=bool))
+    dates = groups.dates.rename(date_col)
+    return pd.Series((r_long - r_short) / 2, index=dates), pd.Series(r_avg, index=dates, name="label")
 
 
 def pred_autocorr(pred: pd.Series, lag=1, inst_col="instrument", date_col="datetime"):
@@ -130,10 +230,19 @@ def pred_autocorr(pred: pd.Series, lag=1, inst_col="instrument", date_col="datet
         pred = pred.iloc[:, 0]
         get_module_logger("pred_autocorr").warning(f"Only the first column in {pred.columns} of `pred` is kept")
     pred_ustk = pred.sort_index().unstack(inst_col)
-    corr_s = {}
-    for (idx, cur), (_, prev) in zip(pred_ustk.iterrows(), pred_ustk.shift(lag).iterrows()):
-        corr_s[idx] = cur.corr(prev)
-    corr_s = pd.Series(corr_s).sort_index()
+    cur = pred_ustk.values.astype(float)
+    prev = pred_ustk.shift(lag).values.astype(float)
+    valid = ~np.isnan(cur) & ~np.isnan(prev)
+    # the correlation of each row
+    n = valid.sum(axis=1)
+    cur, prev = np.where(valid, cur, 0.0), np.where(valid, prev, 0.0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        d_cur = np.where(valid, cur - (cur.sum(axis=1) / n)[:, None], 0.0)
+        d_prev = np.where(valid, prev - (prev.sum(axis=1) / n)[:, None], 0.0)
+        denom = np.sqrt((d_cur * d_cur).sum(axis=1) * (d_prev * d_prev).sum(axis=1))
+        corr = (d_cur * d_prev).sum(axis=1) / denom
+    corr[(n < 2) | (denom == 0)] = np.nan
+    corr_s = pd.Series(np.clip(corr, -1.0, 1.0), index=pred_ustk.index.rename(None)).sort_index()
     return corr_s
 
 
@@ -172,14 +281,62 @@ def calc_ic(pred: pd.Series, label: pd.Series, date_col="datetime", dropna=False
         ic and rank ic
     """
     df = pd.DataFrame({"pred": pred, "label": label})
-    ic = df.groupby(date_col).apply(lambda df: df["pred"].corr(df["label"]))
-    ric = df.groupby(date_col).apply(lambda df: df["pred"].corr(df["label"], method="spearman"))
+    ic, ric = calc_ic_multi(df[["pred"]], df["label"], date_col=date_col, dropna=False)
+    ic, ric = ic["pred"].rename(None), ric["pred"].rename(None)
     if dropna:
         return ic.dropna(), ric.dropna()
     else:
         return ic, ric
 
 
+def calc_ic_multi(
+    pred: pd.DataFrame, label: pd.Series, date_col="datetime", dropna=False
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    calculate the ic and rank ic of multiple predictions against one label in one pass.
+
+    The rows are grouped by date only once and the statistics of the label are shared among the predictions.
+
+    Parameters
+    ----------
+    pred : pd.DataFrame
+        each column is a prediction
+    label : pd.Series
+        label
+    date_col :
+        date_col
+    dropna :
+        drop the dates that the ic of all predictions are NaN
+
+    Returns
+    -------
+    (pd.DataFrame, pd.DataFrame)
+        ic and rank ic; index: date; columns: the columns of pred
+    """
+    if not pred.index.equals(label.index):
+        index = pred.index.union(label.index)
+        pred, label = pred.reindex(index), label.reindex(index)
+
+    groups = _DateGroups(pred.index, date_col)
+    label_s = groups.take(label.values.astype(float))
+    label_valid = ~np.isnan(label_s)
+    label_rank = groups.rank(label_s, label_valid)
+    ic, ric = {}, {}
+    for col in pred.columns:
+        pred_s = groups.take(pred[col].values.astype(float))
+        valid = label_valid & ~np.isnan(pred_s)
+        ic[col] = groups.corr(pred_s, label_s, valid)
+        # the label is ranked again only if the prediction has extra NaN values
+        l_rank = label_rank if (valid == label_valid).all() else groups.rank(label_s, valid)
+        ric[col] = groups.corr(groups.rank(pred_s, valid), l_rank, valid)
+    dates = groups.dates.rename(date_col)
+    ic, ric = pd.DataFrame(ic, index=dates, columns=pred.columns), pd.DataFrame(ric, index=dates, columns=pred.columns)
+    if dropna:
+        return ic.dropna(how="all"), ric.dropna(how="all")
+    else:
+        return ic, ric
+
+
 def calc_all_ic(pred_dict_all, label, date_col="datetime", dropna=False, n_jobs=-1):
     """calc_all_ic.
 
@@ -189,6 +346,8 @@ def calc_all_ic(pred_dict_all, label, date_col="datetime", dropna=False, n_jobs=
         A dict like {<method_name>:  <prediction>}
     label:
         A pd.Series of label values
+    n_jobs:
+        it is kept for compatibility. The ic of all the predictions are calculated in one pass by `calc_ic_multi`
 
     Returns
     -------
@@ -205,8 +364,14 @@ def calc_all_ic(pred_dict_all, label, date_col="datetime", dropna=False, n_jobs=
                   }
     ...}
     """
+    ic, ric = calc_ic_multi(pd.DataFrame(pred_dict_all), label, date_col=date_col)
+    label_dates = label.index.get_level_values(date_col).unique()
     pred_all_ics = {}
     for k, pred in pred_dict_all.items():
-        pred_all_ics[k] = DelayedDict(["ic", "ric"], delayed(calc_ic)(pred, label, date_col=date_col, dropna=dropna))
-    pred_all_ics = complex_parallel(Parallel(n_jobs=n_jobs, verbose=10), pred_all_ics)
+        # the dates of each prediction and the label, which is the same as `calc_ic`
+        dates = ic.index.intersection(pred.index.get_level_values(date_col).unique().union(label_dates))
+        pred_all_ics[k] = {}
+        for name, res in [("ic", ic), ("ric", ric)]:
+            res = res.loc[dates, k].rename(None)
+            pred_all_ics[k][name] = res.dropna() if dropna else res
     return pred_all_ics
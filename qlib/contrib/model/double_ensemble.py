@@ -13,7 +13,16 @@ from ...log import get_module_logger
 
 
 class DEnsembleModel(Model, FeatureInt):
-    """Double Ensemble Model"""
+    """Double Ensemble Model
+
+    Parameters
+    ----------
+    share_dataset : bool
+        If True, the ``lgb.Dataset`` s of the training and validation data are constructed (binned) once with all the
+        features and shared by all the sub-models. The sample weights of a sub-model are set on the shared dataset,
+        and its features are selected by the ``feature_contri`` parameter of LightGBM instead of copying the selected
+        columns, so the sub-models take all the features for prediction.
+    """
 
     def __init__(
         self,
@@ -31,6 +40,7 @@ class DEnsembleModel(Model, FeatureInt):
         sub_weights=None,
         epochs=100,
         early_stopping_rounds=None,
+        share_dataset=False,
         **kwargs
     ):
         self.base_model = base_model  # "gbm" or "mlp", specifically, we use lgbm for "gbm"
@@ -61,6 +71,7 @@ class DEnsembleModel(Model, FeatureInt):
         self.params.update(kwargs)
         self.loss = loss
         self.early_stopping_rounds = early_stopping_rounds
+        self.share_dataset = share_dataset
 
     def fit(self, dataset: DatasetH):
         df_train, df_valid = dataset.prepare(
@@ -75,11 +86,16 @@ class DEnsembleModel(Model, FeatureInt):
         # initialize the features
         features = x_train.columns
         pred_sub = pd.DataFrame(np.zeros((N, self.num_models), dtype=float), index=x_train.index)
+        shared_data = None
+        if self.share_dataset:
+            shared_data = self._prepare_data_shared(df_train, df_valid)
+            # the validation data are not needed any more
+            df_valid = None
         # train sub-models
         for k in range(self.num_models):
             self.sub_features.append(features)
             self.logger.info("Training sub-model: ({}/{})".format(k + 1, self.num_models))
-            model_k = self.train_submodel(df_train, df_valid, weights, features)
+            model_k = self.train_submodel(df_train, df_valid, weights, features, shared_data=shared_data)
             self.ensemble.append(model_k)
             # no further sample re-weight and feature selection needed for the last sub-model
             if k + 1 == self.num_models:
@@ -102,8 +118,16 @@ class DEnsembleModel(Model, FeatureInt):
                 self.logger.info("Feature selection...")
                 features = self.feature_selection(df_train, loss_values)
 
-    def train_submodel(self, df_train, df_valid, weights, features):
-        dtrain, dvalid = self._prepare_data_gbm(df_train, df_valid, weights, features)
+    def train_submodel(self, df_train, df_valid, weights, features, shared_data=None):
+        params = self.params
+        if shared_data is None:
+            dtrain, dvalid = self._prepare_data_gbm(df_train, df_valid, weights, features)
+        else:
+            dtrain, dvalid = shared_data
+            # `set_weight` ignores the weights if they are all ones, so the field is set directly
+            dtrain.set_field("weight", np.asarray(weights, dtype=np.float32))
+            selected = df_train["feature"].columns.isin(features)
+            params = {**params, "feature_contri": selected.astype(float).tolist()}
         evals_result = dict()
 
         callbacks = [lgb.log_evaluation(20), lgb.record_evaluation(evals_result)]
@@ -112,7 +136,7 @@ class DEnsembleModel(Model, FeatureInt):
             self.logger.info("Training with early_stopping...")
 
         model = lgb.train(
-            self.params,
+            params,
             dtrain,
             num_boost_round=self.epochs,
             valid_sets=[dtrain, dvalid],
@@ -137,6 +161,28 @@ class DEnsembleModel(Model, FeatureInt):
         dvalid = lgb.Dataset(x_valid, label=y_valid)
         return dtrain, dvalid
 
+    def _prepare_data_shared(self, df_train, df_valid):
+        x_train, y_train = df_train["feature"], df_train["label"]
+        x_valid, y_valid = df_valid["feature"], df_valid["label"]
+
+        # Lightgbm need 1D array as its label
+        if y_train.values.ndim == 2 and y_train.values.shape[1] == 1:
+            y_train, y_valid = np.squeeze(y_train.values), np.squeeze(y_valid.values)
+        else:
+            raise ValueError("LightGBM doesn't support multi-label training")
+
+        # bin the data right now, so that LightGBM frees its copies of the raw data
+        dtrain = lgb.Dataset(x_train, label=y_train, params=self.params).construct()
+        dvalid = lgb.Dataset(x_valid, label=y_valid, reference=dtrain, params=self.params).construct()
+        return dtrain, dvalid
+
+    def _select_features(self, x_data, features) -> np.ndarray:
+        """the input of a sub-model, the sub-models trained on the shared dataset take all the features"""
+        # the models pickled before the option was added don't have the attribute
+        if getattr(self, "share_dataset", False):
+            return x_data.values
+        return x_data.loc[:, features].values
+
     def sample_reweight(self, loss_curve, loss_values, k_th):
         """
         the SR module of Double Ensemble
@@ -195,7 +241,8 @@ class DEnsembleModel(Model, FeatureInt):
             for i_s, submodel in enumerate(self.ensemble):
                 pred += (
                     pd.Series(
-                        submodel.predict(x_train_tmp.loc[:, self.sub_features[i_s]].values), index=x_train_tmp.index
+                        submodel.predict(self._select_features(x_train_tmp, self.sub_features[i_s])),
+                        index=x_train_tmp.index,
                     )
                     / M
                 )
@@ -227,7 +274,7 @@ class DEnsembleModel(Model, FeatureInt):
     def retrieve_loss_curve(self, model, df_train, features):
         if self.base_model == "gbm":
             num_trees = model.num_trees()
-            x_train, y_train = df_train["feature"].loc[:, features], df_train["label"]
+            x_train, y_train = self._select_features(df_train["feature"], features), df_train["label"]
             # Lightgbm need 1D array as its label
             if y_train.values.ndim == 2 and y_train.values.shape[1] == 1:
                 y_train = np.squeeze(y_train.values)
@@ -238,7 +285,7 @@ class DEnsembleModel(Model, FeatureInt):
             loss_curve = pd.DataFrame(np.zeros((N, num_trees)))
             pred_tree = np.zeros(N, dtype=float)
             for i_tree in range(num_trees):
-                pred_tree += model.predict(x_train.values, start_iteration=i_tree, num_iteration=1)
+                pred_tree += model.predict(x_train, start_iteration=i_tree, num_iteration=1)
                 loss_curve.iloc[:, i_tree] = self.get_loss(y_train, pred_tree)
         else:
             raise ValueError("not implemented yet")
@@ -252,15 +299,15 @@ class DEnsembleModel(Model, FeatureInt):
         for i_sub, submodel in enumerate(self.ensemble):
             feat_sub = self.sub_features[i_sub]
             pred += (
-                pd.Series(submodel.predict(x_test.loc[:, feat_sub].values), index=x_test.index)
+                pd.Series(submodel.predict(self._select_features(x_test, feat_sub)), index=x_test.index)
                 * self.sub_weights[i_sub]
             )
         pred = pred / np.sum(self.sub_weights)
         return pred
 
     def predict_sub(self, submodel, df_data, features):
-        x_data = df_data["feature"].loc[:, features]
-        pred_sub = pd.Series(submodel.predict(x_data.values), index=x_data.index)
+        x_data = df_data["feature"]
+        pred_sub = pd.Series(submodel.predict(self._select_features(x_data, features)), index=x_data.index)
         return pred_sub
 
     def get_feature_importance(self, *args, **kwargs) -> pd.Series:
@@ -4,19 +4,92 @@
 import numpy as np
 import pandas as pd
 import lightgbm as lgb
-from typing import List, Text, Tuple, Union
+from typing import List, Optional, Text, Tuple, Union
 from ...model.base import ModelFT
 from ...data.dataset import DatasetH
-from ...data.dataset.handler import DataHandlerLP
+from ...data.dataset.handler import DataHandler, DataHandlerLP
 from ...model.interpret.base import LightGBMFInt
 from ...data.dataset.weight import Reweighter
 from qlib.workflow import R
 
 
+class DatasetSequence(lgb.Sequence):
+    """The features of a segment of a ``DatasetH`` as a LightGBM ``Sequence``.
+
+    The rows are fetched from the handler in batches (by the days covering the rows of the batch) when LightGBM
+    samples and bins them, so that the features of the whole segment are never materialized.
+
+    Parameters
+    ----------
+    dataset : DatasetH
+        The dataset.
+    index : pd.MultiIndex
+        The index of the segment, e.g., the index of its labels. It must be sorted by ``datetime``.
+    batch_size : int
+        Number of rows fetched at a time.
+    data_key : str
+        The data to fetch.
+    """
+
+    def __init__(self, dataset: DatasetH, index: pd.MultiIndex, batch_size: int, data_key=DataHandlerLP.DK_L):
+        datetime = index.get_level_values("datetime")
+        if not datetime.is_monotonic_increasing:
+            raise ValueError("The index of the segment should be sorted by datetime.")
+        self.dataset = dataset
+        self.data_key = data_key
+        self.batch_size = batch_size
+        self._datetime = datetime
+        self._length = len(index)
+        self._cache: Tuple[int, Optional[np.ndarray]] = (-1, None)
+
+    def __len__(self) -> int:
+        return self._length
+
+    def _fetch(self, start: int, stop: int) -> np.ndarray:
+        """Fetch the rows in ``[start, stop)``."""
+        first, last = self._datetime[start], self._datetime[stop - 1]
+        # the rows of the days from ``first`` to ``last``
+        offset = self._datetime.searchsorted(first, side="left")
+        df = self.dataset.prepare(slice(first, last), col_set=DataHandler.CS_RAW, data_key=self.data_key)
+        if len(df) != self._datetime.searchsorted(last, side="right") - offset:
+            raise ValueError("The data fetched from the handler don't match the index of the segment.")
+        return df["feature"].to_numpy()[start - offset : stop - offset]
+
+    def __getitem__(self, idx: Union[int, slice, List[int]]) -> np.ndarray:
+        if isinstance(idx, slice):
+            start, stop, step = idx.indices(self._length)
+            assert step == 1, "Only continuous slices are supported."
+            return self._fetch(start, stop) if start < stop else np.empty((0, 0))
+        if isinstance(idx, list):
+            return np.stack([self[i] for i in idx])
+        # LightGBM samples the rows with increasing indices, so the batch of the last row is cached
+        batch = idx // self.batch_size
+        if self._cache[0] != batch:
+            start = batch * self.batch_size
+            self._cache = (batch, self._fetch(start, min(start + self.batch_size, self._length)))
+        return self._cache[1][idx - batch * self.batch_size]  # type: ignore
+
+
 class LGBModel(ModelFT, LightGBMFInt):
-    """LightGBM Model"""
+    """LightGBM Model
 
-    def __init__(self, loss="mse", early_stopping_rounds=50, num_boost_round=1000,label_column="LABEL0", **kwargs):
+    Parameters
+    ----------
+    chunk_size : int, optional
+        If set, the ``lgb.Dataset`` s are built from the handler in chunks of this number of rows with
+        :class:`DatasetSequence`, instead of from the whole feature frame of each segment, to reduce the peak memory.
+        Only the labels of the segments are fetched as frames, and the ``reweighter`` receives the label frame.
+    """
+
+    def __init__(
+        self,
+        loss="mse",
+        early_stopping_rounds=50,
+        num_boost_round=1000,
+        label_column="LABEL0",
+        chunk_size=None,
+        **kwargs,
+    ):
         if loss not in {"mse", "binary"}:
             raise NotImplementedError
         self.params = {"objective": loss, "verbosity": -1}
@@ -25,13 +98,16 @@ class LGBModel(ModelFT, LightGBMFInt):
         self.num_boost_round = num_boost_round
         self.model = None
         self.label_column = label_column
-        
+        self.chunk_size = chunk_size
 
     def _prepare_data(self, dataset: DatasetH, reweighter=None) -> List[Tuple[lgb.Dataset, str]]:
         """
         The motivation of current version is to make validation optional
         - train segment is necessary;
         """
+        if self.chunk_size is not None:
+            return self._prepare_data_chunked(dataset, reweighter)
+
         ds_l = []
         assert "train" in dataset.segments
         for key in ["train", "valid"]:
@@ -58,6 +134,38 @@ class LGBModel(ModelFT, LightGBMFInt):
                 ds_l.append((lgb.Dataset(x.values, label=y, weight=w), key))
         return ds_l
 
+    def _prepare_data_chunked(self, dataset: DatasetH, reweighter=None) -> List[Tuple[lgb.Dataset, str]]:
+        ds_l = []
+        assert "train" in dataset.segments
+        for key in ["train", "valid"]:
+            if key in dataset.segments:
+                label = dataset.prepare(key, col_set="label", data_key=DataHandlerLP.DK_L)
+                if label.empty:
+                    raise ValueError("Empty data from dataset, please check your dataset config.")
+
+                # Lightgbm need 1D array as its label
+                if label.values.ndim == 2 and label.values.shape[1] == 1:
+                    y = np.squeeze(label.values)
+                elif self.label_column:
+                    y = label[self.label_column]
+                else:
+                    raise ValueError("LightGBM doesn't support multi-label training")
+
+                if reweighter is None:
+                    w = None
+                elif isinstance(reweighter, Reweighter):
+                    w = reweighter.reweight(label)
+                else:
+                    raise ValueError("Unsupported reweighter type.")
+                seq = DatasetSequence(dataset, label.index, self.chunk_size)
+                # the validation data are binned with the bins of the training data
+                reference = ds_l[0][0] if ds_l else None
+                # construct it right now, so that the raw data are freed before the next segment is loaded
+                ds_l.append(
+                    (lgb.Dataset(seq, label=y, weight=w, reference=reference, params=self.params).construct(), key)
+                )
+        return ds_l
+
     def fit(
         self,
         dataset: DatasetH,
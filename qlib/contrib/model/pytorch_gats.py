@@ -15,7 +15,7 @@ import torch
 import torch.nn as nn
 import torch.optim as optim
 
-from .pytorch_utils import count_parameters
+from .pytorch_utils import count_parameters, DailyBatchFeeder
 from ...model.base import Model
 from ...data.dataset import DatasetH
 from ...data.dataset.handler import DataHandlerLP
@@ -174,20 +174,12 @@ class GATs(Model):
             daily_index, daily_count = zip(*daily_shuffle)
         return daily_index, daily_count
 
-    def train_epoch(self, x_train, y_train):
+    def train_epoch(self, data_feeder: DailyBatchFeeder):
 
-        x_train_values = x_train.values
-        y_train_values = np.squeeze(y_train.values)
         self.GAT_model.train()
 
-        # organize the train data into daily batches
-        daily_index, daily_count = self.get_daily_inter(x_train, shuffle=True)
-
-        for idx, count in zip(daily_index, daily_count):
-            batch = slice(idx, idx + count)
-            feature = torch.from_numpy(x_train_values[batch]).float().to(self.device)
-            label = torch.from_numpy(y_train_values[batch]).float().to(self.device)
-
+        # the train data are organized into daily batches
+        for feature, label in data_feeder.iter_batches(shuffle=True):
             pred = self.GAT_model(feature)
             loss = self.loss_fn(pred, label)
 
@@ -196,25 +188,15 @@ class GATs(Model):
             torch.nn.utils.clip_grad_value_(self.GAT_model.parameters(), 3.0)
             self.train_optimizer.step()
 
-    def test_epoch(self, data_x, data_y):
-
-        # prepare training data
-        x_values = data_x.values
-        y_values = np.squeeze(data_y.values)
+    def test_epoch(self, data_feeder: DailyBatchFeeder):
 
         self.GAT_model.eval()
 
         scores = []
         losses = []
 
-        # organize the test data into daily batches
-        daily_index, daily_count = self.get_daily_inter(data_x, shuffle=False)
-
-        for idx, count in zip(daily_index, daily_count):
-            batch = slice(idx, idx + count)
-            feature = torch.from_numpy(x_values[batch]).float().to(self.device)
-            label = torch.from_numpy(y_values[batch]).float().to(self.device)
-
+        # the test data are organized into daily batches
+        for feature, label in data_feeder.iter_batches(shuffle=False):
             pred = self.GAT_model(feature)
             loss = self.loss_fn(pred, label)
             losses.append(loss.item())
@@ -239,8 +221,13 @@ class GATs(Model):
         if df_train.empty or df_valid.empty:
             raise ValueError("Empty data from dataset, please check your dataset config.")
 
-        x_train, y_train = df_train["feature"], df_train["label"]
-        x_valid, y_valid = df_valid["feature"], df_valid["label"]
+        # the data are converted into tensors once for all the epochs
+        train_feeder = DailyBatchFeeder(
+            df_train["feature"], df_train["label"], device=self.device, pin_memory=self.use_gpu
+        )
+        valid_feeder = DailyBatchFeeder(
+            df_valid["feature"], df_valid["label"], device=self.device, pin_memory=self.use_gpu
+        )
 
         save_path = get_or_create_path(save_path)
         stop_steps = 0
@@ -276,10 +263,10 @@ class GATs(Model):
         for step in range(self.n_epochs):
             self.logger.info("Epoch%d:", step)
             self.logger.info("training...")
-            self.train_epoch(x_train, y_train)
+            self.train_epoch(train_feeder)
             self.logger.info("evaluating...")
-            train_loss, train_score = self.test_epoch(x_train, y_train)
-            val_loss, val_score = self.test_epoch(x_valid, y_valid)
+            train_loss, train_score = self.test_epoch(train_feeder)
+            val_loss, val_score = self.test_epoch(valid_feeder)
             self.logger.info("train %.6f, valid %.6f" % (train_score, val_score))
             evals_result["train"].append(train_score)
             evals_result["valid"].append(val_score)
@@ -309,16 +296,12 @@ class GATs(Model):
         x_test = dataset.prepare(segment, col_set="feature")
         index = x_test.index
         self.GAT_model.eval()
-        x_values = x_test.values
         preds = []
 
         # organize the data into daily batches
-        daily_index, daily_count = self.get_daily_inter(x_test, shuffle=False)
-
-        for idx, count in zip(daily_index, daily_count):
-            batch = slice(idx, idx + count)
-            x_batch = torch.from_numpy(x_values[batch]).float().to(self.device)
+        test_feeder = DailyBatchFeeder(x_test, device=self.device, pin_memory=self.use_gpu)
 
+        for (x_batch,) in test_feeder.iter_batches(shuffle=False):
             with torch.no_grad():
                 pred = self.GAT_model(x_batch).detach().cpu().numpy()
 
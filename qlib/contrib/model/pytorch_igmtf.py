@@ -16,7 +16,7 @@ import torch
 import torch.nn as nn
 import torch.optim as optim
 
-from .pytorch_utils import count_parameters
+from .pytorch_utils import count_parameters, DailyBatchFeeder
 from ...model.base import Model
 from ...data.dataset import DatasetH
 from ...data.dataset.handler import DataHandlerLP
@@ -181,16 +181,13 @@ class IGMTF(Model):
             daily_index, daily_count = zip(*daily_shuffle)
         return daily_index, daily_count
 
-    def get_train_hidden(self, x_train):
-        x_train_values = x_train.values
-        daily_index, daily_count = self.get_daily_inter(x_train, shuffle=True)
+    def get_train_hidden(self, data_feeder: DailyBatchFeeder):
         self.igmtf_model.eval()
         train_hidden = []
         train_hidden_day = []
 
-        for idx, count in zip(daily_index, daily_count):
-            batch = slice(idx, idx + count)
-            feature = torch.from_numpy(x_train_values[batch]).float().to(self.device)
+        # only the features (the first data of the feeder) are used
+        for feature, *_ in data_feeder.iter_batches(shuffle=True):
             out = self.igmtf_model(feature, get_hidden=True)
             train_hidden.append(out.detach().cpu())
             train_hidden_day.append(out.detach().cpu().mean(dim=0).unsqueeze(dim=0))
@@ -200,19 +197,11 @@ class IGMTF(Model):
 
         return train_hidden, train_hidden_day
 
-    def train_epoch(self, x_train, y_train, train_hidden, train_hidden_day):
-
-        x_train_values = x_train.values
-        y_train_values = np.squeeze(y_train.values)
+    def train_epoch(self, data_feeder: DailyBatchFeeder, train_hidden, train_hidden_day):
 
         self.igmtf_model.train()
 
-        daily_index, daily_count = self.get_daily_inter(x_train, shuffle=True)
-
-        for idx, count in zip(daily_index, daily_count):
-            batch = slice(idx, idx + count)
-            feature = torch.from_numpy(x_train_values[batch]).float().to(self.device)
-            label = torch.from_numpy(y_train_values[batch]).float().to(self.device)
+        for feature, label in data_feeder.iter_batches(shuffle=True):
             pred = self.igmtf_model(feature, train_hidden=train_hidden, train_hidden_day=train_hidden_day)
             loss = self.loss_fn(pred, label)
 
@@ -221,24 +210,14 @@ class IGMTF(Model):
             torch.nn.utils.clip_grad_value_(self.igmtf_model.parameters(), 3.0)
             self.train_optimizer.step()
 
-    def test_epoch(self, data_x, data_y, train_hidden, train_hidden_day):
-
-        # prepare training data
-        x_values = data_x.values
-        y_values = np.squeeze(data_y.values)
+    def test_epoch(self, data_feeder: DailyBatchFeeder, train_hidden, train_hidden_day):
 
         self.igmtf_model.eval()
 
         scores = []
         losses = []
 
-        daily_index, daily_count = self.get_daily_inter(data_x, shuffle=False)
-
-        for idx, count in zip(daily_index, daily_count):
-            batch = slice(idx, idx + count)
-            feature = torch.from_numpy(x_values[batch]).float().to(self.device)
-            label = torch.from_numpy(y_values[batch]).float().to(self.device)
-
+        for feature, label in data_feeder.iter_batches(shuffle=False):
             pred = self.igmtf_model(feature, train_hidden=train_hidden, train_hidden_day=train_hidden_day)
             loss = self.loss_fn(pred, label)
             losses.append(loss.item())
@@ -263,8 +242,13 @@ class IGMTF(Model):
         if df_train.empty or df_valid.empty:
             raise ValueError("Empty data from dataset, please check your dataset config.")
 
-        x_train, y_train = df_train["feature"], df_train["label"]
-        x_valid, y_valid = df_valid["feature"], df_valid["label"]
+        # the data are converted into tensors once for all the epochs
+        train_feeder = DailyBatchFeeder(
+            df_train["feature"], df_train["label"], device=self.device, pin_memory=self.use_gpu
+        )
+        valid_feeder = DailyBatchFeeder(
+            df_valid["feature"], df_valid["label"], device=self.device, pin_memory=self.use_gpu
+        )
 
         save_path = get_or_create_path(save_path)
         stop_steps = 0
@@ -301,11 +285,11 @@ class IGMTF(Model):
         for step in range(self.n_epochs):
             self.logger.info("Epoch%d:", step)
             self.logger.info("training...")
-            train_hidden, train_hidden_day = self.get_train_hidden(x_train)
-            self.train_epoch(x_train, y_train, train_hidden, train_hidden_day)
+            train_hidden, train_hidden_day = self.get_train_hidden(train_feeder)
+            self.train_epoch(train_feeder, train_hidden, train_hidden_day)
             self.logger.info("evaluating...")
-            train_loss, train_score = self.test_epoch(x_train, y_train, train_hidden, train_hidden_day)
-            val_loss, val_score = self.test_epoch(x_valid, y_valid, train_hidden, train_hidden_day)
+            train_loss, train_score = self.test_epoch(train_feeder, train_hidden, train_hidden_day)
+            val_loss, val_score = self.test_epoch(valid_feeder, train_hidden, train_hidden_day)
             self.logger.info("train %.6f, valid %.6f" % (train_score, val_score))
             evals_result["train"].append(train_score)
             evals_result["valid"].append(val_score)
@@ -332,19 +316,15 @@ class IGMTF(Model):
         if not self.fitted:
             raise ValueError("model is not fitted yet!")
         x_train = dataset.prepare("train", col_set="feature", data_key=DataHandlerLP.DK_L)
-        train_hidden, train_hidden_day = self.get_train_hidden(x_train)
+        train_feeder = DailyBatchFeeder(x_train, device=self.device, pin_memory=self.use_gpu)
+        train_hidden, train_hidden_day = self.get_train_hidden(train_feeder)
         x_test = dataset.prepare(segment, col_set="feature", data_key=DataHandlerLP.DK_I)
         index = x_test.index
         self.igmtf_model.eval()
-        x_values = x_test.values
         preds = []
 
-        daily_index, daily_count = self.get_daily_inter(x_test, shuffle=False)
-
-        for idx, count in zip(daily_index, daily_count):
-            batch = slice(idx, idx + count)
-            x_batch = torch.from_numpy(x_values[batch]).float().to(self.device)
-
+        test_feeder = DailyBatchFeeder(x_test, device=self.device, pin_memory=self.use_gpu)
+        for (x_batch,) in test_feeder.iter_batches(shuffle=False):
             with torch.no_grad():
                 pred = (
                     self.igmtf_model(x_batch, train_hidden=train_hidden, train_hidden_day=train_hidden_day)
@@ -1,6 +1,13 @@
 # Copyright (c) Microsoft Corporation.
 # Licensed under the MIT License.
 
+import queue
+import threading
+from typing import Iterator, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+import torch
 import torch.nn as nn
 
 
@@ -35,3 +42,119 @@ def count_parameters(models_or_parameters, unit="m"):
     elif unit is not None:
         raise ValueError("Unknown unit: {:}".format(unit))
     return counts
+
+
+class DailyBatchFeeder:
+    """
+    Feed the data of daily cross-sectional models day by day, with the rows of a day as a batch.
+
+    The data are converted only once into contiguous float32 tensors, so that a batch is a zero-copy slice of them,
+    instead of a copy and a dtype conversion of a part of the frame for every batch of every epoch.
+
+    Parameters
+    ----------
+    data : pd.DataFrame or pd.Series
+        The data of the same index, whose first level is the sorted datetime, e.g., the features and the labels.
+        A frame of a single column (e.g., the labels) is squeezed into 1D.
+    device : str or torch.device
+        The device the batches are sent to.
+    pin_memory : bool
+        Whether to pin the tensors in page-locked memory, so that the batches are copied to the GPU asynchronously.
+        It only works when CUDA is available.
+    prefetch : int
+        Number of batches prepared (and sent to the device) in advance on a background thread. 0 to disable it.
+    """
+
+    def __init__(
+        self,
+        *data: Union[pd.DataFrame, pd.Series],
+        device: Union[str, torch.device] = "cpu",
+        pin_memory: bool = False,
+        prefetch: int = 0,
+    ):
+        if len(data) == 0:
+            raise ValueError("No data to feed.")
+        self.device = torch.device(device)
+        self.pin_memory = pin_memory and torch.cuda.is_available()
+        self.prefetch = prefetch
+
+        self.tensors = []
+        for d in data:
+            values = d.values
+            if values.ndim == 2 and values.shape[1] == 1:
+                values = values[:, 0]
+            tensor = torch.from_numpy(np.ascontiguousarray(values, dtype=np.float32))
+            self.tensors.append(tensor.pin_memory() if self.pin_memory else tensor)
+
+        # the offset and the number of the rows of each day
+        self.daily_count = data[0].groupby(level=0).size().values
+        self.daily_index = np.roll(np.cumsum(self.daily_count), 1)
+        self.daily_index[0] = 0
+
+    def __len__(self) -> int:
+        return len(self.daily_count)
+
+    def _get_batch(self, i: int) -> Tuple[torch.Tensor, ...]:
+        batch = slice(self.daily_index[i], self.daily_index[i] + self.daily_count[i])
+        return tuple(t[batch].to(self.device, non_blocking=self.pin_memory) for t in self.tensors)
+
+    def iter_batches(self, shuffle: bool = False) -> Iterator[Tuple[torch.Tensor, ...]]:
+        """
+        Iterate over the days.
+
+        Parameters
+        ----------
+        shuffle : bool
+            Whether to shuffle the days with ``np.random``.
+
+        Returns
+        -------
+        Iterator[Tuple[torch.Tensor, ...]]
+            The tensors of the data of a day, in the same order as the data given to the feeder.
+        """
+        order = np.arange(len(self))
+        if shuffle:
+            np.random.shuffle(order)
+        if self.prefetch <= 0:
+            return (self._get_batch(i) for i in order)
+        return self._iter_prefetch(order)
+
+    def _iter_prefetch(self, order: np.ndarray) -> Iterator[Tuple[torch.Tensor, ...]]:
+        batches: queue.Queue = queue.Queue(self.prefetch)
+        stop = threading.Event()
+        error: Optional[BaseException] = None
+        end = object()
+
+        def put(item) -> bool:
+            # give up if the consumer stops early
+            while not stop.is_set():
+                try:
+                    batches.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+
+        def produce() -> None:
+            nonlocal error
+            try:
+                for i in order:
+                    if not put(self._get_batch(i)):
+                        return
+            except BaseException as e:  # pylint: disable=W0703
+                error = e
+            put(end)
+
+        thread = threading.Thread(target=produce, daemon=True)
+        thread.start()
+        try:
+            while True:
+                item = batches.get()
+                if item is end:
+                    break
+                yield item
+            if error is not None:
+                raise error
+        finally:
+            stop.set()
+            thread.join()
@@ -2,6 +2,10 @@
 # Licensed under the MIT License.
 
 import abc
+from typing import Any, Dict, List, Sequence, Union
+
+import numpy as np
+from joblib import Parallel, delayed, cpu_count
 
 
 class BaseOptimizer(abc.ABC):
@@ -10,3 +14,39 @@ class BaseOptimizer(abc.ABC):
     @abc.abstractmethod
     def __call__(self, *args, **kwargs) -> object:
         """Generate a optimized portfolio allocation"""
+
+
+def _optimize_chunk(optimizer: BaseOptimizer, inputs: List[Union[Sequence, Dict[str, Any]]]) -> list:
+    return [optimizer(**args) if isinstance(args, dict) else optimizer(*args) for args in inputs]
+
+
+def optimize_batch(
+    optimizer: BaseOptimizer,
+    inputs: List[Union[Sequence, Dict[str, Any]]],
+    n_jobs: int = 1,
+    backend: str = "loky",
+) -> list:
+    """solve the optimization problems of many dates (e.g. for research sweeps) in parallel
+
+    The inputs are split into `n_jobs` contiguous chunks and each chunk is solved in order by a copy of `optimizer`
+    in a worker process, so the compiled problems and warm starts of the optimizer (e.g. `parametrized=True` of
+    `EnhancedIndexingOptimizer`) are still reused within each chunk.
+
+    Args:
+        optimizer (BaseOptimizer): the optimizer
+        inputs (list): the arguments of each call of `optimizer`, a tuple of positional arguments or a dict of
+            keyword arguments
+        n_jobs (int): the number of worker processes; -1 means using all CPUs
+        backend (str): joblib backend
+
+    Returns:
+        list: the results of each input
+    """
+    if n_jobs < 0:
+        n_jobs = cpu_count()
+    n_jobs = max(min(n_jobs, len(inputs)), 1)
+    if n_jobs == 1:
+        return _optimize_chunk(optimizer, inputs)
+    chunks = [inputs[i[0] : i[-1] + 1] for i in np.array_split(np.arange(len(inputs)), n_jobs)]
+    res = Parallel(n_jobs=n_jobs, backend=backend)(delayed(_optimize_chunk)(optimizer, chunk) for chunk in chunks)
+    return sum(res, [])
@@ -42,6 +42,12 @@ class EnhancedIndexingOptimizer(BaseOptimizer):
                d <= b_dev
                v >= -f_dev
                v <= f_dev
+
+    By default, the problem is built and compiled from scratch in each call. With `parametrized=True`, the problem
+    is built once with `cp.Parameter`s and only the parameter values are updated in the following calls, so the
+    compilation is reused and the solvers supporting warm start (e.g. OSQP) start from the current holding weights.
+    To share the problem among the dates with different universe sizes, the universe is padded to a multiple of
+    `pad_size` with dummy stocks whose weights are fixed to 0.
     """
 
     def __init__(
@@ -53,6 +59,9 @@ class EnhancedIndexingOptimizer(BaseOptimizer):
         scale_return: bool = True,
         epsilon: float = 5e-5,
         solver_kwargs: Optional[Dict[str, Any]] = {},
+        solver: str = cp.ECOS,
+        parametrized: bool = False,
+        pad_size: int = 100,
     ):
         """
         Args:
@@ -63,6 +72,9 @@ class EnhancedIndexingOptimizer(BaseOptimizer):
             scale_return (bool): whether scale return to match estimated volatility
             epsilon (float): minimum weight
             solver_kwargs (dict): kwargs for cvxpy solver
+            solver (str): cvxpy solver
+            parametrized (bool): whether to reuse the parametrized problem across calls
+            pad_size (int): the universe is padded to a multiple of `pad_size` in the parametrized mode
         """
 
         assert lamb >= 0, "risk aversion parameter `lamb` should be positive"
@@ -84,6 +96,18 @@ class EnhancedIndexingOptimizer(BaseOptimizer):
         self.scale_return = scale_return
         self.epsilon = epsilon
         self.solver_kwargs = solver_kwargs
+        self.solver = solver
+
+        assert pad_size >= 1, "`pad_size` should be positive"
+        self.parametrized = parametrized
+        self.pad_size = pad_size
+        self._problems = {}  # (padded number of stocks, number of factors) -> _ParametrizedProblem
+
+    def __getstate__(self):
+        # the compiled problems are not shared (e.g. with the worker processes of `optimize_batch`)
+        state = self.__dict__.copy()
+        state["_problems"] = {}
+        return state
 
     def __call__(
         self,
@@ -115,19 +139,6 @@ class EnhancedIndexingOptimizer(BaseOptimizer):
             r = r / r.std()
             r *= np.sqrt(np.mean(np.diag(F @ cov_b @ F.T) + var_u))
 
-        # target weight
-        w = cp.Variable(len(r), nonneg=True)
-        w.value = wb  # for warm start
-
-        # precompute exposure
-        d = w - wb  # benchmark exposure
-        v = d @ F  # factor exposure
-
-        # objective
-        ret = d @ r  # excess return
-        risk = cp.quad_form(v, cov_b) + var_u @ (d**2)  # tracking error
-        obj = cp.Maximize(ret - self.lamb * risk)
-
         # weight bounds
         lb = np.zeros_like(wb)
         ub = np.ones_like(wb)
@@ -148,6 +159,39 @@ class EnhancedIndexingOptimizer(BaseOptimizer):
             lb[mfs] = 0
             ub[mfs] = 0
 
+        # total turnover constraint
+        use_turnover = self.delta is not None and w0 is not None and w0.sum() > 0
+
+        if self.parametrized:
+            w = self._optimize_parametrized(r, F, cov_b, var_u, w0, wb, lb, ub, use_turnover)
+        else:
+            w = self._optimize(r, F, cov_b, var_u, w0, wb, lb, ub, use_turnover)
+
+        # return current weight if not success
+        if w is None:
+            logger.warning("optimization failed, will return current holding weight")
+            return w0
+
+        # remove small weight
+        w[w < self.epsilon] = 0
+        w /= w.sum()
+
+        return w
+
+    def _optimize(self, r, F, cov_b, var_u, w0, wb, lb, ub, use_turnover) -> Optional[np.ndarray]:
+        """build and solve the problem from scratch"""
+        # target weight
+        w = cp.Variable(len(r), nonneg=True)
+
+        # precompute exposure
+        d = w - wb  # benchmark exposure
+        v = d @ F  # factor exposure
+
+        # objective
+        ret = d @ r  # excess return
+        risk = cp.quad_form(v, cov_b) + var_u @ (d**2)  # tracking error
+        obj = cp.Maximize(ret - self.lamb * risk)
+
         # constraints
         # TODO: currently we assume fullly invest in the stocks,
         # in the future we should support holding cash as an asset
@@ -158,45 +202,119 @@ class EnhancedIndexingOptimizer(BaseOptimizer):
             cons.extend([v >= -self.f_dev, v <= self.f_dev])  # pylint: disable=E1130
 
         # total turnover constraint
-        t_cons = []
-        if self.delta is not None:
-            if w0 is not None and w0.sum() > 0:
-                t_cons.extend([cp.norm(w - w0, 1) <= self.delta])
+        prob = cp.Problem(obj, cons + [cp.norm(w - w0, 1) <= self.delta]) if use_turnover else cp.Problem(obj, cons)
+        prob_relaxed = cp.Problem(obj, cons) if use_turnover else None
+
+        if not self._solve(w, wb, prob, prob_relaxed):
+            return None
+        return np.asarray(w.value)
+
+    def _optimize_parametrized(self, r, F, cov_b, var_u, w0, wb, lb, ub, use_turnover) -> Optional[np.ndarray]:
+        """update the parameters of the cached problem and solve it"""
+        n, k = F.shape
+        n_pad = -(-n // self.pad_size) * self.pad_size
+        key = (n_pad, k)
+        if key not in self._problems:
+            self._problems[key] = _ParametrizedProblem(n_pad, k, self.lamb, self.delta, self.f_dev)
+        problem = self._problems[key]
+
+        def pad(x):
+            return np.pad(x, [(0, n_pad - n)] + [(0, 0)] * (x.ndim - 1))
+
+        # cov_b = L @ L.T (cov_b may be singular, so eigen decomposition is used instead of cholesky)
+        e, V = np.linalg.eigh(cov_b)
+        G = F @ (V * np.sqrt(np.maximum(e, 0)))
+        sigma_u = np.sqrt(var_u)
+        # NOTE: the products of the parameters are precomputed to keep the problem DPP
+        problem.r.value = pad(r)
+        problem.F.value = pad(F)
+        problem.G.value = pad(G)
+        problem.sigma_u.value = pad(sigma_u)
+        problem.vb.value = wb @ F
+        problem.gb.value = wb @ G
+        problem.ub_wb.value = pad(sigma_u * wb)
+        problem.lb.value = pad(lb)
+        problem.ub.value = pad(ub)
+        problem.w0.value = pad(w0 if use_turnover else wb)
+
+        w_init = pad(w0 if use_turnover else wb)
+        prob, prob_relaxed = (problem.prob, problem.prob_relaxed) if use_turnover else (problem.prob_relaxed, None)
+        if not self._solve(problem.w, w_init, prob, prob_relaxed):
+            return None
+        return np.asarray(problem.w.value)[:n].copy()
+
+    def _solve(self, w: cp.Variable, w_init: np.ndarray, prob: cp.Problem, prob_relaxed: Optional[cp.Problem]) -> bool:
+        """
+        Args:
+            w (cp.Variable): target weight
+            w_init (np.ndarray): initial weight for warm start
+            prob (cp.Problem): the problem with all constraints
+            prob_relaxed (cp.Problem): the problem without turnover constraint, which is tried if `prob` failed
 
+        Returns:
+            bool: whether success
+        """
         # optimize
         # trial 1: use all constraints
         success = False
         try:
-            prob = cp.Problem(obj, cons + t_cons)
-            prob.solve(solver=cp.ECOS, warm_start=True, **self.solver_kwargs)
+            w.value = w_init  # for warm start
+            prob.solve(solver=self.solver, warm_start=True, **self.solver_kwargs)
             assert prob.status == "optimal"
             success = True
         except Exception as e:
             logger.warning(f"trial 1 failed {e} (status: {prob.status})")
 
         # trial 2: remove turnover constraint
-        if not success and len(t_cons):
+        if not success and prob_relaxed is not None:
             logger.info("try removing turnover constraint as the last optimization failed")
+            prob = prob_relaxed
             try:
-                w.value = wb
-                prob = cp.Problem(obj, cons)
-                prob.solve(solver=cp.ECOS, warm_start=True, **self.solver_kwargs)
+                w.value = w_init
+                prob.solve(solver=self.solver, warm_start=True, **self.solver_kwargs)
                 assert prob.status in ["optimal", "optimal_inaccurate"]
                 success = True
             except Exception as e:
                 logger.warning(f"trial 2 failed {e} (status: {prob.status})")
 
-        # return current weight if not success
-        if not success:
-            logger.warning("optimization failed, will return current holding weight")
-            return w0
-
-        if prob.status == "optimal_inaccurate":
+        if success and prob.status == "optimal_inaccurate":
             logger.warning(f"the optimization is inaccurate")
 
-        # remove small weight
-        w = np.asarray(w.value)
-        w[w < self.epsilon] = 0
-        w /= w.sum()
+        return success
 
-        return w
+
+class _ParametrizedProblem:
+    """
+    The enhanced indexing problem with `cp.Parameter`s, which is compiled once and reused
+
+    The tracking error is reformulated with the factor `G = F @ L` (`cov_b = L @ L.T`) and the specific volatility
+    `sigma_u = sqrt(var_u)`:
+        v @ cov_b @ v + var_u @ d**2 = |w @ G - wb @ G|^2 + |sigma_u * w - sigma_u * wb|^2
+    The excess return of the benchmark `wb @ r` is omitted as it is a constant.
+    """
+
+    def __init__(self, n: int, k: int, lamb: float, delta: Optional[float], f_dev):
+        self.w = cp.Variable(n, nonneg=True)
+        self.r = cp.Parameter(n)
+        self.F = cp.Parameter((n, k))
+        self.G = cp.Parameter((n, k))
+        self.sigma_u = cp.Parameter(n, nonneg=True)
+        self.vb = cp.Parameter(k)  # wb @ F
+        self.gb = cp.Parameter(k)  # wb @ G
+        self.ub_wb = cp.Parameter(n)  # sigma_u * wb
+        self.lb = cp.Parameter(n)
+        self.ub = cp.Parameter(n)
+        self.w0 = cp.Parameter(n)
+
+        w = self.w
+        v = w @ self.F - self.vb  # factor exposure
+        risk = cp.sum_squares(w @ self.G - self.gb) + cp.sum_squares(cp.multiply(self.sigma_u, w) - self.ub_wb)
+        obj = cp.Maximize(w @ self.r - lamb * risk)
+
+        cons = [cp.sum(w) == 1, w >= self.lb, w <= self.ub]
+        if f_dev is not None:
+            cons.extend([v >= -f_dev, v <= f_dev])  # pylint: disable=E1130
+        self.prob_relaxed = cp.Problem(obj, cons)
+        self.prob = self.prob_relaxed
+        if delta is not None:
+            self.prob = cp.Problem(obj, cons + [cp.norm(w - self.w0, 1) <= delta])
@@ -10,10 +10,12 @@ from typing import Dict, List, Text, Tuple, Union
 from abc import ABC
 
 from qlib.data import D
+from qlib.data.cache import MemCacheLengthUnit
 from qlib.data.dataset import Dataset
 from qlib.model.base import BaseModel
+from qlib.model.riskmodel.store import RiskDataStore
 from qlib.strategy.base import BaseStrategy
-from qlib.backtest.position import Position
+from qlib.backtest.position import BasePosition, Position
 from qlib.backtest.signal import Signal, create_signal_from
 from qlib.backtest.decision import Order, OrderDir, TradeDecisionWO
 from qlib.log import get_module_logger
@@ -72,6 +74,62 @@ class BaseSignalStrategy(BaseStrategy, ABC):
         return self.risk_degree
 
 
+def _argsort_desc(scores: np.ndarray) -> np.ndarray:
+    """stable descending argsort; NaN is placed at the end (the same as `pd.Series.sort_values(kind="stable")`)"""
+    return np.argsort(-scores, kind="stable")
+
+
+def _top_n_desc(scores: np.ndarray, n: int) -> np.ndarray:
+    """
+    The positions of the top `n` scores in descending order.
+    It is the same as `_argsort_desc(scores)[:n]`, but only the selected `n` scores are sorted.
+    """
+    if n < 0 or n >= len(scores):
+        return _argsort_desc(scores)[:n]
+    if n == 0:
+        return np.array([], dtype=int)
+    keys = -scores
+    thresh = keys[np.argpartition(keys, n - 1)[n - 1]]
+    if np.isnan(thresh):
+        # all the non-NaN scores and the first NaN scores are selected
+        sel = np.flatnonzero(~np.isnan(keys))
+        tie = np.flatnonzero(np.isnan(keys))
+    else:
+        sel = np.flatnonzero(keys < thresh)
+        tie = np.flatnonzero(keys == thresh)
+    # the ties at the threshold are broken by the original order, like a stable sort
+    sel = np.sort(np.concatenate([sel, tie[: n - len(sel)]]))
+    return sel[_argsort_desc(scores[sel])]
+
+
+class _SellSimulationPosition:
+    """
+    A read-only view of the position used to simulate the selling orders without copying the position.
+    Only the cash is changed by the simulated orders; each stock is sold at most once in a step, so the other
+    information is read from the original position directly.
+    """
+
+    def __init__(self, position: BasePosition) -> None:
+        self.position = position
+        self.cash_delta = 0.0
+
+    def check_stock(self, stock_id: str) -> bool:
+        return self.position.check_stock(stock_id)
+
+    def get_stock_amount(self, code: str) -> float:
+        return self.position.get_stock_amount(code)
+
+    def get_cash(self, include_settle: bool = False) -> float:
+        return self.position.get_cash(include_settle=include_settle) + self.cash_delta
+
+    def update_order(self, order: Order, trade_val: float, cost: float, trade_price: float) -> None:
+        if self.position.skip_update():
+            return
+        # the cash of the selling orders is not available until settlement if the cash settlement is delayed
+        if self.position._settle_type == BasePosition.ST_NO:
+            self.cash_delta += trade_val - cost
+
+
 class TopkDropoutStrategy(BaseSignalStrategy):
     # TODO:
     # 1. Supporting leverage the get_range_limit result from the decision
@@ -88,6 +146,7 @@ class TopkDropoutStrategy(BaseSignalStrategy):
         hold_thresh=1,
         only_tradable=False,
         forbid_all_trade_at_limit=True,
+        vectorized=False,
         **kwargs,
     ):
         """
@@ -125,6 +184,15 @@ class TopkDropoutStrategy(BaseSignalStrategy):
             else:
 
                 strategy will sell at limit up and buy ad limit down.
+        vectorized : bool
+            make the decision with array operations over the integer codes of the stocks instead of `pd.Series`.
+
+            - The scores are sorted (partially by `np.argpartition`) once in each step and the tradable state of the
+              candidates is checked by `Exchange.tradable_mask` with one array operation.
+            - The selling orders are simulated without copying the position.
+
+            The orders are the same as the default implementation except that the stocks with equal scores are
+            ordered by their order in the signal (the default implementation doesn't guarantee the order of them).
         """
         super().__init__(**kwargs)
         self.topk = topk
@@ -134,6 +202,7 @@ class TopkDropoutStrategy(BaseSignalStrategy):
         self.hold_thresh = hold_thresh
         self.only_tradable = only_tradable
         self.forbid_all_trade_at_limit = forbid_all_trade_at_limit
+        self.vectorized = vectorized
 
     def generate_trade_decision(self, execute_result=None):
         # get the number of trading step finished, trade_step can be [0, 1, 2, ..., trade_len - 1]
@@ -147,6 +216,8 @@ class TopkDropoutStrategy(BaseSignalStrategy):
             pred_score = pred_score.iloc[:, 0]
         if pred_score is None:
             return TradeDecisionWO([], self)
+        if self.vectorized:
+            return self._generate_trade_decision_vectorized(pred_score, trade_start_time, trade_end_time)
         if self.only_tradable:
             # If The strategy only consider tradable stock when make decision
             # It needs following actions to filter stocks
@@ -294,6 +365,155 @@ class TopkDropoutStrategy(BaseSignalStrategy):
             buy_order_list.append(buy_order)
         return TradeDecisionWO(sell_order_list + buy_order_list, self)
 
+    def _generate_trade_decision_vectorized(
+        self, pred_score: pd.Series, trade_start_time: pd.Timestamp, trade_end_time: pd.Timestamp
+    ) -> TradeDecisionWO:
+        """The array version of `generate_trade_decision`. Each step of it corresponds to the default implementation."""
+        position = self.trade_position
+        current_stock_list = position.get_stock_list()
+        # integer codes of stocks: the stocks in the signal are followed by the held stocks without signal
+        held = pred_score.index.get_indexer(current_stock_list)
+        no_signal = held == -1
+        n_signal = len(pred_score)
+        held[no_signal] = n_signal + np.arange(no_signal.sum())
+        stocks = np.concatenate([pred_score.index.values, np.array(current_stock_list, dtype=object)[no_signal]])
+        scores = np.concatenate([pred_score.values.astype(float), np.full(no_signal.sum(), np.nan)])
+
+        if self.only_tradable:
+            tradable = self.trade_exchange.tradable_mask(stocks, trade_start_time, trade_end_time)
+
+            # NOTE: the default implementation returns one stock at least
+            def get_first_n(codes, n):
+                return codes[tradable[codes]][: max(n, 1)]
+
+            def get_last_n(codes, n):
+                return codes[tradable[codes]][-max(n, 1) :]
+
+            def filter_stock(codes):
+                return codes[tradable[codes]]
+
+        else:
+
+            def get_first_n(codes, n):
+                return codes[:n]
+
+            def get_last_n(codes, n):
+                return codes[-n:]
+
+            def filter_stock(codes):
+                return codes
+
+        def get_top_n(codes, n):
+            # the same as `get_first_n(codes[_argsort_desc(scores[codes])], n)`
+            if self.only_tradable:
+                codes = codes[tradable[codes]]
+                n = max(n, 1)
+            return codes[_top_n_desc(scores[codes], n)]
+
+        # last position (sorted by score)
+        last = held[_argsort_desc(scores[held])]
+        is_last = np.zeros(len(stocks), dtype=bool)
+        is_last[last] = True
+        # The new stocks today want to buy **at most**
+        candidates = np.arange(n_signal)
+        if self.method_buy == "top":
+            today = get_top_n(candidates[~is_last[:n_signal]], self.n_drop + self.topk - len(last))
+        elif self.method_buy == "random":
+            topk_candi = get_top_n(candidates, self.topk)
+            candi = topk_candi[~is_last[topk_candi]]
+            n = self.n_drop + self.topk - len(last)
+            try:
+                today = np.random.choice(candi, n, replace=False)
+            except ValueError:
+                today = candi
+        else:
+            raise NotImplementedError(f"This type of input is not supported")
+        # combine(new stocks + last stocks),  we will drop stocks from this list
+        # In case of dropping higher score stock and buying lower score stock.
+        # NOTE: the stocks are sorted by id before sorting by score like `pd.Index.union` (except for empty input)
+        if len(today) == 0:
+            comb = last
+        elif len(last) == 0:
+            comb = today
+        else:
+            comb = np.union1d(last, today)
+            comb = comb[np.argsort(stocks[comb], kind="stable")]
+        comb = comb[_argsort_desc(scores[comb])]
+
+        # Get the stock list we really want to sell (After filtering the case that we sell high and buy low)
+        if self.method_sell == "bottom":
+            sell = last[np.isin(last, get_last_n(comb, self.n_drop))]
+        elif self.method_sell == "random":
+            candi = filter_stock(last)
+            try:
+                sell = np.random.choice(candi, self.n_drop, replace=False) if len(last) else np.array([], dtype=int)
+            except ValueError:  # No enough candidates
+                sell = candi
+        else:
+            raise NotImplementedError(f"This type of input is not supported")
+
+        # Get the stock list we really want to buy
+        buy = today[: len(sell) + self.topk - len(last)]
+
+        sell_order_list = []
+        buy_order_list = []
+        cash = position.get_cash()
+        sell_tradable = self.trade_exchange.tradable_mask(
+            current_stock_list,
+            trade_start_time,
+            trade_end_time,
+            direction=None if self.forbid_all_trade_at_limit else OrderDir.SELL,
+        )
+        is_sell = np.zeros(len(stocks), dtype=bool)
+        is_sell[sell] = True
+        time_per_step = self.trade_calendar.get_freq()
+        sim_position = _SellSimulationPosition(position)
+        for code, code_id, code_tradable in zip(current_stock_list, held, sell_tradable):
+            if not code_tradable or not is_sell[code_id]:
+                continue
+            # check hold limit
+            if position.get_stock_count(code, bar=time_per_step) < self.hold_thresh:
+                continue
+            sell_order = Order(
+                stock_id=code,
+                amount=position.get_stock_amount(code=code),
+                start_time=trade_start_time,
+                end_time=trade_end_time,
+                direction=Order.SELL,
+            )
+            # is order executable
+            if self.trade_exchange.check_order(sell_order):
+                sell_order_list.append(sell_order)
+                trade_val, trade_cost, trade_price = self.trade_exchange.deal_order(sell_order, position=sim_position)
+                # update cash
+                cash += trade_val - trade_cost
+
+        # buy new stock
+        value = cash * self.risk_degree / len(buy) if len(buy) > 0 else 0
+        buy_stocks = stocks[buy]
+        buy_tradable = self.trade_exchange.tradable_mask(
+            buy_stocks,
+            trade_start_time,
+            trade_end_time,
+            direction=None if self.forbid_all_trade_at_limit else OrderDir.BUY,
+        )
+        for code in buy_stocks[buy_tradable]:
+            buy_price = self.trade_exchange.get_deal_price(
+                stock_id=code, start_time=trade_start_time, end_time=trade_end_time, direction=OrderDir.BUY
+            )
+            buy_amount = value / buy_price
+            factor = self.trade_exchange.get_factor(stock_id=code, start_time=trade_start_time, end_time=trade_end_time)
+            buy_amount = self.trade_exchange.round_amount_by_trade_unit(buy_amount, factor)
+            buy_order = Order(
+                stock_id=code,
+                amount=buy_amount,
+                start_time=trade_start_time,
+                end_time=trade_end_time,
+                direction=Order.BUY,
+            )
+            buy_order_list.append(buy_order)
+        return TradeDecisionWO(sell_order_list + buy_order_list, self)
+
 
 class WeightStrategyBase(BaseSignalStrategy):
     # TODO:
@@ -394,9 +614,15 @@ class EnhancedIndexingStrategy(WeightStrategyBase):
     The risk model data can be obtained from risk data provider. You can also use
     `qlib.model.riskmodel.structured.StructuredCovEstimator` to prepare these data.
 
+    The risk model data can also be packed into contiguous binary files by `qlib.model.riskmodel.store`
+    (`dump_risk_data` or `pack_risk_data`), which are read by mmap instead of loading a few files every day.
+    `riskmodel_root` is recognized as packed if it contains a `meta.json`.
+
     Args:
         riskmodel_path (str): risk model path
         name_mapping (dict): alternative file names
+        riskdata_cache_size (int): the number of dates whose risk data are cached (least recently used dates are
+            evicted first); 0 means no limit
     """
 
     FACTOR_EXP_NAME = "factor_exp.pkl"
@@ -413,6 +639,7 @@ class EnhancedIndexingStrategy(WeightStrategyBase):
         name_mapping={},
         optimizer_kwargs={},
         verbose=False,
+        riskdata_cache_size=64,
         **kwargs,
     ):
         super().__init__(**kwargs)
@@ -432,10 +659,16 @@ class EnhancedIndexingStrategy(WeightStrategyBase):
 
         self.verbose = verbose
 
-        self._riskdata_cache = {}
+        self._riskdata_store = None
+        if RiskDataStore.is_packed(riskmodel_root):
+            self._riskdata_store = RiskDataStore(riskmodel_root, cache_size=riskdata_cache_size)
+        self._riskdata_cache = MemCacheLengthUnit(size_limit=riskdata_cache_size)
 
     def get_risk_data(self, date):
 
+        if self._riskdata_store is not None:
+            return self._riskdata_store.get(date)
+
         if date in self._riskdata_cache:
             return self._riskdata_cache[date]
 
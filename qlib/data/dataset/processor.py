@@ -208,8 +208,12 @@ class MinMaxNorm(Processor):
     def fit(self, df: pd.DataFrame = None):
         df = fetch_df_by_index(df, slice(self.fit_start_time, self.fit_end_time), level="datetime")
         cols = get_group_columns(df, self.fields_group)
-        self.min_val = np.nanmin(df[cols].values, axis=0)
-        self.max_val = np.nanmax(df[cols].values, axis=0)
+        self.set_stats(np.nanmin(df[cols].values, axis=0), np.nanmax(df[cols].values, axis=0), cols)
+
+    def set_stats(self, min_val: np.ndarray, max_val: np.ndarray, cols: pd.Index):
+        """set the fitted statistics (e.g. calculated incrementally by `qlib.data.dataset.rolling`)"""
+        self.min_val = min_val
+        self.max_val = max_val
         self.ignore = self.min_val == self.max_val
         # To improve the speed, we set the value of `min_val` to `0` for the columns that do not need to be processed,
         # and the value of `max_val` to `1`, when using `(x - min_val) / (max_val - min_val)` for uniform calculation,
@@ -242,8 +246,12 @@ class ZScoreNorm(Processor):
     def fit(self, df: pd.DataFrame = None):
         df = fetch_df_by_index(df, slice(self.fit_start_time, self.fit_end_time), level="datetime")
         cols = get_group_columns(df, self.fields_group)
-        self.mean_train = np.nanmean(df[cols].values, axis=0)
-        self.std_train = np.nanstd(df[cols].values, axis=0)
+        self.set_stats(np.nanmean(df[cols].values, axis=0), np.nanstd(df[cols].values, axis=0), cols)
+
+    def set_stats(self, mean_train: np.ndarray, std_train: np.ndarray, cols: pd.Index):
+        """set the fitted statistics (e.g. calculated incrementally by `qlib.data.dataset.rolling`)"""
+        self.mean_train = mean_train
+        self.std_train = std_train
         self.ignore = self.std_train == 0
         # To improve the speed, we set the value of `std_train` to `1` for the columns that do not need to be processed,
         # and the value of `mean_train` to `0`, when using `(x - mean_train) / std_train` for uniform calculation,
@@ -284,10 +292,16 @@ class RobustZScoreNorm(Processor):
 
     def fit(self, df: pd.DataFrame = None):
         df = fetch_df_by_index(df, slice(self.fit_start_time, self.fit_end_time), level="datetime")
-        self.cols = get_group_columns(df, self.fields_group)
-        X = df[self.cols].values
-        self.mean_train = np.nanmedian(X, axis=0)
-        self.std_train = np.nanmedian(np.abs(X - self.mean_train), axis=0)
+        cols = get_group_columns(df, self.fields_group)
+        X = df[cols].values
+        median = np.nanmedian(X, axis=0)
+        self.set_stats(median, np.nanmedian(np.abs(X - median), axis=0), cols)
+
+    def set_stats(self, median: np.ndarray, mad: np.ndarray, cols: pd.Index):
+        """set the fitted statistics (e.g. calculated incrementally by `qlib.data.dataset.rolling`)"""
+        self.cols = cols
+        self.mean_train = median
+        self.std_train = mad
         self.std_train += EPS
         self.std_train *= 1.4826
 
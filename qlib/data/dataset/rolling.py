@@ -0,0 +1,393 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+"""
+Rolling-aware data handler
+
+In rolling training (e.g. the tasks generated by `RollingGen`), the handlers of the tasks only differ in the time
+range and the fitting range of the processors. `RollingDataHandlerLP` loads the raw data of the whole horizon once
+and it can be rolled to a new fitting range by `roll`, where the statistics of the normalization processors are
+updated incrementally (only the dates entering or leaving the fitting range are processed).
+"""
+
+import abc
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from ...log import TimeInspector
+from . import processor as processor_module
+from .handler import DataHandler, DataHandlerLP
+from .utils import fetch_df_by_col
+
+
+class RollingStatistics(abc.ABC):
+    """
+    The statistics of a processor on a window of dates, which can be updated incrementally
+
+    The dates are represented by their positions in the calendar of the handler. The dates must be added in
+    ascending order and removed from the start of the window.
+    """
+
+    @abc.abstractmethod
+    def add(self, X: np.ndarray, date_idx: np.ndarray):
+        """
+        Args:
+            X (np.ndarray): the values of the new dates (rows x columns), sorted by date.
+            date_idx (np.ndarray): the date position of each row.
+        """
+
+    @abc.abstractmethod
+    def remove_before(self, date_idx: int):
+        """remove the dates before `date_idx`"""
+
+    @abc.abstractmethod
+    def set_stats(self, proc: processor_module.Processor, cols: pd.Index):
+        """set the fitted statistics of the processor"""
+
+
+class MomentStatistics(RollingStatistics):
+    """mean and std for `ZScoreNorm`"""
+
+    def __init__(self):
+        self.ref = None  # the values are shifted by the reference to reduce the cancellation error
+        self.dtype = None
+        self.date_stats = {}  # date_idx -> (count, sum, sum of squares)
+        self.count = self.sum = self.sum_sq = 0.0
+
+    def add(self, X, date_idx):
+        self.dtype = X.dtype
+        X = X.astype(np.float64)
+        if self.ref is None:
+            with np.errstate(invalid="ignore"):
+                self.ref = np.nan_to_num(np.nanmean(X, axis=0)) if len(X) else np.zeros(X.shape[1])
+        X -= self.ref
+        valid = ~np.isnan(X)
+        X[~valid] = 0
+        dates, starts = np.unique(date_idx, return_index=True)
+        if len(dates) == 0:
+            return
+        count = np.add.reduceat(valid, starts, axis=0)
+        s = np.add.reduceat(X, starts, axis=0)
+        ss = np.add.reduceat(X**2, starts, axis=0)
+        for i, date in enumerate(dates):
+            self.date_stats[date] = (count[i], s[i], ss[i])
+        self.count = self.count + count.sum(axis=0)
+        self.sum = self.sum + s.sum(axis=0)
+        self.sum_sq = self.sum_sq + ss.sum(axis=0)
+
+    def remove_before(self, date_idx):
+        for date in [d for d in self.date_stats if d < date_idx]:
+            count, s, ss = self.date_stats.pop(date)
+            self.count = self.count - count
+            self.sum = self.sum - s
+            self.sum_sq = self.sum_sq - ss
+
+    def set_stats(self, proc, cols):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mean = self.sum / self.count
+            std = np.sqrt(np.maximum(self.sum_sq / self.count - mean**2, 0))
+        proc.set_stats((mean + self.ref).astype(self.dtype), std.astype(self.dtype), cols)
+
+
+class MinMaxStatistics(RollingStatistics):
+    """min and max for `MinMaxNorm`"""
+
+    def __init__(self):
+        self.date_stats = {}  # date_idx -> (min, max)
+        self.min_val = self.max_val = None
+
+    def add(self, X, date_idx):
+        dates, starts = np.unique(date_idx, return_index=True)
+        if len(dates) == 0:
+            return
+        min_val = np.fmin.reduceat(X, starts, axis=0)
+        max_val = np.fmax.reduceat(X, starts, axis=0)
+        for i, date in enumerate(dates):
+            self.date_stats[date] = (min_val[i], max_val[i])
+        min_val, max_val = np.fmin.reduce(min_val, axis=0), np.fmax.reduce(max_val, axis=0)
+        if self.min_val is not None:
+            min_val, max_val = np.fmin(self.min_val, min_val), np.fmax(self.max_val, max_val)
+        self.min_val, self.max_val = min_val, max_val
+
+    def remove_before(self, date_idx):
+        removed = [d for d in self.date_stats if d < date_idx]
+        for date in removed:
+            del self.date_stats[date]
+        if len(removed) > 0 and len(self.date_stats) > 0:
+            stats = list(self.date_stats.values())
+            self.min_val = np.fmin.reduce([s[0] for s in stats], axis=0)
+            self.max_val = np.fmax.reduce([s[1] for s in stats], axis=0)
+        elif len(self.date_stats) == 0:
+            self.min_val = self.max_val = None
+
+    def set_stats(self, proc, cols):
+        proc.set_stats(self.min_val.copy(), self.max_val.copy(), cols)
+
+
+class MedianStatistics(RollingStatistics):
+    """
+    median and MAD for `RobustZScoreNorm`
+
+    The values of the window are kept sorted for each column, so the new dates are merged in linear time and the
+    median is picked directly. The MAD is the k-th smallest of the distances to the median, which are the union of
+    two sorted sequences (the values below and above the median); it is found by a binary search.
+    """
+
+    def __init__(self):
+        self.values = None  # columns x rows, sorted in each column (NaN at the end)
+        self.dates = None  # the date position of each value
+
+    def add(self, X, date_idx):
+        X = X.T
+        order = np.argsort(X, axis=1, kind="stable")
+        values = np.take_along_axis(X, order, axis=1)
+        dates = np.broadcast_to(date_idx.astype(np.int32), X.shape)
+        dates = np.take_along_axis(dates, order, axis=1)
+        if self.values is not None:
+            # both parts are sorted, so the stable sort (timsort) merges them in linear time
+            values = np.concatenate([self.values, values], axis=1)
+            dates = np.concatenate([self.dates, dates], axis=1)
+            order = np.argsort(values, axis=1, kind="stable")
+            values = np.take_along_axis(values, order, axis=1)
+            dates = np.take_along_axis(dates, order, axis=1)
+        self.values, self.dates = values, dates
+
+    def remove_before(self, date_idx):
+        if self.values is None:
+            return
+        # each date has the same number of rows in all the columns
+        keep = self.dates >= date_idx
+        n_col = self.values.shape[0]
+        self.values = self.values[keep].reshape(n_col, -1)
+        self.dates = self.dates[keep].reshape(n_col, -1)
+
+    @staticmethod
+    def _take(values: np.ndarray, idx: np.ndarray) -> np.ndarray:
+        idx = np.clip(idx, 0, values.shape[1] - 1)
+        return np.take_along_axis(values, idx[:, None], axis=1)[:, 0]
+
+    def _median(self, count: np.ndarray, values: np.ndarray) -> np.ndarray:
+        lo = self._take(values, (count - 1) // 2)
+        hi = self._take(values, count // 2)
+        return np.where(count % 2 == 1, lo, (lo + hi) / 2)
+
+    def _kth_distance(self, k: np.ndarray, median: np.ndarray, n_left: np.ndarray, n_right: np.ndarray) -> np.ndarray:
+        """
+        the k-th smallest (0-based) distance to the median
+            left[i] = median - values[n_left - 1 - i]
+            right[i] = values[n_left + i] - median
+        `a` is the number of the k + 1 smallest distances which come from the left part
+        """
+
+        def left(i):
+            return median - self._take(self.values, n_left - 1 - i)
+
+        def right(i):
+            return self._take(self.values, n_left + i) - median
+
+        lo = np.maximum(k + 1 - n_right, 0)
+        hi = np.minimum(k + 1, n_left)
+        # find the smallest `a` such that left[a] >= right[k - a] (it always holds for a = hi)
+        with np.errstate(invalid="ignore"):
+            while True:
+                active = lo < hi
+                if not active.any():
+                    break
+                a = (lo + hi) // 2
+                more_left = left(a) < right(k - a)
+                lo = np.where(active & more_left, a + 1, lo)
+                hi = np.where(active & ~more_left, a, hi)
+        dist_left = np.where(lo > 0, left(lo - 1), -np.inf)
+        dist_right = np.where(k - lo >= 0, right(k - lo), -np.inf)
+        return np.maximum(dist_left, dist_right).astype(self.values.dtype)
+
+    def set_stats(self, proc, cols):
+        values = self.values
+        count = np.sum(~np.isnan(values), axis=1)
+        empty = count == 0
+        median = self._median(count, values)
+        n_left = np.sum(values < median[:, None], axis=1)
+        n_right = count - n_left
+        k_lo, k_hi = (count - 1) // 2, count // 2
+        mad_lo = self._kth_distance(k_lo, median, n_left, n_right)
+        mad_hi = self._kth_distance(k_hi, median, n_left, n_right)
+        mad = np.where(count % 2 == 1, mad_lo, (mad_lo + mad_hi) / 2)
+        median[empty] = np.nan
+        mad[empty] = np.nan
+        proc.set_stats(median, mad, cols)
+
+
+class RollingDataHandlerLP(DataHandlerLP):
+    """
+    DataHandlerLP for rolling
+
+    - The raw data of the whole horizon (`start_time` ~ `end_time`) is loaded only once.
+    - `roll` changes the fitting range of the processors. The statistics of `ZScoreNorm`, `RobustZScoreNorm` and
+      `MinMaxNorm` are updated incrementally: only the dates entering the fitting range are processed and the dates
+      leaving it are removed from the statistics. Other learnable processors are refitted on their fitting range.
+    - The processed data are not materialized. `fetch` processes the selected rows of the raw data on demand (the
+      raw data are not copied except the selected rows), so each rolling segment costs only its own size.
+
+    NOTE:
+    - The statistics are updated incrementally only if the processors before it are not learnable, otherwise it is
+      refitted.
+    - The processors should process the data of each date independently (which is true for the builtin processors
+      except the learnable ones), so processing the selected rows is the same as processing the whole data.
+
+    It can be combined with an existing handler, e.g.
+
+    .. code-block:: python
+
+        class RollingAlpha158(Alpha158, RollingDataHandlerLP):
+            pass
+    """
+
+    STATISTICS = {
+        processor_module.ZScoreNorm: MomentStatistics,
+        processor_module.RobustZScoreNorm: MedianStatistics,
+        processor_module.MinMaxNorm: MinMaxStatistics,
+    }
+
+    def __init__(self, *args, **kwargs):
+        assert not kwargs.get("drop_raw", False), "RollingDataHandlerLP processes the raw data on demand"
+        self._rolling_stats: Dict[int, Tuple[RollingStatistics, pd.Index, int, int]] = {}
+        super().__init__(*args, **kwargs)
+
+    def setup_data(self, *args, **kwargs):
+        self._rolling_stats = {}
+        super().setup_data(*args, **kwargs)
+
+    @property
+    def _calendar(self) -> pd.Index:
+        return self._data.index.get_level_values("datetime")
+
+    def _get_rows(self, start_idx: int, end_idx: int) -> pd.DataFrame:
+        """the raw rows of the dates [start_idx, end_idx) without copying"""
+        dates = self._calendar
+        unique_dates = dates.unique()
+        start = dates.searchsorted(unique_dates[start_idx]) if start_idx < len(unique_dates) else len(dates)
+        end = dates.searchsorted(unique_dates[end_idx]) if end_idx < len(unique_dates) else len(dates)
+        return self._data.iloc[start:end]
+
+    def _get_date_range(self, start_time, end_time) -> Tuple[int, int]:
+        unique_dates = self._calendar.unique()
+        start = 0 if start_time is None else unique_dates.searchsorted(pd.Timestamp(start_time), side="left")
+        end = len(unique_dates) if end_time is None else unique_dates.searchsorted(pd.Timestamp(end_time), "right")
+        return start, end
+
+    def _get_pipelines(self) -> List[Tuple[processor_module.Processor, List[processor_module.Processor]]]:
+        """the processors and the processors before them"""
+        res = []
+        pre = []
+        for proc in self.shared_processors:
+            res.append((proc, list(pre)))
+            pre.append(proc)
+        shared = list(pre)
+        for proc in self.infer_processors:
+            res.append((proc, list(pre)))
+            pre.append(proc)
+        pre = pre if self.process_type == DataHandlerLP.PTYPE_A else shared
+        for proc in self.learn_processors:
+            res.append((proc, list(pre)))
+            pre.append(proc)
+        return res
+
+    def _get_processors(self, data_key: str) -> List[processor_module.Processor]:
+        if data_key == self.DK_I:
+            return self.shared_processors + self.infer_processors
+        if self.process_type == DataHandlerLP.PTYPE_A:
+            return self.shared_processors + self.infer_processors + self.learn_processors
+        return self.shared_processors + self.learn_processors
+
+    def _process(self, df: pd.DataFrame, proc_l: List[processor_module.Processor]) -> pd.DataFrame:
+        if not self._is_proc_readonly(proc_l):  # avoid modifying the raw data
+            df = df.copy()
+        for proc in proc_l:
+            df = proc(df)
+        return df
+
+    @staticmethod
+    def _is_learnable(proc: processor_module.Processor) -> bool:
+        return type(proc).fit is not processor_module.Processor.fit
+
+    def _fit_incrementally(self, proc: processor_module.Processor, pre: List[processor_module.Processor]):
+        start, end = self._get_date_range(proc.fit_start_time, proc.fit_end_time)
+        stats, cols, cur_start, cur_end = self._rolling_stats.get(id(proc), (None, None, start, start))
+        if stats is None or start < cur_start or end < cur_end or start >= cur_end:
+            # the range can't be reached incrementally
+            cols = processor_module.get_group_columns(self._process(self._data.head(), pre), proc.fields_group)
+            stats, cur_start, cur_end = self.STATISTICS[type(proc)](), start, start
+        stats.remove_before(start)
+        if end > cur_end:
+            df = self._process(self._get_rows(max(cur_end, start), end), pre)
+            date_idx = self._calendar.unique().get_indexer(df.index.get_level_values("datetime"))
+            stats.add(df[cols].values, date_idx)
+        self._rolling_stats[id(proc)] = stats, cols, start, end
+        stats.set_stats(proc, cols)
+
+    def _fit_processors(self):
+        for proc, pre in self._get_pipelines():
+            if not self._is_learnable(proc):
+                continue
+            with TimeInspector.logt(f"{proc.__class__.__name__}"):
+                if type(proc) in self.STATISTICS and not any(self._is_learnable(p) for p in pre):
+                    self._fit_incrementally(proc, pre)
+                else:
+                    df = self._data
+                    if hasattr(proc, "fit_start_time") and hasattr(proc, "fit_end_time"):
+                        df = self._get_rows(*self._get_date_range(proc.fit_start_time, proc.fit_end_time))
+                    proc.fit(self._process(df, pre))
+
+    def roll(self, fit_start_time=None, fit_end_time=None):
+        """
+        change the fitting range of the processors and refit them
+
+        Args:
+            fit_start_time: the new start of the fitting range, None for keeping the current range.
+            fit_end_time: the new end of the fitting range, None for keeping the current range.
+        """
+        kwargs = {}
+        if fit_start_time is not None:
+            kwargs["fit_start_time"] = fit_start_time
+        if fit_end_time is not None:
+            kwargs["fit_end_time"] = fit_end_time
+        if len(kwargs) > 0:
+            for proc in self.get_all_processors():
+                proc.config(**kwargs)
+        self._fit_processors()
+
+    def fit(self):
+        self._fit_processors()
+
+    def process_data(self, with_fit: bool = False):
+        """the data are processed on demand in `fetch`"""
+        if with_fit:
+            self._fit_processors()
+
+    def _get_df_by_key(self, data_key: str = DataHandlerLP.DK_I) -> pd.DataFrame:
+        if data_key == self.DK_R:
+            return self._data
+        # NOTE: the whole data is processed
+        return self._process(self._data, self._get_processors(data_key))
+
+    def fetch(
+        self,
+        selector: Union[pd.Timestamp, slice, str] = slice(None, None),
+        level: Union[str, int] = "datetime",
+        col_set=DataHandler.CS_ALL,
+        data_key: str = DataHandlerLP.DK_I,
+        squeeze: bool = False,
+        proc_func=None,
+    ) -> pd.DataFrame:
+        if data_key == self.DK_R:
+            return super().fetch(selector, level, col_set, data_key, squeeze, proc_func)
+        df = self._fetch_data(self._data, selector=selector, level=level, col_set=self.CS_RAW)
+        df = self._process(df, self._get_processors(data_key))
+        return self._fetch_data(
+            df, selector=selector, level=level, col_set=col_set, squeeze=squeeze, proc_func=proc_func
+        )
+
+    def get_cols(self, col_set=DataHandler.CS_ALL, data_key: str = DataHandlerLP.DK_I) -> list:
+        df = self._process(self._data.head(), self._get_processors(data_key))
+        return fetch_df_by_col(df, col_set).columns.to_list()
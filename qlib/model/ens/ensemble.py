@@ -5,9 +5,11 @@
 Ensemble module can merge the objects in an Ensemble. For example, if there are many submodels predictions, we may need to merge them into an ensemble prediction.
 """
 
-from typing import Union
+from typing import List, Optional, Tuple, Union
+import numpy as np
 import pandas as pd
 from qlib.utils import FLATTEN_TUPLE, flatten_dict
+from qlib.utils.paral import iter_loaded
 from qlib.log import get_module_logger
 
 
@@ -63,11 +65,140 @@ class SingleKeyEnsemble(Ensemble):
         return ensemble_dict
 
 
+class _SortedFold:
+    """
+    Fold the frames one by one into arrays on the union of their index.
+
+    Each row of the index is encoded as an int64 key by the codes of its level values in the vocabularies of the
+    levels, and the keys of the folded rows are kept sorted. So folding a frame is merging sorted arrays instead of
+    concatenating frames, and only the arrays of the output (and the current input) are kept in memory.
+    """
+
+    def __init__(self, fills: List[Tuple[object, np.dtype]]):
+        """
+        Args:
+            fills (List[Tuple[object, np.dtype]]): the fill value and the dtype of each array for creating them.
+        """
+        self.fills = fills
+        self.names = None
+        self.vocabs: List[pd.Index] = []
+        self.bits: List[int] = []
+        self.keys = np.empty(0, dtype=np.int64)
+        self.columns: Optional[pd.Index] = None
+        self.arrays: List[np.ndarray] = []
+
+    @property
+    def empty(self) -> bool:
+        return self.columns is None
+
+    def _encode(self, codes: List[np.ndarray], bits: List[int]) -> np.ndarray:
+        keys = np.zeros(len(codes[0]), dtype=np.int64)
+        for code, n_bits in zip(codes, bits):
+            keys = (keys << n_bits) | code
+        return keys
+
+    def _decode(self, keys: np.ndarray) -> List[np.ndarray]:
+        codes = []
+        for n_bits in reversed(self.bits):
+            codes.append(keys & ((1 << n_bits) - 1))
+            keys = keys >> n_bits
+        return codes[::-1]
+
+    def _codes(self, index: pd.Index) -> List[np.ndarray]:
+        """the codes of the level values of `index` in the vocabularies, which are extended if necessary"""
+        if isinstance(index, pd.MultiIndex):
+            levels, level_codes = list(index.levels), [np.asarray(c) for c in index.codes]
+        else:
+            level_codes, levels = pd.factorize(index)
+            levels, level_codes = [pd.Index(levels)], [level_codes]
+        if self.empty:
+            self.names = index.names
+            self.vocabs = [level[:0] for level in levels]
+            self.bits = [0] * len(levels)
+        codes, bits = [], []
+        for i, (level, code) in enumerate(zip(levels, level_codes)):
+            if (code < 0).any():
+                raise ValueError("The index to ensemble can't contain NaN")
+            mapping = self.vocabs[i].get_indexer(level)
+            if (mapping < 0).any():
+                self.vocabs[i] = self.vocabs[i].append(level[mapping < 0])
+                mapping = self.vocabs[i].get_indexer(level)
+            codes.append(mapping[code].astype(np.int64))
+            bits.append(max(self.bits[i], int(len(self.vocabs[i]) * 2).bit_length()))
+        if bits != self.bits:
+            if sum(bits) > 63:
+                raise ValueError("The index to ensemble has too many distinct values")
+            # the vocabularies outgrow the bits of the keys, so the keys are encoded again
+            self.keys = self._encode(self._decode(self.keys), bits)
+            self.bits = bits
+        return codes
+
+    def align(self, index: pd.Index, columns: pd.Index) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Extend the index and columns of the arrays to cover the frame to fold.
+
+        Args:
+            index (pd.Index): the index of the frame.
+            columns (pd.Index): the columns of the frame.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: the positions of the rows of the frame to fold (the last one is used if the
+            index is duplicated) and their positions in the arrays.
+        """
+        keys = self._encode(self._codes(index), self.bits)
+        if self.empty:
+            self.columns = columns
+            self.arrays = [np.empty((0, len(columns)), dtype=dtype) for _, dtype in self.fills]
+        elif not columns.equals(self.columns):
+            columns = self.columns.append(columns.difference(self.columns, sort=False))
+            if len(columns) > len(self.columns):
+                self.arrays = [
+                    np.concatenate([arr, np.full((len(arr), len(columns) - arr.shape[1]), fill, dtype=arr.dtype)], 1)
+                    for arr, (fill, _) in zip(self.arrays, self.fills)
+                ]
+                self.columns = columns
+        rows = np.argsort(keys, kind="stable")
+        keys = keys[rows]
+        last = np.append(keys[1:] != keys[:-1], True)
+        rows, keys = rows[last], keys[last]
+        pos = np.searchsorted(self.keys, keys)
+        new = pos == len(self.keys)
+        new[~new] = self.keys[pos[~new]] != keys[~new]
+        if new.any():
+            self.keys = np.insert(self.keys, pos[new], keys[new])
+            self.arrays = [np.insert(arr, pos[new], fill, axis=0) for arr, (fill, _) in zip(self.arrays, self.fills)]
+            pos = np.searchsorted(self.keys, keys)
+        return rows, pos
+
+    def result(self) -> Tuple[pd.Index, List[np.ndarray]]:
+        """the index sorted by the level values and the arrays on it"""
+        if self.empty:
+            raise ValueError("There is nothing to ensemble")
+        levels, codes = [], []
+        for vocab, code in zip(self.vocabs, self._decode(self.keys)):
+            sorter = vocab.argsort()
+            rank = np.empty_like(sorter)
+            rank[sorter] = np.arange(len(sorter))
+            levels.append(vocab[sorter])
+            codes.append(rank[code])
+        order = np.lexsort(codes[::-1])
+        codes = [code[order] for code in codes]
+        if len(levels) == 1:
+            index = levels[0][codes[0]].rename(self.names[0])
+        else:
+            index = pd.MultiIndex(levels=levels, codes=codes, names=self.names, verify_integrity=False)
+        return index, [arr[order] for arr in self.arrays]
+
+
 class RollingEnsemble(Ensemble):
 
     """Merge a dict of rolling dataframe like `prediction` or `IC` into an ensemble.
 
-    NOTE: The values of dict must be pd.DataFrame, and have the index "datetime".
+    NOTE: The values of dict must be pd.DataFrame (or `LazyObject` of it), and have the index "datetime".
+
+    The artifacts are merged one by one (the `LazyObject` are loaded one by one), so the memory is bounded by the size
+    of the result instead of the sum of the artifacts. If there are duplicated predictions, the prediction of the
+    artifact with the latest start datetime is used (the later one in the dict if the start datetimes are the same).
 
     When calling this class:
 
@@ -81,20 +212,36 @@ class RollingEnsemble(Ensemble):
 
     def __call__(self, ensemble_dict: dict) -> pd.DataFrame:
         get_module_logger("RollingEnsemble").info(f"keys in group: {list(ensemble_dict.keys())}")
-        artifact_list = list(ensemble_dict.values())
-        artifact_list.sort(key=lambda x: x.index.get_level_values("datetime").min())
-        artifact = pd.concat(artifact_list)
-        # If there are duplicated predition, use the latest perdiction
-        artifact = artifact[~artifact.index.duplicated(keep="last")]
-        artifact = artifact.sort_index()
-        return artifact
+        fold = _SortedFold([(np.nan, None), (np.iinfo(np.int64).min, np.int64)])
+        is_series, name = False, None
+        for artifact in iter_loaded(ensemble_dict.values()):
+            is_series, name = isinstance(artifact, pd.Series), getattr(artifact, "name", None)
+            df = artifact.to_frame() if is_series else artifact
+            dtype = df.values.dtype if fold.empty else np.result_type(fold.arrays[0].dtype, df.values.dtype)
+            if dtype.kind in "iub":
+                # the missing values are filled with NaN
+                dtype = np.result_type(dtype, np.float64)
+            fold.fills[0] = (np.nan, dtype)
+            rows, pos = fold.align(df.index, df.columns)
+            if fold.arrays[0].dtype != dtype:
+                fold.arrays[0] = fold.arrays[0].astype(dtype)
+            values, starts = fold.arrays
+            # the start datetime of the artifact of each row; the later artifact wins if they are the same
+            start = np.datetime64(df.index.get_level_values("datetime").min(), "ns").astype(np.int64)
+            win = start >= starts[pos, 0]
+            values[pos[win]] = df.reindex(columns=fold.columns).values[rows[win]]
+            starts[pos[win]] = start
+        index, (values, _) = fold.result()
+        if is_series:
+            return pd.Series(values[:, 0], index=index, name=name)
+        return pd.DataFrame(values, index=index, columns=fold.columns)
 
 
 class AverageEnsemble(Ensemble):
     """
     Average and standardize a dict of same shape dataframe like `prediction` or `IC` into an ensemble.
 
-    NOTE: The values of dict must be pd.DataFrame, and have the index "datetime". If it is a nested dict, then flat it.
+    NOTE: The values of dict must be pd.DataFrame (or `LazyObject` of it), and have the index "datetime". If it is a nested dict, then flat it.
 
     When calling this class:
 
@@ -124,11 +271,18 @@ class AverageEnsemble(Ensemble):
         # need to flatten the nested dict
         ensemble_dict = flatten_dict(ensemble_dict, sep=FLATTEN_TUPLE)
         get_module_logger("AverageEnsemble").info(f"keys in group: {list(ensemble_dict.keys())}")
-        values = list(ensemble_dict.values())
         # NOTE: this may change the style underlying data!!!!
         # from pd.DataFrame to pd.Series
-        results = pd.concat(values, axis=1)
-        results = results.groupby("datetime").apply(lambda df: (df - df.mean()) / df.std())
-        results = results.mean(axis=1)
-        results = results.sort_index()
-        return results
+        # The artifacts are standardized on each datetime and folded into the running sums and counts one by one
+        fold = _SortedFold([(0.0, np.float64), (0, np.int64)])
+        for artifact in iter_loaded(ensemble_dict.values()):
+            df = artifact.to_frame() if isinstance(artifact, pd.Series) else artifact
+            group = df.groupby(level="datetime")
+            zscore = ((df - group.transform("mean")) / group.transform("std")).values
+            rows, pos = fold.align(df.index, pd.Index([0]))
+            valid = ~np.isnan(zscore[rows])
+            fold.arrays[0][pos, 0] += np.where(valid, zscore[rows], 0).sum(axis=1)
+            fold.arrays[1][pos, 0] += valid.sum(axis=1)
+        index, (total, count) = fold.result()
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return pd.Series(np.where(count[:, 0] > 0, total[:, 0] / count[:, 0], np.nan), index=index)
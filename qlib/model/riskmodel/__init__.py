@@ -1,15 +1,22 @@
 # Copyright (c) Microsoft Corporation.
 # Licensed under the MIT License.
 
+from .online import RunningCovariance
 from .base import RiskModel
 from .poet import POETCovEstimator
 from .shrink import ShrinkCovEstimator
 from .structured import StructuredCovEstimator
+from .store import RiskDataStore, RiskDataWriter, dump_risk_data, pack_risk_data
 
 
 __all__ = [
+    "RunningCovariance",
     "RiskModel",
     "POETCovEstimator",
     "ShrinkCovEstimator",
     "StructuredCovEstimator",
+    "RiskDataStore",
+    "RiskDataWriter",
+    "dump_risk_data",
+    "pack_risk_data",
 ]
@@ -4,9 +4,10 @@
 import inspect
 import numpy as np
 import pandas as pd
-from typing import Union
+from typing import Iterator, Optional, Tuple, Union
 
 from qlib.model.base import BaseModel
+from .online import RunningCovariance
 
 
 class RiskModel(BaseModel):
@@ -60,19 +61,7 @@ class RiskModel(BaseModel):
         ), "Can only return either correlation matrix or decomposed components."
 
         # transform input into 2D array
-        if not isinstance(X, (pd.Series, pd.DataFrame)):
-            columns = None
-        else:
-            if isinstance(X.index, pd.MultiIndex):
-                if isinstance(X, pd.DataFrame):
-                    X = X.iloc[:, 0].unstack(level="instrument")  # always use the first column
-                else:
-                    X = X.unstack(level="instrument")
-            else:
-                # X is 2D DataFrame
-                pass
-            columns = X.columns  # will be used to restore dataframe
-            X = X.values
+        X, _, columns = self._to_2d(X)
 
         # calculate pct_change
         if is_price:
@@ -97,6 +86,136 @@ class RiskModel(BaseModel):
         # estimate covariance
         S = self._predict(X)
 
+        return self._format_cov(S, columns, return_corr)
+
+    def rolling_predict(
+        self,
+        X: Union[pd.Series, pd.DataFrame, np.ndarray],
+        window: int,
+        halflife: Optional[float] = None,
+        return_corr: bool = False,
+        is_price: bool = True,
+        return_decomposed_components=False,
+        start_time=None,
+        end_time=None,
+    ) -> Iterator[Tuple[Union[pd.Timestamp, int], Union[pd.DataFrame, np.ndarray, tuple]]]:
+        """
+        Estimate the covariance of each date in a date range in one call.
+
+        The covariance of each date is estimated from the returns in the rolling window ending at the date, which is
+        the same as calling `predict` with the data in the window. If the estimator can estimate from the sample
+        covariance (e.g. the empirical covariance, the shrinkage with constant targets and the PCA structured
+        covariance), the sample covariance is maintained incrementally by `RunningCovariance` (O(N^2) for each date)
+        instead of being recomputed from the whole window (O(T * N^2)).
+
+        Args:
+            X (pd.Series, pd.DataFrame or np.ndarray): data of all the dates, with variables as columns and
+                observations as rows (the same format as `predict`).
+            window (int): the number of returns in the rolling window.
+            halflife (float): if it is given, the covariance is exponentially weighted by the halflife (in number of
+                observations) instead of equally weighted in the rolling window; `window` is then the minimum number
+                of observations before the first date. Only the estimators which can estimate from the sample
+                covariance support it.
+            return_corr (bool): whether return the correlation matrix.
+            is_price (bool): whether `X` contains price (if not assume stock returns).
+            return_decomposed_components (bool): whether return decomposed components of the covariance matrix.
+            start_time / end_time: the range of the dates to estimate (the data before `start_time` are used as
+                history). Positions of the rows are used if `X` is not a pandas object.
+
+        Returns:
+            Iterator of (date, result); the result is the same as the one of `predict`.
+        """
+        assert (
+            not return_corr or not return_decomposed_components
+        ), "Can only return either correlation matrix or decomposed components."
+        assert window >= 1, "`window` should be positive"
+        if return_decomposed_components:
+            assert (
+                "return_decomposed_components" in inspect.getfullargspec(self._predict).args
+            ), "This risk model does not support return decomposed components of the covariance matrix "
+
+        X, index, columns = self._to_2d(X)
+        X = X.astype(float)  # copy to avoid changing the input
+        if is_price:
+            X = X[1:] / X[:-1] - 1
+            index = index[1:]
+        if self.scale_return:
+            X *= 100
+        if start_time is None:
+            start = 0
+        elif isinstance(index, pd.Index):
+            start = index.searchsorted(pd.Timestamp(start_time))
+        else:
+            start = start_time
+        if end_time is None:
+            end = len(X)
+        elif isinstance(index, pd.Index):
+            end = index.searchsorted(pd.Timestamp(end_time), side="right")
+        else:
+            end = end_time + 1
+
+        online = self._can_predict_from_cov(return_decomposed_components)
+        if not online:
+            if halflife is not None:
+                raise ValueError(f"{self.__class__.__name__} doesn't support exponentially weighted covariance")
+            for i in range(max(start, window - 1), end):
+                # same as `predict` with the data in the window
+                R = self._preprocess(X[i - window + 1 : i + 1])
+                if return_decomposed_components:
+                    yield index[i], self._predict(R, return_decomposed_components=True)
+                else:
+                    yield index[i], self._format_cov(self._predict(R), columns, return_corr)
+            return
+
+        if self.nan_option == self.FILL_NAN:
+            X = np.nan_to_num(X)
+        running_cov = RunningCovariance(X.shape[1], masked=self.nan_option != self.FILL_NAN)
+        decay = None if halflife is None else 0.5 ** (1 / halflife)
+        # the rolling window or the exponentially weighted history can't start later than the first date
+        first = 0 if decay is not None else max(min(start, end) - window + 1, 0)
+        for i in range(first, end):
+            if decay is not None:
+                running_cov.decay(decay)
+            elif i - window >= first:
+                running_cov.remove(X[i - window])
+            running_cov.add(X[i])
+            if i < max(start, window - 1):
+                continue
+            S = running_cov.cov(assume_centered=self.assume_centered, propagate_nan=self.nan_option == self.IGNORE_NAN)
+            n_obs = min(i + 1, window) if decay is None else running_cov.n_obs
+            if return_decomposed_components:
+                yield index[i], self._predict_from_cov(S, n_obs, return_decomposed_components=True)
+            else:
+                yield index[i], self._format_cov(self._predict_from_cov(S, n_obs), columns, return_corr)
+
+    def _can_predict_from_cov(self, return_decomposed_components: bool = False) -> bool:
+        """whether the estimator can estimate from the sample covariance by `_predict_from_cov`"""
+        return type(self)._predict is RiskModel._predict and not return_decomposed_components
+
+    def _predict_from_cov(self, S: np.ndarray, n_obs: float, return_decomposed_components=False):
+        """estimate from the sample covariance `S` of `n_obs` observations instead of the data matrix
+
+        This method should be overridden by the child classes which can estimate from the sample covariance.
+        """
+        return S
+
+    @staticmethod
+    def _to_2d(X: Union[pd.Series, pd.DataFrame, np.ndarray]) -> Tuple[np.ndarray, Union[pd.Index, range], pd.Index]:
+        """transform input into 2D array; the index and the columns are returned to restore dataframe"""
+        if not isinstance(X, (pd.Series, pd.DataFrame)):
+            return X, range(len(X)), None
+        if isinstance(X.index, pd.MultiIndex):
+            if isinstance(X, pd.DataFrame):
+                X = X.iloc[:, 0].unstack(level="instrument")  # always use the first column
+            else:
+                X = X.unstack(level="instrument")
+        else:
+            # X is 2D DataFrame
+            pass
+        return X.values, X.index, X.columns
+
+    @staticmethod
+    def _format_cov(S: np.ndarray, columns: Optional[pd.Index], return_corr: bool) -> Union[pd.DataFrame, np.ndarray]:
         # return correlation if needed
         if return_corr:
             vola = np.sqrt(np.diag(S))
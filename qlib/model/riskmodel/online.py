@@ -0,0 +1,117 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+import numpy as np
+
+
+class RunningCovariance:
+    """Running Covariance
+
+    It maintains the running cross-products of the observations, so the covariance of a rolling window can be
+    updated by adding the newest observation and removing the oldest one in O(N^2) instead of recomputing it from
+    the whole window in O(T * N^2). The exponentially weighted covariance is supported by decaying the sums.
+
+    The following sums are maintained (`x` is the observation with NaN filled by 0 and `m` is its valid mask):
+        - `xx`: sum of x_i * x_j
+        - `xm`: sum of x_i * m_j (only the diagonal is needed if there is no missing value)
+        - `mm`: sum of m_i * m_j, i.e. the number (or the weight) of the observations of each pair
+        - `n_nan`: the number of missing values of each variable
+        - `n_valid`: the number of valid values of each variable (not weighted)
+
+    The covariance of each pair is calculated from the observations in which both variables are valid, and the
+    data are centered by the mean of all the valid observations of each variable, which is the same as
+    `RiskModel._predict` with `nan_option="mask"`.
+    """
+
+    def __init__(self, n_vars: int, masked: bool = True):
+        """
+        Args:
+            n_vars (int): the number of variables.
+            masked (bool): whether the pair-wise counts are maintained. If the observations contain no NaN
+                (e.g. NaN is filled in advance), `masked=False` saves the memory and time of two N x N matrices.
+        """
+        self.n_vars = n_vars
+        self.masked = masked
+        self.reset()
+
+    def reset(self):
+        n = self.n_vars
+        self.xx = np.zeros((n, n))
+        self.xm = np.zeros((n, n)) if self.masked else np.zeros(n)
+        self.mm = np.zeros((n, n)) if self.masked else 0.0
+        self.n_nan = np.zeros(n)
+        self.n_valid = np.zeros(n)
+        self.n_obs = 0.0
+
+    def update(self, x: np.ndarray, weight: float = 1.0):
+        """add an observation with weight; the observation added before is removed with `weight=-1`"""
+        mask = ~np.isnan(x)
+        v = np.where(mask, x, 0.0)
+        self.xx += weight * np.outer(v, v)
+        if self.masked:
+            m = mask.astype(float)
+            self.xm += weight * np.outer(v, m)
+            self.mm += weight * np.outer(m, m)
+        else:
+            assert mask.all(), "the observations contain NaN, please use `masked=True`"
+            self.xm += weight * v
+            self.mm += weight
+        self.n_nan += weight * ~mask
+        self.n_valid += np.sign(weight) * mask
+        self.n_obs += weight
+
+    def add(self, x: np.ndarray):
+        self.update(x, 1.0)
+
+    def remove(self, x: np.ndarray):
+        self.update(x, -1.0)
+
+    def decay(self, factor: float):
+        """multiply the weights of all the previous observations by `factor`"""
+        self.xx *= factor
+        self.xm *= factor
+        self.mm *= factor
+        self.n_nan *= factor
+        self.n_obs *= factor
+
+    def mean(self) -> np.ndarray:
+        """the mean of the valid observations of each variable"""
+        with np.errstate(divide="ignore", invalid="ignore"):
+            if self.masked:
+                return np.diag(self.xm) / np.diag(self.mm)
+            return self.xm / self.mm
+
+    def cov(self, assume_centered: bool = False, propagate_nan: bool = False) -> np.ndarray:
+        """
+        Args:
+            assume_centered (bool): whether the data is assumed to be centered.
+            propagate_nan (bool): the covariance is NaN if any of the pair has missing values
+                (the same as `nan_option="ignore"` in `RiskModel`).
+
+        Returns:
+            np.ndarray: covariance matrix.
+        """
+        S = self.xx.copy()
+        if not assume_centered:
+            mu = self.mean()
+            if self.masked:
+                # sum of (x_i - mu_i) * (x_j - mu_j) over the valid pairs
+                S -= self.xm * mu[None, :]
+                S -= self.xm.T * mu[:, None]
+                S += self.mm * np.outer(mu, mu)
+            else:
+                S -= self.mm * np.outer(mu, mu)
+            # the centered value of a single observation is exactly 0 (the sums may have tiny residuals instead)
+            single = self.n_valid == 1
+            S[single, :] = 0.0
+            S[:, single] = 0.0
+        with np.errstate(divide="ignore", invalid="ignore"):
+            S /= self.mm
+        # the pairs without observation (the sums may be tiny residuals instead of 0 after removing observations)
+        S[np.broadcast_to(self.mm <= 1e-8, S.shape)] = np.nan
+        if propagate_nan:
+            # NOTE: the decayed missing values are ignored once their weight is negligible
+            has_nan = self.n_nan > 1e-8
+            S[has_nan, :] = np.nan
+            S[:, has_nan] = np.nan
+        return S
@@ -102,6 +102,21 @@ class ShrinkCovEstimator(RiskModel):
 
         return S
 
+    def _can_predict_from_cov(self, return_decomposed_components: bool = False) -> bool:
+        # the Ledoit-Wolf parameters and the single factor target depend on the higher moments of the data
+        return (
+            not return_decomposed_components
+            and self.alpha != self.SHR_LW
+            and (not isinstance(self.target, str) or self.target in [self.TGT_CONST_VAR, self.TGT_CONST_CORR])
+        )
+
+    def _predict_from_cov(self, S: np.ndarray, n_obs: float, return_decomposed_components=False) -> np.ndarray:
+        F = self._get_shrink_target(None, S)
+        alpha = self._get_shrink_param_oas_by_shape(S, n_obs) if self.alpha == self.SHR_OAS else self.alpha
+        if alpha > 0:
+            S = (1 - alpha) * S + alpha * F
+        return S
+
     def _get_shrink_target(self, X: np.ndarray, S: np.ndarray) -> np.ndarray:
         """get shrinking target `F`"""
         if self.target == self.TGT_CONST_VAR:
@@ -174,10 +189,15 @@ class ShrinkCovEstimator(RiskModel):
             alpha = A / B
         where `n`, `p` are the dim of observations and variables respectively.
         """
+        return self._get_shrink_param_oas_by_shape(S, len(X))
+
+    @staticmethod
+    def _get_shrink_param_oas_by_shape(S: np.ndarray, n: float) -> float:
+        """the OAS parameter only depends on `S` and the number of observations `n`"""
         trS2 = np.sum(S**2)
         tr2S = np.trace(S) ** 2
 
-        n, p = X.shape
+        p = len(S)
 
         A = (1 - 2 / p) * (trS2 + tr2S)
         B = (n + 1 - 2 / p) * (trS2 + tr2S / p)
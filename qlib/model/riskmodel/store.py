@@ -0,0 +1,285 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+"""
+Packed risk data store
+
+The risk data of all the dates are packed into a few contiguous binary files, which can be read by mmap without
+parsing any text:
+
+.. code-block:: text
+
+    ├── /path/to/packed_riskdata
+    ├──── meta.json           # version and dtype
+    ├──── instruments.npy     # the shared stock code dictionary
+    ├──── calendar.npy        # the sorted dates
+    ├──── index.npy           # the offset table of each date (see `RiskDataWriter.INDEX_FIELDS`)
+    ├──── stock.bin           # int32, the codes of the universe of each date
+    ├──── factor_exp.bin      # float32, the factor exposures of each date (universe x factors)
+    ├──── factor_cov.bin      # float32, the factor covariance of each date (factors x factors)
+    ├──── specific_risk.bin   # float32, the specific risk (volatility) of each date
+    ├──── blacklist.bin       # int32, the codes of the blacklist of each date
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from ...data.cache import MemCacheLengthUnit
+from ...log import get_module_logger
+from ...utils import load_dataset
+
+RiskData = Tuple[np.ndarray, np.ndarray, np.ndarray, List[str], List[str]]
+
+
+class RiskDataWriter:
+    """write the risk data of each date into the packed format"""
+
+    VERSION = 1
+    META_NAME = "meta.json"
+    INSTRUMENTS_NAME = "instruments.npy"
+    CALENDAR_NAME = "calendar.npy"
+    INDEX_NAME = "index.npy"
+    # <file name, dtype>
+    DATA_FILES = {
+        "stock": np.int32,
+        "factor_exp": np.float32,
+        "factor_cov": np.float32,
+        "specific_risk": np.float32,
+        "blacklist": np.int32,
+    }
+    # offsets and lengths of each date in the data files
+    INDEX_FIELDS = ["stock_start", "n_stock", "factor_cov_start", "n_factor", "blacklist_start", "n_blacklist"]
+
+    def __init__(self, root: Union[str, Path]):
+        self.root = Path(root).expanduser()
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._files = {name: (self.root / f"{name}.bin").open("wb") for name in self.DATA_FILES}
+        self._code_ids = {}
+        self._dates = []
+        self._index = []
+        self._n_stock = 0
+        self._n_cov = 0
+        self._n_blacklist = 0
+
+    def _encode(self, codes: Iterable[str]) -> np.ndarray:
+        return np.array([self._code_ids.setdefault(code, len(self._code_ids)) for code in codes], dtype=np.int32)
+
+    def _write(self, name: str, data: np.ndarray):
+        self._files[name].write(np.ascontiguousarray(data, dtype=self.DATA_FILES[name]).tobytes())
+
+    def add(
+        self,
+        date: pd.Timestamp,
+        factor_exp: np.ndarray,
+        factor_cov: np.ndarray,
+        specific_risk: np.ndarray,
+        universe: List[str],
+        blacklist: Optional[List[str]] = None,
+    ):
+        """
+        Args:
+            date (pd.Timestamp): the date of the risk data.
+            factor_exp (np.ndarray): factor exposures (universe x factors).
+            factor_cov (np.ndarray): factor covariance (factors x factors).
+            specific_risk (np.ndarray): specific risk, i.e. the volatility (not variance) of the specific returns.
+            universe (List[str]): the stock codes of the rows of `factor_exp` and `specific_risk`.
+            blacklist (List[str]): the stocks to be sold.
+        """
+        factor_exp = np.asarray(factor_exp)
+        n_stock, n_factor = factor_exp.shape
+        assert factor_cov.shape == (n_factor, n_factor), "the shape of factor_cov doesn't match factor_exp"
+        assert len(specific_risk) == n_stock and len(universe) == n_stock, "the universe doesn't match factor_exp"
+        blacklist = [] if blacklist is None else list(blacklist)
+
+        self._write("stock", self._encode(universe))
+        self._write("factor_exp", factor_exp)
+        self._write("factor_cov", factor_cov)
+        self._write("specific_risk", specific_risk)
+        self._write("blacklist", self._encode(blacklist))
+        self._dates.append(pd.Timestamp(date))
+        self._index.append([self._n_stock, n_stock, self._n_cov, n_factor, self._n_blacklist, len(blacklist)])
+        self._n_stock += n_stock
+        self._n_cov += n_factor * n_factor
+        self._n_blacklist += len(blacklist)
+
+    def add_structured(
+        self,
+        date: pd.Timestamp,
+        F: np.ndarray,
+        cov_b: np.ndarray,
+        var_u: np.ndarray,
+        universe: List[str],
+        blacklist: Optional[List[str]] = None,
+    ):
+        """add the decomposed components of `StructuredCovEstimator`; the specific variance is saved as volatility"""
+        self.add(date, F, cov_b, np.sqrt(var_u), universe, blacklist)
+
+    def close(self):
+        for f in self._files.values():
+            f.close()
+        dates = pd.DatetimeIndex(self._dates)
+        assert dates.is_unique, "the dates of the risk data are duplicated"
+        order = np.argsort(dates.values)
+        np.save(self.root / self.CALENDAR_NAME, dates.values[order])
+        np.save(self.root / self.INDEX_NAME, np.array(self._index, dtype=np.int64).reshape(-1, 6)[order])
+        instruments = np.empty(len(self._code_ids), dtype=object)
+        for code, i in self._code_ids.items():
+            instruments[i] = code
+        np.save(self.root / self.INSTRUMENTS_NAME, instruments.astype(str))
+        # meta is written at last to indicate the store is complete
+        with (self.root / self.META_NAME).open("w") as f:
+            json.dump({"version": self.VERSION}, f)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class RiskDataStore:
+    """
+    read the packed risk data by mmap
+
+    The data of each date is decoded on demand and only the data of the most recently used `cache_size` dates are
+    kept in memory.
+    """
+
+    def __init__(self, root: Union[str, Path], cache_size: int = 64):
+        self.root = Path(root).expanduser()
+        if not self.is_packed(self.root):
+            raise ValueError(f"{self.root} is not a packed risk data store")
+        self.instruments = np.load(self.root / RiskDataWriter.INSTRUMENTS_NAME)
+        self.calendar = pd.DatetimeIndex(np.load(self.root / RiskDataWriter.CALENDAR_NAME))
+        self.index = np.load(self.root / RiskDataWriter.INDEX_NAME)
+        self.data = {}
+        for name, dtype in RiskDataWriter.DATA_FILES.items():
+            path = self.root / f"{name}.bin"
+            # mmap can't map an empty file
+            self.data[name] = np.memmap(path, dtype=dtype, mode="r") if path.stat().st_size > 0 else np.empty(0, dtype)
+        self._cache = MemCacheLengthUnit(size_limit=cache_size)
+
+    @staticmethod
+    def is_packed(root: Union[str, Path]) -> bool:
+        return (Path(root).expanduser() / RiskDataWriter.META_NAME).exists()
+
+    def __contains__(self, date) -> bool:
+        i = self.calendar.searchsorted(pd.Timestamp(date))
+        return i < len(self.calendar) and self.calendar[i] == pd.Timestamp(date)
+
+    def get(self, date) -> Optional[RiskData]:
+        """
+        Returns:
+            None if there is no risk data of the date, otherwise
+            (factor_exp, factor_cov, specific_risk, universe, blacklist), which is the same as
+            `EnhancedIndexingStrategy.get_risk_data`.
+        """
+        date = pd.Timestamp(date)
+        if date in self._cache:
+            return self._cache[date]
+        if date not in self:
+            return None
+        stock_start, n_stock, cov_start, n_factor, bl_start, n_bl = self.index[self.calendar.get_loc(date)]
+        stock = self.data["stock"][stock_start : stock_start + n_stock]
+        factor_exp = self.data["factor_exp"][stock_start * n_factor : (stock_start + n_stock) * n_factor]
+        factor_cov = self.data["factor_cov"][cov_start : cov_start + n_factor * n_factor]
+        # copy into plain arrays so that the cached data doesn't hold the mmap
+        res = (
+            np.array(factor_exp, dtype=np.float64).reshape(n_stock, n_factor),
+            np.array(factor_cov, dtype=np.float64).reshape(n_factor, n_factor),
+            np.array(self.data["specific_risk"][stock_start : stock_start + n_stock], dtype=np.float64),
+            self.instruments[stock].tolist(),
+            self.instruments[self.data["blacklist"][bl_start : bl_start + n_bl]].tolist(),
+        )
+        self._cache[date] = res
+        return res
+
+
+def dump_risk_data(
+    root: Union[str, Path],
+    estimator,
+    X: pd.DataFrame,
+    window: int,
+    universe: Optional[pd.Series] = None,
+    is_price: bool = True,
+    start_time=None,
+    end_time=None,
+):
+    """
+    estimate the risk data of each date by a structured covariance estimator (e.g. `StructuredCovEstimator`) and
+    write them into the packed format
+
+    Args:
+        root (str or Path): the root of the packed risk data.
+        estimator (StructuredCovEstimator): the risk model which supports `return_decomposed_components`.
+        X (pd.DataFrame): the prices (or returns if `is_price=False`) of all the dates (dates x instruments).
+        window (int): the rolling window, see `RiskModel.rolling_predict`.
+        universe (pd.Series): the universe of each date (index: dates, values: list of instruments).
+            If it is given, the covariance of each date is estimated from the instruments in the universe,
+            otherwise all the columns of `X` are used.
+    """
+    logger = get_module_logger("dump_risk_data")
+    with RiskDataWriter(root) as writer:
+        if universe is None:
+            codes = X.columns.tolist()
+            for date, (F, cov_b, var_u) in estimator.rolling_predict(
+                X,
+                window=window,
+                is_price=is_price,
+                return_decomposed_components=True,
+                start_time=start_time,
+                end_time=end_time,
+            ):
+                writer.add_structured(date, F, cov_b, var_u, codes)
+            return
+        for date, codes in universe.loc[start_time:end_time].items():
+            i = X.index.get_loc(date)
+            if i < window + int(is_price) - 1:
+                logger.warning(f"not enough history for {date}, skip it")
+                continue
+            codes = list(codes)
+            F, cov_b, var_u = estimator.predict(
+                X.iloc[i - window - int(is_price) + 1 : i + 1][codes],
+                is_price=is_price,
+                return_decomposed_components=True,
+            )
+            writer.add_structured(date, F, cov_b, var_u, codes)
+
+
+def pack_risk_data(
+    riskmodel_root: Union[str, Path],
+    packed_root: Union[str, Path],
+    factor_exp_name: str = "factor_exp.pkl",
+    factor_cov_name: str = "factor_cov.pkl",
+    specific_risk_name: str = "specific_risk.pkl",
+    blacklist_name: str = "blacklist.pkl",
+):
+    """
+    convert the risk data in the per-date directories of `EnhancedIndexingStrategy` into the packed format
+    """
+    riskmodel_root = Path(riskmodel_root).expanduser()
+    with RiskDataWriter(packed_root) as writer:
+        for date_dir in sorted(riskmodel_root.iterdir()):
+            if not date_dir.is_dir():
+                continue
+            factor_exp = load_dataset(str(date_dir / factor_exp_name), index_col=[0])
+            factor_cov = load_dataset(str(date_dir / factor_cov_name), index_col=[0])
+            specific_risk = load_dataset(str(date_dir / specific_risk_name), index_col=[0])
+            if not factor_exp.index.equals(specific_risk.index):
+                # NOTE: for stocks missing specific_risk, we always assume it has the highest volatility
+                specific_risk = specific_risk.reindex(factor_exp.index, fill_value=specific_risk.max())
+            blacklist = []
+            if os.path.exists(date_dir / blacklist_name):
+                blacklist = load_dataset(str(date_dir / blacklist_name)).index.tolist()
+            writer.add(
+                pd.Timestamp(date_dir.name),
+                factor_exp.values,
+                np.asarray(factor_cov.values),
+                np.asarray(specific_risk.values).reshape(-1),
+                factor_exp.index.tolist(),
+                blacklist,
+            )
@@ -3,6 +3,8 @@
 
 import numpy as np
 from typing import Union
+from scipy.linalg import eigh
+from scipy.sparse.linalg import eigsh
 from sklearn.decomposition import PCA, FactorAnalysis
 
 from qlib.model.riskmodel import RiskModel
@@ -92,3 +94,34 @@ class StructuredCovEstimator(RiskModel):
         cov_x = F @ cov_b @ F.T + np.diag(var_u)
 
         return cov_x
+
+    def _can_predict_from_cov(self, return_decomposed_components: bool = False) -> bool:
+        # PCA only depends on the covariance of the centered data
+        return self.solver is PCA and not self.assume_centered
+
+    def _predict_from_cov(self, S: np.ndarray, n_obs: float, return_decomposed_components=False):
+        """
+        The PCA structured covariance from the sample covariance `S` (normalized by `n_obs`):
+            - the factor exposures `F` are the eigenvectors of `S` with the largest eigenvalues
+            - cov_b = diag(eigenvalues) * n_obs / (n_obs - 1), like `np.cov(B.T)`
+            - var_u = diag(S) - diag(F @ diag(eigenvalues) @ F.T), like `np.var(U, axis=0)`
+        """
+        p = len(S)
+        k = self.num_factors
+        # only the largest `k` eigenvalues are needed
+        if k >= p:
+            eigval, eigvec = np.linalg.eigh(S)
+        elif p > 1000:
+            eigval, eigvec = eigsh(S, k=k, which="LA")
+        else:
+            eigval, eigvec = eigh(S, subset_by_index=[p - k, p - 1])
+        order = np.argsort(eigval)[::-1][:k]
+        eigval, F = eigval[order], eigvec[:, order]
+
+        cov_b = np.diag(eigval) * n_obs / (n_obs - 1)
+        var_u = np.diag(S) - (F**2) @ eigval
+
+        if return_decomposed_components:
+            return F, cov_b, var_u
+
+        return F @ cov_b @ F.T + np.diag(var_u)
@@ -11,13 +11,22 @@ In ``DelayTrainer``, the first step is only to save some necessary info to model
 ``Qlib`` offer two kinds of Trainer, ``TrainerR`` is the simplest way and ``TrainerRM`` is based on TaskManager to help manager tasks lifecycle automatically.
 """
 
+import copy
+import multiprocessing
+import os
 import socket
-from typing import Callable, List, Optional
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Dict, List, Optional
 
+import pandas as pd
+from threadpoolctl import threadpool_limits
 from tqdm.auto import tqdm
 
-from qlib.config import C
+from qlib.config import C, NUM_USABLE_CPU
 from qlib.data.dataset import Dataset
+from qlib.data.dataset.handler import DataHandler
+from qlib.data.dataset.rolling import RollingDataHandlerLP
 from qlib.data.dataset.weight import Reweighter
 from qlib.log import get_module_logger
 from qlib.model.base import Model
@@ -25,6 +34,8 @@ from qlib.utils import (
     auto_filter_kwargs,
     fill_placeholder,
     flatten_dict,
+    get_callable_kwargs,
+    hash_args,
     init_instance_by_config,
 )
 from qlib.utils.paral import call_in_subproc
@@ -336,6 +347,222 @@ class DelayTrainerR(TrainerR):
         return models
 
 
+def shared_task_train(
+    task_config: dict, experiment_name: str, recorder_name: str = None, handler: Optional[DataHandler] = None
+) -> Recorder:
+    """
+    The same as `task_train`, but the dataset is created on the given handler (e.g. shared by many tasks) instead of
+    initializing the handler from the config. The original config is still logged to the recorder.
+
+    Args:
+        task_config (dict): the config of a task
+        experiment_name (str): the name of experiment
+        recorder_name (str): the name of recorder
+        handler (DataHandler): the handler to create the dataset; None for using the config
+
+    Returns:
+        Recorder: the model recorder
+    """
+    with R.start(experiment_name=experiment_name, recorder_name=recorder_name):
+        _log_task_info(task_config)
+        if handler is not None:
+            dataset_config = task_config["dataset"]
+            dataset_config = {**dataset_config, "kwargs": {**dataset_config["kwargs"], "handler": handler}}
+            task_config = {**task_config, "dataset": dataset_config}
+        _exe_task(task_config)
+        return R.get_recorder()
+
+
+# handler key -> the handler shared by the tasks
+# NOTE: the forked worker processes inherit them without copying the data
+_SHARED_HANDLERS: Dict[str, DataHandler] = {}
+
+
+def _get_handler_key(task: dict) -> Optional[str]:
+    """the tasks whose handler configs are the same except the time range can share the same handler"""
+    try:
+        handler = task["dataset"]["kwargs"]["handler"]
+    except (KeyError, TypeError):
+        return None
+    if not isinstance(handler, dict):
+        return None
+    handler = copy.deepcopy(handler)
+    kwargs = handler.get("kwargs", {})
+    kwargs.pop("start_time", None)
+    kwargs.pop("end_time", None)
+    if _is_rolling_handler(handler):
+        # the rolling handler is rolled to the fitting range of each task
+        handler = _drop_fit_time(handler)
+    return hash_args(handler)
+
+
+def _is_rolling_handler(handler: dict) -> bool:
+    try:
+        klass, _ = get_callable_kwargs(handler, default_module="qlib.contrib.data.handler")
+    except (AttributeError, ModuleNotFoundError, ValueError):
+        return False
+    return isinstance(klass, type) and issubclass(klass, RollingDataHandlerLP)
+
+
+def _drop_fit_time(config):
+    """drop the fitting range of the handler and its processors"""
+    if isinstance(config, dict):
+        return {k: _drop_fit_time(v) for k, v in config.items() if k not in ("fit_start_time", "fit_end_time")}
+    if isinstance(config, (list, tuple)):
+        return [_drop_fit_time(v) for v in config]
+    return config
+
+
+def _get_union_handler_config(tasks: List[dict]) -> dict:
+    """the handler config covering the time ranges of all the tasks"""
+    configs = [task["dataset"]["kwargs"]["handler"].get("kwargs", {}) for task in tasks]
+    starts = [config.get("start_time") for config in configs]
+    ends = [config.get("end_time") for config in configs]
+    handler = copy.deepcopy(tasks[0]["dataset"]["kwargs"]["handler"])
+    handler.setdefault("kwargs", {})
+    handler["kwargs"]["start_time"] = None if None in starts else min(pd.Timestamp(t) for t in starts)
+    handler["kwargs"]["end_time"] = None if None in ends else max(pd.Timestamp(t) for t in ends)
+    return handler
+
+
+def _init_worker(n_threads: int, qlib_config=None, handlers: Optional[Dict[str, DataHandler]] = None):
+    # the libraries initialized later (e.g. torch) read the environment variables
+    for name in ["OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"]:
+        os.environ[name] = str(n_threads)
+    if "torch" in sys.modules:
+        sys.modules["torch"].set_num_threads(n_threads)
+    if qlib_config is not None:
+        C.register_from_C(qlib_config)
+    if handlers is not None:
+        _SHARED_HANDLERS.update(handlers)
+
+
+def _train_shared(
+    task: dict, experiment_name: str, recorder_name: Optional[str], handler_key: Optional[str], n_threads: int
+) -> Recorder:
+    handler = _SHARED_HANDLERS.get(handler_key)
+    if isinstance(handler, RollingDataHandlerLP):
+        kwargs = fill_placeholder(copy.deepcopy(task), {})["dataset"]["kwargs"]["handler"].get("kwargs", {})
+        handler.roll(kwargs.get("fit_start_time"), kwargs.get("fit_end_time"))
+    with threadpool_limits(limits=n_threads):
+        return shared_task_train(task, experiment_name, recorder_name, handler=handler)
+
+
+class ParallelTrainerR(TrainerR):
+    """
+    A parallel implementation based on TrainerR, which is designed for the tasks generated by `RollingGen`.
+
+    - The tasks whose handler configs are the same except the time range share one handler, whose data are loaded
+      only once on the union of the time ranges; each task slices its segments from it.
+      NOTE: it assumes the processed data of a date don't depend on the time range of the handler, which is true for
+      the builtin processors (the learnable processors are fitted on `fit_start_time` ~ `fit_end_time`).
+      If the handler is a `RollingDataHandlerLP`, the tasks with different fitting ranges share it too, and it is
+      rolled to the fitting range (`fit_start_time` and `fit_end_time` of the handler) of each task.
+    - The tasks are trained in a process pool. The worker processes are forked by default, so the shared handlers
+      are inherited without copying the data. The number of threads of each task is limited so that the libraries
+      like LightGBM and torch don't oversubscribe the CPUs.
+    - Each recorder is finished (i.e. committed) as soon as its task is finished.
+    """
+
+    def __init__(
+        self,
+        experiment_name: Optional[str] = None,
+        max_workers: Optional[int] = None,
+        n_threads: int = 1,
+        share_data: bool = True,
+        mp_context: Optional[str] = None,
+        default_rec_name: Optional[str] = None,
+    ):
+        """
+        Init ParallelTrainerR.
+
+        Args:
+            experiment_name (str, optional): the default name of experiment.
+            max_workers (int, optional): the max number of tasks trained concurrently.
+                None for `NUM_USABLE_CPU // n_threads`. The tasks are trained in the current process if it is 1.
+            n_threads (int): the max number of threads of each task.
+            share_data (bool): whether to share the handler among the tasks.
+            mp_context (str, optional): the start method of the worker processes. None for `fork` if it is available.
+            default_rec_name (str, optional): the name of recorders.
+        """
+        super().__init__(
+            experiment_name=experiment_name, train_func=shared_task_train, default_rec_name=default_rec_name
+        )
+        assert n_threads >= 1, "`n_threads` should be positive"
+        self.n_threads = n_threads
+        self.max_workers = max_workers if max_workers is not None else max(NUM_USABLE_CPU // n_threads, 1)
+        self.share_data = share_data
+        if mp_context is None:
+            mp_context = "fork" if "fork" in multiprocessing.get_all_start_methods() else None
+        self.mp_context = mp_context
+
+    def _load_shared_handlers(self, tasks: List[dict]) -> List[Optional[str]]:
+        if not self.share_data:
+            return [None] * len(tasks)
+        # the placeholders like "<dataset.kwargs.segments.train.0>" (e.g. `fit_start_time`) differ among the tasks
+        tasks = [fill_placeholder(copy.deepcopy(task), {}) for task in tasks]
+        keys = [_get_handler_key(task) for task in tasks]
+        groups = {}
+        for key, task in zip(keys, tasks):
+            if key is not None:
+                groups.setdefault(key, []).append(task)
+        logger = get_module_logger("ParallelTrainerR")
+        for key, group in groups.items():
+            handler_config = _get_union_handler_config(group)
+            logger.info(f"loading the handler shared by {len(group)} tasks: {handler_config['kwargs']}")
+            _SHARED_HANDLERS[key] = init_instance_by_config(handler_config, accept_types=DataHandler)
+        return keys
+
+    def train(self, tasks: list, experiment_name: str = None, **kwargs) -> List[Recorder]:
+        """
+        Given a list of `tasks` and return a list of trained Recorder. The order can be guaranteed.
+
+        Args:
+            tasks (list): a list of definitions based on `task` dict
+            experiment_name (str): the experiment name, None for use default name.
+
+        Returns:
+            List[Recorder]: a list of Recorders
+        """
+        if isinstance(tasks, dict):
+            tasks = [tasks]
+        if len(tasks) == 0:
+            return []
+        if experiment_name is None:
+            experiment_name = self.experiment_name
+        try:
+            keys = self._load_shared_handlers(tasks)
+            args = [
+                (task, experiment_name, self.default_rec_name, key, self.n_threads) for task, key in zip(tasks, keys)
+            ]
+            recs = [None] * len(tasks)
+            max_workers = min(self.max_workers, len(tasks))
+            if max_workers == 1:
+                for i, arg in enumerate(tqdm(args, desc="train tasks")):
+                    recs[i] = _train_shared(*arg)
+                    recs[i].set_tags(**{self.STATUS_KEY: self.STATUS_BEGIN})
+                return recs
+
+            # create the experiment in advance, otherwise the workers may create it concurrently
+            R.get_exp(experiment_name=experiment_name, create=True)
+            ctx = multiprocessing.get_context(self.mp_context)
+            initargs = (self.n_threads,)
+            if ctx.get_start_method() != "fork":
+                # the handlers are pickled to the worker processes with their data
+                for handler in _SHARED_HANDLERS.values():
+                    handler.config(dump_all=True, recursive=True)
+                initargs = (self.n_threads, C, dict(_SHARED_HANDLERS))
+            with ProcessPoolExecutor(max_workers, mp_context=ctx, initializer=_init_worker, initargs=initargs) as pool:
+                futures = {pool.submit(_train_shared, *arg): i for i, arg in enumerate(args)}
+                for future in tqdm(as_completed(futures), total=len(futures), desc="train tasks"):
+                    rec = future.result()
+                    rec.set_tags(**{self.STATUS_KEY: self.STATUS_BEGIN})
+                    recs[futures[future]] = rec
+            return recs
+        finally:
+            _SHARED_HANDLERS.clear()
+
+
 class TrainerRM(Trainer):
     """
     Trainer based on (R)ecorder and Task(M)anager.
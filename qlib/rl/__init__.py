@@ -3,6 +3,14 @@
 
 from .interpreter import Interpreter, StateInterpreter, ActionInterpreter
 from .reward import Reward, RewardCombination
-from .simulator import Simulator
+from .simulator import BatchSimulator, Simulator
 
-__all__ = ["Interpreter", "StateInterpreter", "ActionInterpreter", "Reward", "RewardCombination", "Simulator"]
+__all__ = [
+    "Interpreter",
+    "StateInterpreter",
+    "ActionInterpreter",
+    "Reward",
+    "RewardCombination",
+    "Simulator",
+    "BatchSimulator",
+]
@@ -4,11 +4,13 @@ from __future__ import annotations
 
 import argparse
 import copy
+import multiprocessing
 import os
 import pickle
+import time
 from collections import defaultdict
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple, Union, cast
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union, cast
 
 import numpy as np
 import pandas as pd
@@ -19,11 +21,31 @@ from qlib.backtest import INDICATOR_METRIC, collect_data_loop, get_strategy_exec
 from qlib.backtest.decision import BaseTradeDecision, Order, OrderDir, TradeRangeByTime
 from qlib.backtest.executor import SimulatorExecutor
 from qlib.backtest.high_performance_ds import BaseOrderIndicator
+from qlib.log import get_module_logger
 from qlib.rl.contrib.naive_config_parser import get_backtest_config_fromfile
 from qlib.rl.contrib.utils import read_order_file
 from qlib.rl.data.integration import init_qlib
+from qlib.rl.interpreter import ActionInterpreter, StateInterpreter
 from qlib.rl.order_execution.simulator_qlib import SingleAssetOrderExecution
+from qlib.rl.order_execution.strategy import init_policy
 from qlib.typehint import Literal
+from qlib.utils import init_instance_by_config
+
+_logger = get_module_logger(__name__)
+
+# The part of data (stock / date) loaded by the latest ``_init_qlib_part`` of this process.
+_loaded_part: Optional[Tuple[str, str]] = None
+
+
+def _init_qlib_part(qlib_config: dict, part: str) -> None:
+    """``init_qlib`` which is skipped when the same part is already loaded in this process,
+    e.g., when a worker runs the shards of the same stock one after another."""
+    global _loaded_part  # pylint: disable=W0603
+
+    key = (repr(qlib_config), str(part))
+    if _loaded_part != key:
+        init_qlib(qlib_config, part=str(part))
+        _loaded_part = key
 
 
 def _get_multi_level_executor_config(
@@ -156,10 +178,10 @@ def single_with_simulator(
     """
     if split == "stock":
         stock_id = orders.iloc[0].instrument
-        init_qlib(backtest_config["qlib"], part=stock_id)
+        _init_qlib_part(backtest_config["qlib"], part=stock_id)
     else:
         day = orders.iloc[0].datetime
-        init_qlib(backtest_config["qlib"], part=day)
+        _init_qlib_part(backtest_config["qlib"], part=day)
 
     stocks = orders.instrument.unique().tolist()
 
@@ -255,10 +277,10 @@ def single_with_collect_data_loop(
 
     if split == "stock":
         stock_id = orders.iloc[0].instrument
-        init_qlib(backtest_config["qlib"], part=stock_id)
+        _init_qlib_part(backtest_config["qlib"], part=stock_id)
     else:
         day = orders.iloc[0].datetime
-        init_qlib(backtest_config["qlib"], part=day)
+        _init_qlib_part(backtest_config["qlib"], part=day)
 
     trade_start_time = orders["datetime"].min()
     trade_end_time = orders["datetime"].max()
@@ -361,6 +383,236 @@ def backtest(backtest_config: dict, with_simulator: bool = False) -> pd.DataFram
     return res
 
 
+def _warm_up_strategy_config(strategy_config: dict) -> dict:
+    """Create the interpreters and the policies of the RL strategies (e.g., ``SAOEIntStrategy``) in the config,
+    so that they are created (and their weights / data providers are loaded) once per worker,
+    rather than once per backtest."""
+    ret = {}
+    for freq, config in strategy_config.items():
+        kwargs = config.get("kwargs", {})
+        if all(key in kwargs for key in ["policy", "state_interpreter", "action_interpreter"]):
+            config = copy.deepcopy(config)
+            kwargs = config["kwargs"]
+            kwargs["state_interpreter"] = init_instance_by_config(
+                kwargs["state_interpreter"], accept_types=StateInterpreter
+            )
+            kwargs["action_interpreter"] = init_instance_by_config(
+                kwargs["action_interpreter"], accept_types=ActionInterpreter
+            )
+            kwargs["policy"] = init_policy(
+                kwargs["policy"], kwargs["state_interpreter"], kwargs["action_interpreter"], kwargs.pop("network", None)
+            )
+        ret[freq] = config
+    return ret
+
+
+def partition_orders(order_df: pd.DataFrame, orders_per_shard: int) -> List[Tuple[str, pd.DataFrame]]:
+    """Partition the orders into shards. Each shard has the orders of one stock in a range of dates,
+    because the data are loaded by stock. The orders of a stock in a day are never split into different shards.
+
+    Parameters
+    ----------
+    order_df
+        Orders, in the format of :func:`~qlib.rl.contrib.utils.read_order_file`.
+    orders_per_shard
+        Number of orders in a shard. Shards are cut at the first day that reaches this size.
+
+    Returns
+    -------
+        Names and orders of the shards. The names are unique, and stay the same for the same orders and
+        ``orders_per_shard``, so that they can be used to resume the backtest.
+    """
+    order_df = order_df.sort_values(["instrument", "datetime"], kind="stable")
+    dates = pd.to_datetime(order_df["datetime"]).dt.strftime("%Y%m%d")
+
+    shards = []
+    for stock_id, stock_orders in order_df.groupby("instrument", sort=False):
+        stock_dates = dates.loc[stock_orders.index]
+        # cut at day boundaries
+        day_ends = np.flatnonzero(stock_dates.to_numpy()[1:] != stock_dates.to_numpy()[:-1]) + 1
+        day_ends = np.append(day_ends, len(stock_orders))
+        start = 0
+        for end in day_ends:
+            if end - start >= orders_per_shard or end == len(stock_orders):
+                name = f"{stock_id}_{stock_dates.iloc[start]}_{stock_dates.iloc[end - 1]}"
+                shards.append((name, stock_orders.iloc[start:end]))
+                start = end
+    return shards
+
+
+# Config of the backtest in the worker process, with the RL strategies created
+_worker_config: Optional[dict] = None
+
+
+def _init_shard_worker(backtest_config: dict) -> None:
+    global _worker_config  # pylint: disable=W0603
+
+    torch.set_num_threads(1)  # https://github.com/pytorch/pytorch/issues/17199
+    _worker_config = copy.copy(backtest_config)
+    _worker_config["strategies"] = _warm_up_strategy_config(backtest_config["strategies"])
+
+
+def _shard_path(shard_dir: Path, name: str, shard_format: str) -> Path:
+    return shard_dir / f"{name}.{shard_format}"
+
+
+def _write_atomic(path: Path, write_fn: Any) -> None:
+    """Write a file with ``write_fn(path)``, so that the file either doesn't exist or is complete."""
+    tmp_path = path.with_name(path.name + ".tmp")
+    write_fn(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def _run_shard(
+    name: str,
+    orders: pd.DataFrame,
+    shard_dir: Path,
+    shard_format: Literal["csv", "parquet"],
+    with_simulator: bool,
+    cash_limit: Optional[float],
+    generate_report: bool,
+) -> Tuple[str, int]:
+    assert _worker_config is not None, "The worker is not initialized."
+
+    single = single_with_simulator if with_simulator else single_with_collect_data_loop
+    res = single(
+        backtest_config=_worker_config,
+        orders=orders,
+        split="stock",
+        cash_limit=cash_limit,
+        generate_report=generate_report,
+    )
+    if generate_report:
+        records, report = cast(Tuple[pd.DataFrame, dict], res)
+
+        def _dump_report(path: Path) -> None:
+            with path.open("wb") as f:
+                pickle.dump(report, f)
+
+        _write_atomic(shard_dir / f"{name}.report.pkl", _dump_report)
+    else:
+        records = cast(pd.DataFrame, res)
+
+    if records is None:
+        records = pd.DataFrame(index=pd.MultiIndex.from_tuples([], names=["instrument", "datetime"]))
+    # the records are written at last, which marks the shard as done
+    if shard_format == "parquet":
+        _write_atomic(_shard_path(shard_dir, name, shard_format), records.to_parquet)
+    else:
+        _write_atomic(_shard_path(shard_dir, name, shard_format), records.to_csv)
+    return name, len(orders)
+
+
+def _run_shard_star(args: tuple) -> Tuple[str, int]:
+    return _run_shard(*args)
+
+
+def _read_shard(shard_dir: Path, name: str, shard_format: str) -> pd.DataFrame:
+    path = _shard_path(shard_dir, name, shard_format)
+    if shard_format == "parquet":
+        return pd.read_parquet(path)
+    return pd.read_csv(path, index_col=["instrument", "datetime"])
+
+
+def _merge_reports(reports: List[dict]) -> dict:
+    """Merge the reports of the shards. The reports of the shards of the same stock are concatenated."""
+    merged: Dict[str, Dict[str, Tuple[pd.DataFrame, pd.DataFrame]]] = {}
+    for report in reports:
+        for stock_id, stock_report in report.items():
+            if stock_id not in merged:
+                merged[stock_id] = stock_report
+                continue
+            for freq, (indicator, his) in stock_report.items():
+                last_indicator, last_his = merged[stock_id][freq]
+                merged[stock_id][freq] = (pd.concat([last_indicator, indicator]), pd.concat([last_his, his]))
+    return merged
+
+
+def sharded_backtest(
+    backtest_config: dict,
+    with_simulator: bool = False,
+    orders_per_shard: int = 1000,
+    shard_format: Literal["csv", "parquet"] = "csv",
+) -> pd.DataFrame:
+    """Backtest a large number of orders in shards, which can be resumed after interruption.
+
+    The orders are partitioned into shards with :func:`partition_orders`. There is a worker process per
+    ``concurrency``, which creates the RL strategies (policies, interpreters and their data providers) once,
+    and runs the shards one by one. The records of each shard are written into ``output_dir/shards``
+    once the shard is done. The shards that are already done are skipped when the backtest is run again.
+    At last, the records are merged into ``output_dir/summary.csv``, as :func:`backtest` does.
+
+    Parameters
+    ----------
+    backtest_config
+        Backtest config, the same as that of :func:`backtest`.
+    with_simulator
+        Whether to use the simulator as the backend.
+    orders_per_shard
+        Number of orders in a shard.
+    shard_format
+        The file format of the records of shards. ``"parquet"`` requires ``pyarrow`` or ``fastparquet``.
+
+    Returns
+    -------
+        The execution records of all the orders.
+    """
+    order_df = read_order_file(backtest_config["order_file"])
+
+    backtest_config = copy.copy(backtest_config)
+    backtest_config["exchange"] = copy.copy(backtest_config["exchange"])
+    cash_limit = backtest_config["exchange"].pop("cash_limit")
+    generate_report = backtest_config.pop("generate_report")
+
+    output_path = Path(backtest_config["output_dir"])
+    shard_dir = output_path / "shards"
+    shard_dir.mkdir(parents=True, exist_ok=True)
+
+    shards = partition_orders(order_df, orders_per_shard)
+    todo = [(name, orders) for name, orders in shards if not _shard_path(shard_dir, name, shard_format).exists()]
+    _logger.info(
+        f"{len(order_df)} orders in {len(shards)} shards. {len(shards) - len(todo)} shards are done before. "
+        f"Running {len(todo)} shards."
+    )
+
+    args = [
+        (name, orders, shard_dir, shard_format, with_simulator, cash_limit, generate_report) for name, orders in todo
+    ]
+    start_time = time.time()
+    n_done_orders = 0
+    n_todo_orders = sum(len(orders) for _, orders in todo)
+
+    def _run_all() -> Iterator[Tuple[str, int]]:
+        if backtest_config["concurrency"] <= 1:
+            _init_shard_worker(backtest_config)
+            for arg in args:
+                yield _run_shard(*arg)
+        else:
+            with multiprocessing.Pool(
+                backtest_config["concurrency"], initializer=_init_shard_worker, initargs=(backtest_config,)
+            ) as pool:
+                yield from pool.imap_unordered(_run_shard_star, args, chunksize=1)
+
+    for name, n_orders in _run_all():
+        n_done_orders += n_orders
+        elapsed = time.time() - start_time
+        _logger.info(
+            f"Shard {name} is done. {n_done_orders}/{n_todo_orders} orders, {n_done_orders / elapsed:.2f} orders/sec."
+        )
+
+    res = pd.concat([_read_shard(shard_dir, name, shard_format) for name, _ in shards])
+    if generate_report:
+        reports = []
+        for name, _ in shards:
+            with (shard_dir / f"{name}.report.pkl").open("rb") as f:
+                reports.append(pickle.load(f))
+        with (output_path / "report.pkl").open("wb") as f:
+            pickle.dump(_merge_reports(reports), f)
+
+    res.to_csv(output_path / "summary.csv")
+    return res
+
+
 if __name__ == "__main__":
     import warnings
 
@@ -376,13 +628,30 @@ if __name__ == "__main__":
         required=False,
         help="The number of jobs for running backtest parallely(1 for single process)",
     )
+    parser.add_argument(
+        "--orders_per_shard",
+        type=int,
+        required=False,
+        help="Run the backtest in shards of this number of orders, which can be resumed after interruption",
+    )
+    parser.add_argument(
+        "--shard_format", type=str, default="csv", choices=["csv", "parquet"], help="File format of the shards"
+    )
     args = parser.parse_args()
 
     config = get_backtest_config_fromfile(args.config_path)
     if args.n_jobs is not None:
         config["concurrency"] = args.n_jobs
 
-    backtest(
-        backtest_config=config,
-        with_simulator=args.use_simulator,
-    )
+    if args.orders_per_shard is not None:
+        sharded_backtest(
+            backtest_config=config,
+            with_simulator=args.use_simulator,
+            orders_per_shard=args.orders_per_shard,
+            shard_format=args.shard_format,
+        )
+    else:
+        backtest(
+            backtest_config=config,
+            with_simulator=args.use_simulator,
+        )
@@ -0,0 +1,353 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+"""Size-bounded LRU caches of the (stock, date) data slices used by RL simulators and interpreters.
+
+Many orders share the same (stock, date), so the same slices are loaded again and again in an epoch.
+
+- :class:`LRUSliceCache` is a per-process cache. When it's pickled (e.g., sent to the workers of
+  ``FiniteSubprocVectorEnv``), each copy starts empty, so it works as a per-worker cache.
+- :class:`SharedLRUSliceCache` keeps fixed-shape arrays in shared memory, so that the workers
+  (e.g., of ``FiniteShmemVectorEnv``) share one cache.
+
+:class:`CachedProcessedDataProvider` wraps any :class:`~qlib.rl.data.base.ProcessedDataProvider` with them.
+The hit rates can be logged with :meth:`LRUSliceCache.log_metrics`.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import multiprocessing
+import os
+import pickle
+import tempfile
+import threading
+import weakref
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Callable, Hashable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None  # type: ignore
+
+from qlib.rl.data.base import BaseIntradayProcessedData, ProcessedDataProvider
+from qlib.utils import init_instance_by_config
+
+if TYPE_CHECKING:
+    from qlib.rl.utils.log import LogCollector
+
+__all__ = ["LRUSliceCache", "SharedLRUSliceCache", "CachedProcessedDataProvider"]
+
+
+class LRUSliceCache:
+    """A size-bounded LRU cache with hit-rate metrics.
+
+    Parameters
+    ----------
+    maxsize
+        Maximum number of cached slices.
+    """
+
+    def __init__(self, maxsize: int = 1024) -> None:
+        self.maxsize = maxsize
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = self._misses = 0
+
+    def get(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """Get the slice of ``key``. ``loader`` is called to load it if it's not cached."""
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self._hits += 1
+                return self._data[key]
+            self._misses += 1
+        value = loader()
+        with self._lock:
+            self._data[key] = value
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+        return value
+
+    @property
+    def hits(self) -> int:
+        return self._hits
+
+    @property
+    def misses(self) -> int:
+        return self._misses
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total > 0 else 0.0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._hits = self._misses = 0
+
+    def log_metrics(self, logger: LogCollector, name: str) -> None:
+        """Log the hit rate (``{name}_hit_rate``) and the number of cached slices (``{name}_size``)."""
+        logger.add_scalar(f"{name}_hit_rate", self.hit_rate)
+        logger.add_scalar(f"{name}_size", len(self))
+
+    def __getstate__(self) -> dict:
+        # each process has its own cache
+        state = self.__dict__.copy()
+        del state["_lock"]
+        state["_data"] = OrderedDict()
+        state["_hits"] = state["_misses"] = 0
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+
+ArraySpec = Tuple[Tuple[int, ...], Any]
+"""Shape and dtype of an array."""
+
+
+def _stable_hash(key: Hashable) -> int:
+    # ``hash()`` is salted differently in each (spawned) process
+    h = int.from_bytes(hashlib.blake2b(repr(key).encode(), digest_size=8).digest(), "little", signed=True)
+    return h or 1  # 0 marks the empty slots
+
+
+class _FileLock:
+    """An inter-process lock on a file, which can be sent to both forked and spawned processes."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._thread_lock = threading.Lock()
+        self._fd: Optional[int] = None
+        self._pid: Optional[int] = None
+
+    def __enter__(self) -> None:
+        self._thread_lock.acquire()
+        if self._pid != os.getpid():
+            # the file must be opened in each process, otherwise the forked processes share the lock
+            self._fd, self._pid = os.open(self.path, os.O_RDWR), os.getpid()
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+
+    def __exit__(self, *args: Any) -> None:
+        fcntl.flock(self._fd, fcntl.LOCK_UN)
+        self._thread_lock.release()
+
+    def __getstate__(self) -> dict:
+        return {"path": self.path}
+
+    def __setstate__(self, state: dict) -> None:
+        self.__init__(state["path"])
+
+
+def _release_shared_file(path: str, owner_pid: int) -> None:
+    if os.getpid() == owner_pid and os.path.exists(path):
+        os.remove(path)
+
+
+class SharedLRUSliceCache(LRUSliceCache):
+    """An LRU cache shared by processes, whose values are fixed-shape arrays (and a small picklable meta).
+
+    The arrays are stored in a file-backed shared memory (under ``/dev/shm`` if it exists), which is removed when the
+    cache in the creating process is garbage collected. The cache must be created before the worker processes
+    (either forked or spawned) are started, so that it's sent to them.
+
+    Values that don't fit the specs are returned but not cached.
+
+    Parameters
+    ----------
+    maxsize
+        Maximum number of cached slices.
+    specs
+        The shape and dtype of each array of a value.
+    meta_nbytes
+        Maximum size of the pickled meta of a value.
+    """
+
+    _HEADER = 3  # key hash, last used tick, size of meta
+    _STATS = 3  # tick, hits, misses
+
+    def __init__(self, maxsize: int, specs: Sequence[ArraySpec], meta_nbytes: int = 1024) -> None:
+        self.maxsize = maxsize
+        self.specs = [(tuple(shape), np.dtype(dtype)) for shape, dtype in specs]
+        self.meta_nbytes = meta_nbytes
+
+        shm_dir = "/dev/shm" if os.path.isdir("/dev/shm") else None
+        fd, self.path = tempfile.mkstemp(prefix="qlib_rl_cache_", dir=shm_dir)
+        os.close(fd)
+        # NOTE: the multiprocessing lock can only be sent to the processes started in the same context
+        self._lock = _FileLock(self.path) if fcntl is not None else multiprocessing.Lock()
+        np.memmap(self.path, dtype=np.uint8, mode="w+", shape=(self._nbytes(),)).flush()
+        self._finalizer = weakref.finalize(self, _release_shared_file, self.path, os.getpid())
+        self._attach()
+
+    def _slot_layout(self) -> Tuple[List[int], int]:
+        offsets, nbytes = [], 0
+        for shape, dtype in self.specs:
+            offsets.append(nbytes)
+            nbytes += (int(np.prod(shape)) * dtype.itemsize + 7) // 8 * 8
+        offsets.append(nbytes)
+        return offsets, nbytes + (self.meta_nbytes + 7) // 8 * 8
+
+    def _nbytes(self) -> int:
+        return 8 * (self._STATS + self.maxsize * self._HEADER) + self.maxsize * self._slot_layout()[1]
+
+    def _attach(self) -> None:
+        buf = np.memmap(self.path, dtype=np.uint8, mode="r+", shape=(self._nbytes(),))
+        head = 8 * (self._STATS + self.maxsize * self._HEADER)
+        self._stats = buf[: 8 * self._STATS].view(np.int64)
+        self._header = buf[8 * self._STATS : head].view(np.int64).reshape(self.maxsize, self._HEADER)
+        self._offsets, slot_nbytes = self._slot_layout()
+        self._slots = buf[head:].reshape(self.maxsize, slot_nbytes)
+
+    def _read(self, slot: int) -> Tuple[List[np.ndarray], Any]:
+        row = self._slots[slot]
+        arrays = [
+            row[start : start + int(np.prod(shape)) * dtype.itemsize].view(dtype).reshape(shape).copy()
+            for (shape, dtype), start in zip(self.specs, self._offsets)
+        ]
+        meta_start = self._offsets[-1]
+        return arrays, pickle.loads(row[meta_start : meta_start + self._header[slot, 2]].tobytes())
+
+    def _write(self, slot: int, arrays: Sequence[np.ndarray], meta: bytes) -> None:
+        row = self._slots[slot]
+        for arr, (_, dtype), start in zip(arrays, self.specs, self._offsets):
+            data = np.ascontiguousarray(arr, dtype=dtype).reshape(-1).view(np.uint8)
+            row[start : start + len(data)] = data
+        meta_start = self._offsets[-1]
+        row[meta_start : meta_start + len(meta)] = np.frombuffer(meta, dtype=np.uint8)
+        self._header[slot, 2] = len(meta)
+
+    def get(
+        self, key: Hashable, loader: Callable[[], Tuple[Sequence[np.ndarray], Any]]
+    ) -> Tuple[List[np.ndarray], Any]:
+        """Get the ``(arrays, meta)`` of ``key``. ``loader`` is called to load it if it's not cached."""
+        h = _stable_hash(key)
+        with self._lock:
+            found = np.flatnonzero(self._header[:, 0] == h)
+            self._stats[0] += 1
+            if len(found) > 0:
+                self._stats[1] += 1
+                self._header[found[0], 1] = self._stats[0]
+                return self._read(found[0])
+            self._stats[2] += 1
+        arrays, meta = loader()
+        meta_bytes = pickle.dumps(meta)
+        fit = len(arrays) == len(self.specs) and all(arr.shape == shape for arr, (shape, _) in zip(arrays, self.specs))
+        if not fit:
+            return list(arrays), meta
+        # the same dtypes as the cached ones
+        arrays = [np.asarray(arr, dtype=dtype) for arr, (_, dtype) in zip(arrays, self.specs)]
+        if len(meta_bytes) <= self.meta_nbytes:
+            with self._lock:
+                if not (self._header[:, 0] == h).any():
+                    empty = np.flatnonzero(self._header[:, 0] == 0)
+                    slot = empty[0] if len(empty) > 0 else int(np.argmin(self._header[:, 1]))
+                    self._header[slot, 0] = 0  # the slot is invalid while it's being written
+                    self._write(slot, arrays, meta_bytes)
+                    self._header[slot, 1] = self._stats[0]
+                    self._header[slot, 0] = h
+        return arrays, meta
+
+    @property
+    def hits(self) -> int:
+        return int(self._stats[1])
+
+    @property
+    def misses(self) -> int:
+        return int(self._stats[2])
+
+    def __len__(self) -> int:
+        return int((self._header[:, 0] != 0).sum())
+
+    def clear(self) -> None:
+        with self._lock:
+            self._header[:] = 0
+            self._stats[:] = 0
+
+    def __getstate__(self) -> dict:
+        # the file is shared instead of the content
+        return {k: v for k, v in self.__dict__.items() if k not in ("_stats", "_header", "_slots", "_finalizer")}
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._attach()
+
+
+class _CachedIntradayProcessedData(BaseIntradayProcessedData):
+    def __init__(self, today: pd.DataFrame, yesterday: pd.DataFrame) -> None:
+        self.today = today
+        self.yesterday = yesterday
+
+    def __repr__(self) -> str:
+        with pd.option_context("memory_usage", False, "display.max_info_columns", 1, "display.large_repr", "info"):
+            return f"{self.__class__.__name__}({self.today}, {self.yesterday})"
+
+
+class CachedProcessedDataProvider(ProcessedDataProvider):
+    """Cache the processed data of another provider, keyed by ``(stock_id, date, feature_dim)``.
+
+    Parameters
+    ----------
+    provider
+        The provider (or its config) to cache.
+    maxsize
+        Maximum number of cached (stock, date) slices.
+    shared_shape
+        ``(time_length, feature_dim)`` of the processed data. If it's given, the cache is a
+        :class:`SharedLRUSliceCache` shared by the processes. Otherwise, each process has its own cache.
+    """
+
+    def __init__(
+        self,
+        provider: dict | ProcessedDataProvider,
+        maxsize: int = 1024,
+        shared_shape: Optional[Tuple[int, int]] = None,
+    ) -> None:
+        super().__init__()
+
+        self.provider: ProcessedDataProvider = init_instance_by_config(provider, accept_types=ProcessedDataProvider)
+        if shared_shape is None:
+            self.cache: LRUSliceCache = LRUSliceCache(maxsize)
+        else:
+            time_length, feature_dim = shared_shape
+            self.cache = SharedLRUSliceCache(
+                maxsize,
+                [((time_length, feature_dim), np.float32)] * 2 + [((time_length,), np.int64)],
+            )
+
+    def get_data(
+        self,
+        stock_id: str,
+        date: pd.Timestamp,
+        feature_dim: int,
+        time_index: pd.Index,
+    ) -> BaseIntradayProcessedData:
+        key = (stock_id, pd.Timestamp(date), feature_dim)
+
+        def _load() -> BaseIntradayProcessedData:
+            return self.provider.get_data(stock_id=stock_id, date=date, feature_dim=feature_dim, time_index=time_index)
+
+        if not isinstance(self.cache, SharedLRUSliceCache):
+            return self.cache.get(key, _load)
+
+        def _load_arrays() -> Tuple[List[np.ndarray], Any]:
+            data = _load()
+            arrays = [data.today.to_numpy(), data.yesterday.to_numpy(), data.today.index.values.view(np.int64)]
+            return arrays, (data.today.index.name, list(data.today.columns))
+
+        (today, yesterday, index), (index_name, columns) = self.cache.get(key, _load_arrays)
+        index = pd.DatetimeIndex(index.view("datetime64[ns]"), name=index_name)
+        return _CachedIntradayProcessedData(
+            pd.DataFrame(today, index=index, columns=columns),
+            pd.DataFrame(yesterday, index=index, columns=columns),
+        )
@@ -0,0 +1,264 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+"""Columnar intraday store for order execution data.
+
+The pickle-styled files (see :mod:`qlib.rl.data.pickle_styled`) have to be loaded and parsed as a whole even if only
+one day of one stock is needed. The columnar store converts each pickle into memory-mapped arrays with an index from
+date to the range of rows, so that the data of a (stock, date) pair is a view of the arrays without any IO or parsing
+in advance.
+
+The layout of a store is::
+
+    <data_dir>/
+        _columnar.json          # the meta of the store (format version)
+        <stock_id>/
+            columns.json        # names of the columns
+            values.npy          # (n_columns, n_rows) array, i.e., the values of each column are contiguous
+            datetime.npy        # (n_rows,) datetime64[ns], sorted
+            dates.npy           # (n_dates,) datetime64[ns], the dates (midnight) of the rows, sorted
+            offsets.npy         # (n_dates + 1,) int64, the rows of ``dates[i]`` are ``offsets[i]:offsets[i + 1]``
+
+Use :func:`convert_pickle_to_columnar` to convert a directory of pickle-styled files.
+"""
+
+from __future__ import annotations
+
+import json
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from qlib.log import get_module_logger
+from qlib.rl.data.base import BaseIntradayBacktestData, BaseIntradayProcessedData, ProcessedDataProvider
+from qlib.rl.data.pickle_styled import (
+    DealPriceType,
+    _deal_price_columns,
+    _infer_processed_data_column_names,
+    _read_pickle,
+)
+
+__all__ = [
+    "ColumnarIntradayBacktestData",
+    "ColumnarIntradayProcessedData",
+    "ColumnarProcessedDataProvider",
+    "convert_pickle_to_columnar",
+    "is_columnar_store",
+    "load_columnar_intraday_backtest_data",
+]
+
+META_FILE = "_columnar.json"
+FORMAT_VERSION = 1
+
+
+def is_columnar_store(data_dir: Path | str) -> bool:
+    return (Path(data_dir) / META_FILE).exists()
+
+
+class _StockColumns:
+    """The memory-mapped arrays of one stock."""
+
+    def __init__(self, stock_dir: Path) -> None:
+        with (stock_dir / "columns.json").open() as f:
+            self.columns: List[str] = json.load(f)
+        self.col_loc: Dict[str, int] = {c: i for i, c in enumerate(self.columns)}
+        self.values: np.ndarray = np.load(stock_dir / "values.npy", mmap_mode="r")
+        self.datetime: np.ndarray = np.load(stock_dir / "datetime.npy", mmap_mode="r")
+        offsets = np.load(stock_dir / "offsets.npy")
+        dates = np.load(stock_dir / "dates.npy")
+        self.ranges: Dict[int, Tuple[int, int]] = {
+            d: (s, e) for d, s, e in zip(dates.view(np.int64).tolist(), offsets[:-1].tolist(), offsets[1:].tolist())
+        }
+
+    def slice(self, date: pd.Timestamp) -> slice:
+        try:
+            return slice(*self.ranges[pd.Timestamp(date).value])
+        except KeyError as e:
+            raise KeyError(f"No data found on {date}") from e
+
+    def column(self, name: str, rows: slice) -> np.ndarray:
+        return self.values[self.col_loc[name], rows]
+
+    def block(self, names: Sequence[str], rows: slice) -> np.ndarray:
+        """The (n_rows, len(names)) values of the columns, which is a view if the columns are stored consecutively."""
+        locs = [self.col_loc[c] for c in names]
+        if locs == list(range(locs[0], locs[0] + len(locs))):
+            return self.values[locs[0] : locs[0] + len(locs), rows].T
+        return self.values[locs, rows].T
+
+
+@lru_cache(maxsize=1024)  # only the file handles and the date index are kept in memory
+def _open_stock(data_dir: Path, stock_id: str) -> _StockColumns:
+    stock_dir = data_dir / stock_id
+    if not stock_dir.exists():
+        raise FileNotFoundError(f"No columnar data found for '{stock_id}' in '{data_dir}'")
+    return _StockColumns(stock_dir)
+
+
+class ColumnarIntradayBacktestData(BaseIntradayBacktestData):
+    """Backtest data for simple simulator, read from a columnar store.
+
+    It behaves the same as :class:`~qlib.rl.data.pickle_styled.SimpleIntradayBacktestData`,
+    but the data are views of the memory-mapped arrays.
+    """
+
+    def __init__(
+        self,
+        data_dir: Path | str,
+        stock_id: str,
+        date: pd.Timestamp,
+        deal_price: DealPriceType = "close",
+        order_dir: int = None,
+    ) -> None:
+        super(ColumnarIntradayBacktestData, self).__init__()
+
+        self._stock = _open_stock(Path(data_dir), stock_id)
+        self._rows = self._stock.slice(date)
+        self._time_index = pd.DatetimeIndex(self._stock.datetime[self._rows], name="datetime")
+        self.deal_price_type: DealPriceType = deal_price
+        self.order_dir = order_dir
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self._time_index[0]} - {self._time_index[-1]}, {self._stock.columns})"
+
+    def __len__(self) -> int:
+        return len(self._time_index)
+
+    def _series(self, col: str) -> pd.Series:
+        return pd.Series(self._stock.column(col, self._rows), index=self._time_index, name=col, copy=False)
+
+    def get_deal_price(self) -> pd.Series:
+        """Return a pandas series that can be indexed with time.
+        See :attribute:`DealPriceType` for details."""
+        col, fill_col = _deal_price_columns(self.deal_price_type, self.order_dir)
+        price = self._series(col)
+        if fill_col is not None:
+            price = price.replace(0, np.nan).fillna(self._series(fill_col))
+        return price
+
+    def get_volume(self) -> pd.Series:
+        """Return a volume series that can be indexed with time."""
+        return self._series("$volume0")
+
+    def get_time_index(self) -> pd.DatetimeIndex:
+        return self._time_index
+
+
+class ColumnarIntradayProcessedData(BaseIntradayProcessedData):
+    """Processed data read from a columnar store, converted from the (new) pickle-styled processed data."""
+
+    def __init__(
+        self,
+        data_dir: Path | str,
+        stock_id: str,
+        date: pd.Timestamp,
+        feature_dim: int,
+        time_index: pd.Index,
+    ) -> None:
+        stock = _open_stock(Path(data_dir), stock_id)
+        rows = stock.slice(date)
+        index = pd.DatetimeIndex(stock.datetime[rows], name="datetime")
+
+        cnames = _infer_processed_data_column_names(feature_dim)
+        self.today: pd.DataFrame = pd.DataFrame(stock.block(cnames, rows), index=index, columns=cnames, copy=False)
+        self.yesterday: pd.DataFrame = pd.DataFrame(
+            stock.block([f"{c}_1" for c in cnames], rows), index=index, columns=cnames, copy=False
+        )
+        assert len(self.today) == len(self.yesterday) == len(time_index)
+
+    def __repr__(self) -> str:
+        with pd.option_context("memory_usage", False, "display.max_info_columns", 1, "display.large_repr", "info"):
+            return f"{self.__class__.__name__}({self.today}, {self.yesterday})"
+
+
+def load_columnar_intraday_backtest_data(
+    data_dir: Path,
+    stock_id: str,
+    date: pd.Timestamp,
+    deal_price: DealPriceType = "close",
+    order_dir: int = None,
+) -> ColumnarIntradayBacktestData:
+    return ColumnarIntradayBacktestData(data_dir, stock_id, date, deal_price, order_dir)
+
+
+class ColumnarProcessedDataProvider(ProcessedDataProvider):
+    def __init__(self, data_dir: Path | str) -> None:
+        super().__init__()
+
+        self._data_dir = Path(data_dir)
+
+    def get_data(
+        self,
+        stock_id: str,
+        date: pd.Timestamp,
+        feature_dim: int,
+        time_index: pd.Index,
+    ) -> BaseIntradayProcessedData:
+        return ColumnarIntradayProcessedData(self._data_dir, stock_id, date, feature_dim, time_index)
+
+
+def _dump_stock(df: pd.DataFrame, stock_dir: Path) -> None:
+    if not {"datetime", "date"} <= set(df.index.names):
+        raise ValueError(
+            f"The index of the data must contain 'datetime' and 'date', got {df.index.names}. "
+            "The legacy processed data is not supported."
+        )
+    datetime = pd.DatetimeIndex(df.index.get_level_values("datetime"))
+    dates = pd.DatetimeIndex(df.index.get_level_values("date")).normalize()
+    order = np.lexsort((datetime.values, dates.values))
+    df, datetime, dates = df.iloc[order], datetime[order], dates[order]
+
+    numeric = df.select_dtypes("number")
+    if len(numeric.columns) < len(df.columns):
+        get_module_logger("columnar").warning(
+            f"Non-numeric columns are dropped: {df.columns.difference(numeric.columns).tolist()}"
+        )
+    dtype = np.result_type(*numeric.dtypes) if len(numeric.columns) > 0 else np.float64
+    uniq_dates, starts = np.unique(dates.values, return_index=True)
+
+    stock_dir.mkdir(parents=True, exist_ok=True)
+    with (stock_dir / "columns.json").open("w") as f:
+        json.dump([str(c) for c in numeric.columns], f)
+    np.save(stock_dir / "values.npy", np.ascontiguousarray(numeric.to_numpy(dtype=dtype).T))
+    np.save(stock_dir / "datetime.npy", datetime.values.astype("datetime64[ns]"))
+    np.save(stock_dir / "dates.npy", uniq_dates.astype("datetime64[ns]"))
+    np.save(stock_dir / "offsets.npy", np.append(starts, len(df)).astype(np.int64))
+
+
+def convert_pickle_to_columnar(
+    pickle_dir: Path | str,
+    output_dir: Path | str,
+    stock_ids: Optional[List[str]] = None,
+) -> List[str]:
+    """Convert a directory of pickle-styled files (one file per stock) into a columnar store.
+
+    Both the backtest data and the (new-style) processed data can be converted.
+
+    Parameters
+    ----------
+    pickle_dir
+        The directory of ``<stock_id>.pkl`` (or ``<stock_id>.pkl.backtest``) files.
+        The index of the dataframes must be ``(instrument, datetime, date)``.
+    output_dir
+        The directory of the columnar store.
+    stock_ids
+        The stocks to convert. All the stocks in ``pickle_dir`` by default.
+
+    Returns
+    -------
+    The converted stocks.
+    """
+    pickle_dir, output_dir = Path(pickle_dir), Path(output_dir)
+    if stock_ids is None:
+        stock_ids = sorted({p.name.split(".pkl")[0] for p in pickle_dir.glob("*.pkl*")})
+    output_dir.mkdir(parents=True, exist_ok=True)
+    for stock_id in stock_ids:
+        # the pickles are read only once, so they are not cached
+        df = _read_pickle.__wrapped__(pickle_dir / stock_id)
+        _dump_stock(df, output_dir / stock_id)
+    with (output_dir / META_FILE).open("w") as f:
+        json.dump({"version": FORMAT_VERSION}, f)
+    return stock_ids
@@ -5,7 +5,8 @@
 
 This is the format used in `OPD paper <https://seqml.github.io/opd/>`__. NOT the standard data format in qlib.
 
-The data here are all wrapped with ``@lru_cache``, which saves the expensive IO cost to repetitively read the data.
+The data here are all cached (see :mod:`qlib.rl.data.cache`), which saves the expensive IO cost to repetitively read
+the data.
 We also encourage users to use ``get_xxx_yyy`` rather than ``XxxYyy`` (although they are the same thing),
 because ``get_xxx_yyy`` is cache-optimized.
 
@@ -21,15 +22,14 @@ from __future__ import annotations
 
 from functools import lru_cache
 from pathlib import Path
-from typing import List, Sequence, cast
+from typing import List, Optional, Sequence, Tuple, cast
 
-import cachetools
 import numpy as np
 import pandas as pd
-from cachetools.keys import hashkey
 
 from qlib.backtest.decision import Order, OrderDir
 from qlib.rl.data.base import BaseIntradayBacktestData, BaseIntradayProcessedData, ProcessedDataProvider
+from qlib.rl.data.cache import LRUSliceCache
 from qlib.typehint import Literal
 
 DealPriceType = Literal["bid_or_ask", "bid_or_ask_fill", "close"]
@@ -40,6 +40,22 @@ DealPriceType = Literal["bid_or_ask", "bid_or_ask_fill", "close"]
 """
 
 
+def _deal_price_columns(deal_price_type: DealPriceType, order_dir: Optional[int]) -> Tuple[str, Optional[str]]:
+    """The column of deal price, and the column to fill the zero prices (if any)."""
+    if deal_price_type in ("bid_or_ask", "bid_or_ask_fill"):
+        if order_dir is None:
+            raise ValueError("Order direction cannot be none when deal_price_type is not close.")
+        if order_dir == OrderDir.SELL:
+            col, fill_col = "$bid0", "$ask0"
+        else:  # BUY
+            col, fill_col = "$ask0", "$bid0"
+    elif deal_price_type == "close":
+        col, fill_col = "$close0", None
+    else:
+        raise ValueError(f"Unsupported deal_price_type: {deal_price_type}")
+    return col, fill_col if deal_price_type == "bid_or_ask_fill" else None
+
+
 def _infer_processed_data_column_names(shape: int) -> List[str]:
     if shape == 16:
         return [
@@ -128,24 +144,10 @@ class SimpleIntradayBacktestData(BaseIntradayBacktestData):
     def get_deal_price(self) -> pd.Series:
         """Return a pandas series that can be indexed with time.
         See :attribute:`DealPriceType` for details."""
-        if self.deal_price_type in ("bid_or_ask", "bid_or_ask_fill"):
-            if self.order_dir is None:
-                raise ValueError("Order direction cannot be none when deal_price_type is not close.")
-            if self.order_dir == OrderDir.SELL:
-                col = "$bid0"
-            else:  # BUY
-                col = "$ask0"
-        elif self.deal_price_type == "close":
-            col = "$close0"
-        else:
-            raise ValueError(f"Unsupported deal_price_type: {self.deal_price_type}")
+        col, fill_col = _deal_price_columns(self.deal_price_type, self.order_dir)
         price = self.data[col]
 
-        if self.deal_price_type == "bid_or_ask_fill":
-            if self.order_dir == OrderDir.SELL:
-                fill_col = "$ask0"
-            else:
-                fill_col = "$bid0"
+        if fill_col is not None:
             price = price.replace(0, np.nan).fillna(self.data[fill_col])
 
         return price
@@ -202,21 +204,33 @@ class IntradayProcessedData(BaseIntradayProcessedData):
             return f"{self.__class__.__name__}({self.today}, {self.yesterday})"
 
 
-@lru_cache(maxsize=100)  # 100 * 50K = 5MB
+BACKTEST_DATA_CACHE = LRUSliceCache(100)  # 100 * 50K = 5MB
+"""Per-process cache of :func:`load_simple_intraday_backtest_data`."""
+
+PROCESSED_DATA_CACHE = LRUSliceCache(100)  # 100 * 50K = 5MB
+"""Per-process cache of :func:`load_pickled_intraday_processed_data`."""
+
+
 def load_simple_intraday_backtest_data(
     data_dir: Path,
     stock_id: str,
     date: pd.Timestamp,
     deal_price: DealPriceType = "close",
     order_dir: int = None,
-) -> SimpleIntradayBacktestData:
-    return SimpleIntradayBacktestData(data_dir, stock_id, date, deal_price, order_dir)
+) -> BaseIntradayBacktestData:
+    # pylint: disable=import-outside-toplevel
+    from qlib.rl.data.columnar import is_columnar_store, load_columnar_intraday_backtest_data
+
+    def _load() -> BaseIntradayBacktestData:
+        # the data converted by `qlib.rl.data.columnar.convert_pickle_to_columnar` can be used in place of the pickles
+        if is_columnar_store(data_dir):
+            return load_columnar_intraday_backtest_data(data_dir, stock_id, date, deal_price, order_dir)
+        return SimpleIntradayBacktestData(data_dir, stock_id, date, deal_price, order_dir)
+
+    key = (str(data_dir), stock_id, pd.Timestamp(date), deal_price, order_dir)
+    return BACKTEST_DATA_CACHE.get(key, _load)
 
 
-@cachetools.cached(  # type: ignore
-    cache=cachetools.LRUCache(100),  # 100 * 50K = 5MB
-    key=lambda data_dir, stock_id, date, feature_dim, time_index: hashkey(data_dir, stock_id, date),
-)
 def load_pickled_intraday_processed_data(
     data_dir: Path,
     stock_id: str,
@@ -224,7 +238,10 @@ def load_pickled_intraday_processed_data(
     feature_dim: int,
     time_index: pd.Index,
 ) -> BaseIntradayProcessedData:
-    return IntradayProcessedData(data_dir, stock_id, date, feature_dim, time_index)
+    return PROCESSED_DATA_CACHE.get(
+        (str(data_dir), stock_id, pd.Timestamp(date), feature_dim),
+        lambda: IntradayProcessedData(data_dir, stock_id, date, feature_dim, time_index),
+    )
 
 
 class PickleProcessedDataProvider(ProcessedDataProvider):
@@ -3,7 +3,7 @@
 
 from __future__ import annotations
 
-from typing import Any, Generic, TypeVar
+from typing import TYPE_CHECKING, Any, Generic, Optional, TypeVar
 
 import gym
 import numpy as np
@@ -12,6 +12,9 @@ from gym import spaces
 from qlib.typehint import final
 from .simulator import ActType, StateType
 
+if TYPE_CHECKING:
+    from .utils.env_wrapper import BatchEnvWrapper, EnvWrapper
+
 ObsType = TypeVar("ObsType")
 PolicyActType = TypeVar("PolicyActType")
 
@@ -31,6 +34,8 @@ class Interpreter:
     states by calling ``self.env.register_state()``, but it's not planned for first iteration.
     """
 
+    env: Optional[EnvWrapper | BatchEnvWrapper] = None
+
 
 class StateInterpreter(Generic[StateType, ObsType], Interpreter):
     """State Interpreter that interpret execution result of qlib executor into rl env state"""
@@ -63,6 +68,22 @@ class StateInterpreter(Generic[StateType, ObsType], Interpreter):
         """
         raise NotImplementedError("interpret is not implemented!")
 
+    def interpret_batch(self, simulator_state: Any, ids: np.ndarray) -> ObsType:
+        """Interpret the state of a :class:`~qlib.rl.simulator.BatchSimulator` for the slots ``ids``.
+
+        Parameters
+        ----------
+        simulator_state
+            Retrieved with ``batch_simulator.get_state()``.
+        ids
+            The slots to interpret.
+
+        Returns
+        -------
+        Observations of the slots, stacked along the first axis (of every value if it's a dict).
+        """
+        raise NotImplementedError(f"{self.__class__.__name__} doesn't support batch simulators.")
+
 
 class ActionInterpreter(Generic[StateType, PolicyActType, ActType], Interpreter):
     """Action Interpreter that interpret rl agent action into qlib orders"""
@@ -97,6 +118,24 @@ class ActionInterpreter(Generic[StateType, PolicyActType, ActType], Interpreter)
         """
         raise NotImplementedError("interpret is not implemented!")
 
+    def interpret_batch(self, simulator_state: Any, ids: np.ndarray, action: np.ndarray) -> np.ndarray:
+        """Convert the policy actions of the slots ``ids`` of a :class:`~qlib.rl.simulator.BatchSimulator`.
+
+        Parameters
+        ----------
+        simulator_state
+            Retrieved with ``batch_simulator.get_state()``.
+        ids
+            The slots that receive the actions.
+        action
+            Raw actions given by policy, stacked along the first axis.
+
+        Returns
+        -------
+        The actions needed by the batch simulator.
+        """
+        raise NotImplementedError(f"{self.__class__.__name__} doesn't support batch simulators.")
+
 
 def _gym_space_contains(space: gym.Space, x: Any) -> None:
     """Strengthened version of gym.Space.contains.
@@ -15,9 +15,10 @@ from .interpreter import (
 from .network import Recurrent
 from .policy import AllOne, PPO
 from .reward import PAPenaltyReward
+from .simulator_batch import BatchSingleAssetOrderExecutionSimple
 from .simulator_simple import SingleAssetOrderExecutionSimple
-from .state import SAOEMetrics, SAOEState
-from .strategy import SAOEStateAdapter, SAOEStrategy, ProxySAOEStrategy, SAOEIntStrategy
+from .state import SAOEBatchState, SAOEMetrics, SAOEState
+from .strategy import SAOEBatchStateAdapter, SAOEStateAdapter, SAOEStrategy, ProxySAOEStrategy, SAOEIntStrategy
 
 __all__ = [
     "FullHistoryStateInterpreter",
@@ -29,9 +30,12 @@ __all__ = [
     "PPO",
     "PAPenaltyReward",
     "SingleAssetOrderExecutionSimple",
+    "BatchSingleAssetOrderExecutionSimple",
     "SAOEStateAdapter",
+    "SAOEBatchStateAdapter",
     "SAOEMetrics",
     "SAOEState",
+    "SAOEBatchState",
     "SAOEStrategy",
     "ProxySAOEStrategy",
     "SAOEIntStrategy",
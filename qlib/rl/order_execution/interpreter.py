@@ -10,10 +10,12 @@ import numpy as np
 import pandas as pd
 from gym import spaces
 
+from qlib.backtest.decision import OrderDir
 from qlib.constant import EPS
 from qlib.rl.data.base import ProcessedDataProvider
+from qlib.rl.data.cache import CachedProcessedDataProvider
 from qlib.rl.interpreter import ActionInterpreter, StateInterpreter
-from qlib.rl.order_execution.state import SAOEState
+from qlib.rl.order_execution.state import SAOEBatchState, SAOEState
 from qlib.typehint import TypedDict
 
 __all__ = [
@@ -67,6 +69,7 @@ class FullHistoryStateInterpreter(StateInterpreter[SAOEState, FullHistoryObs]):
         Number of dimensions in data.
     processed_data_provider
         Provider of the processed data.
+        If it's a :class:`~qlib.rl.data.cache.CachedProcessedDataProvider`, the hit rate of the cache is logged.
     """
 
     def __init__(
@@ -93,6 +96,8 @@ class FullHistoryStateInterpreter(StateInterpreter[SAOEState, FullHistoryObs]):
             feature_dim=self.data_dim,
             time_index=state.ticks_index,
         )
+        if self.env is not None and isinstance(self.processed_data_provider, CachedProcessedDataProvider):
+            self.processed_data_provider.cache.log_metrics(self.env.logger, "processed_data_cache")
 
         position_history = np.full(self.max_step + 1, 0.0, dtype=np.float32)
         position_history[0] = state.order.amount
@@ -118,6 +123,41 @@ class FullHistoryStateInterpreter(StateInterpreter[SAOEState, FullHistoryObs]):
             ),
         )
 
+    def interpret_batch(self, state: SAOEBatchState, ids: np.ndarray) -> FullHistoryObs:
+        data_processed = np.zeros((len(ids), self.data_ticks, self.data_dim), dtype=np.float32)
+        data_processed_prev = np.zeros_like(data_processed)
+        for k, i in enumerate(ids):
+            order = state.orders[i]
+            assert order is not None
+            processed = self.processed_data_provider.get_data(
+                stock_id=order.stock_id,
+                date=pd.Timestamp(order.start_time.date()),
+                feature_dim=self.data_dim,
+                time_index=state.ticks_index[i],
+            )
+            data_processed[k] = processed.today
+            data_processed_prev[k] = processed.yesterday
+            if self.env is not None and isinstance(self.processed_data_provider, CachedProcessedDataProvider):
+                self.processed_data_provider.cache.log_metrics(self.env.loggers[i], "processed_data_cache")
+        # mask out data after this moment (inclusive)
+        data_processed[np.arange(self.data_ticks) >= state.cur_tick[ids, None]] = 0.0
+
+        position_history = np.zeros((len(ids), self.max_step), dtype=np.float32)
+        history = state.position_history[ids, : self.max_step]
+        position_history[:, : history.shape[1]] = history
+
+        return FullHistoryObs(
+            data_processed=data_processed,
+            data_processed_prev=data_processed_prev,
+            acquiring=(state.direction[ids] == OrderDir.BUY).astype(np.int32),
+            cur_tick=np.minimum(state.cur_tick[ids], self.data_ticks - 1).astype(np.int32),
+            cur_step=np.minimum(state.cur_step[ids], self.max_step - 1).astype(np.int32),
+            num_step=np.full(len(ids), self.max_step, dtype=np.int32),
+            target=state.amount[ids].astype(np.float32),
+            position=state.position[ids].astype(np.float32),
+            position_history=position_history,
+        )
+
     @property
     def observation_space(self) -> spaces.Dict:
         space = {
@@ -183,6 +223,16 @@ class CurrentStepStateInterpreter(StateInterpreter[SAOEState, CurrentStateObs]):
         )
         return obs
 
+    def interpret_batch(self, state: SAOEBatchState, ids: np.ndarray) -> CurrentStateObs:
+        assert (state.cur_step[ids] <= self.max_step).all()
+        return CurrentStateObs(
+            acquiring=(state.direction[ids] == OrderDir.BUY).astype(np.int32),
+            cur_step=state.cur_step[ids].astype(np.int32),
+            num_step=np.full(len(ids), self.max_step, dtype=np.int32),
+            target=state.amount[ids].astype(np.float32),
+            position=state.position[ids].astype(np.float32),
+        )
+
 
 class CategoricalActionInterpreter(ActionInterpreter[SAOEState, int, float]):
     """Convert a discrete policy action to a continuous action, then multiplied by ``order.amount``.
@@ -217,6 +267,14 @@ class CategoricalActionInterpreter(ActionInterpreter[SAOEState, int, float]):
         else:
             return min(state.position, state.order.amount * self.action_values[action])
 
+    def interpret_batch(self, state: SAOEBatchState, ids: np.ndarray, action: np.ndarray) -> np.ndarray:
+        assert ((0 <= action) & (action < len(self.action_values))).all()
+        position = state.position[ids]
+        amount = np.minimum(position, state.amount[ids] * np.asarray(self.action_values)[action])
+        if self.max_step is not None:
+            amount = np.where(state.cur_step[ids] >= self.max_step - 1, position, amount)
+        return amount
+
 
 class TwapRelativeActionInterpreter(ActionInterpreter[SAOEState, float, float]):
     """Convert a continuous ratio to deal amount.
@@ -236,6 +294,11 @@ class TwapRelativeActionInterpreter(ActionInterpreter[SAOEState, float, float]):
         twap_volume = state.position / (estimated_total_steps - state.cur_step)
         return min(state.position, twap_volume * action)
 
+    def interpret_batch(self, state: SAOEBatchState, ids: np.ndarray, action: np.ndarray) -> np.ndarray:
+        estimated_total_steps = np.ceil(state.n_ticks_for_order[ids] / state.ticks_per_step)
+        twap_volume = state.position[ids] / (estimated_total_steps - state.cur_step[ids])
+        return np.minimum(state.position[ids], twap_volume * action)
+
 
 def _to_int32(val):
     return np.array(int(val), dtype=np.int32)
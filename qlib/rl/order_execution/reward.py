@@ -7,7 +7,7 @@ from typing import cast
 
 import numpy as np
 
-from qlib.rl.order_execution.state import SAOEMetrics, SAOEState
+from qlib.rl.order_execution.state import SAOEBatchState, SAOEMetrics, SAOEState
 from qlib.rl.reward import Reward
 
 __all__ = ["PAPenaltyReward"]
@@ -47,3 +47,18 @@ class PAPenaltyReward(Reward[SAOEState]):
         self.log("reward/pa", pa)
         self.log("reward/penalty", penalty)
         return reward * self.scale
+
+    def reward_batch(self, simulator_state: SAOEBatchState, ids: np.ndarray) -> np.ndarray:
+        whole_order = simulator_state.amount[ids]
+        assert (whole_order > 0).all()
+        pa = simulator_state.last_pa[ids] * simulator_state.last_amount[ids] / whole_order
+        penalty = -self.penalty * ((simulator_state.last_exec[ids] / whole_order[:, None]) ** 2).sum(axis=1)
+
+        reward = pa + penalty
+
+        # Throw error in case of NaN
+        assert np.isfinite(reward).all(), f"Invalid reward for simulator state: {simulator_state}"
+
+        self.log_batch("reward/pa", pa, ids)
+        self.log_batch("reward/penalty", penalty, ids)
+        return reward * self.scale
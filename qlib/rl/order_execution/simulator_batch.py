@@ -0,0 +1,278 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from qlib.backtest.decision import Order, OrderDir
+from qlib.constant import EPS, EPS_T
+from qlib.rl.data.pickle_styled import BACKTEST_DATA_CACHE, DealPriceType, load_simple_intraday_backtest_data
+from qlib.rl.simulator import BatchSimulator
+
+from .simulator_simple import price_advantage
+from .state import SAOEBatchState, SAOEMetrics
+
+__all__ = ["BatchSingleAssetOrderExecutionSimple"]
+
+
+def _batch_price_advantage(exec_price: np.ndarray, baseline_price: np.ndarray, direction: np.ndarray) -> np.ndarray:
+    """Vectorized :func:`~qlib.rl.order_execution.simulator_simple.price_advantage`."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = exec_price / baseline_price
+    res = np.where(direction == OrderDir.BUY, 1 - ratio, ratio - 1) * 10000
+    # something is wrong with data if the baseline is zero
+    return np.where(baseline_price == 0, 0.0, np.nan_to_num(res, nan=0.0))
+
+
+class BatchSingleAssetOrderExecutionSimple(BatchSimulator[Order, SAOEBatchState, np.ndarray]):
+    """Batched version of :class:`~qlib.rl.order_execution.SingleAssetOrderExecutionSimple`.
+
+    Each slot executes an order with the same rules as the simple simulator,
+    but the states of all the slots are stored as arrays, and a step of all the slots is done with numpy.
+    The market data of the days of the orders are copied into a ``(size, ticks)`` array when the slots are reset.
+
+    Parameters
+    ----------
+    size
+        Number of slots.
+    data_dir
+        Path to load backtest data
+    data_granularity
+        Number of ticks between consecutive data entries.
+    ticks_per_step
+        How many ticks per step.
+    deal_price_type
+        Type of the deal price, see :class:`~qlib.rl.data.pickle_styled.DealPriceType`.
+    vol_threshold
+        Maximum execution volume (divided by market execution volume).
+    """
+
+    def __init__(
+        self,
+        size: int,
+        data_dir: Path,
+        data_granularity: int = 1,
+        ticks_per_step: int = 30,
+        deal_price_type: DealPriceType = "close",
+        vol_threshold: Optional[float] = None,
+    ) -> None:
+        super().__init__(size)
+
+        assert ticks_per_step % data_granularity == 0
+
+        self.data_dir = data_dir
+        self.ticks_per_step: int = ticks_per_step // data_granularity
+        self.deal_price_type = deal_price_type
+        self.vol_threshold = vol_threshold
+
+        self.orders: List[Optional[Order]] = [None] * size
+        self.ticks_index: List[Optional[pd.DatetimeIndex]] = [None] * size
+        self.metrics: List[Optional[SAOEMetrics]] = [None] * size
+
+        # market data of the days, padded with zeros. Columns are added when a longer day comes.
+        self._price = np.zeros((size, 0))
+        self._volume = np.zeros((size, 0))
+
+        # ticks available for trading are ``[start_loc, end_loc)``, current time is at ``cur_loc``
+        self._start_loc = np.zeros(size, dtype=np.int64)
+        self._end_loc = np.zeros(size, dtype=np.int64)
+        self._cur_loc = np.zeros(size, dtype=np.int64)
+        self.cur_step = np.zeros(size, dtype=np.int64)
+        self.position = np.zeros(size)
+        self.amount = np.zeros(size)
+        self.direction = np.zeros(size, dtype=np.int64)
+        self.twap_price = np.zeros(size)
+        self.position_history = np.zeros((size, 1))
+
+        self.last_amount = np.zeros(size)
+        self.last_pa = np.zeros(size)
+        self.last_exec = np.zeros((size, self.ticks_per_step))
+
+        # accumulated over the steps, for the daily metrics
+        self._market_vol_sum = np.zeros(size)
+        self._market_price_sum = np.zeros(size)
+        self._exec_ticks = np.zeros(size, dtype=np.int64)
+        self._amount_sum = np.zeros(size)
+        self._deal_sum = np.zeros(size)
+        self._trade_value_sum = np.zeros(size)
+
+    def reset(self, ids: np.ndarray, initial_states: Sequence[Order]) -> None:
+        for i, order in zip(ids, initial_states):
+            backtest_data = load_simple_intraday_backtest_data(
+                self.data_dir,
+                order.stock_id,
+                pd.Timestamp(order.start_time.date()),
+                self.deal_price_type,
+                order.direction,
+            )
+            ticks_index = backtest_data.get_time_index()
+            start_loc, end_loc = ticks_index.slice_locs(order.start_time, order.end_time - EPS_T)
+            if start_loc >= end_loc:
+                raise ValueError(f"No ticks available for trading the order: {order}")
+
+            self._reserve_ticks(len(ticks_index))
+            deal_price = backtest_data.get_deal_price()
+            self._price[i, : len(ticks_index)] = deal_price.to_numpy()
+            self._price[i, len(ticks_index) :] = 0.0
+            self._volume[i, : len(ticks_index)] = backtest_data.get_volume().to_numpy()
+            self._volume[i, len(ticks_index) :] = 0.0
+
+            self.orders[i] = order
+            self.ticks_index[i] = ticks_index
+            self._start_loc[i], self._end_loc[i] = start_loc, end_loc
+            self.amount[i] = order.amount
+            self.direction[i] = order.direction
+            # the same precision as the simple simulator
+            self.twap_price[i] = float(deal_price.iloc[start_loc:end_loc].astype(float).mean())
+
+        for i in ids:
+            self.metrics[i] = None
+        self._cur_loc[ids] = self._start_loc[ids]
+        self.cur_step[ids] = 0
+        self.position[ids] = self.amount[ids]
+        self.position_history[ids] = 0.0
+        self.position_history[ids, 0] = self.amount[ids]
+        for arr in [self.last_amount, self.last_pa, self.last_exec, self._market_vol_sum, self._market_price_sum]:
+            arr[ids] = 0
+        for arr in [self._exec_ticks, self._amount_sum, self._deal_sum, self._trade_value_sum]:
+            arr[ids] = 0
+
+    def step(self, ids: np.ndarray, actions: np.ndarray) -> None:
+        """Execute one step of the slots ``ids``.
+
+        Parameters
+        ----------
+        ids
+            The slots to step.
+        actions
+            The amount each slot wishes to deal.
+        """
+        ids = np.asarray(ids)
+        assert not self.done()[ids].any()
+        amount = np.asarray(actions, dtype=np.float64)
+
+        # the ticks of this step are ``[cur_loc, stop)``, see ``SingleAssetOrderExecutionSimple._next_loc``
+        cur_loc, end_loc = self._cur_loc[ids], self._end_loc[ids]
+        next_loc = cur_loc + self.ticks_per_step
+        next_loc -= next_loc % self.ticks_per_step
+        stop = np.minimum(next_loc, end_loc)
+        n_ticks = stop - cur_loc
+        last_step = next_loc >= end_loc
+
+        tick_loc = cur_loc[:, None] + np.arange(self.ticks_per_step)
+        mask = tick_loc < stop[:, None]
+        tick_loc = np.minimum(tick_loc, self._price.shape[1] - 1)
+        market_price = np.where(mask, self._price[ids[:, None], tick_loc], 0.0)
+        market_vol = np.where(mask, self._volume[ids[:, None], tick_loc], 0.0)
+
+        # split the volume equally into each tick, and apply the volume threshold
+        exec_vol = np.where(mask, (amount / n_ticks)[:, None], 0.0)
+        market_vol_limit = self.vol_threshold * market_vol if self.vol_threshold is not None else np.inf
+        exec_vol = np.minimum(exec_vol, market_vol_limit)
+        # Complete all the order amount at the last tick of the last step.
+        if last_step.any():
+            rows = np.flatnonzero(last_step)
+            exec_vol[rows, n_ticks[rows] - 1] += self.position[ids[rows]] - exec_vol[rows].sum(axis=1)
+            exec_vol = np.minimum(exec_vol, market_vol_limit)
+
+        exec_sum = exec_vol.sum(axis=1)
+        position = self.position[ids] - exec_sum
+        position[np.abs(position) < 1e-6] = 0.0
+        if (position < -EPS).any() or (exec_vol < -EPS).any():
+            bad = np.flatnonzero((position < -EPS) | (exec_vol < -EPS).any(axis=1))[0]
+            raise ValueError(
+                f"Execution volume is invalid: {exec_vol[bad, :n_ticks[bad]]} (position = {position[bad]})"
+            )
+
+        trade_value = (market_price * exec_vol).sum(axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            exec_avg_price = np.where(np.abs(exec_sum) < EPS, 0.0, trade_value / exec_sum)
+
+        self.position[ids] = position
+        self.position_history[ids, np.minimum(self.cur_step[ids] + 1, self.position_history.shape[1] - 1)] = position
+        self.last_amount[ids] = amount
+        self.last_pa[ids] = _batch_price_advantage(exec_avg_price, self.twap_price[ids], self.direction[ids])
+        self.last_exec[ids] = exec_vol
+
+        self._market_vol_sum[ids] += market_vol.sum(axis=1)
+        self._market_price_sum[ids] += market_price.sum(axis=1)
+        self._exec_ticks[ids] += n_ticks
+        self._amount_sum[ids] += amount
+        self._deal_sum[ids] += exec_sum
+        self._trade_value_sum[ids] += trade_value
+
+        self._cur_loc[ids] = next_loc
+        self.cur_step[ids] += 1
+
+        for i in ids[self.done()[ids]]:
+            self._collect_metrics(i)
+
+    def get_state(self) -> SAOEBatchState:
+        return SAOEBatchState(
+            orders=self.orders,
+            ticks_index=self.ticks_index,
+            ticks_per_step=self.ticks_per_step,
+            cur_step=self.cur_step,
+            cur_tick=np.minimum(self._cur_loc, self._end_loc),
+            position=self.position,
+            amount=self.amount,
+            direction=self.direction,
+            n_ticks_for_order=self._end_loc - self._start_loc,
+            position_history=self.position_history,
+            last_amount=self.last_amount,
+            last_pa=self.last_pa,
+            last_exec=self.last_exec,
+            metrics=self.metrics,
+        )
+
+    def done(self) -> np.ndarray:
+        return (self.position < EPS) | (self._cur_loc >= self._end_loc)
+
+    def _reserve_ticks(self, n_ticks: int) -> None:
+        if n_ticks > self._price.shape[1]:
+            pad = ((0, 0), (0, n_ticks - self._price.shape[1]))
+            self._price = np.pad(self._price, pad)
+            self._volume = np.pad(self._volume, pad)
+        # each step takes at least one tick, and at most ``ticks_per_step``
+        n_steps = n_ticks // self.ticks_per_step + 2
+        if n_steps > self.position_history.shape[1]:
+            self.position_history = np.pad(
+                self.position_history, ((0, 0), (0, n_steps - self.position_history.shape[1]))
+            )
+
+    def _collect_metrics(self, i: int) -> None:
+        order = self.orders[i]
+        assert order is not None
+        ticks_index = self.ticks_index[i]
+        assert ticks_index is not None
+
+        deal_amount = float(self._deal_sum[i])
+        trade_price = float(self._trade_value_sum[i]) / deal_amount if abs(deal_amount) >= EPS else 0.0
+        self.metrics[i] = SAOEMetrics(
+            stock_id=order.stock_id,
+            datetime=ticks_index[0],  # start time
+            direction=order.direction,
+            market_volume=float(self._market_vol_sum[i]),
+            market_price=float(self._market_price_sum[i] / self._exec_ticks[i]),
+            amount=float(self._amount_sum[i]),
+            inner_amount=deal_amount,
+            deal_amount=deal_amount,  # in this simulator, there's no other restrictions
+            trade_price=trade_price,
+            trade_value=float(self._trade_value_sum[i]),
+            position=float(self.position[i]),
+            ffr=deal_amount / order.amount,
+            pa=price_advantage(trade_price, float(self.twap_price[i]), order.direction),
+        )
+
+        if self.env is not None:
+            logger = self.env.loggers[i]
+            for key, value in self.metrics[i].items():
+                if isinstance(value, float):
+                    logger.add_scalar(key, value)
+                else:
+                    logger.add_any(key, value)
+            BACKTEST_DATA_CACHE.log_metrics(logger, "backtest_data_cache")
@@ -3,14 +3,15 @@
 
 from __future__ import annotations
 
+from functools import partial
 from pathlib import Path
-from typing import Any, cast, Optional
+from typing import Callable, Dict, Tuple, cast, Optional
 
 import numpy as np
 import pandas as pd
 from qlib.backtest.decision import Order, OrderDir
 from qlib.constant import EPS, EPS_T, float_or_ndarray
-from qlib.rl.data.pickle_styled import DealPriceType, load_simple_intraday_backtest_data
+from qlib.rl.data.pickle_styled import BACKTEST_DATA_CACHE, DealPriceType, load_simple_intraday_backtest_data
 from qlib.rl.simulator import Simulator
 from qlib.rl.utils import LogLevel
 
@@ -19,6 +20,21 @@ from .state import SAOEMetrics, SAOEState
 __all__ = ["SingleAssetOrderExecutionSimple"]
 
 
+class _LazyHistorySAOEState(SAOEState):
+    """:class:`SAOEState` whose ``history_exec`` and ``history_steps`` are stored as callables,
+    which build the dataframes only when they are accessed."""
+
+    __slots__ = ()
+
+    @property
+    def history_exec(self) -> pd.DataFrame:  # type: ignore
+        return SAOEState.history_exec.__get__(self, SAOEState)()
+
+    @property
+    def history_steps(self) -> pd.DataFrame:  # type: ignore
+        return SAOEState.history_steps.__get__(self, SAOEState)()
+
+
 class SingleAssetOrderExecutionSimple(Simulator[Order, SAOEState, float]):
     """Single-asset order execution (SAOE) simulator.
 
@@ -28,6 +44,10 @@ class SingleAssetOrderExecutionSimple(Simulator[Order, SAOEState, float]):
     If such fine granularity is not needed, use ``ticks_per_step`` to
     lengthen the ticks for each step.
 
+    The histories of executions and steps are written into numpy record arrays preallocated for the order,
+    and the ticks are located by integer offsets in ``ticks_index``, so that a step doesn't create any dataframe.
+    ``history_exec`` and ``history_steps`` are converted into dataframes only when they are accessed.
+
     In each step, the traded amount are "equally" separated to each tick,
     then bounded by volume maximum execution volume (i.e., ``vol_threshold``),
     and if it's the last step, try to ensure all the amount to be executed.
@@ -46,16 +66,6 @@ class SingleAssetOrderExecutionSimple(Simulator[Order, SAOEState, float]):
         Maximum execution volume (divided by market execution volume).
     """
 
-    history_exec: pd.DataFrame
-    """All execution history at every possible time ticks. See :class:`SAOEMetrics` for available columns.
-    Index is ``datetime``.
-    """
-
-    history_steps: pd.DataFrame
-    """Positions at each step. The position before first step is also recorded.
-    See :class:`SAOEMetrics` for available columns.
-    Index is ``datetime``, which is the **starting** time of each step."""
-
     metrics: Optional[SAOEMetrics]
     """Metrics. Only available when done."""
 
@@ -96,22 +106,33 @@ class SingleAssetOrderExecutionSimple(Simulator[Order, SAOEState, float]):
         )
 
         self.ticks_index = self.backtest_data.get_time_index()
+        # The market data of the whole day, which are sliced by integer offsets in each step.
+        self._market_vol: np.ndarray = self.backtest_data.get_volume().to_numpy()
+        self._market_price: np.ndarray = self.backtest_data.get_deal_price().to_numpy()
 
-        # Get time index available for trading
-        self.ticks_for_order = self._get_ticks_slice(self.order.start_time, self.order.end_time)
+        # Get time index available for trading, which is ``ticks_index[start_loc:end_loc]``
+        self._start_loc, self._end_loc = self.ticks_index.slice_locs(self.order.start_time, self.order.end_time - EPS_T)
+        self.ticks_for_order = self.ticks_index[self._start_loc : self._end_loc]
 
+        self._cur_loc: int = self._start_loc
         self.cur_time = self.ticks_for_order[0]
         self.cur_step = 0
         # NOTE: astype(float) is necessary in some systems.
         # this will align the precision with `.to_numpy()` in `_split_exec_vol`
-        self.twap_price = float(self.backtest_data.get_deal_price().loc[self.ticks_for_order].astype(float).mean())
+        self.twap_price = float(
+            self.backtest_data.get_deal_price().iloc[self._start_loc : self._end_loc].astype(float).mean()
+        )
 
         self.position = order.amount
 
-        metric_keys = list(SAOEMetrics.__annotations__.keys())  # pylint: disable=no-member
-        # NOTE: can empty dataframe contain index?
-        self.history_exec = pd.DataFrame(columns=metric_keys).set_index("datetime")
-        self.history_steps = pd.DataFrame(columns=metric_keys).set_index("datetime")
+        # Every tick of the order is executed in exactly one step, and the steps are cut at multiples of
+        # ``ticks_per_step``, so the sizes of the histories are known in advance.
+        exec_dtype, steps_dtype = self._history_dtypes()
+        n_steps = (self._end_loc - 1) // self.ticks_per_step - self._start_loc // self.ticks_per_step + 1
+        self._exec_records = np.zeros(max(self._end_loc - self._start_loc, 0), dtype=exec_dtype)
+        self._steps_records = np.zeros(max(n_steps, 0), dtype=steps_dtype)
+        self._n_exec = self._n_steps = 0
+        self._history_cache: Dict[Tuple[str, int], pd.DataFrame] = {}
         self.metrics = None
 
         self.market_price: Optional[np.ndarray] = None
@@ -142,47 +163,38 @@ class SingleAssetOrderExecutionSimple(Simulator[Order, SAOEState, float]):
         if self.position < -EPS or (exec_vol < -EPS).any():
             raise ValueError(f"Execution volume is invalid: {exec_vol} (position = {self.position})")
 
-        # Get time index available for this step
-        time_index = self._get_ticks_slice(self.cur_time, self._next_time())
-
-        self.history_exec = self._dataframe_append(
-            self.history_exec,
-            SAOEMetrics(
-                # It should have the same keys with SAOEMetrics,
-                # but the values do not necessarily have the annotated type.
-                # Some values could be vectorized (e.g., exec_vol).
-                stock_id=self.order.stock_id,
-                datetime=time_index,
-                direction=self.order.direction,
-                market_volume=self.market_vol,
-                market_price=self.market_price,
-                amount=exec_vol,
-                inner_amount=exec_vol,
-                deal_amount=exec_vol,
-                trade_price=self.market_price,
-                trade_value=self.market_price * exec_vol,
-                position=ticks_position,
-                ffr=exec_vol / self.order.amount,
-                pa=price_advantage(self.market_price, self.twap_price, self.order.direction),
-            ),
-        )
-
-        self.history_steps = self._dataframe_append(
-            self.history_steps,
-            [self._metrics_collect(self.cur_time, self.market_vol, self.market_price, amount, exec_vol)],
-        )
+        self._history_cache.clear()
+
+        # The ticks of this step are ``ticks_index[cur_loc:cur_loc + len(exec_vol)]``.
+        # The columns have the same names with SAOEMetrics, except for the constant ``stock_id`` and ``direction``.
+        records = self._exec_records[self._n_exec : self._n_exec + len(exec_vol)]
+        records["datetime"] = self.ticks_index.values[self._cur_loc : self._cur_loc + len(exec_vol)]
+        records["market_volume"] = self.market_vol
+        records["market_price"] = self.market_price
+        records["amount"] = exec_vol
+        records["inner_amount"] = exec_vol
+        records["deal_amount"] = exec_vol
+        records["trade_price"] = self.market_price
+        records["trade_value"] = self.market_price * exec_vol
+        records["position"] = ticks_position
+        records["ffr"] = exec_vol / self.order.amount
+        records["pa"] = price_advantage(self.market_price, self.twap_price, self.order.direction)
+        self._n_exec += len(exec_vol)
+
+        self._append_step(self._metrics_collect(self.cur_time, self.market_vol, self.market_price, amount, exec_vol))
 
         if self.done():
             if self.env is not None:
                 self.env.logger.add_any("history_steps", self.history_steps, loglevel=LogLevel.DEBUG)
                 self.env.logger.add_any("history_exec", self.history_exec, loglevel=LogLevel.DEBUG)
 
+            exec_records = self._exec_records[: self._n_exec]
             self.metrics = self._metrics_collect(
                 self.ticks_index[0],  # start time
-                self.history_exec["market_volume"],
-                self.history_exec["market_price"],
-                self.history_steps["amount"].sum(),
-                self.history_exec["deal_amount"],
+                exec_records["market_volume"],
+                exec_records["market_price"],
+                self._steps_records["amount"][: self._n_steps].sum(),
+                exec_records["deal_amount"],
             )
 
             # NOTE (yuge): It looks to me that it's the "correct" decision to
@@ -198,18 +210,36 @@ class SingleAssetOrderExecutionSimple(Simulator[Order, SAOEState, float]):
                         self.env.logger.add_scalar(key, value)
                     else:
                         self.env.logger.add_any(key, value)
+                BACKTEST_DATA_CACHE.log_metrics(self.env.logger, "backtest_data_cache")
 
         self.cur_time = self._next_time()
+        self._cur_loc = self._next_loc()
         self.cur_step += 1
 
+    @property
+    def history_exec(self) -> pd.DataFrame:
+        """All execution history at every possible time ticks. See :class:`SAOEMetrics` for available columns.
+        Index is ``datetime``.
+        """
+        return self._history("exec", self._n_exec)
+
+    @property
+    def history_steps(self) -> pd.DataFrame:
+        """Positions at each step. The position before first step is also recorded.
+        See :class:`SAOEMetrics` for available columns.
+        Index is ``datetime``, which is the **starting** time of each step."""
+        return self._history("steps", self._n_steps)
+
     def get_state(self) -> SAOEState:
-        return SAOEState(
+        history_exec: Callable[[], pd.DataFrame] = partial(self._history, "exec", self._n_exec)
+        history_steps: Callable[[], pd.DataFrame] = partial(self._history, "steps", self._n_steps)
+        return _LazyHistorySAOEState(
             order=self.order,
             cur_time=self.cur_time,
             cur_step=self.cur_step,
             position=self.position,
-            history_exec=self.history_exec,
-            history_steps=self.history_steps,
+            history_exec=history_exec,  # type: ignore
+            history_steps=history_steps,  # type: ignore
             metrics=self.metrics,
             backtest_data=self.backtest_data,
             ticks_per_step=self.ticks_per_step,
@@ -220,18 +250,20 @@ class SingleAssetOrderExecutionSimple(Simulator[Order, SAOEState, float]):
     def done(self) -> bool:
         return self.position < EPS or self.cur_time >= self.order.end_time
 
-    def _next_time(self) -> pd.Timestamp:
-        """The "current time" (``cur_time``) for next step."""
-        # Look for next time on time index
-        current_loc = self.ticks_index.get_loc(self.cur_time)
-        next_loc = current_loc + self.ticks_per_step
+    def _next_loc(self) -> int:
+        """The location of next step's ``cur_time`` on time index, which could be out of the order."""
+        next_loc = self._cur_loc + self.ticks_per_step
 
         # Calibrate the next location to multiple of ticks_per_step.
         # This is to make sure that:
         # as long as ticks_per_step is a multiple of something, each step won't cross morning and afternoon.
-        next_loc = next_loc - next_loc % self.ticks_per_step
+        return next_loc - next_loc % self.ticks_per_step
 
-        if next_loc < len(self.ticks_index) and self.ticks_index[next_loc] < self.order.end_time:
+    def _next_time(self) -> pd.Timestamp:
+        """The "current time" (``cur_time``) for next step."""
+        # Ticks before ``end_loc`` are exactly those earlier than the end time of the order
+        next_loc = self._next_loc()
+        if next_loc < self._end_loc:
             return self.ticks_index[next_loc]
         else:
             return self.order.end_time
@@ -245,11 +277,12 @@ class SingleAssetOrderExecutionSimple(Simulator[Order, SAOEState, float]):
         Split the volume in each step into minutes, considering possible constraints.
         This follows TWAP strategy.
         """
-        next_time = self._next_time()
+        next_loc = self._next_loc()
+        stop = min(next_loc, self._end_loc)
 
         # get the backtest data for next interval
-        self.market_vol = self.backtest_data.get_volume().loc[self.cur_time : next_time - EPS_T].to_numpy()
-        self.market_price = self.backtest_data.get_deal_price().loc[self.cur_time : next_time - EPS_T].to_numpy()
+        self.market_vol = self._market_vol[self._cur_loc : stop]
+        self.market_price = self._market_price[self._cur_loc : stop]
 
         assert self.market_vol is not None and self.market_price is not None
 
@@ -261,7 +294,7 @@ class SingleAssetOrderExecutionSimple(Simulator[Order, SAOEState, float]):
         exec_vol = np.minimum(exec_vol, market_vol_limit)  # type: ignore
 
         # Complete all the order amount at the last moment.
-        if next_time >= self.order.end_time:
+        if next_loc >= self._end_loc:
             exec_vol[-1] += self.position - exec_vol.sum()
             exec_vol = np.minimum(exec_vol, market_vol_limit)  # type: ignore
 
@@ -300,17 +333,40 @@ class SingleAssetOrderExecutionSimple(Simulator[Order, SAOEState, float]):
             pa=price_advantage(exec_avg_price, self.twap_price, self.order.direction),
         )
 
-    def _get_ticks_slice(self, start: pd.Timestamp, end: pd.Timestamp, include_end: bool = False) -> pd.DatetimeIndex:
-        if not include_end:
-            end = end - EPS_T
-        return self.ticks_index[self.ticks_index.slice_indexer(start, end)]
-
-    @staticmethod
-    def _dataframe_append(df: pd.DataFrame, other: Any) -> pd.DataFrame:
-        # dataframe.append is deprecated
-        other_df = pd.DataFrame(other).set_index("datetime")
-        other_df.index.name = "datetime"
-        return pd.concat([df, other_df], axis=0)
+    def _history_dtypes(self) -> Tuple[np.dtype, np.dtype]:
+        """Dtypes of the records of ``history_exec`` and ``history_steps``.
+        The fields are those of :class:`SAOEMetrics`, except for ``stock_id`` and ``direction``."""
+        vol_dtype, price_dtype = self._market_vol.dtype, self._market_price.dtype
+        # e.g., the mean of float32 prices, or the price advantage computed with them, is still float32
+        float_price_dtype = np.promote_types(price_dtype, np.float32)
+        exec_dtypes = {"market_volume": vol_dtype, "market_price": price_dtype, "trade_price": price_dtype}
+        exec_dtypes["pa"] = float_price_dtype
+        steps_dtypes = {"market_volume": vol_dtype, "market_price": float_price_dtype}
+
+        fields = [
+            k for k in SAOEMetrics.__annotations__ if k not in ("stock_id", "direction")
+        ]  # pylint: disable=no-member
+        return tuple(  # type: ignore
+            np.dtype([(k, "M8[ns]" if k == "datetime" else dtypes.get(k, np.float64)) for k in fields])
+            for dtypes in (exec_dtypes, steps_dtypes)
+        )
+
+    def _append_step(self, metrics: SAOEMetrics) -> None:
+        record = self._steps_records[self._n_steps]
+        for name in record.dtype.names:
+            record[name] = metrics[name].to_datetime64() if name == "datetime" else metrics[name]  # type: ignore
+        self._n_steps += 1
+
+    def _history(self, name: str, length: int) -> pd.DataFrame:
+        """Build (and cache) the dataframe of the first ``length`` records of a history."""
+        key = (name, length)
+        if key not in self._history_cache:
+            records = (self._exec_records if name == "exec" else self._steps_records)[:length]
+            columns = {"stock_id": self.order.stock_id, "direction": self.order.direction}
+            columns.update({k: records[k] for k in records.dtype.names if k != "datetime"})
+            index = pd.DatetimeIndex(records["datetime"], name="datetime")
+            self._history_cache[key] = pd.DataFrame(columns, index=index)
+        return self._history_cache[key]
 
 
 def price_advantage(
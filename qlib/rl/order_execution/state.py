@@ -4,7 +4,7 @@
 from __future__ import annotations
 
 import typing
-from typing import NamedTuple, Optional
+from typing import List, NamedTuple, Optional
 
 import numpy as np
 import pandas as pd
@@ -99,3 +99,42 @@ class SAOEState(NamedTuple):
     """Trading ticks in all day, NOT sliced by order (defined in data). e.g., [9:30, 9:31, ..., 14:59]."""
     ticks_for_order: pd.DatetimeIndex
     """Trading ticks sliced by order, e.g., [9:45, 9:46, ..., 14:44]."""
+
+
+class SAOEBatchState(NamedTuple):
+    """Data structure holding the states of all the slots of
+    :class:`~qlib.rl.order_execution.BatchSingleAssetOrderExecutionSimple`,
+    or of all the orders of :class:`~qlib.rl.order_execution.SAOEBatchStateAdapter`.
+
+    The arrays are indexed by slots. The fields are what the batched interpreters and rewards need,
+    which are (mostly) the array counterparts of the fields of :class:`SAOEState`.
+    """
+
+    orders: List[Optional[Order]]
+    """The orders of the slots. None if a slot has never been reset."""
+    ticks_index: List[Optional[pd.DatetimeIndex]]
+    """Trading ticks in all day of the orders."""
+    ticks_per_step: int
+    """How many ticks for each step."""
+    cur_step: np.ndarray
+    """Current step."""
+    cur_tick: np.ndarray
+    """Number of ticks (in ``ticks_index``) earlier than current time."""
+    position: np.ndarray
+    """Current remaining volume to execute."""
+    amount: np.ndarray
+    """Amount of the orders."""
+    direction: np.ndarray
+    """Direction of the orders."""
+    n_ticks_for_order: np.ndarray
+    """Number of ticks available for trading (i.e., length of ``ticks_for_order`` of :class:`SAOEState`)."""
+    position_history: np.ndarray
+    """The order amount, followed by the position after each step. Padded with zeros."""
+    last_amount: np.ndarray
+    """The amount intended to trade in the latest step."""
+    last_pa: np.ndarray
+    """The price advantage of the latest step."""
+    last_exec: np.ndarray
+    """The deal amount at every tick of the latest step, padded with zeros to ``ticks_per_step``."""
+    metrics: List[Optional[SAOEMetrics]]
+    """Daily metric of each slot, only available when the trading is in "done" state."""
@@ -4,6 +4,8 @@
 from __future__ import annotations
 
 import collections
+import warnings
+from functools import partial
 from types import GeneratorType
 from typing import Any, Callable, cast, Dict, Generator, List, Optional, Tuple, Union
 
@@ -21,7 +23,9 @@ from qlib.backtest.utils import LevelInfrastructure, get_start_end_idx
 from qlib.constant import EPS, ONE_MIN, REG_CN
 from qlib.rl.data.native import IntradayBacktestData, load_backtest_data
 from qlib.rl.interpreter import ActionInterpreter, StateInterpreter
-from qlib.rl.order_execution.state import SAOEMetrics, SAOEState
+from qlib.rl.order_execution.simulator_batch import _batch_price_advantage
+from qlib.rl.order_execution.simulator_simple import _LazyHistorySAOEState
+from qlib.rl.order_execution.state import SAOEBatchState, SAOEMetrics, SAOEState
 from qlib.rl.order_execution.utils import dataframe_append, price_advantage
 from qlib.strategy.base import RLStrategy
 from qlib.utils import init_instance_by_config
@@ -287,8 +291,314 @@ class SAOEStateAdapter:
         )
 
 
+class _SAOEOrderStateView:
+    """Per-order view of :class:`SAOEBatchStateAdapter`, with the same interfaces as :class:`SAOEStateAdapter`.
+    It's what ``SAOEStrategy.adapter_dict`` holds when the batch state is enabled."""
+
+    def __init__(self, batch_adapter: SAOEBatchStateAdapter, index: int) -> None:
+        self.batch_adapter = batch_adapter
+        self.index = index
+        self.order = batch_adapter.orders[index]
+        self.backtest_data = batch_adapter.backtest_data[index]
+        self.ticks_per_step = batch_adapter.ticks_per_step
+
+    @property
+    def position(self) -> float:
+        return float(self.batch_adapter.position[self.index])
+
+    @property
+    def twap_price(self) -> float:
+        return float(self.batch_adapter.twap_price[self.index])
+
+    @property
+    def metrics(self) -> Optional[SAOEMetrics]:
+        return self.batch_adapter.metrics[self.index]
+
+    @property
+    def history_exec(self) -> pd.DataFrame:
+        return self.batch_adapter.history("exec", self.index)
+
+    @property
+    def history_steps(self) -> pd.DataFrame:
+        return self.batch_adapter.history("steps", self.index)
+
+    @property
+    def saoe_state(self) -> SAOEState:
+        return self.batch_adapter.get_saoe_state(self.index)
+
+
+class SAOEBatchStateAdapter:
+    """Array-based counterpart of :class:`SAOEStateAdapter`, which maintains the states of all the orders
+    in a trade decision at once.
+
+    The market price and volume of the day of each order are queried from the exchange once, when the adapter is
+    created. In each step, the execution results of all the orders are gathered into a ``(orders, ticks)`` matrix,
+    and the histories are written into numpy record arrays, so that the cost of a step is dominated by numpy
+    rather than by per-order pandas operations. ``history_exec`` and ``history_steps`` of an order are built
+    only when they are accessed (e.g., in :meth:`get_saoe_state`).
+    The states of all orders can be retrieved as a :class:`~qlib.rl.order_execution.state.SAOEBatchState`,
+    which can be fed to ``interpret_batch`` of the interpreters.
+
+    The values are the same as those of :class:`SAOEStateAdapter`.
+    """
+
+    def __init__(
+        self,
+        orders: List[Order],
+        trade_decision: BaseTradeDecision,
+        executor: BaseExecutor,
+        exchange: Exchange,
+        ticks_per_step: int,
+        backtest_data: List[IntradayBacktestData],
+    ) -> None:
+        assert len(orders) == len(backtest_data)
+
+        self.orders = orders
+        self.executor = executor
+        self.exchange = exchange
+        self.backtest_data = backtest_data
+        self.ticks_per_step = ticks_per_step
+        self.start_idx, _ = get_start_end_idx(self.executor.trade_calendar, trade_decision)
+        self.order_loc = {order.key_by_day: i for i, order in enumerate(orders)}
+
+        n_orders = len(orders)
+        n_ticks = max((len(data.ticks_index) for data in backtest_data), default=0)
+
+        self.amount = np.array([order.amount for order in orders], dtype=float)
+        self.direction = np.array([order.direction for order in orders], dtype=np.int64)
+        self.twap_price = np.array([data.get_deal_price().mean() for data in backtest_data], dtype=float)
+        self.position = self.amount.copy()
+        self.metrics: List[Optional[SAOEMetrics]] = [None] * n_orders
+
+        # market data of the days of the orders, padded with nan
+        self._market_price = np.full((n_orders, n_ticks), np.nan)
+        self._market_volume = np.full((n_orders, n_ticks), np.nan)
+        # current time is ``ticks_index[cur_loc]``, or ``order.end_time`` if ``cur_loc`` reaches ``end_loc``
+        self._cur_loc = np.zeros(n_orders, dtype=np.int64)
+        self._end_loc = np.zeros(n_orders, dtype=np.int64)
+        for i, (order, data) in enumerate(zip(orders, backtest_data)):
+            ticks_index = data.ticks_index
+            self._market_price[i, : len(ticks_index)] = self._fetch_market_data(order, ticks_index, "deal_price")
+            self._market_volume[i, : len(ticks_index)] = self._fetch_market_data(order, ticks_index, "volume")
+            self._cur_loc[i] = ticks_index.searchsorted(max(data.ticks_for_order[0], order.start_time))
+            self._end_loc[i] = ticks_index.searchsorted(order.end_time)
+
+        # Each tick is executed in at most one step, and each step takes at least one tick.
+        self._exec_records = np.zeros((n_orders, n_ticks), dtype=self._history_dtype())
+        self._steps_records = np.zeros((n_orders, n_ticks), dtype=self._history_dtype())
+        self._n_exec = self._n_steps = 0
+        self._history_cache: Dict[Tuple[str, int, int], pd.DataFrame] = {}
+
+        self.position_history = np.zeros((n_orders, n_ticks + 1))
+        self.position_history[:, 0] = self.amount
+        self.last_amount = np.zeros(n_orders)
+        self.last_pa = np.zeros(n_orders)
+        self.last_exec = np.zeros((n_orders, ticks_per_step))
+
+    def _fetch_market_data(self, order: Order, ticks_index: pd.DatetimeIndex, field: str) -> np.ndarray:
+        if field == "deal_price":
+            data = self.exchange.get_deal_price(
+                order.stock_id, ticks_index[0], ticks_index[-1], method=None, direction=order.direction
+            )
+        else:
+            data = self.exchange.get_volume(order.stock_id, ticks_index[0], ticks_index[-1], method=None)
+        values = np.array(cast(IndexData, data), dtype=float).reshape(-1)
+        assert len(values) == len(ticks_index), f"Market data of {order} doesn't match the ticks of the day"
+        return values
+
+    def update(
+        self,
+        execute_result: Optional[list],
+        last_step_range: Tuple[int, int],
+    ) -> None:
+        """Update the states of all the orders with the execution results of all the orders in the last step."""
+        start, stop = last_step_range[0], last_step_range[1] + 1
+
+        exec_vol = np.zeros((len(self.orders), stop - start))
+        for order, _, __, ___ in execute_result or []:
+            idx, _ = get_day_min_idx_range(order.start_time, order.end_time, "1min", REG_CN)
+            exec_vol[self.order_loc[order.key_by_day], idx - start] = order.deal_amount
+
+        exec_sum = exec_vol.sum(axis=1)
+        too_large = (exec_sum > self.position) & (exec_sum > 0.0)
+        if too_large.any():
+            assert (exec_sum[too_large] < self.position[too_large] + 1).all(), f"{exec_vol[too_large]} too large"
+            exec_vol[too_large] *= (self.position[too_large] / exec_sum[too_large])[:, None]
+            exec_sum = exec_vol.sum(axis=1)
+
+        # fill the missing data with the median of the step, as ``fill_missing_data`` does
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)  # all-nan steps are left as nan
+            market_price = self._market_price[:, start:stop]
+            market_price = np.where(np.isnan(market_price), np.nanmedian(market_price, axis=1)[:, None], market_price)
+            market_volume = self._market_volume[:, start:stop]
+            market_volume = np.where(
+                np.isnan(market_volume), np.nanmedian(market_volume, axis=1)[:, None], market_volume
+            )
+
+        # the price advantage of the current level executor is shared by all the orders
+        current_df = self.executor.trade_account.get_trade_indicator().generate_trade_indicators_dataframe()
+
+        self._history_cache.clear()
+        records = self._exec_records[:, self._n_exec : self._n_exec + exec_vol.shape[1]]
+        for i, data in enumerate(self.backtest_data):
+            records["datetime"][i] = data.ticks_index.values[start:stop]
+        records["market_volume"] = market_volume
+        records["market_price"] = market_price
+        records["amount"] = exec_vol
+        records["inner_amount"] = exec_vol
+        records["deal_amount"] = exec_vol
+        records["trade_price"] = market_price
+        records["trade_value"] = market_price * exec_vol
+        records["position"] = self.position[:, None] - np.cumsum(exec_vol, axis=1)
+        records["ffr"] = exec_vol / self.amount[:, None]
+        records["pa"] = current_df.iloc[-1]["pa"]
+        self._n_exec += exec_vol.shape[1]
+
+        trade_value = (market_price * exec_vol).sum(axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            exec_avg_price = np.where(np.abs(exec_sum) < EPS, 0.0, trade_value / exec_sum)
+        pa = _batch_price_advantage(exec_avg_price, self.twap_price, self.direction)
+
+        record = self._steps_records[:, self._n_steps]
+        record["datetime"] = [time.to_datetime64() for time in self._cur_time()]
+        record["market_volume"] = market_volume.sum(axis=1)
+        record["market_price"] = market_price.mean(axis=1)
+        record["amount"] = exec_sum
+        record["inner_amount"] = exec_sum
+        record["deal_amount"] = exec_sum
+        record["trade_price"] = exec_avg_price
+        record["trade_value"] = trade_value
+        record["position"] = self.position - exec_sum
+        record["ffr"] = exec_sum / self.amount
+        record["pa"] = pa
+        self._n_steps += 1
+
+        # Do this at the end
+        self.position = self.position - exec_sum
+        self.position_history[:, self._n_steps] = self.position
+        self.last_amount = exec_sum
+        self.last_pa = pa
+        self.last_exec = np.zeros_like(self.last_exec)
+        n_last = min(exec_vol.shape[1], self.ticks_per_step)
+        self.last_exec[:, :n_last] = exec_vol[:, :n_last]
+
+        next_loc = self._cur_loc + self.ticks_per_step
+        next_loc -= next_loc % self.ticks_per_step
+        self._cur_loc = np.minimum(next_loc, self._end_loc)
+
+    def generate_metrics_after_done(self) -> None:
+        """Generate metrics of all the orders once the upper level execution is done"""
+        records = self._exec_records[:, : self._n_exec]
+        deal_amount = records["deal_amount"].sum(axis=1)
+        trade_value = (records["market_price"] * records["deal_amount"]).sum(axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            trade_price = np.where(np.abs(deal_amount) < EPS, 0.0, trade_value / deal_amount)
+            market_price = (
+                records["market_price"].mean(axis=1) if self._n_exec > 0 else np.full(len(self.orders), np.nan)
+            )
+        amount = self._steps_records["amount"][:, : self._n_steps].sum(axis=1)
+        pa = _batch_price_advantage(trade_price, self.twap_price, self.direction)
+
+        for i, (order, data) in enumerate(zip(self.orders, self.backtest_data)):
+            self.metrics[i] = SAOEMetrics(
+                stock_id=order.stock_id,
+                datetime=data.ticks_index[0],  # start time
+                direction=order.direction,
+                market_volume=float(records["market_volume"][i].sum()),
+                market_price=float(market_price[i]),
+                amount=float(amount[i]),
+                inner_amount=float(deal_amount[i]),
+                deal_amount=float(deal_amount[i]),  # in this simulator, there's no other restrictions
+                trade_price=float(trade_price[i]),
+                trade_value=float(trade_value[i]),
+                position=float(self.position[i] - deal_amount[i]),
+                ffr=float(deal_amount[i] / order.amount),
+                pa=float(pa[i]),
+            )
+
+    def _cur_time(self) -> List[pd.Timestamp]:
+        return [
+            data.ticks_index[loc] if loc < end_loc else order.end_time
+            for order, data, loc, end_loc in zip(self.orders, self.backtest_data, self._cur_loc, self._end_loc)
+        ]
+
+    @property
+    def cur_step(self) -> int:
+        return self.executor.trade_calendar.get_trade_step() - self.start_idx
+
+    def history(self, name: str, index: int) -> pd.DataFrame:
+        """Build (and cache) the dataframe of ``history_exec`` (``name == "exec"``) or ``history_steps``
+        (``name == "steps"``) of the ``index``-th order. See :class:`SAOEStateAdapter` for the columns."""
+        length = self._n_exec if name == "exec" else self._n_steps
+        key = (name, index, length)
+        if key not in self._history_cache:
+            records = (self._exec_records if name == "exec" else self._steps_records)[index, :length]
+            order = self.orders[index]
+            columns = {"stock_id": order.stock_id, "direction": order.direction}
+            columns.update({k: records[k] for k in records.dtype.names if k != "datetime"})
+            index_ = pd.DatetimeIndex(records["datetime"], name="datetime")
+            self._history_cache[key] = pd.DataFrame(columns, index=index_)
+        return self._history_cache[key]
+
+    def get_saoe_state(self, index: int) -> SAOEState:
+        """The :class:`SAOEState` of the ``index``-th order, whose histories are built lazily."""
+        data = self.backtest_data[index]
+        history_exec: Callable[[], pd.DataFrame] = partial(self.history, "exec", index)
+        history_steps: Callable[[], pd.DataFrame] = partial(self.history, "steps", index)
+        return _LazyHistorySAOEState(
+            order=self.orders[index],
+            cur_time=self._cur_time()[index],
+            cur_step=self.cur_step,
+            position=float(self.position[index]),
+            history_exec=history_exec,  # type: ignore
+            history_steps=history_steps,  # type: ignore
+            metrics=self.metrics[index],
+            backtest_data=data,
+            ticks_per_step=self.ticks_per_step,
+            ticks_index=data.ticks_index,
+            ticks_for_order=data.ticks_for_order,
+        )
+
+    @property
+    def saoe_batch_state(self) -> SAOEBatchState:
+        return SAOEBatchState(
+            orders=cast(List[Optional[Order]], self.orders),
+            ticks_index=[data.ticks_index for data in self.backtest_data],
+            ticks_per_step=self.ticks_per_step,
+            cur_step=np.full(len(self.orders), self.cur_step, dtype=np.int64),
+            cur_tick=self._cur_loc,
+            position=self.position,
+            amount=self.amount,
+            direction=self.direction,
+            n_ticks_for_order=np.array([len(data.ticks_for_order) for data in self.backtest_data], dtype=np.int64),
+            position_history=self.position_history,
+            last_amount=self.last_amount,
+            last_pa=self.last_pa,
+            last_exec=self.last_exec,
+            metrics=self.metrics,
+        )
+
+    @staticmethod
+    def _history_dtype() -> np.dtype:
+        """Dtype of the records of ``history_exec`` and ``history_steps``.
+        The fields are those of :class:`SAOEMetrics`, except for ``stock_id`` and ``direction``."""
+        fields = [
+            k for k in SAOEMetrics.__annotations__ if k not in ("stock_id", "direction")
+        ]  # pylint: disable=no-member
+        return np.dtype([(k, "M8[ns]" if k == "datetime" else np.float64) for k in fields])
+
+
 class SAOEStrategy(RLStrategy):
-    """RL-based strategies that use SAOEState as state."""
+    """RL-based strategies that use SAOEState as state.
+
+    Parameters
+    ----------
+    batch_state
+        Whether to maintain the states of all the orders with one :class:`SAOEBatchStateAdapter`,
+        instead of one :class:`SAOEStateAdapter` per order. It's much faster when there are lots of orders
+        in the outer trade decision. ``adapter_dict`` and ``get_saoe_state_by_order`` work in both ways.
+    """
 
     def __init__(
         self,
@@ -296,6 +606,7 @@ class SAOEStrategy(RLStrategy):
         outer_trade_decision: BaseTradeDecision = None,
         level_infra: LevelInfrastructure = None,
         common_infra: CommonInfrastructure = None,
+        batch_state: bool = False,
         **kwargs: Any,
     ) -> None:
         super(SAOEStrategy, self).__init__(
@@ -306,7 +617,9 @@ class SAOEStrategy(RLStrategy):
             **kwargs,
         )
 
-        self.adapter_dict: Dict[tuple, SAOEStateAdapter] = {}
+        self.batch_state = batch_state
+        self.adapter_dict: Dict[tuple, SAOEStateAdapter | _SAOEOrderStateView] = {}
+        self.batch_adapter: Optional[SAOEBatchStateAdapter] = None
         self._last_step_range = (0, 0)
 
     def _create_qlib_backtest_adapter(
@@ -326,10 +639,26 @@ class SAOEStrategy(RLStrategy):
             backtest_data=backtest_data,
         )
 
+    def _create_qlib_backtest_batch_adapter(
+        self,
+        orders: List[Order],
+        trade_decision: BaseTradeDecision,
+        trade_range: TradeRange,
+    ) -> SAOEBatchStateAdapter:
+        return SAOEBatchStateAdapter(
+            orders=orders,
+            trade_decision=trade_decision,
+            executor=self.executor,
+            exchange=self.trade_exchange,
+            ticks_per_step=int(pd.Timedelta(self.trade_calendar.get_freq()) / ONE_MIN),
+            backtest_data=[load_backtest_data(order, self.trade_exchange, trade_range) for order in orders],
+        )
+
     def reset(self, outer_trade_decision: BaseTradeDecision = None, **kwargs: Any) -> None:
         super(SAOEStrategy, self).reset(outer_trade_decision=outer_trade_decision, **kwargs)
 
         self.adapter_dict = {}
+        self.batch_adapter = None
         self._last_step_range = (0, 0)
 
         if outer_trade_decision is not None and not outer_trade_decision.empty():
@@ -337,6 +666,16 @@ class SAOEStrategy(RLStrategy):
             assert trade_range is not None
 
             self.adapter_dict = {}
+            if self.batch_state:
+                # the last one wins if several orders share the same key, as the per-order adapters do
+                orders = {cast(Order, d).key_by_day: cast(Order, d) for d in outer_trade_decision.get_decision()}
+                self.batch_adapter = self._create_qlib_backtest_batch_adapter(
+                    list(orders.values()), outer_trade_decision, trade_range
+                )
+                for i, key in enumerate(orders):
+                    self.adapter_dict[key] = _SAOEOrderStateView(self.batch_adapter, i)
+                return
+
             for decision in outer_trade_decision.get_decision():
                 order = cast(Order, decision)
                 self.adapter_dict[order.key_by_day] = self._create_qlib_backtest_adapter(
@@ -347,6 +686,10 @@ class SAOEStrategy(RLStrategy):
         return self.adapter_dict[order.key_by_day].saoe_state
 
     def post_upper_level_exe_step(self) -> None:
+        if self.batch_adapter is not None:
+            self.batch_adapter.generate_metrics_after_done()
+            return
+
         for adapter in self.adapter_dict.values():
             adapter.generate_metrics_after_done()
 
@@ -356,6 +699,10 @@ class SAOEStrategy(RLStrategy):
             assert not execute_result
             return
 
+        if self.batch_adapter is not None:
+            self.batch_adapter.update(execute_result, self._last_step_range)
+            return
+
         results = collections.defaultdict(list)
         if execute_result is not None:
             for e in execute_result:
@@ -428,8 +775,63 @@ class ProxySAOEStrategy(SAOEStrategy):
             self._order = order_list[0]
 
 
+def init_policy(
+    policy: dict | BasePolicy,
+    state_interpreter: StateInterpreter,
+    action_interpreter: ActionInterpreter,
+    network: dict | torch.nn.Module | None = None,
+) -> BasePolicy:
+    """Create the policy of an RL strategy.
+
+    Parameters
+    ----------
+    policy
+        Policy, or the config of the policy. The observation / action spaces and the network are filled into
+        the config.
+    state_interpreter
+        State interpreter, which provides the observation space.
+    action_interpreter
+        Action interpreter, which provides the action space.
+    network
+        Network, or the config of the network. Required if ``policy`` is a config.
+
+    Returns
+    -------
+        The policy.
+    """
+    if isinstance(policy, dict):
+        assert network is not None
+
+        if isinstance(network, dict):
+            network["kwargs"].update(
+                {
+                    "obs_space": state_interpreter.observation_space,
+                }
+            )
+            network_inst = init_instance_by_config(network)
+        else:
+            network_inst = network
+
+        policy["kwargs"].update(
+            {
+                "obs_space": state_interpreter.observation_space,
+                "action_space": action_interpreter.action_space,
+                "network": network_inst,
+            }
+        )
+        return init_instance_by_config(policy)
+    elif isinstance(policy, BasePolicy):
+        return policy
+    else:
+        raise ValueError(f"Unsupported policy type: {type(policy)}.")
+
+
 class SAOEIntStrategy(SAOEStrategy):
-    """(SAOE)state based strategy with (Int)preters."""
+    """(SAOE)state based strategy with (Int)preters.
+
+    With ``batch_state=True``, the observations and the actions of all the orders are interpreted with
+    ``interpret_batch`` of the interpreters, which must support :class:`SAOEBatchState`.
+    """
 
     def __init__(
         self,
@@ -440,6 +842,7 @@ class SAOEIntStrategy(SAOEStrategy):
         outer_trade_decision: BaseTradeDecision = None,
         level_infra: LevelInfrastructure = None,
         common_infra: CommonInfrastructure = None,
+        batch_state: bool = False,
         **kwargs: Any,
     ) -> None:
         super(SAOEIntStrategy, self).__init__(
@@ -447,6 +850,7 @@ class SAOEIntStrategy(SAOEStrategy):
             outer_trade_decision=outer_trade_decision,
             level_infra=level_infra,
             common_infra=common_infra,
+            batch_state=batch_state,
             **kwargs,
         )
 
@@ -459,31 +863,7 @@ class SAOEIntStrategy(SAOEStrategy):
             accept_types=ActionInterpreter,
         )
 
-        if isinstance(policy, dict):
-            assert network is not None
-
-            if isinstance(network, dict):
-                network["kwargs"].update(
-                    {
-                        "obs_space": self._state_interpreter.observation_space,
-                    }
-                )
-                network_inst = init_instance_by_config(network)
-            else:
-                network_inst = network
-
-            policy["kwargs"].update(
-                {
-                    "obs_space": self._state_interpreter.observation_space,
-                    "action_space": self._action_interpreter.action_space,
-                    "network": network_inst,
-                }
-            )
-            self._policy = init_instance_by_config(policy)
-        elif isinstance(policy, BasePolicy):
-            self._policy = policy
-        else:
-            raise ValueError(f"Unsupported policy type: {type(policy)}.")
+        self._policy = init_policy(policy, self._state_interpreter, self._action_interpreter, network)
 
         if self._policy is not None:
             self._policy.eval()
@@ -509,6 +889,25 @@ class SAOEIntStrategy(SAOEStrategy):
         return pd.DataFrame.from_records(trade_details)
 
     def _generate_trade_decision(self, execute_result: list = None) -> BaseTradeDecision:
+        if self.batch_adapter is not None:
+            act, exec_vols = self._generate_exec_vols_batch()
+        else:
+            act, exec_vols = self._generate_exec_vols()
+
+        oh = self.trade_exchange.get_order_helper()
+        order_list = []
+        for decision, exec_vol in zip(self.outer_trade_decision.get_decision(), exec_vols):
+            if exec_vol != 0:
+                order = cast(Order, decision)
+                order_list.append(oh.create(order.stock_id, exec_vol, order.direction))
+
+        return TradeDecisionWithDetails(
+            order_list=order_list,
+            strategy=self,
+            details=self._generate_trade_details(act, exec_vols),
+        )
+
+    def _generate_exec_vols(self) -> Tuple[np.ndarray, List[float]]:
         states = []
         obs_batch = []
         for decision in self.outer_trade_decision.get_decision():
@@ -522,16 +921,19 @@ class SAOEIntStrategy(SAOEStrategy):
             policy_out = self._policy(Batch(obs_batch))
         act = policy_out.act.numpy() if torch.is_tensor(policy_out.act) else policy_out.act
         exec_vols = [self._action_interpreter.interpret(s, a) for s, a in zip(states, act)]
-
-        oh = self.trade_exchange.get_order_helper()
-        order_list = []
-        for decision, exec_vol in zip(self.outer_trade_decision.get_decision(), exec_vols):
-            if exec_vol != 0:
-                order = cast(Order, decision)
-                order_list.append(oh.create(order.stock_id, exec_vol, order.direction))
-
-        return TradeDecisionWithDetails(
-            order_list=order_list,
-            strategy=self,
-            details=self._generate_trade_details(act, exec_vols),
+        return act, exec_vols
+
+    def _generate_exec_vols_batch(self) -> Tuple[np.ndarray, List[float]]:
+        """Interpret the states of all the orders, and run the policy, in one batch."""
+        assert self.batch_adapter is not None
+        state = self.batch_adapter.saoe_batch_state
+        ids = np.array(
+            [self.batch_adapter.order_loc[cast(Order, d).key_by_day] for d in self.outer_trade_decision.get_decision()]
         )
+
+        obs = self._state_interpreter.interpret_batch(state, ids)
+        with torch.no_grad():
+            policy_out = self._policy(Batch(obs=obs))
+        act = policy_out.act.numpy() if torch.is_tensor(policy_out.act) else policy_out.act
+        exec_vols = self._action_interpreter.interpret_batch(state, ids, np.asarray(act))
+        return act, exec_vols.tolist()
@@ -5,10 +5,12 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING, Any, Dict, Generic, Optional, Tuple, TypeVar
 
+import numpy as np
+
 from qlib.typehint import final
 
 if TYPE_CHECKING:
-    from .utils.env_wrapper import EnvWrapper
+    from .utils.env_wrapper import BatchEnvWrapper, EnvWrapper
 
 SimulatorState = TypeVar("SimulatorState")
 
@@ -20,7 +22,7 @@ class Reward(Generic[SimulatorState]):
     Subclass should implement ``reward(simulator_state)`` to implement their own reward calculation recipe.
     """
 
-    env: Optional[EnvWrapper] = None
+    env: Optional[EnvWrapper | BatchEnvWrapper] = None
 
     @final
     def __call__(self, simulator_state: SimulatorState) -> float:
@@ -30,10 +32,21 @@ class Reward(Generic[SimulatorState]):
         """Implement this method for your own reward."""
         raise NotImplementedError("Implement reward calculation recipe in `reward()`.")
 
+    def reward_batch(self, simulator_state: Any, ids: np.ndarray) -> np.ndarray:
+        """Implement this method to compute the rewards of the slots ``ids`` of a
+        :class:`~qlib.rl.simulator.BatchSimulator` in one call."""
+        raise NotImplementedError(f"{self.__class__.__name__} doesn't support batch simulators.")
+
     def log(self, name: str, value: Any) -> None:
         assert self.env is not None
         self.env.logger.add_scalar(name, value)
 
+    def log_batch(self, name: str, values: np.ndarray, ids: np.ndarray) -> None:
+        """Log a value for each of the slots ``ids``. Only works with :class:`~qlib.rl.utils.BatchEnvWrapper`."""
+        assert self.env is not None
+        for i, value in zip(ids, values):
+            self.env.loggers[i].add_scalar(name, value)
+
 
 class RewardCombination(Reward):
     """Combination of multiple reward."""
@@ -3,12 +3,14 @@
 
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, Any, Generic, Optional, TypeVar
+from typing import TYPE_CHECKING, Any, Generic, Optional, Sequence, TypeVar
+
+import numpy as np
 
 from .seed import InitialStateType
 
 if TYPE_CHECKING:
-    from .utils.env_wrapper import EnvWrapper
+    from .utils.env_wrapper import BatchEnvWrapper, EnvWrapper
 
 StateType = TypeVar("StateType")
 """StateType stores all the useful data in the simulation process
@@ -73,3 +75,46 @@ class Simulator(Generic[InitialStateType, StateType, ActType]):
         the old one should be destroyed and a new simulator can be created.
         """
         raise NotImplementedError()
+
+
+class BatchSimulator(Generic[InitialStateType, StateType, ActType]):
+    """
+    A fixed number of simulators (called "slots") whose states are stored as arrays,
+    so that all of them can be stepped with one vectorized call.
+
+    It's used with :class:`~qlib.rl.utils.BatchEnvWrapper`, which takes the place of a vector of
+    :class:`~qlib.rl.utils.EnvWrapper`. Unlike :class:`Simulator`, a batch simulator is not ephemeral:
+    when the trajectory of a slot ends, the slot is reset with a new initial state.
+
+    The state returned by ``get_state()`` covers all the slots. It's interpreted by the batched versions of
+    the other components, i.e., :meth:`~qlib.rl.interpreter.StateInterpreter.interpret_batch`,
+    :meth:`~qlib.rl.interpreter.ActionInterpreter.interpret_batch` and :meth:`~qlib.rl.reward.Reward.reward_batch`.
+
+    Attributes
+    ----------
+    size
+        Number of slots.
+    env
+        A reference of the batch env-wrapper. Logs of slot ``i`` can be written into ``env.loggers[i]``.
+    """
+
+    env: Optional[BatchEnvWrapper] = None
+
+    def __init__(self, size: int, **kwargs: Any) -> None:
+        self.size = size
+
+    def reset(self, ids: np.ndarray, initial_states: Sequence[InitialStateType]) -> None:
+        """Start new trajectories in the slots ``ids``, with one initial state for each slot."""
+        raise NotImplementedError()
+
+    def step(self, ids: np.ndarray, actions: np.ndarray) -> None:
+        """Receives the actions of the slots ``ids`` (``actions[k]`` is for ``ids[k]``), and steps them together."""
+        raise NotImplementedError()
+
+    def get_state(self) -> StateType:
+        """The state of all the slots."""
+        raise NotImplementedError()
+
+    def done(self) -> np.ndarray:
+        """A boolean array of length ``size``, indicating whether each slot is in a "done" state."""
+        raise NotImplementedError()
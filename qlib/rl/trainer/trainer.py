@@ -14,7 +14,18 @@ import torch
 
 from qlib.log import get_module_logger
 from qlib.rl.simulator import InitialStateType
-from qlib.rl.utils import EnvWrapper, FiniteEnvType, LogBuffer, LogCollector, LogLevel, LogWriter, vectorize_env
+from qlib.rl.utils import (
+    AsyncLogWriter,
+    BatchEnvWrapper,
+    EnvWrapper,
+    FiniteEnvType,
+    LogBuffer,
+    LogChannel,
+    LogCollector,
+    LogLevel,
+    LogWriter,
+    vectorize_env,
+)
 from qlib.rl.utils.finite_env import FiniteVectorEnv
 from qlib.typehint import Literal
 
@@ -58,8 +69,14 @@ class Trainer:
         without logger, all information will be lost.
     finite_env_type
         Type of finite env implementation.
+        ``batch`` requires the ``batch_simulator_fn`` of the vessel, and the batched methods of the components
+        (see :class:`~qlib.rl.utils.BatchEnvWrapper`).
     concurrency
-        Parallel workers.
+        Parallel workers. For ``batch``, it's the number of slots of the batch simulator.
+    async_logging
+        Send the logs of the env workers via shared memory and files rather than the "info" of steps,
+        and feed them to the loggers in a background thread. See :class:`~qlib.rl.utils.AsyncLogWriter`.
+        The env workers must be forked (the default on Linux), as they inherit the shared memory.
     fast_dev_run
         Create a subset for debugging.
         How this is implemented depends on the implementation of training vessel.
@@ -98,6 +115,7 @@ class Trainer:
         finite_env_type: FiniteEnvType = "subproc",
         concurrency: int = 2,
         fast_dev_run: int | None = None,
+        async_logging: bool = False,
     ):
         self.max_iters = max_iters
         self.val_every_n_iters = val_every_n_iters
@@ -115,6 +133,7 @@ class Trainer:
         self.finite_env_type = finite_env_type
         self.concurrency = concurrency
         self.fast_dev_run = fast_dev_run
+        self.async_logging = async_logging
 
         self.current_stage: Literal["train", "val", "test"] = "train"
 
@@ -274,12 +293,34 @@ class Trainer:
     def venv_from_iterator(self, iterator: Iterable[InitialStateType]) -> FiniteVectorEnv:
         """Create a vectorized environment from iterator and the training vessel."""
 
+        loggers: List[LogWriter] = self.loggers
+        log_channel: LogChannel | None = None
+        if self.async_logging:
+            async_writer = AsyncLogWriter(self.loggers, self.concurrency)
+            loggers, log_channel = [async_writer], async_writer.channel
+
         def env_factory():
             # FIXME: state_interpreter and action_interpreter are stateful (having a weakref of env),
             # and could be thread unsafe.
             # I'm not sure whether it's a design flaw.
             # I'll rethink about this when designing the trainer.
 
+            if self.finite_env_type == "batch":
+                # There's only one env, so the components are not copied.
+                batch_simulator_fn = getattr(self.vessel, "batch_simulator_fn", None)
+                if batch_simulator_fn is None:
+                    raise ValueError("The vessel must have a batch_simulator_fn to use the batch env.")
+                return BatchEnvWrapper(
+                    batch_simulator_fn,
+                    self.concurrency,
+                    self.vessel.state_interpreter,
+                    self.vessel.action_interpreter,
+                    iterator,
+                    self.vessel.reward,
+                    min_loglevel=self._min_loglevel(),
+                    log_channel=log_channel,
+                )
+
             if self.finite_env_type == "dummy":
                 # We could only experience the "threading-unsafe" problem in dummy.
                 state = copy.deepcopy(self.vessel.state_interpreter)
@@ -296,14 +337,14 @@ class Trainer:
                 action,
                 iterator,
                 rew,
-                logger=LogCollector(min_loglevel=self._min_loglevel()),
+                logger=LogCollector(min_loglevel=self._min_loglevel(), channel=log_channel),
             )
 
         return vectorize_env(
             env_factory,
             self.finite_env_type,
             self.concurrency,
-            self.loggers,
+            loggers,
         )
 
     def _metrics_callback(self, on_episode: bool, on_collect: bool, log_buffer: LogBuffer) -> None:
@@ -15,7 +15,7 @@ from qlib.constant import INF
 from qlib.log import get_module_logger
 from qlib.rl.interpreter import ActionInterpreter, ActType, ObsType, PolicyActType, StateInterpreter, StateType
 from qlib.rl.reward import Reward
-from qlib.rl.simulator import InitialStateType, Simulator
+from qlib.rl.simulator import BatchSimulator, InitialStateType, Simulator
 from qlib.rl.utils import DataQueue
 from qlib.rl.utils.finite_env import FiniteVectorEnv
 
@@ -40,6 +40,7 @@ class TrainingVesselBase(Generic[InitialStateType, StateType, ActType, ObsType,
     """
 
     simulator_fn: Callable[[InitialStateType], Simulator[InitialStateType, StateType, ActType]]
+    batch_simulator_fn: Callable[[int], BatchSimulator[InitialStateType, Any, ActType]] | None = None
     state_interpreter: StateInterpreter[StateType, ObsType]
     action_interpreter: ActionInterpreter[StateType, PolicyActType, ActType]
     policy: BasePolicy
@@ -110,6 +111,12 @@ class TrainingVessel(TrainingVesselBase):
     - ``episode_per_iter``: Episodes per collect at training. Can be overridden by fast dev run.
     - ``update_kwargs``: Keyword arguments appearing in ``policy.update``.
       For example, ``dict(repeat=10, batch_size=64)``.
+
+    ``batch_simulator_fn`` (taking the number of slots) is only needed when the trainer uses the ``batch`` env,
+    where it replaces ``simulator_fn``.
+
+    ``data_queue_kwargs`` are passed to the :class:`~qlib.rl.utils.DataQueue` of the initial states,
+    e.g., ``dict(shared_memory=True, readahead=64)`` for initial states bundled with large arrays.
     """
 
     def __init__(
@@ -126,8 +133,11 @@ class TrainingVessel(TrainingVesselBase):
         buffer_size: int = 20000,
         episode_per_iter: int = 1000,
         update_kwargs: Dict[str, Any] = cast(Dict[str, Any], None),
+        batch_simulator_fn: Callable[[int], BatchSimulator[InitialStateType, Any, ActType]] | None = None,
+        data_queue_kwargs: Dict[str, Any] | None = None,
     ):
         self.simulator_fn = simulator_fn  # type: ignore
+        self.batch_simulator_fn = batch_simulator_fn
         self.state_interpreter = state_interpreter
         self.action_interpreter = action_interpreter
         self.policy = policy
@@ -138,27 +148,28 @@ class TrainingVessel(TrainingVesselBase):
         self.buffer_size = buffer_size
         self.episode_per_iter = episode_per_iter
         self.update_kwargs = update_kwargs or {}
+        self.data_queue_kwargs = data_queue_kwargs or {}
 
     def train_seed_iterator(self) -> ContextManager[Iterable[InitialStateType]] | Iterable[InitialStateType]:
         if self.train_initial_states is not None:
             _logger.info("Training initial states collection size: %d", len(self.train_initial_states))
             # Implement fast_dev_run here.
             train_initial_states = self._random_subset("train", self.train_initial_states, self.trainer.fast_dev_run)
-            return DataQueue(train_initial_states, repeat=-1, shuffle=True)
+            return DataQueue(train_initial_states, repeat=-1, shuffle=True, **self.data_queue_kwargs)
         return super().train_seed_iterator()
 
     def val_seed_iterator(self) -> ContextManager[Iterable[InitialStateType]] | Iterable[InitialStateType]:
         if self.val_initial_states is not None:
             _logger.info("Validation initial states collection size: %d", len(self.val_initial_states))
             val_initial_states = self._random_subset("val", self.val_initial_states, self.trainer.fast_dev_run)
-            return DataQueue(val_initial_states, repeat=1)
+            return DataQueue(val_initial_states, repeat=1, **self.data_queue_kwargs)
         return super().val_seed_iterator()
 
     def test_seed_iterator(self) -> ContextManager[Iterable[InitialStateType]] | Iterable[InitialStateType]:
         if self.test_initial_states is not None:
             _logger.info("Testing initial states collection size: %d", len(self.test_initial_states))
             test_initial_states = self._random_subset("test", self.test_initial_states, self.trainer.fast_dev_run)
-            return DataQueue(test_initial_states, repeat=1)
+            return DataQueue(test_initial_states, repeat=1, **self.data_queue_kwargs)
         return super().test_seed_iterator()
 
     def train(self, vector_env: FiniteVectorEnv) -> Dict[str, Any]:
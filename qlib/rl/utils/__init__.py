@@ -2,14 +2,15 @@
 # Licensed under the MIT License.
 
 from .data_queue import DataQueue
-from .env_wrapper import EnvWrapper, EnvWrapperStatus
+from .env_wrapper import BatchEnvWrapper, EnvWrapper, EnvWrapperStatus
 from .finite_env import FiniteEnvType, vectorize_env
-from .log import ConsoleWriter, CsvWriter, LogBuffer, LogCollector, LogLevel, LogWriter
+from .log import AsyncLogWriter, ConsoleWriter, CsvWriter, LogBuffer, LogChannel, LogCollector, LogLevel, LogWriter
 
 __all__ = [
     "LogLevel",
     "DataQueue",
     "EnvWrapper",
+    "BatchEnvWrapper",
     "FiniteEnvType",
     "LogCollector",
     "LogWriter",
@@ -18,4 +19,6 @@ __all__ = [
     "CsvWriter",
     "EnvWrapperStatus",
     "LogBuffer",
+    "LogChannel",
+    "AsyncLogWriter",
 ]
@@ -5,20 +5,99 @@ from __future__ import annotations
 
 import multiprocessing
 import os
+import queue
 import threading
 import time
 import warnings
 from queue import Empty
-from typing import Any, Generator, Generic, Sequence, TypeVar, cast
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Generator,
+    Generic,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+    cast,
+)
+
+import numpy as np
 
 from qlib.log import get_module_logger
 
+if TYPE_CHECKING:
+    from .log import LogCollector
+
 _logger = get_module_logger(__name__)
 
 T = TypeVar("T")
 
 __all__ = ["DataQueue"]
 
+# indices of the statistics shared by the producer and the consumers
+_N_PUT, _N_GET, _PRODUCER_WAIT, _CONSUMER_WAIT = range(4)
+
+# offsets of the arrays in a slot of the ring buffer are aligned to this
+_ALIGNMENT = 64
+
+
+def _split_arrays(obj: Any) -> Tuple[Dict[Any, np.ndarray], Any]:
+    """Split the numpy arrays (that could be stored in shared memory) from a data-point.
+
+    A data-point can be an array (keyed by ``None``), or a dict whose values are partly arrays.
+    The arrays of a dict are replaced by ``None`` in the remaining part. Other data-points don't have any arrays.
+    """
+    if isinstance(obj, np.ndarray) and not obj.dtype.hasobject:
+        return {None: obj}, None
+    if isinstance(obj, dict):
+        arrays = {k: v for k, v in obj.items() if isinstance(v, np.ndarray) and not v.dtype.hasobject}
+        return arrays, {k: None if k in arrays else v for k, v in obj.items()}
+    return {}, obj
+
+
+def _merge_arrays(arrays: Dict[Any, np.ndarray], rest: Any) -> Any:
+    """Inverse of :func:`_split_arrays`."""
+    if None in arrays:
+        return arrays[None]
+    return {k: arrays[k] if k in arrays else v for k, v in rest.items()}
+
+
+class _RingLayout:
+    """Where the arrays of a data-point are stored in a slot of the ring buffer."""
+
+    def __init__(self, arrays: Dict[Any, np.ndarray]) -> None:
+        self.fields: List[Tuple[Any, Tuple[int, ...], np.dtype, int]] = []
+        offset = 0
+        for key, arr in arrays.items():
+            self.fields.append((key, arr.shape, arr.dtype, offset))
+            offset += -(-arr.nbytes // _ALIGNMENT) * _ALIGNMENT
+        self.slot_nbytes = max(offset, _ALIGNMENT)
+
+    def matches(self, arrays: Dict[Any, np.ndarray]) -> bool:
+        return len(arrays) == len(self.fields) and all(
+            key in arrays and arrays[key].shape == shape and arrays[key].dtype == dtype
+            for key, shape, dtype, _ in self.fields
+        )
+
+    def write(self, buffer: np.ndarray, slot: int, arrays: Dict[Any, np.ndarray]) -> None:
+        base = slot * self.slot_nbytes
+        for key, shape, dtype, offset in self.fields:
+            dest = buffer[base + offset : base + offset + arrays[key].nbytes].view(dtype).reshape(shape)
+            dest[...] = arrays[key]
+
+    def read(self, buffer: np.ndarray, slot: int) -> Dict[Any, np.ndarray]:
+        base = slot * self.slot_nbytes
+        arrays = {}
+        for key, shape, dtype, offset in self.fields:
+            nbytes = int(np.prod(shape, dtype=np.int64)) * dtype.itemsize
+            # copy, as the slot will be reused
+            arrays[key] = buffer[base + offset : base + offset + nbytes].view(dtype).reshape(shape).copy()
+        return arrays
+
 
 class DataQueue(Generic[T]):
     """Main process (producer) produces data and stores them in a queue.
@@ -30,6 +109,9 @@ class DataQueue(Generic[T]):
 
     See the documents of :class:`qlib.rl.utils.FiniteVectorEnv` for more background.
 
+    The queue depth and the time the producer and the consumers spend waiting on each other
+    are shared among the processes. See :meth:`log_metrics`.
+
     Parameters
     ----------
     dataset
@@ -42,6 +124,17 @@ class DataQueue(Generic[T]):
         Concurrent workers for data-loading.
     queue_maxsize
         Maximum items to put into queue before it jams.
+    shared_memory
+        Transport the numpy arrays of the data-points through a ring buffer in shared memory
+        (of ``queue_maxsize`` slots), rather than pickling them through the queue.
+        The data-points can be arrays, or dicts whose values are partly arrays (the rest are still pickled).
+        The layout of a slot is inferred from ``dataset[0]``.
+        The data-points whose arrays don't match the layout fall back to be pickled.
+        Only works when the consumers are forked after the queue is created,
+        which is already required by the queue itself.
+    readahead
+        Number of data-points the producer loads ahead in a background thread,
+        so that loading overlaps with waiting for the consumers. 0 to disable.
 
     Examples
     --------
@@ -62,6 +155,8 @@ class DataQueue(Generic[T]):
         shuffle: bool = True,
         producer_num_workers: int = 0,
         queue_maxsize: int = 0,
+        shared_memory: bool = False,
+        readahead: int = 0,
     ) -> None:
         if queue_maxsize == 0:
             if os.cpu_count() is not None:
@@ -75,10 +170,27 @@ class DataQueue(Generic[T]):
         self.repeat: int = repeat
         self.shuffle: bool = shuffle
         self.producer_num_workers: int = producer_num_workers
+        self.readahead: int = readahead
 
         self._activated: bool = False
+        # items are ``(slot, payload)``. ``slot`` is -1 if the item is pickled as a whole in ``payload``.
         self._queue: multiprocessing.Queue = multiprocessing.Queue(maxsize=queue_maxsize)
         self._done = multiprocessing.Value("i", 0)
+        self._stats = multiprocessing.Array("d", 4)
+
+        self._layout: Optional[_RingLayout] = None
+        if shared_memory:
+            arrays, _ = _split_arrays(dataset[0]) if len(dataset) > 0 else ({}, None)
+            if arrays:
+                self._layout = _RingLayout(arrays)
+                self._buffer = multiprocessing.RawArray("B", self._layout.slot_nbytes * queue_maxsize)
+                self._buffer_view = np.frombuffer(self._buffer, dtype=np.uint8)
+                # a slot is taken by the producer (only one thread), and freed by any consumer after reading
+                self._slot_free = multiprocessing.RawArray("b", [1] * queue_maxsize)
+                self._slot_free_view = np.frombuffer(self._slot_free, dtype=np.int8)
+                self._num_free_slots = multiprocessing.Semaphore(queue_maxsize)
+            else:
+                _logger.warning("The data-points have no numpy arrays. Shared memory is not used.")
 
     def __enter__(self) -> DataQueue:
         self.activate()
@@ -95,7 +207,10 @@ class DataQueue(Generic[T]):
                 warnings.warn(f"After {repeat} cleanup, the queue is still not empty.", category=RuntimeWarning)
             while not self._queue.empty():
                 try:
-                    self._queue.get(block=False)
+                    slot, _ = self._queue.get(block=False)
+                    if slot >= 0:
+                        # the producer might be waiting for a free slot
+                        self._free_slot(slot)
                 except Empty:
                     pass
             # Sometimes when the queue gets emptied, more data have already been sent,
@@ -115,15 +230,82 @@ class DataQueue(Generic[T]):
             self._first_get = False
         else:
             timeout = 0.5
+        start = time.perf_counter()
         while True:
             try:
-                return self._queue.get(block=block, timeout=timeout)
+                slot, payload = self._queue.get(block=block, timeout=timeout)
+                break
             except Empty:
                 if self._done.value:
                     raise StopIteration  # pylint: disable=raise-missing-from
+        self._add_stats(_N_GET, _CONSUMER_WAIT, time.perf_counter() - start)
+
+        if slot < 0:
+            return payload
+        assert self._layout is not None
+        arrays = self._layout.read(self._buffer_view, slot)
+        self._free_slot(slot)
+        return _merge_arrays(arrays, payload)
 
     def put(self, obj: Any, block: bool = True, timeout: int = None) -> None:
-        self._queue.put(obj, block=block, timeout=timeout)
+        wait_time = 0.0
+        slot, payload = -1, obj
+        if self._layout is not None:
+            arrays, rest = _split_arrays(obj)
+            if self._layout.matches(arrays):
+                # blocks when all the slots are taken by the items in queue, like the queue does
+                start = time.perf_counter()
+                if not self._num_free_slots.acquire(block, timeout):
+                    raise queue.Full
+                wait_time += time.perf_counter() - start
+                slot = int(np.argmax(self._slot_free_view))
+                self._slot_free_view[slot] = 0
+                self._layout.write(self._buffer_view, slot, arrays)
+                payload = rest
+
+        start = time.perf_counter()
+        try:
+            self._queue.put((slot, payload), block=block, timeout=timeout)
+        except BaseException:
+            if slot >= 0:
+                self._free_slot(slot)
+            raise
+        wait_time += time.perf_counter() - start
+        self._add_stats(_N_PUT, _PRODUCER_WAIT, wait_time)
+
+    @property
+    def depth(self) -> int:
+        """Number of data-points put into the queue but not yet retrieved."""
+        return int(self._stats[_N_PUT] - self._stats[_N_GET])
+
+    @property
+    def producer_wait_time(self) -> float:
+        """Total seconds the producer is blocked because the queue is full."""
+        return self._stats[_PRODUCER_WAIT]
+
+    @property
+    def consumer_wait_time(self) -> float:
+        """Total seconds the consumers are blocked because the queue is empty."""
+        return self._stats[_CONSUMER_WAIT]
+
+    def log_metrics(self, logger: LogCollector, name: str) -> None:
+        """Log the queue depth (``{name}_depth``), and the average seconds the producer and consumers wait
+        per data-point (``{name}_producer_wait`` and ``{name}_consumer_wait``)."""
+        with self._stats.get_lock():
+            n_put, n_get = self._stats[_N_PUT], self._stats[_N_GET]
+            producer_wait, consumer_wait = self._stats[_PRODUCER_WAIT], self._stats[_CONSUMER_WAIT]
+        logger.add_scalar(f"{name}_depth", n_put - n_get)
+        logger.add_scalar(f"{name}_producer_wait", producer_wait / max(n_put, 1))
+        logger.add_scalar(f"{name}_consumer_wait", consumer_wait / max(n_get, 1))
+
+    def _free_slot(self, slot: int) -> None:
+        self._slot_free_view[slot] = 1
+        self._num_free_slots.release()
+
+    def _add_stats(self, count_index: int, wait_index: int, wait_time: float) -> None:
+        with self._stats.get_lock():
+            self._stats[count_index] += 1
+            self._stats[wait_index] += wait_time
 
     def mark_as_done(self) -> None:
         with self._done.get_lock():
@@ -162,24 +344,63 @@ class DataQueue(Generic[T]):
                 return
 
     def _producer(self) -> None:
+        try:
+            for data in self._readahead(self._load()) if self.readahead > 0 else self._load():
+                if self._done.value:
+                    # Already done.
+                    return
+                self.put(data)
+        finally:
+            self.mark_as_done()
+
+    def _load(self) -> Iterator[T]:
         # pytorch dataloader is used here only because we need its sampler and multi-processing
         from torch.utils.data import DataLoader, Dataset  # pylint: disable=import-outside-toplevel
 
-        try:
-            dataloader = DataLoader(
-                cast(Dataset[T], self.dataset),
-                batch_size=None,
-                num_workers=self.producer_num_workers,
-                shuffle=self.shuffle,
-                collate_fn=lambda t: t,  # identity collate fn
-            )
-            repeat = 10**18 if self.repeat == -1 else self.repeat
-            for _rep in range(repeat):
-                for data in dataloader:
-                    if self._done.value:
-                        # Already done.
+        dataloader = DataLoader(
+            cast(Dataset[T], self.dataset),
+            batch_size=None,
+            num_workers=self.producer_num_workers,
+            shuffle=self.shuffle,
+            collate_fn=lambda t: t,  # identity collate fn
+        )
+        repeat = 10**18 if self.repeat == -1 else self.repeat
+        for _rep in range(repeat):
+            for data in dataloader:
+                if self._done.value:
+                    return
+                yield data
+            _logger.debug(f"Dataloader loop done. Repeat {_rep}.")
+
+    def _readahead(self, iterator: Iterator[T]) -> Iterator[T]:
+        """Load up to ``readahead`` data-points in a background thread, ahead of the consumption."""
+        buffer: queue.Queue = queue.Queue(maxsize=self.readahead)
+        end = object()
+
+        def _put(item: Any) -> bool:
+            while not self._done.value:
+                try:
+                    buffer.put(item, timeout=0.5)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+
+        def _loader() -> None:
+            try:
+                for data in iterator:
+                    if not _put((data, None)):
                         return
-                    self._queue.put(data)
-                _logger.debug(f"Dataloader loop done. Repeat {_rep}.")
-        finally:
-            self.mark_as_done()
+            except BaseException as e:  # pylint: disable=broad-except
+                _put((end, e))
+            else:
+                _put((end, None))
+
+        threading.Thread(target=_loader, daemon=True).start()
+        while True:
+            data, exc = buffer.get()
+            if data is end:
+                if exc is not None:
+                    raise exc
+                return
+            yield data
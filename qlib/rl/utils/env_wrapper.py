@@ -4,20 +4,22 @@
 from __future__ import annotations
 
 import weakref
-from typing import Any, Callable, cast, Dict, Generic, Iterable, Iterator, Optional, Tuple
+from typing import Any, Callable, cast, Dict, Generic, Iterable, Iterator, List, Optional, Tuple
 
 import gym
+import numpy as np
 from gym import Space
 
 from qlib.rl.aux_info import AuxiliaryInfoCollector
 from qlib.rl.interpreter import ActionInterpreter, ObsType, PolicyActType, StateInterpreter
 from qlib.rl.reward import Reward
-from qlib.rl.simulator import ActType, InitialStateType, Simulator, StateType
+from qlib.rl.simulator import ActType, BatchSimulator, InitialStateType, Simulator, StateType
 from qlib.typehint import TypedDict
+from .data_queue import DataQueue
 from .finite_env import generate_nan_observation
-from .log import LogCollector, LogLevel
+from .log import LogChannel, LogCollector, LogLevel
 
-__all__ = ["InfoDict", "EnvWrapperStatus", "EnvWrapper"]
+__all__ = ["InfoDict", "EnvWrapperStatus", "EnvWrapper", "BatchEnvWrapper"]
 
 # in this case, there won't be any seed for simulator
 SEED_INTERATOR_MISSING = "_missing_"
@@ -130,6 +132,8 @@ class EnvWrapper(
         else:
             self.seed_iterator = iter(seed_iterator)
         self.reward_fn = reward_fn
+        # to log the metrics of the queue that the seeds come from
+        self._data_queue = seed_iterator if isinstance(seed_iterator, DataQueue) else None
 
         self.aux_info_collector = aux_info_collector
         self.logger: LogCollector = logger or LogCollector()
@@ -239,6 +243,8 @@ class EnvWrapper(
         # Final logging stuff: RL-specific logs
         if done:
             self.logger.add_scalar("steps_per_episode", self.status["cur_step"])
+            if self._data_queue is not None:
+                self._data_queue.log_metrics(self.logger, "data_queue")
         self.logger.add_scalar("reward", rew)
         self.logger.add_any("obs", obs, loglevel=LogLevel.DEBUG)
         self.logger.add_any("policy_act", policy_action, loglevel=LogLevel.DEBUG)
@@ -248,3 +254,183 @@ class EnvWrapper(
 
     def render(self, mode: str = "human") -> None:
         raise NotImplementedError("Render is not implemented in EnvWrapper.")
+
+
+def _unstack(obs: Any, index: int) -> Any:
+    """The ``index``-th observation of stacked observations."""
+    if isinstance(obs, dict):
+        return {k: _unstack(v, index) for k, v in obs.items()}
+    return obs[index, ...]  # a 0-dim array rather than a numpy scalar for 1-dim values
+
+
+class BatchEnvWrapper(Generic[InitialStateType, StateType, ActType, ObsType, PolicyActType]):
+    """The counterpart of :class:`EnvWrapper` for :class:`~qlib.rl.simulator.BatchSimulator`.
+
+    It plays ``size`` environments (called "slots") at once. Rather than calling the components once per
+    environment, the batch simulator steps all the requested slots together, and the batched versions of the
+    components (``interpret_batch`` of the interpreters and ``reward_batch`` of the reward) are called once per step.
+    It's vectorized with ``vectorize_env(..., env_type="batch")``, where every worker is a slot of it,
+    and there is no inter-process communication.
+
+    Auxiliary info collectors are not supported, and the status of the slots only includes
+    ``cur_step`` (no history of observations, actions and rewards).
+
+    Parameters
+    ----------
+    batch_simulator_fn
+        Factory of the batch simulator. It takes the number of slots.
+    size
+        Number of slots.
+    state_interpreter
+        State-observation converter, which must implement ``interpret_batch``.
+    action_interpreter
+        Policy-simulator action converter, which must implement ``interpret_batch``.
+    seed_iterator
+        An iterable of seed, shared by all the slots.
+    reward_fn
+        Reward, which must implement ``reward_batch``.
+    min_loglevel
+        Minimum log level of the log collectors.
+    log_channel
+        Channel of the log collectors, when the vector env logs with :class:`~qlib.rl.utils.AsyncLogWriter`.
+
+    Attributes
+    ----------
+    loggers
+        Log collectors, one for each slot. The logs of a slot are sent back with the return value of its step.
+    cur_step
+        Number of steps of the current trajectory of each slot.
+    """
+
+    simulator: BatchSimulator[InitialStateType, StateType, ActType]
+
+    def __init__(
+        self,
+        batch_simulator_fn: Callable[[int], BatchSimulator[InitialStateType, StateType, ActType]],
+        size: int,
+        state_interpreter: StateInterpreter[StateType, ObsType],
+        action_interpreter: ActionInterpreter[StateType, PolicyActType, ActType],
+        seed_iterator: Iterable[InitialStateType],
+        reward_fn: Reward = None,
+        min_loglevel: int | LogLevel = LogLevel.PERIODIC,
+        log_channel: LogChannel | None = None,
+    ) -> None:
+        # Weak references, for the same reasons as EnvWrapper.
+        for obj in [state_interpreter, action_interpreter, reward_fn]:
+            if obj is not None:
+                obj.env = weakref.proxy(self)  # type: ignore
+
+        self.size = size
+        self.simulator = batch_simulator_fn(size)
+        self.simulator.env = cast(BatchEnvWrapper, weakref.proxy(self))
+        self.state_interpreter = state_interpreter
+        self.action_interpreter = action_interpreter
+        self.seed_iterator: Optional[Iterator[InitialStateType]] = iter(seed_iterator)
+        self.reward_fn = reward_fn
+        self._data_queue = seed_iterator if isinstance(seed_iterator, DataQueue) else None
+
+        self.loggers: List[LogCollector] = [LogCollector(min_loglevel, log_channel) for _ in range(size)]
+        self.cur_step = np.zeros(size, dtype=int)
+        # slots that have got the NaN observation as there is no seed left
+        self._dead = np.zeros(size, dtype=bool)
+        # only the first observation and action are validated, as the batched components are consistent across slots
+        self._obs_validated = self._action_validated = False
+
+        # requests of the workers (see BatchEnvWorker) that haven't been executed, and the results not received yet
+        self._pending: Dict[int, Any] = {}
+        self._results: Dict[int, Any] = {}
+
+    @property
+    def action_space(self) -> Space:
+        return self.action_interpreter.action_space
+
+    @property
+    def observation_space(self) -> Space:
+        return self.state_interpreter.observation_space
+
+    def send(self, index: int, policy_action: Optional[PolicyActType]) -> None:
+        """Request to reset (if ``policy_action`` is None) or step the slot ``index``.
+        The requests are buffered until the result of any of them is received."""
+        self._pending[index] = policy_action
+
+    def recv(self, index: int) -> Any:
+        """Receive the result of the request of the slot ``index``.
+        All the buffered requests are executed together if the result is not ready."""
+        if index not in self._results:
+            pending, self._pending = self._pending, {}
+            reset_ids = [i for i, act in pending.items() if act is None]
+            step_ids = [i for i, act in pending.items() if act is not None]
+            if reset_ids:
+                self._results.update(zip(reset_ids, self.reset(np.array(reset_ids))))
+            if step_ids:
+                actions = np.stack([pending[i] for i in step_ids])
+                self._results.update(zip(step_ids, self.step(np.array(step_ids), actions)))
+        return self._results.pop(index)
+
+    def reset(self, ids: np.ndarray) -> List[ObsType]:
+        """Start new trajectories in the slots ``ids``.
+        The slots that can't get a seed from the (exhausted) seed iterator get the NaN observation."""
+        if self._dead[ids].any():
+            raise RuntimeError("You are trying to get a state from a dead environment wrapper.")
+        for i in ids:
+            self.loggers[i].reset()
+
+        initial_states = []
+        while self.seed_iterator is not None and len(initial_states) < len(ids):
+            try:
+                initial_states.append(next(self.seed_iterator))
+            except StopIteration:
+                self.seed_iterator = None
+
+        seeded, dead = ids[: len(initial_states)], ids[len(initial_states) :]
+        self._dead[dead] = True
+        obs = [generate_nan_observation(self.observation_space) for _ in dead]
+        if len(seeded) > 0:
+            self.simulator.reset(seeded, initial_states)
+            self.cur_step[seeded] = 0
+            stacked_obs = self._interpret(seeded)
+            obs = [_unstack(stacked_obs, k) for k in range(len(seeded))] + obs
+        return obs
+
+    def step(self, ids: np.ndarray, policy_action: np.ndarray) -> List[Tuple[ObsType, float, bool, InfoDict]]:
+        """Step the slots ``ids`` with the stacked policy actions.
+        Returns the ``(obs, reward, done, info)`` of each slot, as what ``EnvWrapper.step`` returns."""
+        if self._dead[ids].any():
+            raise RuntimeError("State queue is already exhausted, but the environment is still receiving action.")
+        for i in ids:
+            self.loggers[i].reset()
+
+        if not self._action_validated:
+            self.action_interpreter.validate(policy_action[0])
+            self._action_validated = True
+        action = self.action_interpreter.interpret_batch(self.simulator.get_state(), ids, policy_action)
+        self.cur_step[ids] += 1
+        self.simulator.step(ids, action)
+        done = self.simulator.done()[ids]
+
+        stacked_obs = self._interpret(ids)
+        if self.reward_fn is not None:
+            rew = self.reward_fn.reward_batch(self.simulator.get_state(), ids)
+        else:
+            rew = np.zeros(len(ids))
+
+        results = []
+        for k, i in enumerate(ids):
+            obs = _unstack(stacked_obs, k)
+            logger = self.loggers[i]
+            if done[k]:
+                logger.add_scalar("steps_per_episode", self.cur_step[i])
+                if self._data_queue is not None:
+                    self._data_queue.log_metrics(logger, "data_queue")
+            logger.add_scalar("reward", rew[k])
+            logger.add_any("obs", obs, loglevel=LogLevel.DEBUG)
+            logger.add_any("policy_act", policy_action[k], loglevel=LogLevel.DEBUG)
+            results.append((obs, float(rew[k]), bool(done[k]), InfoDict(log=logger.logs(), aux_info={})))
+        return results
+
+    def _interpret(self, ids: np.ndarray) -> Any:
+        obs = self.state_interpreter.interpret_batch(self.simulator.get_state(), ids)
+        if not self._obs_validated:
+            self.state_interpreter.validate(_unstack(obs, 0))
+            self._obs_validated = True
+        return obs
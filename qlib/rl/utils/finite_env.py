@@ -11,16 +11,35 @@ from __future__ import annotations
 import copy
 import warnings
 from contextlib import contextmanager
-from typing import Any, Callable, Dict, Generator, List, Optional, Set, Tuple, Type, Union, cast
+from functools import partial
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Generator,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+    Type,
+    Union,
+    cast,
+)
 
 import gym
 import numpy as np
 from tianshou.env import BaseVectorEnv, DummyVectorEnv, ShmemVectorEnv, SubprocVectorEnv
+from tianshou.env.worker import EnvWorker
 
 from qlib.typehint import Literal
 
 from .log import LogWriter
 
+if TYPE_CHECKING:
+    from .env_wrapper import BatchEnvWrapper
+
 __all__ = [
     "generate_nan_observation",
     "check_nan_observation",
@@ -28,11 +47,12 @@ __all__ = [
     "FiniteDummyVectorEnv",
     "FiniteSubprocVectorEnv",
     "FiniteShmemVectorEnv",
+    "FiniteBatchVectorEnv",
     "FiniteEnvType",
     "vectorize_env",
 ]
 
-FiniteEnvType = Literal["dummy", "subproc", "shmem"]
+FiniteEnvType = Literal["dummy", "subproc", "shmem", "batch"]
 T = Union[dict, list, tuple, np.ndarray]
 
 
@@ -310,6 +330,63 @@ class FiniteShmemVectorEnv(FiniteVectorEnv, ShmemVectorEnv):
     pass
 
 
+class _BatchEnvSlot(NamedTuple):
+    env: BatchEnvWrapper
+    index: int
+
+
+class BatchEnvWorker(EnvWorker):
+    """Worker of a slot of :class:`~qlib.rl.utils.BatchEnvWrapper`.
+
+    The requests sent to the workers are buffered in the batch env, and executed together when the result of
+    any of them is received. As the vector env sends the requests to all the workers before receiving from them,
+    one step of the vector env is one (batched) step of the batch env.
+    """
+
+    def __init__(self, env_fn: Callable[[], _BatchEnvSlot]) -> None:
+        self.slot = env_fn()
+        super().__init__(env_fn)  # type: ignore
+
+    def get_env_attr(self, key: str) -> Any:
+        return getattr(self.slot.env, key)
+
+    def set_env_attr(self, key: str, value: Any) -> None:
+        setattr(self.slot.env, key, value)
+
+    def reset(self, **kwargs: Any) -> Any:
+        self.send(None)
+        return self.recv()
+
+    @staticmethod
+    def wait(  # type: ignore
+        workers: List[BatchEnvWorker], wait_num: int, timeout: Optional[float] = None
+    ) -> List[BatchEnvWorker]:
+        return workers
+
+    def send(self, action: Optional[np.ndarray], **kwargs: Any) -> None:
+        self.slot.env.send(self.slot.index, action)
+
+    def recv(self) -> Any:
+        return self.slot.env.recv(self.slot.index)
+
+    def render(self, **kwargs: Any) -> Any:
+        raise NotImplementedError("Render is not implemented in BatchEnvWrapper.")
+
+    def close_env(self) -> None:
+        pass
+
+
+class BatchVectorEnv(BaseVectorEnv):
+    """Vector env of the slots of a :class:`~qlib.rl.utils.BatchEnvWrapper`. See :class:`BatchEnvWorker`."""
+
+    def __init__(self, env_fns: List[Callable[[], _BatchEnvSlot]], **kwargs: Any) -> None:
+        super().__init__(env_fns, BatchEnvWorker, **kwargs)  # type: ignore
+
+
+class FiniteBatchVectorEnv(FiniteVectorEnv, BatchVectorEnv):
+    pass
+
+
 def vectorize_env(
     env_factory: Callable[..., gym.Env],
     env_type: FiniteEnvType,
@@ -337,9 +414,12 @@ def vectorize_env(
     env_factory
         Callable to instantiate one single ``gym.Env``.
         All concurrent workers will have the same ``env_factory``.
+        If ``env_type`` is batch, it's called only once, to instantiate a :class:`~qlib.rl.utils.BatchEnvWrapper`
+        with ``concurrency`` slots.
     env_type
         dummy or subproc or shmem. Corresponding to
         `parallelism in tianshou <https://tianshou.readthedocs.io/en/master/api/tianshou.env.html#vectorenv>`_.
+        Or batch, where the workers are the slots of one batch env, stepped together in the main process.
     concurrency
         Concurrent environment workers.
     logger
@@ -358,6 +438,12 @@ def vectorize_env(
         def env_factory(): ...
         vectorize_env(env_factory, ...)
     """
+    if env_type == "batch":
+        batch_env = cast("BatchEnvWrapper", env_factory())
+        if batch_env.size != concurrency:
+            raise ValueError(f"The batch env has {batch_env.size} slots, but the concurrency is {concurrency}.")
+        return FiniteBatchVectorEnv(logger, [partial(_BatchEnvSlot, batch_env, i) for i in range(concurrency)])
+
     env_type_cls_mapping: Dict[str, Type[FiniteVectorEnv]] = {
         "dummy": FiniteDummyVectorEnv,
         "subproc": FiniteSubprocVectorEnv,
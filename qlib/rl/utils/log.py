@@ -10,6 +10,10 @@ and add them (as a dict) to auxiliary info returned for each step.
 in each worker, and writes them to console, log files, or tensorboard...
 
 The two modules communicate by the "log" field in "info" returned by ``env.step()``.
+
+Alternatively, with :class:`AsyncLogWriter`, the logs bypass the "info": scalars are written to shared arrays,
+and other objects are spilled to files, by the :class:`LogCollector` in each worker.
+The episodes are then replayed to the wrapped :class:`LogWriter` s in a background thread.
 """
 
 # NOTE: This file contains many hardcoded / ad-hoc rules.
@@ -18,10 +22,32 @@ The two modules communicate by the "log" field in "info" returned by ``env.step(
 from __future__ import annotations
 
 import logging
+import multiprocessing
+import pickle
+import queue
+import shutil
+import tempfile
+import threading
+import warnings
+import weakref
 from collections import defaultdict
 from enum import IntEnum
 from pathlib import Path
-from typing import TYPE_CHECKING, Any, Callable, Dict, Generic, List, Sequence, Set, Tuple, TypeVar
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    BinaryIO,
+    Callable,
+    Dict,
+    Generic,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    TypeVar,
+    cast,
+)
 
 import numpy as np
 import pandas as pd
@@ -32,7 +58,16 @@ if TYPE_CHECKING:
     from .env_wrapper import InfoDict
 
 
-__all__ = ["LogCollector", "LogWriter", "LogLevel", "LogBuffer", "ConsoleWriter", "CsvWriter"]
+__all__ = [
+    "LogCollector",
+    "LogWriter",
+    "LogLevel",
+    "LogBuffer",
+    "ConsoleWriter",
+    "CsvWriter",
+    "LogChannel",
+    "AsyncLogWriter",
+]
 
 ObsType = TypeVar("ObsType")
 ActType = TypeVar("ActType")
@@ -63,13 +98,18 @@ class LogCollector:
     The dict is sent via the ``info`` in ``env.step()``, and decoded by the :class:`LogWriter` at vector env.
 
     ``min_loglevel`` is for optimization purposes: to avoid too much traffic on networks / in pipe.
+
+    With a ``channel`` (see :class:`AsyncLogWriter`), the contents are written to the channel at ``logs()``,
+    and the dict only holds a reference to them.
     """
 
     _logged: Dict[str, Tuple[int, Any]]
     _min_loglevel: int
 
-    def __init__(self, min_loglevel: int | LogLevel = LogLevel.PERIODIC) -> None:
+    def __init__(self, min_loglevel: int | LogLevel = LogLevel.PERIODIC, channel: LogChannel | None = None) -> None:
         self._min_loglevel = int(min_loglevel)
+        self._channel = channel
+        self._sender: Optional[_ChannelSender] = None
 
     def reset(self) -> None:
         """Clear all collected contents."""
@@ -131,6 +171,12 @@ class LogCollector:
         self._add_metric(name, obj, loglevel)
 
     def logs(self) -> Dict[str, np.ndarray]:
+        if self._channel is not None:
+            if self._sender is None:
+                self._sender = self._channel.open_sender()
+            if self._sender is not None:
+                ref = self._sender.send(self._logged)
+                return {ASYNC_LOG_KEY: np.asanyarray((int(LogLevel.CRITICAL), ref), dtype="object")}
         return {key: np.asanyarray(value, dtype="object") for key, value in self._logged.items()}
 
 
@@ -508,7 +554,261 @@ class CsvWriter(LogWriter):
         pd.DataFrame.from_records(self.all_records).to_csv(self.output_dir / "result.csv", index=False)
 
 
-# The following are not implemented yet.
+ASYNC_LOG_KEY = "__async_log__"
+"""Key of the reference to the contents written to :class:`LogChannel`, in the logs of a step."""
+
+# columns of a row in the channel, before the scalars
+_SEQ, _PRESENT, _SCHEMA_OFFSET, _SPILL_OFFSET, _N_META = range(5)
+
+
+class LogChannel:
+    """Transport of the logs from :class:`LogCollector` s to :class:`AsyncLogWriter`.
+
+    Each collector takes a slot of the channel. A slot has:
+
+    - A ring of rows in shared memory. A row holds the scalars logged at a step.
+      The columns of the scalars (i.e., the schema) are assigned by the collector as new scalars come,
+      and are fixed afterwards. At most ``max_scalars`` scalars are stored in the row.
+    - A file, to which the schema and the other contents (those that are not scalars,
+      or can't fit into the row) are spilled with pickle.
+
+    The channel is created in the main process, and must be inherited by the env workers (i.e., forked),
+    in the same way as :class:`~qlib.rl.utils.DataQueue`.
+
+    Parameters
+    ----------
+    n_slots
+        Maximum number of collectors. Collectors that can't get a slot fall back to sending their logs via "info".
+    capacity
+        Number of rows per slot. The rows are copied by the writer at every step,
+        so a few rows are enough, unless the steps of a worker are not received in time.
+    max_scalars
+        Maximum number of scalars in a row.
+    spill_dir
+        Directory of the files. A temporary directory (removed with the channel) is used if not given.
+    """
+
+    def __init__(self, n_slots: int, capacity: int = 16, max_scalars: int = 32, spill_dir: Path | None = None) -> None:
+        # the presence of the scalars is a bitmask in a float64, which is exact with up to 53 bits
+        assert max_scalars <= 52, "At most 52 scalars are supported."
+        self.n_slots = n_slots
+        self.capacity = capacity
+        self.max_scalars = max_scalars
+
+        if spill_dir is None:
+            self.spill_dir = Path(tempfile.mkdtemp(prefix="qlib_rl_log_"))
+            self._finalizer = weakref.finalize(self, shutil.rmtree, str(self.spill_dir), True)
+        else:
+            self.spill_dir = Path(spill_dir)
+            self.spill_dir.mkdir(parents=True, exist_ok=True)
+
+        self._rows_buffer = multiprocessing.RawArray("d", n_slots * capacity * (_N_META + max_scalars))
+        self._next_slot = multiprocessing.Value("i", 0)
+
+    @property
+    def rows(self) -> np.ndarray:
+        """The rows of all the slots, with shape ``(n_slots, capacity, columns)``."""
+        return np.frombuffer(self._rows_buffer, dtype=np.float64).reshape(self.n_slots, self.capacity, -1)
+
+    def spill_path(self, slot: int) -> Path:
+        return self.spill_dir / f"{slot}.pkl"
+
+    def open_sender(self) -> Optional[_ChannelSender]:
+        """Take a slot for a collector. None if all the slots are taken."""
+        with self._next_slot.get_lock():
+            slot = self._next_slot.value
+            if slot >= self.n_slots:
+                warnings.warn(f"All the {self.n_slots} slots of the log channel are taken. Logs are sent via info.")
+                return None
+            self._next_slot.value += 1
+        return _ChannelSender(self, slot)
+
+
+class _ChannelSender:
+    """Writes the logs of a collector to a slot of :class:`LogChannel`."""
+
+    def __init__(self, channel: LogChannel, slot: int) -> None:
+        self.channel = channel
+        self.slot = slot
+        self.rows = channel.rows[slot]
+        self.seq = 0
+        self.columns: Dict[Tuple[str, int], int] = {}
+        self.schema_offset = -1
+        self.file: BinaryIO = open(channel.spill_path(slot), "wb")  # pylint: disable=consider-using-with
+
+    def send(self, logged: Dict[str, Tuple[int, Any]]) -> Tuple[int, int]:
+        """Write the contents of a step, and return the reference ``(slot, seq)`` to them."""
+        row = self.rows[self.seq % self.channel.capacity]
+        row[_N_META:] = 0.0
+        present, spilled, new_columns = 0, {}, False
+        for name, (loglevel, value) in logged.items():
+            col = self.columns.get((name, loglevel)) if isinstance(value, float) else None
+            if col is None and isinstance(value, float) and len(self.columns) < self.channel.max_scalars:
+                col = self.columns[(name, loglevel)] = len(self.columns)
+                new_columns = True
+            if col is None:
+                spilled[name] = (loglevel, value)
+            else:
+                row[_N_META + col] = value
+                present |= 1 << col
+
+        if new_columns:
+            self.schema_offset = self._spill(list(self.columns))
+        row[_SEQ] = self.seq
+        row[_PRESENT] = present
+        row[_SCHEMA_OFFSET] = self.schema_offset
+        row[_SPILL_OFFSET] = self._spill(spilled) if spilled else -1
+        self.seq += 1
+        return self.slot, self.seq - 1
+
+    def _spill(self, obj: Any) -> int:
+        offset = self.file.tell()
+        pickle.dump(obj, self.file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.file.flush()
+        return offset
+
+    def __del__(self) -> None:
+        if hasattr(self, "file"):
+            self.file.close()
+
+
+class AsyncLogWriter(LogWriter):
+    """Receive the logs via :class:`LogChannel`, and feed them to ``writers`` in a background thread.
+
+    At every step, only the row of the step is copied, in the thread of the vector env.
+    When an episode is done, the episode is decoded, and replayed to the writers
+    (i.e., ``on_env_reset`` and ``on_env_step`` of every step) in the background thread.
+    Therefore, the writers work as if they are attached to the vector env directly,
+    except that the episodes arrive later.
+    The background thread is synchronized with at ``on_env_all_ready`` and ``on_env_all_done``,
+    so that the writers are complete after every collect.
+
+    The :class:`LogCollector` s in the env workers must be created with ``channel=writer.channel``.
+
+    Parameters
+    ----------
+    writers
+        The log writers to feed.
+    n_slots
+        Maximum number of collectors (i.e., env workers). See :class:`LogChannel`.
+    channel_kwargs
+        Other keyword arguments of :class:`LogChannel`.
+    """
+
+    def __init__(self, writers: LogWriter | List[LogWriter], n_slots: int, **channel_kwargs: Any) -> None:
+        self.writers = writers if isinstance(writers, list) else [writers]
+        super().__init__(min((w.loglevel for w in self.writers), default=LogLevel.PERIODIC))
+        self.channel = LogChannel(n_slots, **channel_kwargs)
+
+        # the steps of the ongoing episodes. A step is (reward, (slot, row) in the channel, logs via info).
+        self._episodes: Dict[int, List[_Step]] = {}
+        self._schemas: Dict[Tuple[int, int], List[Tuple[str, int]]] = {}
+        self._spill_files: Dict[int, BinaryIO] = {}
+        self._jobs: queue.Queue = queue.Queue()
+        self._error: Optional[BaseException] = None
+        # the thread only holds a weak reference, and exits when the writer is deleted
+        threading.Thread(target=AsyncLogWriter._worker, args=(weakref.ref(self), self._jobs), daemon=True).start()
+
+    def on_env_reset(self, env_id: int, _: Any) -> None:
+        if env_id in self._episodes:
+            self._submit(env_id, done=False)
+        self._episodes[env_id] = []
+
+    def on_env_step(self, env_id: int, obs: Any, rew: float, done: bool, info: InfoDict) -> None:
+        logs = dict(info["log"]) if info is not None else {}
+        ref = None
+        if ASYNC_LOG_KEY in logs:
+            slot, seq = logs.pop(ASYNC_LOG_KEY)[1]
+            # copy now, as the row will be overwritten by the following steps
+            row = self.channel.rows[slot, seq % self.channel.capacity].copy()
+            if row[_SEQ] == seq:
+                ref = (slot, row)
+            else:
+                warnings.warn(f"The logs of step {seq} in slot {slot} are overwritten. Try a larger capacity.")
+        self._episodes.setdefault(env_id, []).append((rew, ref, logs))
+        if done:
+            self._submit(env_id, done=True)
+
+    def on_env_all_ready(self) -> None:
+        self._wait()
+        for writer in self.writers:
+            writer.on_env_all_ready()
+
+    def on_env_all_done(self) -> None:
+        # the unfinished episodes are replayed without the end
+        for env_id in list(self._episodes):
+            self._submit(env_id, done=False)
+        self._wait()
+        for writer in self.writers:
+            writer.on_env_all_done()
+
+    def _submit(self, env_id: int, done: bool) -> None:
+        steps = self._episodes.pop(env_id)
+        if steps:
+            self._jobs.put((env_id, steps, done))
+
+    def _wait(self) -> None:
+        self._jobs.join()
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise RuntimeError("Error in the background thread of AsyncLogWriter.") from error
+
+    @staticmethod
+    def _worker(writer_ref: weakref.ReferenceType, jobs: queue.Queue) -> None:
+        while True:
+            job = jobs.get()
+            writer = writer_ref()
+            try:
+                if job is None or writer is None:
+                    return
+                if writer._error is None:
+                    writer._replay(*job)
+            except BaseException as e:  # pylint: disable=broad-except
+                writer._error = e
+            finally:
+                del writer
+                jobs.task_done()
+
+    def _replay(self, env_id: int, steps: List[_Step], done: bool) -> None:
+        for writer in self.writers:
+            writer.on_env_reset(env_id, None)
+        for k, (rew, ref, logs) in enumerate(steps):
+            if ref is not None:
+                logs = {**self._decode(*ref), **logs}
+            info = cast("InfoDict", {"log": logs, "aux_info": {}})
+            for writer in self.writers:
+                writer.on_env_step(env_id, None, rew, done and k == len(steps) - 1, info)
+
+    def _decode(self, slot: int, row: np.ndarray) -> Dict[str, np.ndarray]:
+        """Restore the logs of a step, in the format of :meth:`LogCollector.logs`."""
+        logged: Dict[str, Tuple[int, Any]] = {}
+        present = int(row[_PRESENT])
+        if present:
+            schema_offset = int(row[_SCHEMA_OFFSET])
+            if (slot, schema_offset) not in self._schemas:
+                self._schemas[(slot, schema_offset)] = self._read_spill(slot, schema_offset)
+            for col, (name, loglevel) in enumerate(self._schemas[(slot, schema_offset)]):
+                if present >> col & 1:
+                    logged[name] = (loglevel, float(row[_N_META + col]))
+        if row[_SPILL_OFFSET] >= 0:
+            logged.update(self._read_spill(slot, int(row[_SPILL_OFFSET])))
+        return {key: np.asanyarray(value, dtype="object") for key, value in logged.items()}
+
+    def _read_spill(self, slot: int, offset: int) -> Any:
+        if slot not in self._spill_files:
+            self._spill_files[slot] = open(self.channel.spill_path(slot), "rb")  # pylint: disable=consider-using-with
+        file = self._spill_files[slot]
+        file.seek(offset)
+        return pickle.load(file)
+
+    def __del__(self) -> None:
+        if hasattr(self, "_jobs"):
+            self._jobs.put(None)
+        for file in getattr(self, "_spill_files", {}).values():
+            file.close()
+
+
+_Step = Tuple[float, Optional[Tuple[int, np.ndarray]], Dict[str, Any]]
 
 
 class PickleWriter(LogWriter):
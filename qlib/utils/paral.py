@@ -1,9 +1,10 @@
 # Copyright (c) Microsoft Corporation.
 # Licensed under the MIT License.
 
+from concurrent.futures import ThreadPoolExecutor
 from functools import partial
-from threading import Thread
-from typing import Callable, Text, Union
+from threading import Lock, Thread
+from typing import Callable, Iterable, Iterator, Optional, Text, Union
 
 from joblib import Parallel, delayed
 from joblib._parallel_backends import MultiprocessingBackend
@@ -112,6 +113,141 @@ class AsyncCaller:
         return decorator_func
 
 
+class LazyObject:
+    """
+    The handle of an object which is loaded only when it is needed (e.g. an artifact of a recorder)
+
+    The loaded object is cached in the handle by default. `materialize` can load many handles concurrently.
+    """
+
+    def __init__(self, func: Callable, *args, **kwargs):
+        """
+        Parameters
+        ----------
+        func : Callable
+            the function to load the object, which is called with `args` and `kwargs`
+        """
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self._obj = None
+        self._loaded = False
+        self._lock = Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    def load(self, cache: bool = True):
+        """
+        Parameters
+        ----------
+        cache : bool
+            keep the loaded object in the handle. If False, the object is not cached (it is loaded again next time)
+            unless it has been cached, which is helpful to reduce the memory when the objects are consumed one by one.
+        """
+        if self._loaded:
+            return self._obj
+        with self._lock:
+            if self._loaded:
+                return self._obj
+            obj = self.func(*self.args, **self.kwargs)
+            if cache:
+                self._obj, self._loaded = obj, True
+            return obj
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = Lock()
+
+    def __repr__(self):
+        status = "loaded" if self._loaded else "not loaded"
+        return f"{self.__class__.__name__}({getattr(self.func, '__name__', self.func)}, args={self.args}, {status})"
+
+
+def materialize(obj, max_workers: Optional[int] = None):
+    """
+    Replace the `LazyObject` in a nested structure of dict, list and tuple with the objects loaded by it.
+    The objects are loaded concurrently by a thread pool, which is suitable for the I/O bound loading.
+
+    Parameters
+    ----------
+    obj :
+        the nested structure, e.g. {"pred": {"rec_1": LazyObject, "rec_2": LazyObject}}
+    max_workers : Optional[int]
+        the max number of threads; None for the default of `ThreadPoolExecutor`
+
+    Returns
+    -------
+        the same structure with the loaded objects
+    """
+    lazy_objs = []
+
+    def _find(o):
+        if isinstance(o, LazyObject):
+            if not o.loaded:
+                lazy_objs.append(o)
+        elif isinstance(o, dict):
+            for v in o.values():
+                _find(v)
+        elif isinstance(o, (list, tuple)):
+            for v in o:
+                _find(v)
+
+    def _replace(o):
+        if isinstance(o, LazyObject):
+            return o.load()
+        if isinstance(o, dict):
+            return {k: _replace(v) for k, v in o.items()}
+        if isinstance(o, list):
+            return [_replace(v) for v in o]
+        if isinstance(o, tuple):
+            return tuple(_replace(v) for v in o)
+        return o
+
+    _find(obj)
+    if len(lazy_objs) > 1 and max_workers != 1:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            list(executor.map(LazyObject.load, lazy_objs))
+    return _replace(obj)
+
+
+def iter_loaded(objs: Iterable, prefetch: bool = True) -> Iterator:
+    """
+    Iterate the objects and load the `LazyObject` one by one without caching them, so only the current object (and the
+    prefetched one) is kept in memory.
+
+    Parameters
+    ----------
+    objs : Iterable
+        the objects or `LazyObject`
+    prefetch : bool
+        load the next object in a thread while the current one is being consumed
+    """
+
+    def _load(o):
+        return o.load(cache=False) if isinstance(o, LazyObject) else o
+
+    objs = iter(objs)
+    if not prefetch:
+        yield from map(_load, objs)
+        return
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        future = None
+        for o in objs:
+            nxt = executor.submit(_load, o)
+            if future is not None:
+                yield future.result()
+            future = nxt
+        if future is not None:
+            yield future.result()
+
+
 # # Outlines: Joblib enhancement
 # The code are for implementing following workflow
 # - Construct complex data structure nested with delayed joblib tasks
@@ -6,13 +6,16 @@ Collector module can collect objects from everywhere and process them such as me
 """
 
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import PurePosixPath
 from qlib.log import TimeInspector
-from typing import Callable, Dict, Iterable, List
+from typing import Callable, Dict, Iterable, List, Optional
 from qlib.log import get_module_logger
+from qlib.utils.paral import LazyObject
 from qlib.utils.serial import Serializable
 from qlib.utils.exceptions import LoadObjectError
 from qlib.workflow import R
-from qlib.workflow.exp import Experiment
+from qlib.workflow.exp import Experiment, MLflowExperiment
 from qlib.workflow.recorder import Recorder
 
 
@@ -133,6 +136,9 @@ class MergeCollector(Collector):
         return collect_dict
 
 
+_FILTERED = object()  # the mark of the filtered recorders
+
+
 class RecorderCollector(Collector):
     ART_KEY_RAW = "__raw"
 
@@ -146,6 +152,10 @@ class RecorderCollector(Collector):
         artifacts_key=None,
         list_kwargs={},
         status: Iterable = {Recorder.STATUS_FI},
+        tags: Optional[dict] = None,
+        params: Optional[dict] = None,
+        lazy: bool = False,
+        max_workers: Optional[int] = None,
     ):
         """
         Init RecorderCollector.
@@ -161,6 +171,13 @@ class RecorderCollector(Collector):
             artifacts_key (str or List, optional): the artifacts key you want to get. If None, get all artifacts.
             list_kwargs (str): arguments for list_recorders function.
             status (Iterable): only collect recorders with specific status. None indicating collecting all the recorders
+            tags (dict, optional): only collect the recorders with these tags, e.g. {"train_status": "end_train"}.
+                They are filtered (by mlflow if possible) before calling `rec_filter_func` and loading any artifact.
+            params (dict, optional): only collect the recorders with these params, like `tags`.
+            lazy (bool): collect the artifacts as `LazyObject` handles, which are loaded only when they are needed
+                (e.g. by `qlib.utils.paral.materialize` in the ensembles).
+            max_workers (int, optional): the max number of threads to filter the recorders, get their keys and load the
+                artifacts concurrently. None for the default of `ThreadPoolExecutor`; 1 for loading sequentially.
         """
         super().__init__(process_list=process_list)
         if isinstance(experiment, str):
@@ -180,6 +197,49 @@ class RecorderCollector(Collector):
         self.rec_filter_func = rec_filter_func
         self.list_kwargs = list_kwargs
         self.status = status
+        self.tags = {} if tags is None else tags
+        self.params = {} if params is None else params
+        self.lazy = lazy
+        self.max_workers = max_workers
+
+    def _get_filter_string(self) -> str:
+        """the mlflow filter string of the tags and params"""
+        conds = []
+        for prefix, flt in [("tags", self.tags), ("params", self.params)]:
+            for k, v in flt.items():
+                v = str(v)
+                quote = "'" if "'" not in v else '"'
+                conds.append(f'{prefix}."{k}" = {quote}{v}{quote}')
+        return " and ".join(conds)
+
+    def _list_recorders(self) -> List[Recorder]:
+        if isinstance(self.experiment, Experiment):
+            list_kwargs = self.list_kwargs
+            filter_string = self._get_filter_string()
+            if isinstance(self.experiment, MLflowExperiment) and filter_string != "":
+                list_kwargs = list_kwargs.copy()
+                if list_kwargs.get("filter_string"):
+                    filter_string = f"{list_kwargs['filter_string']} and {filter_string}"
+                list_kwargs["filter_string"] = filter_string
+            with TimeInspector.logt("Time to `list_recorders` in RecorderCollector"):
+                return list(self.experiment.list_recorders(**list_kwargs).values())
+        return self.experiment()
+
+    def _match_tags_params(self, rec: Recorder) -> bool:
+        for flt, get_values in [(self.tags, rec.list_tags), (self.params, rec.list_params)]:
+            if len(flt) > 0:
+                values = get_values()
+                if any(k not in values or str(values[k]) != str(v) for k, v in flt.items()):
+                    return False
+        return True
+
+    @staticmethod
+    def _artifact_exists(rec: Recorder, path: str, listed: dict) -> bool:
+        parent = str(PurePosixPath(path).parent)
+        parent = None if parent == "." else parent
+        if parent not in listed:
+            listed[parent] = set(rec.list_artifacts(parent))
+        return path in listed[parent]
 
     def collect(self, artifacts_key=None, rec_filter_func=None, only_exist=True) -> dict:
         """
@@ -204,40 +264,57 @@ class RecorderCollector(Collector):
 
         collect_dict = {}
         # filter records
-
-        if isinstance(self.experiment, Experiment):
-            with TimeInspector.logt("Time to `list_recorders` in RecorderCollector"):
-                recs = list(self.experiment.list_recorders(**self.list_kwargs).values())
-        elif isinstance(self.experiment, Callable):
-            recs = self.experiment()
-
-        recs = [
-            rec
-            for rec in recs
-            if (
-                (self.status is None or rec.status in self.status) and (rec_filter_func is None or rec_filter_func(rec))
-            )
-        ]
+        recs = self._list_recorders()
+        # the tags and params have been filtered by mlflow if `filter_string` is supported
+        check_tags_params = not isinstance(self.experiment, MLflowExperiment)
+        recs = [rec for rec in recs if self.status is None or rec.status in self.status]
 
         logger = get_module_logger("RecorderCollector")
-        status_stat = defaultdict(int)
-        for r in recs:
-            status_stat[r.status] += 1
-        logger.info(f"Nubmer of recorders after filter: {status_stat}")
-        for rec in recs:
-            rec_key = self.rec_key_func(rec)
-            for key in artifacts_key:
-                if self.ART_KEY_RAW == key:
-                    artifact = rec
-                else:
-                    try:
-                        artifact = rec.load_object(self.artifacts_path[key])
-                    except LoadObjectError as e:
-                        if only_exist:
-                            # only collect existing artifact
-                            logger.warning(f"Fail to load {self.artifacts_path[key]} and it is ignored.")
-                            continue
-                        raise e
+
+        def _filter_and_key(rec):
+            # the key function may load the artifacts (e.g. the task), so it is called concurrently too
+            if check_tags_params and not self._match_tags_params(rec):
+                return _FILTERED
+            if rec_filter_func is not None and not rec_filter_func(rec):
+                return _FILTERED
+            return self.rec_key_func(rec)
+
+        def _load(rec, key):
+            """return the artifact, a lazy handle or the exception when loading"""
+            if self.ART_KEY_RAW == key:
+                return rec
+            path = self.artifacts_path[key]
+            if self.lazy:
+                if only_exist and not self._artifact_exists(rec, path, listed.setdefault(rec.id, {})):
+                    return LoadObjectError(f"{path} doesn't exist")
+                return LazyObject(rec.load_object, path)
+            try:
+                return rec.load_object(path)
+            except LoadObjectError as e:
+                return e
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            kept = [(rec, key) for rec, key in zip(recs, executor.map(_filter_and_key, recs)) if key is not _FILTERED]
+            recs, rec_keys = [rec for rec, _ in kept], [key for _, key in kept]
+
+            status_stat = defaultdict(int)
+            for r in recs:
+                status_stat[r.status] += 1
+            logger.info(f"Nubmer of recorders after filter: {status_stat}")
+
+            listed = {}  # the listed artifacts of each recorder
+            with TimeInspector.logt("Time to load artifacts in RecorderCollector"):
+                artifacts = [[executor.submit(_load, rec, key) for key in artifacts_key] for rec in recs]
+                artifacts = [[f.result() for f in rec_artifacts] for rec_artifacts in artifacts]
+
+        for rec_key, rec_artifacts in zip(rec_keys, artifacts):
+            for key, artifact in zip(artifacts_key, rec_artifacts):
+                if isinstance(artifact, LoadObjectError):
+                    if only_exist:
+                        # only collect existing artifact
+                        logger.warning(f"Fail to load {self.artifacts_path[key]} and it is ignored.")
+                        continue
+                    raise artifact
                 # give user some warning if the values are overridden
                 cdd = collect_dict.setdefault(key, {})
                 if rec_key in cdd:
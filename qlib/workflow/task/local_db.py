@@ -0,0 +1,446 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+"""
+A local stand-in of MongoDB for `TaskManager` based on SQLite.
+
+It implements the subset of the `pymongo.collection.Collection` API used by `TaskManager`, so the task management
+can be tested (or run on a single machine by many processes) without a MongoDB server.
+
+.. code-block:: python
+
+    C["mongo"] = {
+        "task_url": "sqlite:///path/to/tasks.db",  # or "sqlite://:memory:" for an in-process store
+        "task_db_name": "rolling_db",
+    }
+
+The documents are pickled into the table of the collection. The fields used by `TaskManager` to fetch the tasks
+(see `SQLiteCollection.COLUMNS`) are also saved in indexed columns, so the queries on them are executed by SQLite and
+the other conditions are checked in Python.
+"""
+
+import os
+import pickle
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Iterator, List, Optional, Tuple
+
+import bson
+import pymongo
+from bson.objectid import ObjectId
+from pymongo.errors import DuplicateKeyError
+from pymongo.results import DeleteResult, InsertManyResult, InsertOneResult, UpdateResult
+
+_MISSING = object()
+
+
+def _get_field(doc: dict, key: str):
+    for k in key.split("."):
+        if not isinstance(doc, dict) or k not in doc:
+            return _MISSING
+        doc = doc[k]
+    return doc
+
+
+def _compare(value, op: str, target) -> bool:
+    if value is _MISSING or value is None:
+        return False
+    try:
+        if op == "$gt":
+            return value > target
+        if op == "$gte":
+            return value >= target
+        if op == "$lt":
+            return value < target
+        return value <= target
+    except TypeError:
+        return False
+
+
+def _eq(value, target) -> bool:
+    if value is _MISSING:
+        return target is None
+    if isinstance(value, list) and not isinstance(target, list):
+        return target in value
+    return value == target
+
+
+def _match_cond(value, cond) -> bool:
+    if not (isinstance(cond, dict) and len(cond) > 0 and all(k.startswith("$") for k in cond)):
+        return _eq(value, cond)
+    for op, target in cond.items():
+        if op == "$eq":
+            res = _eq(value, target)
+        elif op == "$ne":
+            res = not _eq(value, target)
+        elif op == "$in":
+            res = any(_eq(value, t) for t in target)
+        elif op == "$nin":
+            res = not any(_eq(value, t) for t in target)
+        elif op in ("$gt", "$gte", "$lt", "$lte"):
+            res = _compare(value, op, target)
+        elif op == "$exists":
+            res = (value is not _MISSING) == bool(target)
+        else:
+            raise NotImplementedError(f"The operator {op} is not supported")
+        if not res:
+            return False
+    return True
+
+
+def match(doc: dict, query: dict) -> bool:
+    """check if the document matches the query in MongoDB"""
+    for key, cond in query.items():
+        if key == "$and":
+            res = all(match(doc, q) for q in cond)
+        elif key == "$or":
+            res = any(match(doc, q) for q in cond)
+        elif key == "$nor":
+            res = not any(match(doc, q) for q in cond)
+        else:
+            res = _match_cond(_get_field(doc, key), cond)
+        if not res:
+            return False
+    return True
+
+
+def _apply_update(doc: dict, update: dict):
+    for op, fields in update.items():
+        for key, value in fields.items():
+            *parents, name = key.split(".")
+            d = doc
+            for k in parents:
+                d = d.setdefault(k, {})
+            if op == "$set":
+                d[name] = value
+            elif op == "$unset":
+                d.pop(name, None)
+            elif op == "$inc":
+                d[name] = d.get(name, 0) + value
+            else:
+                raise NotImplementedError(f"The operator {op} is not supported")
+
+
+class SQLiteCollection:
+    """A collection of `SQLiteDatabase` with the same interface as `pymongo.collection.Collection`"""
+
+    # the fields saved in the indexed columns
+    COLUMNS = ["_id", "status", "priority", "lease_expire"]
+    SQL_OPS = {"$eq": "=", "$ne": "!=", "$gt": ">", "$gte": ">=", "$lt": "<", "$lte": "<="}
+
+    def __init__(self, database: "SQLiteDatabase", name: str):
+        self.database = database
+        self.name = name
+        self.table = f'"{database.name}.{name}"'
+        self._created = False
+
+    def __str__(self):
+        return f"SQLiteCollection({self.database.path}, {self.database.name}.{self.name})"
+
+    __repr__ = __str__
+
+    @contextmanager
+    def _transaction(self, write: bool = False) -> Iterator[sqlite3.Connection]:
+        conn = self.database.connect()
+        if not self._created:
+            columns = ", ".join(f"{c} {'TEXT PRIMARY KEY' if c == '_id' else ''}" for c in self.COLUMNS)
+            with self.database.lock:
+                conn.execute(f"CREATE TABLE IF NOT EXISTS {self.table} ({columns}, doc BLOB)")
+            self._created = True
+        with self.database.lock:
+            # `BEGIN IMMEDIATE` locks the database, so the read-modify-write is atomic among the processes
+            conn.execute("BEGIN IMMEDIATE" if write else "BEGIN")
+            try:
+                yield conn
+            except BaseException:
+                conn.rollback()
+                raise
+            conn.commit()
+
+    # SQL helpers
+    @staticmethod
+    def _to_column(key: str, value):
+        if key == "_id" and isinstance(value, ObjectId):
+            return str(value)
+        return value
+
+    def _translate(self, query: dict) -> Tuple[Optional[str], list]:
+        """
+        translate the conditions on the indexed columns into SQL, which selects a superset of the matched documents
+
+        Returns:
+            (None, []) if no condition can be translated
+        """
+        clauses, params = [], []
+        for key, cond in query.items():
+            sql = None
+            if key in ("$and", "$or"):
+                sub = [self._translate(q) for q in cond]
+                if key == "$and":
+                    sub = [s for s in sub if s[0] is not None]
+                if len(sub) > 0 and all(s[0] is not None for s in sub):
+                    sql = "(" + f" {key[1:].upper()} ".join(s[0] for s in sub) + ")"
+                    for s in sub:
+                        params.extend(s[1])
+            elif key in self.COLUMNS:
+                sql = self._translate_cond(key, cond, params)
+            if sql is not None:
+                clauses.append(sql)
+        if len(clauses) == 0:
+            return None, []
+        return " AND ".join(clauses), params
+
+    def _translate_cond(self, key: str, cond, params: list) -> Optional[str]:
+        if not (isinstance(cond, dict) and len(cond) > 0 and all(k.startswith("$") for k in cond)):
+            cond = {"$eq": cond}
+        clauses = []
+        for op, target in cond.items():
+            if op in ("$eq", "$ne") and target is None:
+                clauses.append(f"{key} IS {'NOT ' if op == '$ne' else ''}NULL")
+            elif op == "$ne" and not isinstance(target, (dict, list)):
+                # the missing fields match `$ne` in MongoDB
+                clauses.append(f"({key} != ? OR {key} IS NULL)")
+                params.append(self._to_column(key, target))
+            elif op in self.SQL_OPS and not isinstance(target, (dict, list)):
+                clauses.append(f"{key} {self.SQL_OPS[op]} ?")
+                params.append(self._to_column(key, target))
+            elif op == "$in" and all(t is not None and not isinstance(t, (dict, list)) for t in target):
+                clauses.append(f"{key} IN ({', '.join('?' * len(target))})" if len(target) > 0 else "0")
+                params.extend(self._to_column(key, t) for t in target)
+        return "(" + " AND ".join(clauses) + ")" if len(clauses) > 0 else None
+
+    def _select(self, conn, query: dict, sort=None, limit: int = 0) -> List[dict]:
+        query = query or {}
+        where, params = self._translate(query)
+        sql = f"SELECT doc FROM {self.table}" + (f" WHERE {where}" if where is not None else "")
+        sort = sort or []
+        sql_sort = all(key in self.COLUMNS for key, _ in sort)
+        if len(sort) > 0 and sql_sort:
+            sql += " ORDER BY " + ", ".join(
+                f"{key} {'DESC' if direction == pymongo.DESCENDING else 'ASC'}" for key, direction in sort
+            )
+        docs = []
+        for (blob,) in conn.execute(sql, params):
+            doc = pickle.loads(blob)
+            if match(doc, query):
+                docs.append(doc)
+                if limit > 0 and sql_sort and len(docs) >= limit:
+                    break
+        if not sql_sort:
+            for key, direction in reversed(sort):
+                docs.sort(key=lambda d: (_get_field(d, key) is not _MISSING, _get_field(d, key)), reverse=direction < 0)
+        return docs[:limit] if limit > 0 else docs
+
+    def _write(self, conn, doc: dict, insert: bool = False):
+        bson.encode(doc)  # raise `InvalidDocument` as MongoDB
+        values = [self._to_column(c, doc.get(c)) for c in self.COLUMNS]
+        sql = "INSERT INTO" if insert else "REPLACE INTO"
+        try:
+            conn.execute(
+                f"{sql} {self.table} VALUES ({', '.join('?' * (len(values) + 1))})", values + [pickle.dumps(doc)]
+            )
+        except sqlite3.IntegrityError as e:
+            raise DuplicateKeyError(str(e)) from e
+
+    def _update(self, query: dict, update: dict, many: bool) -> UpdateResult:
+        with self._transaction(write=True) as conn:
+            docs = self._select(conn, query, limit=0 if many else 1)
+            for doc in docs:
+                _apply_update(doc, update)
+                self._write(conn, doc)
+        return UpdateResult({"n": len(docs), "nModified": len(docs)}, acknowledged=True)
+
+    @staticmethod
+    def _project(doc: dict, projection) -> dict:
+        if projection is None:
+            return doc
+        if isinstance(projection, (list, tuple)):
+            projection = {k: 1 for k in projection}
+        if any(projection.values()):
+            keys = {k for k, v in projection.items() if v} | {"_id"}
+            if not projection.get("_id", 1):
+                keys.remove("_id")
+            return {k: v for k, v in doc.items() if k in keys}
+        return {k: v for k, v in doc.items() if k not in projection}
+
+    # Collection API
+    def create_index(self, keys, name: Optional[str] = None, **kwargs) -> str:
+        if isinstance(keys, str):
+            keys = [(keys, pymongo.ASCENDING)]
+        if not all(key in self.COLUMNS for key, _ in keys):
+            raise NotImplementedError(f"Only the fields in {self.COLUMNS} can be indexed")
+        if name is None:
+            name = "_".join(f"{key}_{direction}" for key, direction in keys)
+        columns = ", ".join(f"{key} {'DESC' if direction == pymongo.DESCENDING else 'ASC'}" for key, direction in keys)
+        with self._transaction(write=True) as conn:
+            conn.execute(
+                f'CREATE INDEX IF NOT EXISTS "{self.database.name}.{self.name}.{name}" ON {self.table} ({columns})'
+            )
+        return name
+
+    def insert_one(self, document: dict) -> InsertOneResult:
+        document.setdefault("_id", ObjectId())
+        with self._transaction(write=True) as conn:
+            self._write(conn, document, insert=True)
+        return InsertOneResult(document["_id"], acknowledged=True)
+
+    def insert_many(self, documents: List[dict]) -> InsertManyResult:
+        with self._transaction(write=True) as conn:
+            for doc in documents:
+                doc.setdefault("_id", ObjectId())
+                self._write(conn, doc, insert=True)
+        return InsertManyResult([doc["_id"] for doc in documents], acknowledged=True)
+
+    def find(self, filter: Optional[dict] = None, projection=None, sort=None, limit: int = 0) -> Iterator[dict]:
+        with self._transaction() as conn:
+            docs = self._select(conn, filter, sort=sort, limit=limit)
+        return iter([self._project(doc, projection) for doc in docs])
+
+    def find_one(self, filter: Optional[dict] = None, projection=None, sort=None) -> Optional[dict]:
+        return next(self.find(filter, projection=projection, sort=sort, limit=1), None)
+
+    def find_one_and_update(
+        self, filter: dict, update: dict, projection=None, sort=None, return_document=pymongo.ReturnDocument.BEFORE
+    ) -> Optional[dict]:
+        with self._transaction(write=True) as conn:
+            docs = self._select(conn, filter, sort=sort, limit=1)
+            if len(docs) == 0:
+                return None
+            doc = docs[0]
+            new_doc = pickle.loads(pickle.dumps(doc))
+            _apply_update(new_doc, update)
+            self._write(conn, new_doc)
+        return self._project(new_doc if return_document == pymongo.ReturnDocument.AFTER else doc, projection)
+
+    def update_one(self, filter: dict, update: dict) -> UpdateResult:
+        return self._update(filter, update, many=False)
+
+    def update_many(self, filter: dict, update: dict) -> UpdateResult:
+        return self._update(filter, update, many=True)
+
+    def replace_one(self, filter: dict, replacement: dict) -> UpdateResult:
+        with self._transaction(write=True) as conn:
+            docs = self._select(conn, filter, limit=1)
+            for doc in docs:
+                self._write(conn, {**replacement, "_id": doc["_id"]})
+        return UpdateResult({"n": len(docs), "nModified": len(docs)}, acknowledged=True)
+
+    def delete_many(self, filter: dict) -> DeleteResult:
+        with self._transaction(write=True) as conn:
+            ids = [str(doc["_id"]) for doc in self._select(conn, filter)]
+            conn.executemany(f"DELETE FROM {self.table} WHERE _id = ?", [(i,) for i in ids])
+        return DeleteResult({"n": len(ids)}, acknowledged=True)
+
+    def count_documents(self, filter: dict) -> int:
+        return len(list(self.find(filter, projection=["_id"])))
+
+    def aggregate(self, pipeline: List[dict]) -> Iterator[dict]:
+        """
+        Only `$match` and `$group` (with `$sum`) are supported.
+        The counting grouped by an indexed column is executed by SQLite if the query can be translated completely.
+        """
+        stages = list(pipeline)
+        query = stages.pop(0)["$match"] if len(stages) > 0 and "$match" in stages[0] else {}
+        if len(stages) != 1 or "$group" not in stages[0]:
+            raise NotImplementedError("Only `$match` + `$group` is supported")
+        group = dict(stages[0]["$group"])
+        key = group.pop("_id")
+        assert isinstance(key, str) and key.startswith("$"), "Only grouping by a field is supported"
+        key = key[1:]
+        where, params = self._translate(query)
+        exact = where is not None and self._is_exact(query) or len(query) == 0
+        if exact and key in self.COLUMNS and all(acc == {"$sum": 1} for acc in group.values()):
+            sql = f"SELECT {key}, COUNT(*) FROM {self.table}" + (f" WHERE {where}" if where is not None else "")
+            with self._transaction() as conn:
+                rows = conn.execute(f"{sql} GROUP BY {key}", params).fetchall()
+            return iter([{"_id": value, **{name: n for name in group}} for value, n in rows])
+        res = {}
+        for doc in self.find(query):
+            value = _get_field(doc, key)
+            value = None if value is _MISSING else value
+            item = res.setdefault(value, {"_id": value, **{name: 0 for name in group}})
+            for name, acc in group.items():
+                acc = acc["$sum"]
+                item[name] += acc if not isinstance(acc, str) else _get_field(doc, acc[1:])
+        return iter(res.values())
+
+    def _is_exact(self, query: dict) -> bool:
+        """if the query only has the conditions which can be translated into SQL exactly"""
+        for key, cond in query.items():
+            if key in ("$and", "$or"):
+                if not all(self._is_exact(q) for q in cond):
+                    return False
+            elif key not in self.COLUMNS:
+                return False
+            else:
+                conds = cond if isinstance(cond, dict) and all(k.startswith("$") for k in cond) else {"$eq": cond}
+                for op, target in conds.items():
+                    if op == "$in":
+                        if any(t is None or isinstance(t, (dict, list)) for t in target):
+                            return False
+                    elif op in ("$eq", "$ne"):
+                        if isinstance(target, (dict, list)):
+                            return False
+                    elif op not in self.SQL_OPS:
+                        return False
+        return True
+
+    def drop(self):
+        self.database.drop_collection(self.name)
+
+
+class SQLiteDatabase:
+    """A database in a SQLite file with the same interface as `pymongo.database.Database`"""
+
+    # pid -> (connection, lock) of the in-process store, which is shared by all the databases and threads
+    _MEMORY = {}
+
+    def __init__(self, path: str, name: str):
+        self.path = path
+        self.name = name
+        self._lock = threading.RLock()
+        self._local = threading.local()
+
+    @property
+    def lock(self) -> threading.RLock:
+        return self._connect_memory()[1] if self.path == ":memory:" else self._lock
+
+    def _connect_memory(self) -> Tuple[sqlite3.Connection, threading.RLock]:
+        pid = os.getpid()
+        if pid not in self._MEMORY:
+            self._MEMORY[pid] = (
+                sqlite3.connect(":memory:", isolation_level=None, check_same_thread=False),
+                threading.RLock(),
+            )
+        return self._MEMORY[pid]
+
+    def connect(self) -> sqlite3.Connection:
+        if self.path == ":memory:":
+            return self._connect_memory()[0]
+        # each process and thread has its own connection
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=600, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def get_collection(self, name: str) -> SQLiteCollection:
+        return SQLiteCollection(self, name)
+
+    def __getattr__(self, name: str) -> SQLiteCollection:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self.get_collection(name)
+
+    __getitem__ = get_collection
+
+    def list_collection_names(self) -> List[str]:
+        prefix = f"{self.name}."
+        rows = self.connect().execute("SELECT name FROM sqlite_master WHERE type = 'table'").fetchall()
+        return [name[len(prefix) :] for (name,) in rows if name.startswith(prefix)]
+
+    def drop_collection(self, name: str):
+        with self.lock:
+            self.connect().execute(f'DROP TABLE IF EXISTS "{self.name}.{name}"')
@@ -14,15 +14,18 @@ A task in TaskManager consists of 3 parts
 """
 import concurrent
 import pickle
+import threading
 import time
+import uuid
+import zlib
 from contextlib import contextmanager
-from typing import Callable, List
+from typing import Callable, List, Optional
 
 import fire
 import pymongo
 from bson.binary import Binary
 from bson.objectid import ObjectId
-from pymongo.errors import InvalidDocument
+from pymongo.errors import InvalidDocument, PyMongoError
 from qlib import auto_init, get_module_logger
 from tqdm.cli import tqdm
 
@@ -43,11 +46,21 @@ class TaskManager:
             'filter': json-like data. This is for filtering the tasks.
             'status': 'waiting' | 'running' | 'done'
             'res': pickle serialized task result,
+            # the lease of a running task
+            'lease_id': the id of the fetching,
+            'lease_status': the status before fetching,
+            'lease_expire': the timestamp when the lease expires (optional),
         }
 
     The tasks manager assumes that you will only update the tasks you fetched.
     The mongo fetch one and update will make it date updating secure.
 
+    If the tasks are fetched with a `lease` (in seconds), the lease of the running tasks must be renewed by
+    `heartbeat` (`safe_fetch_task` and `safe_fetch_tasks` do it in a background thread). The running tasks whose
+    lease has expired (e.g. the worker was killed) can be fetched again like the tasks in their original status,
+    so `reset_waiting` is not necessary.
+    NOTE: the lease is based on the clocks of the workers, so they should be synchronized.
+
     This class can be used as a tool from commandline. Here are several examples.
     You can view the help of manage module with the following commands:
     python -m qlib.workflow.task.manage -h # show manual of manage module CLI
@@ -80,8 +93,21 @@ class TaskManager:
     STATUS_PART_DONE = "part_done"
 
     ENCODE_FIELDS_PREFIX = ["def", "res"]
+    # the pickled data larger than the threshold (in bytes) are compressed; the prefix can't start a pickle
+    COMPRESS_THRESHOLD = 1024
+    COMPRESS_PREFIX = b"\x00zlib"
+
+    LEASE_ID = "lease_id"
+    LEASE_STATUS = "lease_status"
+    LEASE_EXPIRE = "lease_expire"
+
+    # the indexes for fetching the tasks by status and priority
+    INDEXES = [
+        [("status", pymongo.ASCENDING), ("priority", pymongo.DESCENDING)],
+        [("status", pymongo.ASCENDING), (LEASE_EXPIRE, pymongo.ASCENDING)],
+    ]
 
-    def __init__(self, task_pool: str):
+    def __init__(self, task_pool: str, create_index: bool = True):
         """
         Init Task Manager, remember to make the statement of MongoDB url and database name firstly.
         A TaskManager instance serves a specific task pool.
@@ -91,10 +117,25 @@ class TaskManager:
         ----------
         task_pool: str
             the name of Collection in MongoDB
+        create_index: bool
+            create the indexes (`INDEXES`) of the task pool if they don't exist
         """
         self.task_pool: pymongo.collection.Collection = getattr(get_mongodb(), task_pool)
         self.logger = get_module_logger(self.__class__.__name__)
         self.logger.info(f"task_pool:{task_pool}")
+        if create_index:
+            self.create_index()
+
+    def create_index(self):
+        """
+        Create the indexes of the task pool. It does nothing if they exist.
+        """
+        for keys in self.INDEXES:
+            try:
+                self.task_pool.create_index(keys)
+            except PyMongoError as e:
+                # e.g. the user has no permission
+                self.logger.warning(f"Failed to create index {keys}: {e}")
 
     @staticmethod
     def list() -> list:
@@ -106,11 +147,22 @@ class TaskManager:
         """
         return get_mongodb().list_collection_names()
 
+    def _encode(self, obj) -> Binary:
+        data = pickle.dumps(obj, protocol=C.dump_protocol_version)
+        if len(data) > self.COMPRESS_THRESHOLD:
+            data = self.COMPRESS_PREFIX + zlib.compress(data)
+        return Binary(data)
+
+    def _decode(self, data: bytes):
+        if data.startswith(self.COMPRESS_PREFIX):
+            data = zlib.decompress(data[len(self.COMPRESS_PREFIX) :])
+        return pickle.loads(data)
+
     def _encode_task(self, task):
         for prefix in self.ENCODE_FIELDS_PREFIX:
             for k in list(task.keys()):
                 if k.startswith(prefix):
-                    task[k] = Binary(pickle.dumps(task[k], protocol=C.dump_protocol_version))
+                    task[k] = self._encode(task[k])
         return task
 
     def _decode_task(self, task):
@@ -131,7 +183,7 @@ class TaskManager:
         for prefix in self.ENCODE_FIELDS_PREFIX:
             for k in list(task.keys()):
                 if k.startswith(prefix):
-                    task[k] = pickle.loads(task[k])
+                    task[k] = self._decode(task[k])
         return task
 
     def _dict_to_str(self, flt):
@@ -260,31 +312,133 @@ class TaskManager:
 
         return _id_list
 
-    def fetch_task(self, query={}, status=STATUS_WAITING) -> dict:
+    def _get_fetch_query(self, query: dict, status: str) -> dict:
+        """the tasks in `status` and the running tasks fetched from `status` whose lease has expired"""
+        query = query.copy()
+        query = self._decode_query(query)
+        query.pop("status", None)
+        expired = {"status": self.STATUS_RUNNING, self.LEASE_STATUS: status, self.LEASE_EXPIRE: {"$lt": time.time()}}
+        cond = {"$or": [{"status": status}, expired]}
+        return {"$and": [query, cond]} if len(query) > 0 else cond
+
+    def _get_lease_update(self, status: str, lease_id: str, lease: Optional[float]) -> dict:
+        fields = {"status": self.STATUS_RUNNING, self.LEASE_ID: lease_id, self.LEASE_STATUS: status}
+        if lease is None:
+            return {"$set": fields, "$unset": {self.LEASE_EXPIRE: ""}}
+        fields[self.LEASE_EXPIRE] = time.time() + lease
+        return {"$set": fields}
+
+    def _get_release_update(self, status: str) -> dict:
+        return {"$set": {"status": status}, "$unset": {self.LEASE_ID: "", self.LEASE_STATUS: "", self.LEASE_EXPIRE: ""}}
+
+    def fetch_task(self, query={}, status=STATUS_WAITING, lease: Optional[float] = None) -> dict:
         """
         Use query to fetch tasks.
 
         Args:
             query (dict, optional): query dict. Defaults to {}.
             status (str, optional): [description]. Defaults to STATUS_WAITING.
+            lease (float, optional): the lease of the task in seconds, which must be renewed by `heartbeat`.
+                None for no expiration.
 
         Returns:
             dict: a task(document in collection) after decoding
         """
-        query = query.copy()
-        query = self._decode_query(query)
-        query.update({"status": status})
         task = self.task_pool.find_one_and_update(
-            query, {"$set": {"status": self.STATUS_RUNNING}}, sort=[("priority", pymongo.DESCENDING)]
+            self._get_fetch_query(query, status),
+            self._get_lease_update(status, uuid.uuid4().hex, lease),
+            sort=[("priority", pymongo.DESCENDING)],
+            return_document=pymongo.ReturnDocument.AFTER,
         )
         # null will be at the top after sorting when using ASCENDING, so the larger the number higher, the higher the priority
         if task is None:
             return None
-        task["status"] = self.STATUS_RUNNING
         return self._decode_task(task)
 
+    def fetch_tasks(self, query={}, status=STATUS_WAITING, n: int = 1, lease: Optional[float] = None) -> List[dict]:
+        """
+        Fetch at most `n` tasks in a few round trips.
+
+        Each task is leased atomically (so a task will never be fetched by two workers), but the tasks may be leased by
+        other workers concurrently, so less than `n` tasks may be fetched even if there are enough tasks.
+
+        Args:
+            query (dict, optional): query dict. Defaults to {}.
+            status (str, optional): the status of the tasks to fetch. Defaults to STATUS_WAITING.
+            n (int): the max number of tasks.
+            lease (float, optional): the lease of the tasks in seconds, see `fetch_task`.
+
+        Returns:
+            List[dict]: the tasks after decoding, sorted by priority
+        """
+        if n == 1:
+            task = self.fetch_task(query=query, status=status, lease=lease)
+            return [] if task is None else [task]
+        lease_id = uuid.uuid4().hex
+        fetch_query = self._get_fetch_query(query, status)
+        update = self._get_lease_update(status, lease_id, lease)
+        sort = [("priority", pymongo.DESCENDING)]
+        ids, n_leased = [], 0
+        while n_leased < n:
+            candidates = [
+                t["_id"] for t in self.task_pool.find(fetch_query, projection=["_id"], sort=sort, limit=n - n_leased)
+            ]
+            if len(candidates) == 0:
+                break
+            # the candidates leased by others in the meantime don't match `fetch_query` anymore
+            res = self.task_pool.update_many({"$and": [fetch_query, {"_id": {"$in": candidates}}]}, update)
+            ids.extend(candidates)
+            n_leased += res.modified_count
+        if n_leased == 0:
+            return []
+        tasks = self.task_pool.find({"_id": {"$in": ids}, self.LEASE_ID: lease_id}, sort=sort)
+        return [self._decode_task(t) for t in tasks]
+
+    def heartbeat(self, tasks: List[dict], lease: float) -> int:
+        """
+        Renew the lease of the running tasks.
+
+        Args:
+            tasks (List[dict]): the tasks fetched with lease.
+            lease (float): the new lease in seconds from now.
+
+        Returns:
+            int: the number of tasks renewed. The tasks whose lease has been lost (e.g. expired and fetched by others)
+            are not renewed.
+        """
+        if len(tasks) == 0:
+            return 0
+        res = self.task_pool.update_many(
+            {
+                "_id": {"$in": [t["_id"] for t in tasks]},
+                "status": self.STATUS_RUNNING,
+                self.LEASE_ID: {"$in": list({t[self.LEASE_ID] for t in tasks})},
+            },
+            {"$set": {self.LEASE_EXPIRE: time.time() + lease}},
+        )
+        return res.modified_count
+
     @contextmanager
-    def safe_fetch_task(self, query={}, status=STATUS_WAITING):
+    def _lease(self, tasks: List[dict], status: str, lease: Optional[float]):
+        """renew the lease of the tasks in the background and return the unfinished tasks if any error occurs"""
+        heartbeat = None
+        if lease is not None and len(tasks) > 0:
+            heartbeat = _Heartbeat(self, tasks, lease)
+            heartbeat.start()
+        try:
+            yield
+        except (Exception, KeyboardInterrupt):  # KeyboardInterrupt is not a subclass of Exception
+            if len(tasks) > 0:
+                self.logger.info("Returning task before raising error")
+                self.return_tasks(tasks, status=status)  # return task as the original status
+                self.logger.info("Task returned")
+            raise
+        finally:
+            if heartbeat is not None:
+                heartbeat.stop()
+
+    @contextmanager
+    def safe_fetch_task(self, query={}, status=STATUS_WAITING, lease: Optional[float] = None):
         """
         Fetch task from task_pool using query with contextmanager
 
@@ -292,20 +446,39 @@ class TaskManager:
         ----------
         query: dict
             the dict of query
+        lease: float
+            the lease of the task in seconds, which is renewed in the background until exiting
 
         Returns
         -------
         dict: a task(document in collection) after decoding
         """
-        task = self.fetch_task(query=query, status=status)
-        try:
+        task = self.fetch_task(query=query, status=status, lease=lease)
+        with self._lease([] if task is None else [task], status, lease):
             yield task
-        except (Exception, KeyboardInterrupt):  # KeyboardInterrupt is not a subclass of Exception
-            if task is not None:
-                self.logger.info("Returning task before raising error")
-                self.return_task(task, status=status)  # return task as the original status
-                self.logger.info("Task returned")
-            raise
+
+    @contextmanager
+    def safe_fetch_tasks(self, query={}, status=STATUS_WAITING, n: int = 1, lease: Optional[float] = None):
+        """
+        Fetch at most `n` tasks (see `fetch_tasks`) with contextmanager.
+        If any error occurs, the tasks not committed will be returned.
+
+        Parameters
+        ----------
+        query: dict
+            the dict of query
+        n: int
+            the max number of tasks
+        lease: float
+            the lease of the tasks in seconds, which is renewed in the background until exiting
+
+        Returns
+        -------
+        List[dict]: the tasks after decoding
+        """
+        tasks = self.fetch_tasks(query=query, status=status, n=n, lease=lease)
+        with self._lease(tasks, status, lease):
+            yield tasks
 
     def task_fetcher_iter(self, query={}):
         while True:
@@ -334,7 +507,7 @@ class TaskManager:
         query = query.copy()
         query = self._decode_query(query)
         for t in self.task_pool.find(query):
-            yield self._decode_task(t)
+            yield self._decode_task(t) if decode else t
 
     def re_query(self, _id) -> dict:
         """
@@ -361,10 +534,9 @@ class TaskManager:
         # A workaround to use the class attribute.
         if status is None:
             status = TaskManager.STATUS_DONE
-        self.task_pool.update_one(
-            {"_id": task["_id"]},
-            {"$set": {"status": status, "res": Binary(pickle.dumps(res, protocol=C.dump_protocol_version))}},
-        )
+        update = self._get_release_update(status)
+        update["$set"]["res"] = self._encode(res)
+        self.task_pool.update_one({"_id": task["_id"]}, update)
 
     def return_task(self, task, status=STATUS_WAITING):
         """
@@ -376,8 +548,29 @@ class TaskManager:
         """
         if status is None:
             status = TaskManager.STATUS_WAITING
-        update_dict = {"$set": {"status": status}}
-        self.task_pool.update_one({"_id": task["_id"]}, update_dict)
+        self.task_pool.update_one({"_id": task["_id"]}, self._get_release_update(status))
+
+    def return_tasks(self, tasks: List[dict], status=STATUS_WAITING):
+        """
+        Return the tasks which are still running with the lease of fetching to status.
+        The tasks which have been committed or fetched by others are skipped.
+
+        Args:
+            tasks (List[dict]): the fetched tasks.
+            status (str, optional): Defaults to STATUS_WAITING.
+        """
+        if len(tasks) == 0:
+            return
+        if status is None:
+            status = TaskManager.STATUS_WAITING
+        self.task_pool.update_many(
+            {
+                "_id": {"$in": [t["_id"] for t in tasks]},
+                "status": self.STATUS_RUNNING,
+                self.LEASE_ID: {"$in": list({t.get(self.LEASE_ID) for t in tasks})},
+            },
+            self._get_release_update(status),
+        )
 
     def remove(self, query={}):
         """
@@ -405,11 +598,9 @@ class TaskManager:
         """
         query = query.copy()
         query = self._decode_query(query)
-        tasks = self.query(query=query, decode=False)
-        status_stat = {}
-        for t in tasks:
-            status_stat[t["status"]] = status_stat.get(t["status"], 0) + 1
-        return status_stat
+        # count in the database instead of downloading the tasks
+        pipeline = [{"$match": query}, {"$group": {"_id": "$status", "count": {"$sum": 1}}}]
+        return {item["_id"]: item["count"] for item in self.task_pool.aggregate(pipeline)}
 
     def reset_waiting(self, query={}):
         """
@@ -427,7 +618,7 @@ class TaskManager:
     def reset_status(self, query, status):
         query = query.copy()
         query = self._decode_query(query)
-        print(self.task_pool.update_many(query, {"$set": {"status": status}}))
+        print(self.task_pool.update_many(query, self._get_release_update(status)))
 
     def prioritize(self, task, priority: int):
         """
@@ -480,6 +671,28 @@ class TaskManager:
         return f"TaskManager({self.task_pool})"
 
 
+class _Heartbeat(threading.Thread):
+    """renew the lease of the tasks periodically"""
+
+    def __init__(self, tm: TaskManager, tasks: List[dict], lease: float):
+        super().__init__(daemon=True)
+        self.tm = tm
+        self.tasks = tasks
+        self.lease = lease
+        self._stopped = threading.Event()
+
+    def run(self):
+        while not self._stopped.wait(self.lease / 3):
+            try:
+                self.tm.heartbeat(self.tasks, self.lease)
+            except PyMongoError as e:
+                self.tm.logger.warning(f"Failed to renew the lease: {e}")
+
+    def stop(self):
+        self._stopped.set()
+        self.join()
+
+
 def run_task(
     task_func: Callable,
     task_pool: str,
@@ -487,6 +700,8 @@ def run_task(
     force_release: bool = False,
     before_status: str = TaskManager.STATUS_WAITING,
     after_status: str = TaskManager.STATUS_DONE,
+    fetch_n: int = 1,
+    lease: Optional[float] = None,
     **kwargs,
 ):
     r"""
@@ -518,6 +733,13 @@ def run_task(
         the tasks in before_status will be fetched and trained. Can be STATUS_WAITING, STATUS_PART_DONE.
     after_status : str:
         the tasks after trained will become after_status. Can be STATUS_WAITING, STATUS_PART_DONE.
+    fetch_n : int
+        the number of tasks fetched in a batch, which reduces the round trips to the database when there are many
+        short tasks
+    lease : float
+        the lease of the fetched tasks in seconds. The lease is renewed in the background while running, so if the
+        worker is killed, the tasks can be fetched by other workers after the lease expires.
+        None for no expiration (the tasks have to be reset by `reset_waiting`)
     kwargs
         the params for `task_func`
     """
@@ -526,25 +748,26 @@ def run_task(
     ever_run = False
 
     while True:
-        with tm.safe_fetch_task(status=before_status, query=query) as task:
-            if task is None:
+        with tm.safe_fetch_tasks(status=before_status, query=query, n=fetch_n, lease=lease) as tasks:
+            if len(tasks) == 0:
                 break
-            get_module_logger("run_task").info(task["def"])
-            # when fetching `WAITING` task, use task["def"] to train
-            if before_status == TaskManager.STATUS_WAITING:
-                param = task["def"]
-            # when fetching `PART_DONE` task, use task["res"] to train because the middle result has been saved to task["res"]
-            elif before_status == TaskManager.STATUS_PART_DONE:
-                param = task["res"]
-            else:
-                raise ValueError("The fetched task must be `STATUS_WAITING` or `STATUS_PART_DONE`!")
-            if force_release:
-                with concurrent.futures.ProcessPoolExecutor(max_workers=1) as executor:
-                    res = executor.submit(task_func, param, **kwargs).result()
-            else:
-                res = task_func(param, **kwargs)
-            tm.commit_task_res(task, res, status=after_status)
-            ever_run = True
+            for task in tasks:
+                get_module_logger("run_task").info(task["def"])
+                # when fetching `WAITING` task, use task["def"] to train
+                if before_status == TaskManager.STATUS_WAITING:
+                    param = task["def"]
+                # when fetching `PART_DONE` task, use task["res"] to train because the middle result has been saved to task["res"]
+                elif before_status == TaskManager.STATUS_PART_DONE:
+                    param = task["res"]
+                else:
+                    raise ValueError("The fetched task must be `STATUS_WAITING` or `STATUS_PART_DONE`!")
+                if force_release:
+                    with concurrent.futures.ProcessPoolExecutor(max_workers=1) as executor:
+                        res = executor.submit(task_func, param, **kwargs).result()
+                else:
+                    res = task_func(param, **kwargs)
+                tm.commit_task_res(task, res, status=after_status)
+                ever_run = True
 
     return ever_run
 
@@ -15,6 +15,8 @@ from pymongo import MongoClient
 from pymongo.database import Database
 from typing import Union
 
+SQLITE_PREFIX = "sqlite://"
+
 
 def get_mongodb() -> Database:
 
@@ -42,6 +44,9 @@ def get_mongodb() -> Database:
                     "task_db_name" : "rolling_db"
                 }
 
+    If the url starts with `sqlite://` (e.g. `sqlite:///path/to/tasks.db` or `sqlite://:memory:`), the local stand-in
+    in `qlib.workflow.task.local_db` will be used instead of MongoDB.
+
     Returns:
         Database: the Database instance
     """
@@ -51,6 +56,10 @@ def get_mongodb() -> Database:
         get_module_logger("task").error("Please configure `C['mongo']` before using TaskManager")
         raise
     get_module_logger("task").info(f"mongo config:{cfg}")
+    if cfg["task_url"].startswith(SQLITE_PREFIX):
+        from .local_db import SQLiteDatabase  # pylint: disable=C0415
+
+        return SQLiteDatabase(cfg["task_url"][len(SQLITE_PREFIX) :], cfg["task_db_name"])
     client = MongoClient(cfg["task_url"])
     return client.get_database(name=cfg["task_db_name"])
 
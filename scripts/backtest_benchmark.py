@@ -0,0 +1,213 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+"""
+Reference benchmark of the backtest.
+
+It runs a daily TopK backtest (and optionally a nested day/30min/1min backtest) with the backtest profiler enabled
+and reports the time of each (level, component).
+
+.. code-block:: bash
+
+    # record the baseline
+    python scripts/backtest_benchmark.py run --output_dir ./bench_base
+    # compare the current code with the baseline; exit with non-zero code if it is slower than the tolerance
+    python scripts/backtest_benchmark.py run --output_dir ./bench_new --baseline ./bench_base/profile.csv
+"""
+import sys
+import time
+from pathlib import Path
+
+import fire
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+import qlib
+from qlib.backtest import backtest
+from qlib.backtest.profiler import PROFILER
+from qlib.data import D
+
+
+class BacktestBenchmark:
+    def __init__(
+        self,
+        provider_uri: str = "~/.qlib/qlib_data/cn_data",
+        provider_uri_1min: str = "~/.qlib/qlib_data/cn_data_1min",
+        market: str = "csi300",
+        start_time: str = "2020-01-01",
+        end_time: str = "2020-06-30",
+        topk: int = 50,
+        n_drop: int = 5,
+        seed: int = 0,
+    ):
+        """
+        Parameters
+        ----------
+        provider_uri : str
+            the qlib daily data dir
+        provider_uri_1min : str
+            the qlib 1min data dir, which is only used by the nested backtest
+        market : str
+            the stock pool
+        start_time : str
+            start time of the backtest
+        end_time : str
+            end time of the backtest
+        topk : int
+            topk of TopkDropoutStrategy
+        n_drop : int
+            n_drop of TopkDropoutStrategy
+        seed : int
+            the random seed of the signal
+        """
+        self.provider_uri = provider_uri
+        self.provider_uri_1min = provider_uri_1min
+        self.market = market
+        self.start_time = start_time
+        self.end_time = end_time
+        self.topk = topk
+        self.n_drop = n_drop
+        self.seed = seed
+
+    def _get_signal(self) -> pd.Series:
+        codes = D.list_instruments(D.instruments(self.market), self.start_time, self.end_time, as_list=True)
+        index = pd.MultiIndex.from_product(
+            [D.calendar(self.start_time, self.end_time), codes], names=["datetime", "instrument"]
+        )
+        return pd.Series(np.random.RandomState(self.seed).randn(len(index)), index=index)
+
+    def _strategy_config(self, signal: pd.Series) -> dict:
+        return {
+            "class": "TopkDropoutStrategy",
+            "module_path": "qlib.contrib.strategy.signal_strategy",
+            "kwargs": {"signal": signal, "topk": self.topk, "n_drop": self.n_drop},
+        }
+
+    def _daily_backtest(self, signal: pd.Series) -> None:
+        backtest(
+            start_time=self.start_time,
+            end_time=self.end_time,
+            strategy=self._strategy_config(signal),
+            executor={
+                "class": "SimulatorExecutor",
+                "module_path": "qlib.backtest.executor",
+                "kwargs": {"time_per_step": "day", "generate_portfolio_metrics": True},
+            },
+            benchmark=None,
+            exchange_kwargs={
+                "freq": "day",
+                "codes": self.market,
+                "limit_threshold": 0.095,
+                "deal_price": "close",
+                "open_cost": 0.0005,
+                "close_cost": 0.0015,
+                "min_cost": 5,
+            },
+        )
+
+    def _nested_backtest(self, signal: pd.Series) -> None:
+        backtest(
+            start_time=self.start_time,
+            end_time=self.end_time,
+            strategy=self._strategy_config(signal),
+            executor={
+                "class": "NestedExecutor",
+                "module_path": "qlib.backtest.executor",
+                "kwargs": {
+                    "time_per_step": "day",
+                    "inner_executor": {
+                        "class": "NestedExecutor",
+                        "module_path": "qlib.backtest.executor",
+                        "kwargs": {
+                            "time_per_step": "30min",
+                            "inner_executor": {
+                                "class": "SimulatorExecutor",
+                                "module_path": "qlib.backtest.executor",
+                                "kwargs": {"time_per_step": "1min", "generate_portfolio_metrics": True},
+                            },
+                            "inner_strategy": {"class": "TWAPStrategy", "module_path": "qlib.contrib.strategy"},
+                            "generate_portfolio_metrics": True,
+                        },
+                    },
+                    "inner_strategy": {"class": "TWAPStrategy", "module_path": "qlib.contrib.strategy"},
+                    "generate_portfolio_metrics": True,
+                },
+            },
+            benchmark=None,
+            exchange_kwargs={
+                "freq": "1min",
+                "codes": self.market,
+                "limit_threshold": 0.095,
+                "deal_price": "close",
+                "open_cost": 0.0005,
+                "close_cost": 0.0015,
+                "min_cost": 5,
+            },
+        )
+
+    def run(
+        self,
+        output_dir: str = "./backtest_benchmark",
+        nested: bool = False,
+        trace: bool = False,
+        baseline=None,
+        tolerance: float = 0.2,
+    ):
+        """
+        Run the benchmark and save the profile into `output_dir`
+
+        Parameters
+        ----------
+        output_dir : str
+            the profile of each backtest and the summary `profile.csv` will be saved in it
+        nested : bool
+            run the nested day/30min/1min backtest besides the daily backtest
+        trace : bool
+            save the Chrome trace of each backtest
+        baseline : str
+            the path of the `profile.csv` of a previous run; the benchmark fails if the total time of a backtest is
+            slower than the baseline by more than `tolerance`
+        tolerance : float
+            the tolerated relative slowdown
+        """
+        if nested:
+            qlib.init(provider_uri={"day": self.provider_uri, "1min": self.provider_uri_1min})
+        else:
+            qlib.init(provider_uri=self.provider_uri)
+        output_dir = Path(output_dir).expanduser()
+        output_dir.mkdir(parents=True, exist_ok=True)
+
+        signal = self._get_signal()
+        tasks = {"daily": self._daily_backtest}
+        if nested:
+            tasks["nested"] = self._nested_backtest
+
+        res = []
+        for name, func in tasks.items():
+            with PROFILER.profiling(trace=trace):
+                start = time.perf_counter()
+                func(signal)
+                total = time.perf_counter() - start
+            profile = PROFILER.to_dataframe()
+            profile.loc[(-1, "backtest"), :] = [1, total, total]
+            profile = pd.concat({name: profile}, names=["benchmark"])
+            logger.info(f"{name} backtest takes {total:.3f}s\n{profile}")
+            if trace:
+                PROFILER.dump_chrome_trace(output_dir / f"{name}_trace.json")
+            res.append(profile)
+        res = pd.concat(res)
+        res.to_csv(output_dir / "profile.csv")
+
+        if baseline is not None:
+            base = pd.read_csv(baseline, index_col=[0, 1, 2])
+            base_total = base.xs((-1, "backtest"), level=["level", "component"])["total"]
+            new_total = res.xs((-1, "backtest"), level=["level", "component"])["total"]
+            ratio = (new_total / base_total).dropna()
+            logger.info(f"the ratio of time to the baseline:\n{ratio}")
+            if (ratio > 1 + tolerance).any():
+                logger.error(f"the backtest is slower than the baseline by more than {tolerance:.0%}")
+                sys.exit(1)
+
+
+if __name__ == "__main__":
+    fire.Fire(BacktestBenchmark)
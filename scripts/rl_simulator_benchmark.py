@@ -0,0 +1,209 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+"""
+Benchmark of the order execution simulators.
+
+``run`` runs the same random orders on the pickle-styled backtest data and on the columnar store converted from it,
+with ``SingleAssetOrderExecutionSimple``, and reports the episodes per second of each.
+
+``batch`` runs the same random orders with ``SingleAssetOrderExecutionSimple`` one by one, and with
+``BatchSingleAssetOrderExecutionSimple`` of ``size`` slots, and reports the env steps per second of each.
+
+.. code-block:: bash
+
+    # on synthetic data
+    python scripts/rl_simulator_benchmark.py run
+    python scripts/rl_simulator_benchmark.py batch --size 64
+    # on the data of the RL example (examples/rl)
+    python scripts/rl_simulator_benchmark.py run --pickle_dir examples/rl/data/pickle_dataframe/backtest
+"""
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Optional
+
+import fire
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+from qlib.backtest import Order
+from qlib.rl.data.columnar import _open_stock, convert_pickle_to_columnar
+from qlib.rl.data.pickle_styled import BACKTEST_DATA_CACHE, _read_pickle
+from qlib.rl.order_execution import BatchSingleAssetOrderExecutionSimple, SingleAssetOrderExecutionSimple
+
+
+class SAOESimpleBenchmark:
+    def __init__(
+        self,
+        pickle_dir: Optional[str] = None,
+        n_stocks: int = 50,
+        n_days: int = 500,
+        n_episodes: int = 1000,
+        ticks_per_step: int = 30,
+        seed: int = 0,
+    ):
+        """
+        Parameters
+        ----------
+        pickle_dir : Optional[str]
+            the dir of the pickle-styled backtest data; synthetic data are generated if it is None
+        n_stocks : int
+            the number of stocks of the synthetic data
+        n_days : int
+            the number of days of the synthetic data
+        n_episodes : int
+            the number of orders (episodes) to run
+        ticks_per_step : int
+            ticks per step of the simulator
+        seed : int
+            the random seed of the orders and the synthetic data
+        """
+        self.pickle_dir = pickle_dir
+        self.n_stocks = n_stocks
+        self.n_days = n_days
+        self.n_episodes = n_episodes
+        self.ticks_per_step = ticks_per_step
+        self.seed = seed
+
+    def _gen_pickles(self, pickle_dir: Path) -> None:
+        rng = np.random.RandomState(self.seed)
+        dates = pd.bdate_range("2018-01-01", periods=self.n_days)
+        minutes = pd.to_timedelta(np.r_[570:690, 780:900], unit="min")
+        datetime = (dates.values[:, None] + minutes.values[None, :]).ravel()
+        for i in range(self.n_stocks):
+            index = pd.MultiIndex.from_arrays(
+                [[f"S{i:04d}"] * len(datetime), datetime, np.repeat(dates.values, len(minutes))],
+                names=["instrument", "datetime", "date"],
+            )
+            price = 10 * np.exp(np.cumsum(rng.randn(len(index)) * 1e-3))
+            df = pd.DataFrame(
+                {
+                    "$close0": price,
+                    "$bid0": price * 0.999,
+                    "$ask0": price * 1.001,
+                    "$volume0": rng.randint(100, 10000, len(index)).astype(np.float64),
+                },
+                index=index,
+            ).astype(np.float32)
+            df.to_pickle(pickle_dir / f"S{i:04d}.pkl")
+
+    def _orders(self, data_dir: Path) -> List[Order]:
+        rng = np.random.RandomState(self.seed)
+        stocks = sorted({p.name for p in data_dir.iterdir() if p.is_dir()})
+        orders = []
+        for _ in range(self.n_episodes):
+            stock_id = stocks[rng.randint(len(stocks))]
+            stock = _open_stock(data_dir, stock_id)
+            date = pd.Timestamp(list(stock.ranges)[rng.randint(len(stock.ranges))])
+            ticks = stock.datetime[stock.slice(date)]
+            start_time, end_time = pd.Timestamp(ticks[0]), pd.Timestamp(ticks[-1]) + pd.Timedelta("1min")
+            orders.append(Order(stock_id, 100.0, rng.randint(2), start_time, end_time))
+        return orders
+
+    @staticmethod
+    def _clear_caches() -> None:
+        # start cold, as the orders of an epoch are spread over many stocks and days
+        _read_pickle.cache_clear()
+        BACKTEST_DATA_CACHE.clear()
+        _open_stock.cache_clear()
+
+    def _run_episodes(self, orders: List[Order], data_dir: Path) -> float:
+        self._clear_caches()
+        start = time.perf_counter()
+        for order in orders:
+            simulator = SingleAssetOrderExecutionSimple(order, data_dir, ticks_per_step=self.ticks_per_step)
+            while not simulator.done():
+                simulator.step(order.amount / 8)
+        return len(orders) / (time.perf_counter() - start)
+
+    def _run_single_steps(self, orders: List[Order], data_dir: Path) -> float:
+        self._clear_caches()
+        n_steps = 0
+        start = time.perf_counter()
+        for order in orders:
+            simulator = SingleAssetOrderExecutionSimple(order, data_dir, ticks_per_step=self.ticks_per_step)
+            while not simulator.done():
+                simulator.step(order.amount / 8)
+                n_steps += 1
+        return n_steps / (time.perf_counter() - start)
+
+    def _run_batch_steps(self, orders: List[Order], data_dir: Path, size: int) -> float:
+        self._clear_caches()
+        simulator = BatchSingleAssetOrderExecutionSimple(size, data_dir, ticks_per_step=self.ticks_per_step)
+        n_steps = 0
+        start = time.perf_counter()
+        # a new order is fed into a slot as soon as the slot is done, like a vector env does
+        pending = iter(orders)
+        simulator.reset(np.arange(size), [next(pending) for _ in range(size)])
+        active = np.ones(size, dtype=bool)
+        while active.any():
+            ids = np.flatnonzero(active)
+            simulator.step(ids, simulator.amount[ids] / 8)
+            n_steps += len(ids)
+            for i in ids[simulator.done()[ids]]:
+                order = next(pending, None)
+                if order is None:
+                    active[i] = False
+                else:
+                    simulator.reset(np.array([i]), [order])
+        return n_steps / (time.perf_counter() - start)
+
+    def _prepare(self, tmp_dir: Path) -> Path:
+        if self.pickle_dir is None:
+            pickle_dir = tmp_dir / "pickle"
+            pickle_dir.mkdir()
+            self._gen_pickles(pickle_dir)
+        else:
+            pickle_dir = Path(self.pickle_dir).expanduser()
+        columnar_dir = tmp_dir / "columnar"
+        start = time.perf_counter()
+        convert_pickle_to_columnar(pickle_dir, columnar_dir)
+        logger.info(f"converting the pickles takes {time.perf_counter() - start:.3f}s")
+        return pickle_dir
+
+    def run(self) -> None:
+        tmp_dir = Path(tempfile.mkdtemp())
+        try:
+            pickle_dir = self._prepare(tmp_dir)
+            columnar_dir = tmp_dir / "columnar"
+            orders = self._orders(columnar_dir)
+            res = pd.Series(
+                {
+                    name: self._run_episodes(orders, path)
+                    for name, path in [("pickle", pickle_dir), ("columnar", columnar_dir)]
+                },
+                name="episodes/sec",
+            )
+            logger.info(f"episodes per second:\n{res}")
+        finally:
+            shutil.rmtree(tmp_dir)
+
+    def batch(self, size: int = 64) -> None:
+        """
+        Parameters
+        ----------
+        size : int
+            the number of slots of the batch simulator
+        """
+        tmp_dir = Path(tempfile.mkdtemp())
+        try:
+            self._prepare(tmp_dir)
+            columnar_dir = tmp_dir / "columnar"
+            orders = self._orders(columnar_dir)
+            assert len(orders) >= size, "There should be at least one order per slot."
+            res = pd.Series(
+                {
+                    "single": self._run_single_steps(orders, columnar_dir),
+                    f"batch ({size} slots)": self._run_batch_steps(orders, columnar_dir, size),
+                },
+                name="steps/sec",
+            )
+            logger.info(f"env steps per second:\n{res}")
+        finally:
+            shutil.rmtree(tmp_dir)
+
+
+if __name__ == "__main__":
+    fire.Fire(SAOESimpleBenchmark)
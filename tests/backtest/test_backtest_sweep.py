@@ -0,0 +1,93 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from qlib.backtest import backtest, backtest_sweep
+from qlib.contrib.evaluate import risk_analysis
+from qlib.data import D
+from qlib.tests import TestAutoData
+
+
+class BacktestSweepTest(TestAutoData):
+    START_TIME = "2020-01-01"
+    END_TIME = "2020-03-31"
+
+    def _get_configs(self):
+        codes = D.list_instruments(D.instruments("csi300"), self.START_TIME, self.END_TIME, as_list=True)[:50]
+        index = pd.MultiIndex.from_product(
+            [D.calendar(self.START_TIME, self.END_TIME), codes], names=["datetime", "instrument"]
+        )
+        signal = pd.Series(np.random.RandomState(0).randn(len(index)), index=index)
+        strategy_config = {
+            "class": "TopkDropoutStrategy",
+            "module_path": "qlib.contrib.strategy.signal_strategy",
+            "kwargs": {"signal": signal, "topk": 10, "n_drop": 2},
+        }
+        executor_config = {
+            "class": "SimulatorExecutor",
+            "module_path": "qlib.backtest.executor",
+            "kwargs": {"time_per_step": "day", "generate_portfolio_metrics": True},
+        }
+        exchange_kwargs = {
+            "freq": "day",
+            "codes": codes,
+            "limit_threshold": 0.095,
+            "deal_price": "close",
+            "open_cost": 0.0005,
+            "close_cost": 0.0015,
+            "min_cost": 5,
+        }
+        return strategy_config, executor_config, exchange_kwargs
+
+    def test_sweep(self):
+        strategy_config, executor_config, exchange_kwargs = self._get_configs()
+        sweep_configs = [
+            {},
+            {"strategy": {"topk": 5, "n_drop": 1}},
+            {"exchange": {"open_cost": 0.002, "close_cost": 0.003}},
+        ]
+        kwargs = dict(
+            start_time=self.START_TIME,
+            end_time=self.END_TIME,
+            strategy=strategy_config,
+            executor=executor_config,
+            sweep_configs=sweep_configs,
+            account=1e8,
+            exchange_kwargs=exchange_kwargs,
+        )
+        res_single = backtest_sweep(**kwargs, n_jobs=1)
+        res_paral = backtest_sweep(**kwargs, n_jobs=2)
+        self.assertEqual(len(res_single), len(sweep_configs))
+        pd.testing.assert_frame_equal(res_single, res_paral)
+
+        # the result of the first config is the same as a single backtest
+        portfolio_dict, _ = backtest(
+            start_time=self.START_TIME,
+            end_time=self.END_TIME,
+            strategy=strategy_config,
+            executor=executor_config,
+            account=1e8,
+            exchange_kwargs=exchange_kwargs,
+        )
+        report_normal, _ = portfolio_dict["1day"]
+        risk = risk_analysis(report_normal["return"] - report_normal["bench"] - report_normal["cost"], freq="day")
+        self.assertAlmostEqual(
+            res_single.loc[0, "1day.excess_return_with_cost.annualized_return"],
+            risk.loc["annualized_return", "risk"],
+        )
+        # higher cost results in lower return
+        self.assertLess(
+            res_single.loc[2, "1day.excess_return_with_cost.annualized_return"],
+            res_single.loc[0, "1day.excess_return_with_cost.annualized_return"],
+        )
+
+        with self.assertRaises(ValueError):
+            backtest_sweep(**{**kwargs, "sweep_configs": [{"exchange": {"freq": "1min"}}]}, n_jobs=1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,46 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from qlib.backtest import get_exchange
+from qlib.backtest.decision import Order
+from qlib.data import D
+from qlib.tests import TestAutoData
+
+
+class ExchangeMaskTest(TestAutoData):
+    def test_tradable_mask(self):
+        start_time, end_time = "2020-01-01", "2020-03-31"
+        codes = D.list_instruments(D.instruments("csi300"), start_time, end_time, as_list=True)[:100]
+        exchange = get_exchange(
+            freq="day",
+            start_time=start_time,
+            end_time=end_time,
+            codes=codes,
+            limit_threshold=0.03,
+            deal_price="close",
+        )
+        stocks = codes + ["NOT_EXISTS"]
+        cal = D.calendar(start_time, end_time)
+        for start, end in [
+            (cal[3], cal[3] + pd.Timedelta(days=1) - pd.Timedelta(seconds=1)),
+            (cal[5], cal[9]),
+            (cal[0], cal[-1]),
+            (pd.Timestamp("2019-01-01"), pd.Timestamp("2019-01-31")),
+        ]:
+            for direction in [None, Order.BUY, Order.SELL]:
+                expected = np.array([exchange.is_stock_tradable(s, start, end, direction) for s in stocks])
+                np.testing.assert_array_equal(exchange.tradable_mask(stocks, start, end, direction), expected)
+                expected = np.array([bool(exchange.check_stock_limit(s, start, end, direction)) for s in stocks])
+                np.testing.assert_array_equal(exchange.limit_mask(stocks, start, end, direction), expected)
+            expected = np.array([bool(exchange.check_stock_suspended(s, start, end)) for s in stocks])
+            np.testing.assert_array_equal(exchange.suspended_mask(stocks, start, end), expected)
+        self.assertFalse(exchange.tradable_mask(["NOT_EXISTS"], cal[0], cal[-1])[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+import copy
+import unittest
+
+import numpy as np
+import pandas as pd
+
+import qlib.utils.index_data as idd
+from qlib.backtest.decision import Order, OrderDir
+from qlib.backtest.high_performance_ds import NumpyOrderIndicator
+from qlib.backtest.report import Indicator
+
+
+class MockDecision:
+    trade_range = None
+
+
+class MockExchange:
+    """return a deterministic price/volume series for each (stock, step, direction)"""
+
+    def get_deal_price(self, stock_id, start_time, end_time, direction, method=None):
+        if stock_id == "SH600002" and start_time.minute == 0:
+            # no data in this step
+            return None
+        seed = hash((stock_id, start_time, direction)) % 1000
+        return idd.SingleData(10 + np.arange(3) + seed / 1000, pd.date_range(start_time, periods=3, freq="1min"))
+
+    def get_volume(self, stock_id, start_time, end_time, method=None):
+        seed = hash((stock_id, start_time)) % 1000
+        return idd.SingleData(100.0 + np.arange(3) + seed, pd.date_range(start_time, periods=3, freq="1min"))
+
+
+class InnerIndicatorAccTest(unittest.TestCase):
+    def _gen_inner_indicators(self, with_base: bool):
+        rs = np.random.RandomState(0)
+        insts = ["SH600000", "SH600001", "SH600002", "SH600003"]
+        inner_order_indicators, decision_list = [], []
+        for i, start in enumerate(pd.date_range("2020-01-02 09:30", periods=8, freq="15min")):
+            step_insts = [inst for inst in insts if rs.rand() > 0.3 or i == 0]
+            oi = NumpyOrderIndicator()
+            amount = {inst: rs.randint(1, 10) * 100.0 for inst in step_insts}
+            oi.assign("inner_amount", amount)
+            oi.assign("deal_amount", {inst: amount[inst] * rs.rand() for inst in step_insts})
+            oi.assign("trade_price", {inst: 10 + rs.rand() for inst in step_insts})
+            oi.assign("trade_value", {inst: rs.rand() * 1000 for inst in step_insts})
+            oi.assign("trade_cost", {inst: rs.rand() for inst in step_insts})
+            # SH600003 is sold at first and then bought
+            oi.assign(
+                "trade_dir",
+                {inst: Order.BUY if inst != "SH600003" or i > 5 else Order.SELL for inst in step_insts},
+            )
+            if with_base:
+                oi.assign("base_price", {inst: 10 + rs.rand() if rs.rand() > 0.5 else np.nan for inst in step_insts})
+                oi.assign("base_volume", {inst: 100 * rs.rand() for inst in step_insts})
+            inner_order_indicators.append(oi)
+            decision_list.append((MockDecision(), start, start + pd.Timedelta("14min")))
+        return inner_order_indicators, decision_list
+
+    def test_acc_equal_to_list_agg(self):
+        for with_base in [True, False]:
+            for agg in ["twap", "vwap"]:
+                pa_config = {"agg": agg}
+                inner_order_indicators, decision_list = self._gen_inner_indicators(with_base)
+                res = {}
+                for use_acc in [False, True]:
+                    indicator = Indicator()
+                    exchange = MockExchange()
+                    ois = copy.deepcopy(inner_order_indicators)
+                    if use_acc:
+                        indicator.reset_inner_acc(exchange, pa_config=pa_config)
+                        for oi, (dec, start, end) in zip(ois, decision_list):
+                            indicator.update_inner_acc(oi, dec, start, end)
+                    inner_acc = indicator._pop_inner_acc(len(ois))
+                    self.assertEqual(inner_acc is not None, use_acc)
+                    indicator._agg_order_trade_info(ois, inner_acc=inner_acc)
+                    indicator._agg_base_price(ois, decision_list, exchange, pa_config=pa_config, inner_acc=inner_acc)
+                    res[use_acc] = indicator.get_order_indicator(raw=False)
+
+                self.assertEqual(set(res[False]), set(res[True]))
+                for metric, series in res[False].items():
+                    if metric == "trade_dir":
+                        self.assertEqual(series.to_dict(), res[True][metric].to_dict())
+                    else:
+                        pd.testing.assert_series_equal(series, res[True][metric], check_names=False)
+                self.assertEqual(res[True]["trade_dir"]["SH600003"], OrderDir.BUY)
+
+    def test_inconsistent_steps(self):
+        # the accumulators are ignored if they don't match the inner order indicators
+        inner_order_indicators, decision_list = self._gen_inner_indicators(True)
+        indicator = Indicator()
+        indicator.reset_inner_acc(MockExchange())
+        for oi, (dec, start, end) in zip(inner_order_indicators[:-1], decision_list[:-1]):
+            indicator.update_inner_acc(oi, dec, start, end)
+        self.assertIsNone(indicator._pop_inner_acc(len(inner_order_indicators)))
+        self.assertIsNone(indicator.inner_acc)
+
+
+if __name__ == "__main__":
+    unittest.main()
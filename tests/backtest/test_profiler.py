@@ -0,0 +1,103 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from qlib.backtest import backtest
+from qlib.backtest.profiler import PROFILER, BacktestProfiler
+from qlib.data import D
+from qlib.tests import TestAutoData
+
+
+class BacktestProfilerTest(unittest.TestCase):
+    def test_timer(self):
+        profiler = BacktestProfiler()
+        with profiler.timer("outer", level=0):
+            pass
+        self.assertTrue(profiler.to_dataframe().empty)
+
+        with profiler.profiling(trace=True):
+            for _ in range(3):
+                with profiler.timer("outer", level=0):
+                    with profiler.timer("inner"):
+                        with profiler.timer("nested", level=1):
+                            pass
+        df = profiler.to_dataframe()
+        self.assertEqual(df.loc[(0, "outer"), "count"], 3)
+        self.assertEqual(df.loc[(0, "inner"), "count"], 3)
+        self.assertEqual(df.loc[(1, "nested"), "count"], 3)
+        self.assertGreaterEqual(df.loc[(0, "outer"), "total"], df.loc[(0, "inner"), "total"])
+        self.assertEqual(len(profiler.to_chrome_trace()["traceEvents"]), 9)
+        self.assertFalse(profiler.enabled)
+        self.assertEqual(profiler.level_stack, [])
+
+
+class BacktestProfileTest(TestAutoData):
+    def test_backtest_profile(self):
+        start_time, end_time = "2020-01-01", "2020-01-31"
+        codes = D.list_instruments(D.instruments("csi300"), start_time, end_time, as_list=True)[:20]
+        index = pd.MultiIndex.from_product([D.calendar(start_time, end_time), codes], names=["datetime", "instrument"])
+        signal = pd.Series(np.random.RandomState(0).randn(len(index)), index=index)
+        with PROFILER.profiling(trace=True):
+            backtest(
+                start_time=start_time,
+                end_time=end_time,
+                strategy={
+                    "class": "TopkDropoutStrategy",
+                    "module_path": "qlib.contrib.strategy.signal_strategy",
+                    "kwargs": {"signal": signal, "topk": 5, "n_drop": 1},
+                },
+                executor={
+                    "class": "SimulatorExecutor",
+                    "module_path": "qlib.backtest.executor",
+                    "kwargs": {"time_per_step": "day", "generate_portfolio_metrics": True},
+                },
+                benchmark=None,
+                exchange_kwargs={"freq": "day", "codes": codes, "limit_threshold": 0.095, "deal_price": "close"},
+            )
+        df = PROFILER.to_dataframe()
+        n_steps = len(D.calendar(start_time, end_time))
+        for component in [
+            "executor.collect_data",
+            "strategy.generate_trade_decision",
+            "account.update_bar_end",
+            "exchange.deal_order",
+        ]:
+            self.assertIn((0, component), df.index)
+        self.assertEqual(df.loc[(0, "executor.collect_data"), "count"], n_steps)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = Path(tmp_dir) / "trace.json"
+            PROFILER.dump_chrome_trace(path)
+            with path.open() as f:
+                self.assertEqual(len(json.load(f)["traceEvents"]), df["count"].sum())
+
+        # nothing is recorded when the profiler is disabled
+        PROFILER.reset()
+        signal_strategy = {
+            "class": "TopkDropoutStrategy",
+            "module_path": "qlib.contrib.strategy.signal_strategy",
+            "kwargs": {"signal": signal, "topk": 5, "n_drop": 1},
+        }
+        backtest(
+            start_time=start_time,
+            end_time=end_time,
+            strategy=signal_strategy,
+            executor={
+                "class": "SimulatorExecutor",
+                "module_path": "qlib.backtest.executor",
+                "kwargs": {"time_per_step": "day"},
+            },
+            benchmark=None,
+            exchange_kwargs={"freq": "day", "codes": codes, "deal_price": "close"},
+        )
+        self.assertTrue(PROFILER.to_dataframe().empty)
+
+
+if __name__ == "__main__":
+    unittest.main()
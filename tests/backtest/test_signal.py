@@ -0,0 +1,56 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from qlib.backtest.signal import SignalWCache
+from qlib.utils.resam import resam_ts_data
+
+
+class SignalWCacheTest(unittest.TestCase):
+    def _gen_signal(self) -> pd.DataFrame:
+        rs = np.random.RandomState(0)
+        dates = pd.bdate_range("2020-01-01", "2020-03-31")
+        instruments = [f"SH600{i:03d}" for i in range(50)]
+        index = pd.MultiIndex.from_product([instruments, dates], names=["instrument", "datetime"])
+        signal = pd.DataFrame(rs.randn(len(index), 2), index=index, columns=["score", "score2"])
+        # missing records and NaN values
+        signal = signal[rs.rand(len(signal)) > 0.2]
+        signal[rs.rand(*signal.shape) < 0.2] = np.nan
+        return signal
+
+    def _check(self, signal_w_cache: SignalWCache, start_time, end_time):
+        expected = resam_ts_data(signal_w_cache.signal_cache, start_time=start_time, end_time=end_time, method="last")
+        res = signal_w_cache.get_signal(start_time=start_time, end_time=end_time)
+        if expected is None:
+            self.assertIsNone(res)
+        elif isinstance(expected, pd.Series):
+            pd.testing.assert_series_equal(res, expected)
+        else:
+            pd.testing.assert_frame_equal(res, expected)
+
+    def test_get_signal(self):
+        signal = self._gen_signal()
+        dates = signal.index.get_level_values("datetime").unique().sort_values()
+        for sig in [signal, signal["score"], signal.swaplevel()]:
+            signal_w_cache = SignalWCache(sig)
+            self.assertIsNotNone(signal_w_cache.signal_store)
+            # the same frequency
+            for date in dates[:10]:
+                self._check(signal_w_cache, date, date + pd.Timedelta(days=1) - pd.Timedelta(seconds=1))
+            # lower frequency of the strategy
+            for start, end in zip(dates[::5], dates[4::5]):
+                self._check(signal_w_cache, start, end)
+            # no signal in the range
+            self._check(signal_w_cache, pd.Timestamp("2019-01-01"), pd.Timestamp("2019-01-31"))
+            self._check(signal_w_cache, pd.Timestamp("2020-01-04"), pd.Timestamp("2020-01-05"))
+
+    def test_non_float_signal(self):
+        signal = self._gen_signal()["score"].fillna(0).astype(int)
+        signal_w_cache = SignalWCache(signal)
+        self.assertIsNone(signal_w_cache.signal_store)
+        self._check(signal_w_cache, pd.Timestamp("2020-01-06"), pd.Timestamp("2020-01-10"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from qlib.backtest import backtest
+from qlib.contrib.strategy.signal_strategy import TopkDropoutStrategy, _top_n_desc
+from qlib.data import D
+from qlib.tests import TestAutoData
+
+
+class CompareTopkDropoutStrategy(TopkDropoutStrategy):
+    """make decisions with both implementations in each step and check that the orders are the same"""
+
+    n_orders = 0
+
+    def _decide(self, vectorized: bool, seed: int):
+        self.vectorized = vectorized
+        np.random.seed(seed)
+        return super().generate_trade_decision()
+
+    def generate_trade_decision(self, execute_result=None):
+        seed = self.trade_calendar.get_trade_step()
+        expected = self._decide(False, seed).get_decision()
+        res = self._decide(True, seed).get_decision()
+        assert len(expected) == len(res), (expected, res)
+        for exp_order, order in zip(expected, res):
+            assert exp_order.stock_id == order.stock_id, (exp_order, order)
+            assert exp_order.direction == order.direction, (exp_order, order)
+            assert exp_order.amount == order.amount, (exp_order, order)
+            assert exp_order.deal_amount == order.deal_amount, (exp_order, order)
+            assert (exp_order.start_time, exp_order.end_time) == (order.start_time, order.end_time)
+        CompareTopkDropoutStrategy.n_orders += len(res)
+        # use the vectorized decision to drive the backtest
+        return self._decide(True, seed)
+
+
+class TopkDropoutVectorizedTest(TestAutoData):
+    START_TIME = "2020-01-01"
+    END_TIME = "2020-06-30"
+
+    def _get_signal(self, codes):
+        rs = np.random.RandomState(0)
+        index = pd.MultiIndex.from_product(
+            [D.calendar(self.START_TIME, self.END_TIME), codes], names=["datetime", "instrument"]
+        )
+        signal = pd.Series(rs.randn(len(index)), index=index)
+        # the held stocks may have no signal or NaN signal
+        signal = signal[rs.rand(len(signal)) > 0.1]
+        signal[rs.rand(len(signal)) < 0.05] = np.nan
+        return signal
+
+    def test_same_orders(self):
+        codes = D.list_instruments(D.instruments("csi300"), self.START_TIME, self.END_TIME, as_list=True)[:60]
+        signal = self._get_signal(codes)
+        for kwargs in [
+            {"topk": 10, "n_drop": 3},
+            {"topk": 10, "n_drop": 3, "only_tradable": True},
+            {"topk": 10, "n_drop": 3, "forbid_all_trade_at_limit": False, "hold_thresh": 3},
+            {"topk": 10, "n_drop": 3, "method_buy": "random", "method_sell": "random"},
+            {"topk": 10, "n_drop": 3, "method_buy": "random", "method_sell": "random", "only_tradable": True},
+            {"topk": 5, "n_drop": 0},
+            {"topk": 5, "n_drop": 0, "only_tradable": True},
+        ]:
+            CompareTopkDropoutStrategy.n_orders = 0
+            backtest(
+                start_time=self.START_TIME,
+                end_time=self.END_TIME,
+                strategy=CompareTopkDropoutStrategy(signal=signal, **kwargs),
+                executor={
+                    "class": "SimulatorExecutor",
+                    "module_path": "qlib.backtest.executor",
+                    "kwargs": {"time_per_step": "day", "generate_portfolio_metrics": True},
+                },
+                benchmark=None,
+                account=1e7,
+                exchange_kwargs={
+                    "freq": "day",
+                    "codes": codes,
+                    "limit_threshold": 0.03,
+                    "deal_price": "close",
+                    "open_cost": 0.0005,
+                    "close_cost": 0.0015,
+                    "min_cost": 5,
+                },
+            )
+            self.assertGreater(CompareTopkDropoutStrategy.n_orders, 0, kwargs)
+
+    def test_top_n_desc(self):
+        rs = np.random.RandomState(0)
+        for _ in range(100):
+            # a lot of ties and NaN
+            scores = rs.randint(0, 5, size=rs.randint(0, 30)).astype(float)
+            scores[rs.rand(len(scores)) < 0.2] = np.nan
+            expected = pd.Series(scores).sort_values(ascending=False, kind="stable").index.values
+            for n in range(-2, len(scores) + 2):
+                np.testing.assert_array_equal(_top_n_desc(scores, n), expected[:n])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,117 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from qlib.contrib.eva.alpha import (
+    calc_all_ic,
+    calc_ic,
+    calc_ic_multi,
+    calc_long_short_prec,
+    calc_long_short_return,
+    pred_autocorr,
+)
+
+
+# the previous implementations based on `groupby(...).apply`
+def calc_ic_ref(pred, label, date_col="datetime"):
+    df = pd.DataFrame({"pred": pred, "label": label})
+    ic = df.groupby(date_col).apply(lambda df: df["pred"].corr(df["label"]))
+    ric = df.groupby(date_col).apply(lambda df: df["pred"].corr(df["label"], method="spearman"))
+    return ic, ric
+
+
+def calc_long_short_ref(pred, label, date_col="datetime", quantile=0.2, dropna=False):
+    df = pd.DataFrame({"pred": pred, "label": label})
+    if dropna:
+        df.dropna(inplace=True)
+    group = df.groupby(level=date_col)
+
+    def N(x):
+        return int(len(x) * quantile)
+
+    long = group.apply(lambda x: x.nlargest(N(x), columns="pred").label).reset_index(level=0, drop=True)
+    short = group.apply(lambda x: x.nsmallest(N(x), columns="pred").label).reset_index(level=0, drop=True)
+    long_prec = (long > 0).groupby(date_col).sum() / long.groupby(date_col).count()
+    short_prec = (short < 0).groupby(date_col).sum() / short.groupby(date_col).count()
+    r_long = group.apply(lambda x: x.nlargest(N(x), columns="pred").label.mean())
+    r_short = group.apply(lambda x: x.nsmallest(N(x), columns="pred").label.mean())
+    return long_prec, short_prec, (r_long - r_short) / 2, group.label.mean()
+
+
+def pred_autocorr_ref(pred, lag=1, inst_col="instrument"):
+    pred_ustk = pred.sort_index().unstack(inst_col)
+    corr_s = {}
+    for (idx, cur), (_, prev) in zip(pred_ustk.iterrows(), pred_ustk.shift(lag).iterrows()):
+        corr_s[idx] = cur.corr(prev)
+    return pd.Series(corr_s).sort_index()
+
+
+class EvaAlphaTest(unittest.TestCase):
+    def _gen_data(self, seed=0):
+        rs = np.random.RandomState(seed)
+        dates = pd.bdate_range("2020-01-01", periods=30)
+        instruments = [f"SH600{i:03d}" for i in range(40)]
+        index = pd.MultiIndex.from_product([dates, instruments], names=["datetime", "instrument"])
+        # rounded values to have ties
+        pred = pd.Series(rs.randn(len(index)).round(1), index=index, name="score")
+        label = pd.Series(rs.randn(len(index)).round(1), index=index, name="LABEL0")
+        pred[rs.rand(len(pred)) < 0.1] = np.nan
+        label[rs.rand(len(label)) < 0.1] = np.nan
+        # a date without valid label, a date with a constant prediction and a date with a single valid pair
+        label.loc[dates[1]] = np.nan
+        pred.loc[dates[2]] = 1.0
+        label.loc[dates[3]] = np.nan
+        label.loc[(dates[3], instruments[0])] = 1.0
+        pred.loc[(dates[3], instruments[0])] = 1.0
+        # missing records in prediction and label; the label has a date without prediction
+        pred = pred[rs.rand(len(pred)) > 0.1].drop(dates[4], level="datetime")
+        label = label[rs.rand(len(label)) > 0.1]
+        return pred, label
+
+    def test_ic(self):
+        pred, label = self._gen_data()
+        ic_ref, ric_ref = calc_ic_ref(pred, label)
+        ic, ric = calc_ic(pred, label)
+        pd.testing.assert_series_equal(ic, ic_ref)
+        pd.testing.assert_series_equal(ric, ric_ref)
+        ic, ric = calc_ic(pred, label, dropna=True)
+        pd.testing.assert_series_equal(ic, ic_ref.dropna())
+        pd.testing.assert_series_equal(ric, ric_ref.dropna())
+
+    def test_ic_multi(self):
+        pred, label = self._gen_data()
+        pred2, _ = self._gen_data(seed=1)
+        pred_dict = {"a": pred, "b": pred2}
+        ic, ric = calc_ic_multi(pd.DataFrame(pred_dict), label)
+        res = calc_all_ic(pred_dict, label)
+        for k, p in pred_dict.items():
+            ic_ref, ric_ref = calc_ic_ref(p, label)
+            pd.testing.assert_series_equal(res[k]["ic"], ic_ref)
+            pd.testing.assert_series_equal(res[k]["ric"], ric_ref)
+            pd.testing.assert_series_equal(ic[k].dropna(), ic_ref.dropna(), check_names=False)
+            pd.testing.assert_series_equal(ric[k].dropna(), ric_ref.dropna(), check_names=False)
+
+    def test_long_short(self):
+        pred, label = self._gen_data()
+        for dropna in [False, True]:
+            for quantile in [0.2, 0.05]:
+                long_prec, short_prec, long_short_r, long_avg_r = calc_long_short_ref(
+                    pred, label, quantile=quantile, dropna=dropna
+                )
+                res = calc_long_short_prec(pred, label, quantile=quantile, dropna=dropna)
+                pd.testing.assert_series_equal(res[0], long_prec)
+                pd.testing.assert_series_equal(res[1], short_prec)
+                res = calc_long_short_return(pred, label, quantile=quantile, dropna=dropna)
+                pd.testing.assert_series_equal(res[0], long_short_r)
+                pd.testing.assert_series_equal(res[1], long_avg_r)
+
+    def test_pred_autocorr(self):
+        pred, _ = self._gen_data()
+        pred = pred.swaplevel()
+        for lag in [1, 3]:
+            pd.testing.assert_series_equal(pred_autocorr(pred, lag=lag), pred_autocorr_ref(pred, lag=lag))
+
+
+if __name__ == "__main__":
+    unittest.main()
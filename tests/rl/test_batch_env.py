@@ -0,0 +1,139 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+import shutil
+import sys
+import tempfile
+import unittest
+from functools import partial
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from qlib.backtest import Order
+from qlib.rl.data import pickle_styled
+from qlib.rl.data.pickle_styled import PickleProcessedDataProvider
+from qlib.rl.order_execution import (
+    AllOne,
+    BatchSingleAssetOrderExecutionSimple,
+    FullHistoryStateInterpreter,
+    PAPenaltyReward,
+    SingleAssetOrderExecutionSimple,
+    TwapRelativeActionInterpreter,
+)
+from qlib.rl.trainer import Trainer, TrainingVessel
+from qlib.rl.utils import CsvWriter
+
+pytestmark = pytest.mark.skipif(sys.version_info < (3, 8), reason="Pickle styled data only supports Python >= 3.8")
+
+DATE = pd.Timestamp("2020-01-06")
+STOCKS = ["AAA", "BBB", "CCC"]
+
+
+def _dump_pickles(data_dir: Path, stock_id: str, seed: int, processed: bool = False) -> None:
+    index = pd.MultiIndex.from_tuples(
+        [(stock_id, DATE + pd.Timedelta(minutes=m), DATE) for m in list(range(570, 690)) + list(range(780, 900))],
+        names=["instrument", "datetime", "date"],
+    )
+    rng = np.random.RandomState(seed)
+    if processed:
+        cnames = pickle_styled._infer_processed_data_column_names(6)
+        columns = cnames + [f"{c}_1" for c in cnames]
+    else:
+        columns = ["$close0", "$bid0", "$ask0", "$volume0"]
+    df = pd.DataFrame(rng.rand(len(index), len(columns)).astype(np.float32) + 1, index=index, columns=columns)
+    df.to_pickle(data_dir / f"{stock_id}.pkl")
+
+
+class TestBatchEnv(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = Path(tempfile.mkdtemp())
+        for name in ["backtest", "processed"]:
+            (self.tmp_dir / name).mkdir()
+            for i, stock_id in enumerate(STOCKS):
+                _dump_pickles(self.tmp_dir / name, stock_id, i, processed=name == "processed")
+
+        rng = np.random.RandomState(42)
+        self.orders = [
+            Order(
+                STOCKS[rng.randint(len(STOCKS))],
+                float(rng.randint(10, 100)),
+                rng.randint(2),
+                DATE + pd.Timedelta(minutes=570 + rng.randint(100)),
+                DATE + pd.Timedelta(minutes=800 + rng.randint(100)),
+            )
+            for _ in range(10)
+        ]
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_simulator(self):
+        interpreter = FullHistoryStateInterpreter(9, 240, 6, PickleProcessedDataProvider(self.tmp_dir / "processed"))
+        batch = BatchSingleAssetOrderExecutionSimple(len(self.orders), self.tmp_dir / "backtest")
+        batch.reset(np.arange(len(self.orders)), self.orders)
+        simulators = [SingleAssetOrderExecutionSimple(order, self.tmp_dir / "backtest") for order in self.orders]
+
+        rng = np.random.RandomState(0)
+        while not batch.done().all():
+            ids = np.flatnonzero(~batch.done())
+            amounts = np.minimum(rng.rand(len(ids)) * 20, batch.position[ids])
+            batch.step(ids, amounts)
+            for i, amount in zip(ids, amounts):
+                simulators[i].step(amount)
+
+            obs = interpreter.interpret_batch(batch.get_state(), ids)
+            for k, i in enumerate(ids):
+                expected = interpreter.interpret(simulators[i].get_state())
+                for key, value in expected.items():
+                    np.testing.assert_allclose(obs[key][k], value, rtol=1e-6, err_msg=key)
+                self.assertAlmostEqual(batch.position[i], simulators[i].position)
+
+        for i, simulator in enumerate(simulators):
+            self.assertTrue(simulator.done())
+            self.assertEqual(batch.cur_step[i], simulator.cur_step)
+            for key, value in simulator.metrics.items():
+                if isinstance(value, (str, int, pd.Timestamp)):
+                    self.assertEqual(batch.metrics[i][key], value)
+                else:
+                    # the simple simulator sums float32 market data
+                    np.testing.assert_allclose(batch.metrics[i][key], value, rtol=1e-6, err_msg=key)
+
+    def _test_results(self, finite_env_type: str, async_logging: bool = False) -> pd.DataFrame:
+        state_interp = FullHistoryStateInterpreter(9, 240, 6, PickleProcessedDataProvider(self.tmp_dir / "processed"))
+        action_interp = TwapRelativeActionInterpreter()
+        vessel = TrainingVessel(
+            simulator_fn=partial(SingleAssetOrderExecutionSimple, data_dir=self.tmp_dir / "backtest"),
+            batch_simulator_fn=partial(BatchSingleAssetOrderExecutionSimple, data_dir=self.tmp_dir / "backtest"),
+            state_interpreter=state_interp,
+            action_interpreter=action_interp,
+            policy=AllOne(state_interp.observation_space, action_interp.action_space),
+            reward=PAPenaltyReward(),
+            test_initial_states=self.orders,
+        )
+        output_dir = self.tmp_dir / f"{finite_env_type}_{async_logging}"
+        trainer = Trainer(
+            finite_env_type=finite_env_type,
+            concurrency=4,
+            loggers=CsvWriter(output_dir),
+            async_logging=async_logging,
+        )
+        trainer.test(vessel)
+        return pd.read_csv(output_dir / "result.csv")
+
+    def test_vector_env(self):
+        expected = self._test_results("dummy")
+        self.assertEqual(len(expected), len(self.orders))
+        # the episodes finish in different orders
+        columns = ["stock_id", "amount", "deal_amount", "ffr", "pa", "reward", "steps_per_episode"]
+        expected = expected[columns].sort_values(columns).reset_index(drop=True)
+        for finite_env_type, async_logging in [("batch", False), ("batch", True), ("dummy", True)]:
+            results = self._test_results(finite_env_type, async_logging)
+            results = results[columns].sort_values(columns).reset_index(drop=True)
+            pd.testing.assert_frame_equal(results, expected, check_dtype=False)
+
+
+if __name__ == "__main__":
+    unittest.main()
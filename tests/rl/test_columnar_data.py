@@ -0,0 +1,101 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from qlib.backtest import Order
+from qlib.rl.data import pickle_styled
+from qlib.rl.data.columnar import (
+    ColumnarIntradayBacktestData,
+    ColumnarProcessedDataProvider,
+    convert_pickle_to_columnar,
+)
+from qlib.rl.data.pickle_styled import PickleProcessedDataProvider, SimpleIntradayBacktestData
+from qlib.rl.order_execution import SingleAssetOrderExecutionSimple
+
+pytestmark = pytest.mark.skipif(sys.version_info < (3, 8), reason="Pickle styled data only supports Python >= 3.8")
+
+DATES = pd.bdate_range("2020-01-06", periods=3)
+
+
+def _dump_pickles(data_dir: Path, stock_id: str, seed: int, processed: bool = False) -> None:
+    rng = np.random.RandomState(seed)
+    index = pd.MultiIndex.from_tuples(
+        [(stock_id, d + pd.Timedelta(minutes=570 + i), d) for d in DATES for i in range(240)],
+        names=["instrument", "datetime", "date"],
+    )
+    if processed:
+        cnames = pickle_styled._infer_processed_data_column_names(6)
+        columns = cnames + [f"{c}_1" for c in cnames]
+    else:
+        columns = ["$close0", "$bid0", "$ask0", "$volume0"]
+    df = pd.DataFrame(rng.rand(len(index), len(columns)).astype(np.float32), index=index, columns=columns)
+    if not processed:
+        df.loc[df.sample(frac=0.1, random_state=seed).index, "$bid0"] = 0.0
+    df.to_pickle(data_dir / f"{stock_id}.pkl")
+
+
+class TestColumnarData(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = Path(tempfile.mkdtemp())
+        for name in ["backtest", "processed"]:
+            (self.tmp_dir / name).mkdir()
+            for i, stock_id in enumerate(["AAA", "BBB"]):
+                _dump_pickles(self.tmp_dir / name, stock_id, i, processed=name == "processed")
+            convert_pickle_to_columnar(self.tmp_dir / name, self.tmp_dir / f"{name}_columnar")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_data(self):
+        for stock_id in ["AAA", "BBB"]:
+            for date in DATES:
+                for deal_price, order_dir in [("close", None), ("bid_or_ask", 0), ("bid_or_ask_fill", 0)]:
+                    args = (stock_id, date, deal_price, order_dir)
+                    expected = SimpleIntradayBacktestData(self.tmp_dir / "backtest", *args)
+                    data = ColumnarIntradayBacktestData(self.tmp_dir / "backtest_columnar", *args)
+                    self.assertEqual(len(data), 240)
+                    pd.testing.assert_index_equal(data.get_time_index(), expected.get_time_index())
+                    pd.testing.assert_series_equal(data.get_deal_price(), expected.get_deal_price())
+                    pd.testing.assert_series_equal(data.get_volume(), expected.get_volume())
+
+                time_index = data.get_time_index()
+                expected = PickleProcessedDataProvider(self.tmp_dir / "processed").get_data(
+                    stock_id, date, 6, time_index
+                )
+                proc = ColumnarProcessedDataProvider(self.tmp_dir / "processed_columnar").get_data(
+                    stock_id, date, 6, time_index
+                )
+                pd.testing.assert_frame_equal(proc.today, expected.today)
+                pd.testing.assert_frame_equal(proc.yesterday, expected.yesterday)
+                # the data are views of the memory-mapped arrays
+                self.assertFalse(proc.today.values.flags.writeable)
+                self.assertFalse(data.get_volume().values.flags.writeable)
+
+        with self.assertRaises(KeyError):
+            ColumnarIntradayBacktestData(self.tmp_dir / "backtest_columnar", "AAA", pd.Timestamp("2020-01-01"))
+
+    def test_simulator(self):
+        order = Order("BBB", 100.0, 1, DATES[1] + pd.Timedelta("9:40:00"), DATES[1] + pd.Timedelta("13:00:00"))
+        histories = []
+        for data_dir in ["backtest", "backtest_columnar"]:
+            simulator = SingleAssetOrderExecutionSimple(
+                order, self.tmp_dir / data_dir, ticks_per_step=30, deal_price_type="bid_or_ask_fill", vol_threshold=100
+            )
+            while not simulator.done():
+                simulator.step(order.amount / 7)
+            histories.append(simulator.get_state().history_exec)
+        self.assertIsInstance(simulator.backtest_data, ColumnarIntradayBacktestData)
+        pd.testing.assert_frame_equal(histories[0], histories[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
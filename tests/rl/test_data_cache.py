@@ -0,0 +1,118 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+import multiprocessing
+import os
+import pickle
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from qlib.rl.data.base import BaseIntradayProcessedData, ProcessedDataProvider
+from qlib.rl.data.cache import CachedProcessedDataProvider, LRUSliceCache, SharedLRUSliceCache
+from qlib.rl.utils import LogCollector
+
+TIME_INDEX = pd.date_range("2020-01-02 09:30", periods=240, freq="1min", name="datetime")
+
+
+class _ProcessedData(BaseIntradayProcessedData):
+    def __init__(self, stock_id: str, date: pd.Timestamp, feature_dim: int) -> None:
+        seed = int(stock_id[1:]) * 100 + pd.Timestamp(date).day
+        values = np.random.RandomState(seed).rand(len(TIME_INDEX), feature_dim * 2)
+        columns = [f"f{i}" for i in range(feature_dim)]
+        self.today = pd.DataFrame(values[:, :feature_dim], index=TIME_INDEX, columns=columns)
+        self.yesterday = pd.DataFrame(values[:, feature_dim:], index=TIME_INDEX, columns=columns)
+
+
+class _CountingProvider(ProcessedDataProvider):
+    def __init__(self) -> None:
+        self.n_loads = multiprocessing.Value("i", 0)
+
+    def get_data(self, stock_id, date, feature_dim, time_index):
+        with self.n_loads.get_lock():
+            self.n_loads.value += 1
+        return _ProcessedData(stock_id, date, feature_dim)
+
+
+def _worker(provider: CachedProcessedDataProvider, keys: list) -> None:
+    for stock_id, date in keys:
+        data = provider.get_data(stock_id, date, 3, TIME_INDEX)
+        expected = _ProcessedData(stock_id, date, 3)
+        np.testing.assert_allclose(data.today.values, expected.today.values, rtol=1e-6)
+        assert list(data.today.columns) == list(expected.today.columns)
+        assert data.today.index.equals(TIME_INDEX)
+    os._exit(0)
+
+
+class TestSliceCache(unittest.TestCase):
+    def test_lru(self):
+        cache = LRUSliceCache(maxsize=2)
+        calls = []
+
+        def load(key):
+            calls.append(key)
+            return key * 2
+
+        for key in [1, 2, 1, 3, 2, 1]:
+            self.assertEqual(cache.get(key, lambda: load(key)), key * 2)
+        # 2 is evicted by 3, then 1 is evicted by 2
+        self.assertEqual(calls, [1, 2, 3, 2, 1])
+        self.assertEqual((cache.hits, cache.misses, len(cache)), (1, 5, 2))
+        self.assertAlmostEqual(cache.hit_rate, 1 / 6)
+
+        logger = LogCollector()
+        logger.reset()
+        cache.log_metrics(logger, "test_cache")
+        self.assertAlmostEqual(logger.logs()["test_cache_hit_rate"][1], 1 / 6)
+
+        # each worker has its own cache
+        copied = pickle.loads(pickle.dumps(cache))
+        self.assertEqual((copied.hits, copied.misses, len(copied)), (0, 0, 0))
+
+    def test_provider(self):
+        inner = _CountingProvider()
+        provider = CachedProcessedDataProvider(inner, maxsize=10)
+        for _ in range(3):
+            for date in ["2020-01-02", "2020-01-03"]:
+                data = provider.get_data("S1", pd.Timestamp(date), 3, TIME_INDEX)
+                self.assertIsInstance(data, _ProcessedData)
+        # keyed by the feature dim as well
+        self.assertEqual(provider.get_data("S1", pd.Timestamp("2020-01-02"), 4, TIME_INDEX).today.shape[1], 4)
+        self.assertEqual(inner.n_loads.value, 3)
+        self.assertAlmostEqual(provider.cache.hit_rate, 4 / 7)
+
+    def test_shared(self):
+        inner = _CountingProvider()
+        provider = CachedProcessedDataProvider(inner, maxsize=4, shared_shape=(len(TIME_INDEX), 3))
+        self.assertIsInstance(provider.cache, SharedLRUSliceCache)
+        path = provider.cache.path
+        keys = [(f"S{i}", pd.Timestamp("2020-01-02")) for i in range(3)]
+
+        ctx = multiprocessing.get_context("fork")
+        workers = [ctx.Process(target=_worker, args=(provider, keys)) for _ in range(3)]
+        for w in workers:
+            w.start()
+            # one by one, so that the later workers hit the cache
+            w.join()
+            self.assertEqual(w.exitcode, 0)
+        self.assertEqual(inner.n_loads.value, 3)
+        self.assertEqual((provider.cache.hits, provider.cache.misses), (6, 3))
+
+        # LRU eviction in the shared cache
+        for i in range(3, 6):
+            provider.get_data(f"S{i}", pd.Timestamp("2020-01-02"), 3, TIME_INDEX)
+        self.assertEqual(len(provider.cache), 4)
+        provider.get_data("S0", pd.Timestamp("2020-01-02"), 3, TIME_INDEX)
+        self.assertEqual(inner.n_loads.value, 7)
+        # the data that don't fit the shape are loaded but not cached
+        provider.get_data("S0", pd.Timestamp("2020-01-02"), 2, TIME_INDEX)
+        provider.get_data("S0", pd.Timestamp("2020-01-02"), 2, TIME_INDEX)
+        self.assertEqual(inner.n_loads.value, 9)
+
+        del provider
+        self.assertFalse(os.path.exists(path))
+
+
+if __name__ == "__main__":
+    unittest.main()
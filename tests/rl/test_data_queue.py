@@ -8,6 +8,7 @@ import numpy as np
 import pandas as pd
 
 from torch.utils.data import Dataset, DataLoader
+from qlib.rl.utils import LogCollector
 from qlib.rl.utils.data_queue import DataQueue
 
 
@@ -23,6 +24,37 @@ class DummyDataset(Dataset):
         return self.length
 
 
+class ArrayDataset(Dataset):
+    def __init__(self, length):
+        self.length = length
+
+    def __getitem__(self, index):
+        # the 7th item has a different shape, and is transported by pickle
+        shape = (3, 5) if index == 7 else (4, 5)
+        return {
+            "index": index,
+            "data": np.full(shape, index, dtype=np.float32),
+            "mask": np.arange(3) < index,
+            "name": f"item{index}",
+        }
+
+    def __len__(self):
+        return self.length
+
+
+def _check_worker(data_queue, collector):
+    for data in data_queue:
+        index = data["index"]
+        ok = (
+            list(data) == ["index", "data", "mask", "name"]
+            and data["name"] == f"item{index}"
+            and np.all(data["data"] == index)
+            and data["data"].shape == ((3, 5) if index == 7 else (4, 5))
+            and np.array_equal(data["mask"], np.arange(3) < index)
+        )
+        collector.put((index, ok))
+
+
 def _worker(dataloader, collector):
     # for i in range(3):
     for i, data in enumerate(dataloader):
@@ -57,6 +89,36 @@ def test_multiprocess_shared_dataloader():
         assert len(set(_queue_to_list(queue))) == 100
 
 
+def test_shared_memory():
+    dataset = ArrayDataset(100)
+    with DataQueue(dataset, queue_maxsize=4, shared_memory=True, readahead=8) as data_queue:
+        queue = multiprocessing.Queue()
+        processes = []
+        for _ in range(3):
+            processes.append(multiprocessing.Process(target=_check_worker, args=(data_queue, queue)))
+            processes[-1].start()
+        for p in processes:
+            p.join()
+        results = _queue_to_list(queue)
+        assert sorted(index for index, _ in results) == list(range(100))
+        assert all(ok for _, ok in results)
+
+        # the statistics are shared with the workers
+        assert data_queue.depth == 0
+        assert data_queue.producer_wait_time > 0 and data_queue.consumer_wait_time > 0
+        logger = LogCollector()
+        logger.reset()
+        data_queue.log_metrics(logger, "data_queue")
+        assert set(logger.logs()) == {"data_queue_depth", "data_queue_producer_wait", "data_queue_consumer_wait"}
+
+
+def test_readahead():
+    dataset = DummyDataset(20)
+    with DataQueue(dataset, repeat=2, readahead=4) as data_queue:
+        lengths = [len(data) for data in data_queue]
+    assert sorted(lengths) == sorted(list(range(1, 21)) * 2)
+
+
 def test_exit_on_crash_finite():
     def _exit_finite():
         dataset = DummyDataset(100)
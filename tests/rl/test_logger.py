@@ -21,7 +21,7 @@ from qlib.rl.interpreter import StateInterpreter, ActionInterpreter
 from qlib.rl.simulator import Simulator
 from qlib.rl.utils.data_queue import DataQueue
 from qlib.rl.utils.env_wrapper import InfoDict, EnvWrapper
-from qlib.rl.utils.log import LogLevel, LogCollector, CsvWriter, ConsoleWriter
+from qlib.rl.utils.log import AsyncLogWriter, LogLevel, LogCollector, CsvWriter, ConsoleWriter
 from qlib.rl.utils.finite_env import vectorize_env
 
 
@@ -160,3 +160,34 @@ def test_logger_with_env_wrapper():
     assert (output_df["test_a"] == 233).all()
     assert (output_df["test_b"] == 200).all()
     assert "steps_per_episode" in output_df and "reward" in output_df
+
+
+def test_async_logger(tmp_path):
+    for venv_type in ["dummy", "subproc"]:
+        results = []
+        for use_async in [False, True]:
+            output_dir = tmp_path / f"{venv_type}_{use_async}"
+            output_dir.mkdir()
+            csv_writer = CsvWriter(output_dir, loglevel=LogLevel.DEBUG)
+            writer = AsyncLogWriter(csv_writer, 4) if use_async else csv_writer
+            channel = writer.channel if use_async else None
+            with DataQueue(list(range(20)), shuffle=False) as data_iterator:
+                env_wrapper_factory = lambda: EnvWrapper(
+                    SimpleSimulator,
+                    DummyStateInterpreter(),
+                    DummyActionInterpreter(),
+                    data_iterator,
+                    logger=LogCollector(LogLevel.DEBUG, channel=channel),
+                )
+                venv = vectorize_env(env_wrapper_factory, venv_type, 4, writer)
+                with venv.collector_guard():
+                    collector = Collector(AnyPolicy(), venv)
+                    collector.collect(n_episode=INF * len(venv))
+            result = pd.read_csv(output_dir / "result.csv").sort_values("obs").reset_index(drop=True)
+            # the wait time of the data queue is not deterministic
+            results.append(result[[c for c in result.columns if not c.startswith("data_queue_")]])
+
+        assert len(results[0]) == 20
+        # the scalars are sent via shared memory, and the others (e.g., obs) are spilled to files
+        pd.testing.assert_frame_equal(results[0], results[1])
+        assert set(results[1].columns) >= {"test_a", "test_b", "steps_per_episode", "reward", "obs"}
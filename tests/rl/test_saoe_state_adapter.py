@@ -0,0 +1,202 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+import unittest
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+from tianshou.data import Batch
+
+from qlib.backtest import Order
+from qlib.rl.order_execution import (
+    CategoricalActionInterpreter,
+    CurrentStepStateInterpreter,
+    SAOEBatchStateAdapter,
+    SAOEIntStrategy,
+    SAOEStateAdapter,
+    TwapRelativeActionInterpreter,
+)
+from qlib.rl.order_execution.policy import NonLearnablePolicy
+from qlib.rl.order_execution.strategy import _SAOEOrderStateView
+
+DATE = pd.Timestamp("2020-01-06")
+# the minutes of a trading day in the CN market
+TICKS_INDEX = pd.DatetimeIndex(
+    [DATE + pd.Timedelta(minutes=m) for m in list(range(570, 690)) + list(range(780, 900))], name="datetime"
+)
+TICKS_PER_STEP = 30
+
+
+class _Calendar:
+    def __init__(self) -> None:
+        self.step = 0
+
+    def get_trade_step(self) -> int:
+        return self.step
+
+    def get_trade_len(self) -> int:
+        return len(TICKS_INDEX) // TICKS_PER_STEP
+
+
+class _Decision:
+    def __init__(self, orders: list) -> None:
+        self.orders = orders
+
+    def get_decision(self) -> list:
+        return self.orders
+
+    def get_range_limit(self, **kwargs):
+        raise NotImplementedError
+
+
+class _Exchange:
+    def __init__(self, stocks: list) -> None:
+        rng = np.random.RandomState(0)
+        self.price = {s: pd.Series(rng.rand(len(TICKS_INDEX)) + 1, index=TICKS_INDEX) for s in stocks}
+        self.volume = {s: pd.Series(rng.rand(len(TICKS_INDEX)) * 100, index=TICKS_INDEX) for s in stocks}
+        # some missing data, which are filled with the median of the step
+        self.price[stocks[0]].iloc[[40, 41, 100]] = np.nan
+
+    def get_deal_price(self, stock_id, start_time, end_time, method=None, direction=None):
+        return self.price[stock_id].loc[start_time:end_time].to_numpy()
+
+    def get_volume(self, stock_id, start_time, end_time, method=None):
+        return self.volume[stock_id].loc[start_time:end_time].to_numpy()
+
+
+class _BacktestData:
+    def __init__(self, exchange: _Exchange, order: Order) -> None:
+        self.ticks_index = TICKS_INDEX
+        self.ticks_for_order = TICKS_INDEX[15:225]  # 9:45 - 14:44
+        self._deal_price = exchange.price[order.stock_id].loc[self.ticks_for_order]
+
+    def get_deal_price(self) -> pd.Series:
+        return self._deal_price
+
+
+class _CurStepPolicy(NonLearnablePolicy):
+    """A policy whose actions depend on the observations."""
+
+    def forward(self, batch, state=None, **kwargs):
+        return Batch(act=(np.asarray(batch.obs.cur_step) + np.asarray(batch.obs.acquiring)) % 5, state=state)
+
+
+class TestSAOEBatchStateAdapter(unittest.TestCase):
+    def setUp(self):
+        stocks = ["AAA", "BBB", "CCC", "DDD"]
+        self.orders = [
+            Order(stock_id, 100.0 * (i + 1), i % 2, DATE, DATE + pd.Timedelta("23:59:59"))
+            for i, stock_id in enumerate(stocks)
+        ]
+        self.exchange = _Exchange(stocks)
+        self.backtest_data = [_BacktestData(self.exchange, order) for order in self.orders]
+        self.calendar = _Calendar()
+        self.pa = 0.0
+        account = SimpleNamespace(
+            get_trade_indicator=lambda: SimpleNamespace(
+                generate_trade_indicators_dataframe=lambda: pd.DataFrame({"pa": [self.pa]})
+            )
+        )
+        self.executor = SimpleNamespace(trade_calendar=self.calendar, trade_account=account)
+        self.decision = _Decision(self.orders)
+
+    def _execute(self, step_range, rng):
+        """Execution results of a step, in which some orders trade at some minutes."""
+        results = []
+        for order in self.orders:
+            for loc in range(step_range[0], step_range[1] + 1):
+                if rng.rand() < 0.5:
+                    time = TICKS_INDEX[loc]
+                    child = Order(order.stock_id, 0.0, order.direction, time, time + pd.Timedelta("59s"))
+                    child.deal_amount = rng.rand() * order.amount / 100
+                    results.append((child, 0.0, 0.0, 0.0))
+        return results
+
+    def test_adapter(self):
+        adapters = [
+            SAOEStateAdapter(order, self.decision, self.executor, self.exchange, TICKS_PER_STEP, data)
+            for order, data in zip(self.orders, self.backtest_data)
+        ]
+        batch_adapter = SAOEBatchStateAdapter(
+            self.orders, self.decision, self.executor, self.exchange, TICKS_PER_STEP, self.backtest_data
+        )
+        views = [_SAOEOrderStateView(batch_adapter, i) for i in range(len(self.orders))]
+        state_interp = CurrentStepStateInterpreter(8)
+        action_interps = [CategoricalActionInterpreter(4, 8), TwapRelativeActionInterpreter()]
+        ids = np.arange(len(self.orders))
+
+        rng = np.random.RandomState(42)
+        step_starts = [15] + list(range(30, 120, 30)) + list(range(120, 225, 30))
+        for step, start in enumerate(step_starts):
+            step_range = (start, min(start - start % TICKS_PER_STEP + TICKS_PER_STEP, 225) - 1)
+            self.calendar.step, self.pa = step + 1, rng.rand()
+            results = self._execute(step_range, rng)
+            for adapter in adapters:
+                adapter.update([r for r in results if r[0].stock_id == adapter.order.stock_id], step_range)
+            batch_adapter.update(results, step_range)
+
+            batch_state = batch_adapter.saoe_batch_state
+            obs = state_interp.interpret_batch(batch_state, ids)
+            action = np.arange(len(self.orders)) % 4
+            for i, (adapter, view) in enumerate(zip(adapters, views)):
+                state, batch_view_state = adapter.saoe_state, view.saoe_state
+                self.assertEqual(batch_view_state.cur_time, state.cur_time)
+                self.assertEqual(batch_view_state.cur_step, state.cur_step)
+                self.assertAlmostEqual(batch_view_state.position, state.position)
+                pd.testing.assert_frame_equal(batch_view_state.history_exec, state.history_exec, check_dtype=False)
+                pd.testing.assert_frame_equal(batch_view_state.history_steps, state.history_steps, check_dtype=False)
+                self.assertEqual(batch_state.cur_tick[i], np.sum(TICKS_INDEX < state.cur_time))
+
+                for key, value in state_interp.interpret(state).items():
+                    np.testing.assert_allclose(obs[key][i], value, rtol=1e-6, err_msg=key)
+                # the estimated number of steps of TwapRelativeActionInterpreter (7) is less than the actual one
+                for interp in action_interps if step + 2 < len(step_starts) else []:
+                    self.assertAlmostEqual(
+                        interp.interpret_batch(batch_state, ids, action)[i], interp.interpret(state, action[i])
+                    )
+
+        for adapter in adapters:
+            adapter.generate_metrics_after_done()
+        batch_adapter.generate_metrics_after_done()
+        for adapter, view in zip(adapters, views):
+            self.assertEqual(view.twap_price, adapter.twap_price)
+            self.assertEqual(set(view.metrics), set(adapter.metrics))
+            for key, value in adapter.metrics.items():
+                if isinstance(value, (str, pd.Timestamp)):
+                    self.assertEqual(view.metrics[key], value)
+                else:
+                    np.testing.assert_allclose(view.metrics[key], value, rtol=1e-9, err_msg=key)
+
+    def test_strategy(self):
+        state_interp = CurrentStepStateInterpreter(8)
+        action_interp = CategoricalActionInterpreter(4, 8)
+        strategy = SAOEIntStrategy(
+            _CurStepPolicy(state_interp.observation_space, action_interp.action_space),
+            state_interp,
+            action_interp,
+        )
+        strategy.outer_trade_decision = self.decision
+        self.calendar.step = 3
+
+        strategy.adapter_dict = {
+            order.key_by_day: SAOEStateAdapter(order, self.decision, self.executor, self.exchange, 30, data)
+            for order, data in zip(self.orders, self.backtest_data)
+        }
+        act, exec_vols = strategy._generate_exec_vols()
+
+        strategy.batch_adapter = SAOEBatchStateAdapter(
+            self.orders, self.decision, self.executor, self.exchange, 30, self.backtest_data
+        )
+        strategy.adapter_dict = {
+            order.key_by_day: _SAOEOrderStateView(strategy.batch_adapter, i) for i, order in enumerate(self.orders)
+        }
+        batch_act, batch_exec_vols = strategy._generate_exec_vols_batch()
+        np.testing.assert_array_equal(batch_act, act)
+        np.testing.assert_allclose(batch_exec_vols, exec_vols)
+        # the per-order path also works with the views of the batch adapter
+        np.testing.assert_allclose(strategy._generate_exec_vols()[1], exec_vols)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,159 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+from torch import nn
+
+from qlib.rl.contrib import backtest as backtest_module
+from qlib.rl.contrib.backtest import _warm_up_strategy_config, partition_orders, sharded_backtest
+from qlib.rl.order_execution import CategoricalActionInterpreter, CurrentStepStateInterpreter, PPO
+
+
+def _make_orders() -> pd.DataFrame:
+    rng = np.random.RandomState(0)
+    records = []
+    for stock_id in ["AAA", "BBB", "CCC"]:
+        for date in pd.bdate_range("2020-01-01", periods=10):
+            for _ in range(rng.randint(1, 4)):
+                records.append((str(date.date()), stock_id, float(rng.randint(1, 100)), rng.randint(2)))
+    # the order file is not sorted
+    records = [records[i] for i in rng.permutation(len(records))]
+    return pd.DataFrame(records, columns=["datetime", "instrument", "amount", "direction"])
+
+
+def _fake_single(backtest_config, orders, split, cash_limit, generate_report, fail_on=None, calls=None):
+    assert split == "stock" and orders["instrument"].nunique() == 1
+    if calls is not None:
+        calls.append(len(orders))
+    if fail_on is not None and (orders["datetime"] == fail_on).any():
+        raise KeyboardInterrupt
+    records = pd.DataFrame(
+        {"amount": orders["amount"].to_numpy(), "ffr": 1.0},
+        index=pd.MultiIndex.from_arrays([orders["instrument"], orders["datetime"]], names=["instrument", "datetime"]),
+    )
+    if generate_report:
+        stock_id = orders.iloc[0].instrument
+        return records, {stock_id: {"1day": (records[["amount"]], records[["ffr"]])}}
+    return records
+
+
+class _Network(nn.Module):
+    def __init__(self, obs_space=None):
+        super().__init__()
+        self.output_dim = 4
+        self.fc = nn.Linear(5, 4)
+
+    def forward(self, batch):
+        return self.fc(batch)
+
+
+class TestShardedBacktest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = Path(tempfile.mkdtemp())
+        self.orders = _make_orders()
+        self.config = {
+            "order_file": self.orders,
+            "output_dir": self.tmp_dir / "output",
+            "exchange": {"cash_limit": None},
+            "generate_report": False,
+            "concurrency": 1,
+            "strategies": {"30min": {"class": "TWAPStrategy", "kwargs": {}}},
+        }
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_partition(self):
+        shards = partition_orders(self.orders, 10)
+        names = [name for name, _ in shards]
+        self.assertEqual(len(set(names)), len(names))
+        pd.testing.assert_frame_equal(
+            pd.concat([orders for _, orders in shards]).sort_index(), self.orders.sort_index(), check_like=True
+        )
+        for name, orders in shards:
+            self.assertEqual(orders["instrument"].nunique(), 1)
+            self.assertTrue(name.startswith(orders.iloc[0]["instrument"]))
+            # sorted by date, and the orders of a day are in the same shard
+            self.assertTrue(orders["datetime"].is_monotonic_increasing)
+            self.assertTrue(len(orders) < 10 + 3 or orders["datetime"].nunique() == 1)
+        days = pd.concat([orders.assign(shard=name) for name, orders in shards]).groupby(["instrument", "datetime"])
+        self.assertTrue((days["shard"].nunique() == 1).all())
+        self.assertEqual(names, [name for name, _ in partition_orders(self.orders.iloc[::-1], 10)])
+
+    def test_resume(self):
+        calls = []
+        failing = mock.patch.object(
+            backtest_module,
+            "single_with_collect_data_loop",
+            lambda **kwargs: _fake_single(**kwargs, fail_on="2020-01-08", calls=calls),
+        )
+        with failing, self.assertRaises(KeyboardInterrupt):
+            sharded_backtest(self.config, orders_per_shard=5)
+        n_done = len(list((self.tmp_dir / "output" / "shards").glob("*.csv")))
+        self.assertGreater(n_done, 0)
+
+        calls.clear()
+        with mock.patch.object(
+            backtest_module, "single_with_collect_data_loop", lambda **kwargs: _fake_single(**kwargs, calls=calls)
+        ):
+            res = sharded_backtest(self.config, orders_per_shard=5)
+        # only the shards that are not done are run again
+        self.assertEqual(len(calls), len(partition_orders(self.orders, 5)) - n_done)
+        self.assertEqual(len(res), len(self.orders))
+        summary = pd.read_csv(self.tmp_dir / "output" / "summary.csv")
+        self.assertEqual(len(summary), len(self.orders))
+        np.testing.assert_allclose(np.sort(summary["amount"]), np.sort(self.orders["amount"]))
+
+    def test_parallel_report(self):
+        self.config.update(concurrency=2, generate_report=True)
+        with mock.patch.object(backtest_module, "single_with_collect_data_loop", _fake_single):
+            res = sharded_backtest(self.config, orders_per_shard=5)
+        self.assertEqual(len(res), len(self.orders))
+        report = pd.read_pickle(self.tmp_dir / "output" / "report.pkl")
+        self.assertEqual(set(report), {"AAA", "BBB", "CCC"})
+        # the reports of the shards of a stock are concatenated
+        for stock_id, stock_report in report.items():
+            self.assertEqual(len(stock_report["1day"][0]), (self.orders["instrument"] == stock_id).sum())
+
+    def test_warm_up(self):
+        strategies = {
+            "1day": {
+                "class": "SAOEIntStrategy",
+                "module_path": "qlib.rl.order_execution.strategy",
+                "kwargs": {
+                    "state_interpreter": {
+                        "class": "CurrentStepStateInterpreter",
+                        "module_path": "qlib.rl.order_execution.interpreter",
+                        "kwargs": {"max_step": 8},
+                    },
+                    "action_interpreter": {
+                        "class": "CategoricalActionInterpreter",
+                        "module_path": "qlib.rl.order_execution.interpreter",
+                        "kwargs": {"values": 4, "max_step": 8},
+                    },
+                    "network": _Network(),
+                    "policy": {"class": "PPO", "module_path": "qlib.rl.order_execution.policy", "kwargs": {"lr": 1e-4}},
+                },
+            },
+            "30min": {"class": "TWAPStrategy", "module_path": "qlib.contrib.strategy.rule_strategy", "kwargs": {}},
+        }
+        warm = _warm_up_strategy_config(strategies)
+        kwargs = warm["1day"]["kwargs"]
+        self.assertIsInstance(kwargs["state_interpreter"], CurrentStepStateInterpreter)
+        self.assertIsInstance(kwargs["action_interpreter"], CategoricalActionInterpreter)
+        self.assertIsInstance(kwargs["policy"], PPO)
+        self.assertNotIn("network", kwargs)
+        self.assertIs(warm["30min"], strategies["30min"])
+        # the original config is untouched
+        self.assertIsInstance(strategies["1day"]["kwargs"]["policy"], dict)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,132 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+import shutil
+import sys
+import tempfile
+import unittest
+from functools import partial
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from qlib.backtest import Order
+from qlib.rl.data import pickle_styled
+from qlib.rl.data.pickle_styled import PickleProcessedDataProvider
+from qlib.rl.order_execution import (
+    AllOne,
+    FullHistoryStateInterpreter,
+    PAPenaltyReward,
+    SingleAssetOrderExecutionSimple,
+    TwapRelativeActionInterpreter,
+)
+from qlib.rl.trainer import backtest
+from qlib.rl.utils import CsvWriter
+
+pytestmark = pytest.mark.skipif(sys.version_info < (3, 8), reason="Pickle styled data only supports Python >= 3.8")
+
+DATE = pd.Timestamp("2020-01-06")
+
+
+def _dump_pickles(data_dir: Path, stock_id: str, processed: bool = False) -> None:
+    index = pd.MultiIndex.from_tuples(
+        [(stock_id, DATE + pd.Timedelta(minutes=m), DATE) for m in list(range(570, 690)) + list(range(780, 900))],
+        names=["instrument", "datetime", "date"],
+    )
+    rng = np.random.RandomState(0)
+    if processed:
+        cnames = pickle_styled._infer_processed_data_column_names(6)
+        columns = cnames + [f"{c}_1" for c in cnames]
+    else:
+        columns = ["$close0", "$bid0", "$ask0", "$volume0"]
+    df = pd.DataFrame(rng.rand(len(index), len(columns)).astype(np.float32) + 1, index=index, columns=columns)
+    df.to_pickle(data_dir / f"{stock_id}.pkl")
+
+
+class TestSimulatorSimple(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = Path(tempfile.mkdtemp())
+        for name in ["backtest", "processed"]:
+            (self.tmp_dir / name).mkdir()
+            _dump_pickles(self.tmp_dir / name, "AAA", processed=name == "processed")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_history(self):
+        order = Order("AAA", 15.0, 0, DATE + pd.Timedelta("10:15:00"), DATE + pd.Timedelta("14:44:59"))
+        simulator = SingleAssetOrderExecutionSimple(order, self.tmp_dir / "backtest", vol_threshold=10)
+        self.assertEqual(len(simulator.ticks_for_order), 180)
+        self.assertEqual(len(simulator.history_exec), 0)
+
+        simulator.step(2.0)
+        self.assertEqual(simulator.cur_time, DATE + pd.Timedelta("10:30:00"))
+        state = simulator.get_state()
+        while not simulator.done():
+            simulator.step(1.0)
+        self.assertEqual(simulator.cur_step, 7)
+
+        # the state is a snapshot of the step
+        self.assertEqual(len(state.history_exec), 15)
+        self.assertEqual(len(state.history_steps), 1)
+        pd.testing.assert_frame_equal(state.history_exec, simulator.history_exec.iloc[:15])
+
+        history_exec, history_steps = simulator.history_exec, simulator.history_steps
+        self.assertIs(simulator.history_exec, history_exec)
+        pd.testing.assert_index_equal(history_exec.index, simulator.ticks_for_order)
+        self.assertEqual(list(history_exec.columns), list(history_steps.columns))
+        self.assertEqual(history_exec.columns[0], "stock_id")
+        self.assertTrue((history_exec["direction"] == 0).all())
+
+        backtest_data = simulator.backtest_data
+        np.testing.assert_array_equal(
+            history_exec["market_price"], backtest_data.get_deal_price().loc[simulator.ticks_for_order]
+        )
+        np.testing.assert_allclose(history_exec["position"], 15.0 - history_exec["deal_amount"].cumsum(), atol=1e-9)
+        # steps are cut at multiples of ticks_per_step, and never cross the noon break
+        step_starts = ["10:15", "10:30", "11:00", "13:00", "13:30", "14:00", "14:30"]
+        expected_index = pd.DatetimeIndex([DATE + pd.Timedelta(f"{t}:00") for t in step_starts], name="datetime")
+        pd.testing.assert_index_equal(history_steps.index, expected_index)
+        np.testing.assert_allclose(
+            history_steps["deal_amount"].to_numpy(),
+            history_exec["deal_amount"].groupby(history_steps.index.searchsorted(history_exec.index, "right")).sum(),
+        )
+
+        metrics = simulator.metrics
+        self.assertAlmostEqual(metrics["ffr"], 1.0)
+        self.assertAlmostEqual(metrics["amount"], history_steps["amount"].sum())
+        self.assertAlmostEqual(
+            metrics["trade_value"], (history_exec["market_price"] * history_exec["deal_amount"]).sum(), places=6
+        )
+
+    def test_backtest(self):
+        orders = [
+            Order("AAA", 10.0, direction, DATE + pd.Timedelta("9:30:00"), DATE + pd.Timedelta("15:00:00"))
+            for direction in [0, 1]
+        ]
+        state_interp = FullHistoryStateInterpreter(8, 240, 6, PickleProcessedDataProvider(self.tmp_dir / "processed"))
+        action_interp = TwapRelativeActionInterpreter()
+        policy = AllOne(state_interp.observation_space, action_interp.action_space)
+
+        backtest(
+            partial(SingleAssetOrderExecutionSimple, data_dir=self.tmp_dir / "backtest", ticks_per_step=30),
+            state_interp,
+            action_interp,
+            orders,
+            policy,
+            [CsvWriter(self.tmp_dir / "output")],
+            reward=PAPenaltyReward(),
+            concurrency=2,
+            finite_env_type="dummy",
+        )
+
+        metrics = pd.read_csv(self.tmp_dir / "output" / "result.csv")
+        self.assertEqual(len(metrics), 2)
+        np.testing.assert_allclose(metrics["ffr"], 1.0)
+        np.testing.assert_allclose(metrics["pa"], 0.0, atol=1e-6)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from qlib.model.ens.ensemble import RollingEnsemble
+from qlib.model.ens.group import RollingGroup
+from qlib.tests import TestAutoData
+from qlib.utils.paral import LazyObject, materialize
+from qlib.workflow import R
+from qlib.workflow.recorder import MLflowRecorder
+from qlib.workflow.task.collect import RecorderCollector
+
+
+class TestRecorderCollector(TestAutoData):
+    EXP_NAME = "collector"
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.uri_context = R.uri_context(uri=self.tmp_dir)
+        self.uri_context.__enter__()
+        dates = pd.bdate_range("2020-01-01", periods=40)
+        instruments = ["SH600000", "SH600001"]
+        self.preds = {}
+        for i in range(4):
+            index = pd.MultiIndex.from_product(
+                [dates[i * 10 : i * 10 + 12], instruments], names=["datetime", "instrument"]
+            )
+            pred = pd.DataFrame({"score": np.random.RandomState(i).randn(len(index))}, index=index)
+            with R.start(experiment_name=self.EXP_NAME, recorder_name=f"rec_{i}"):
+                R.save_objects(**{"pred.pkl": pred})
+                R.log_params(model="linear" if i < 3 else "lgb")
+                R.set_tags(rolling=str(i))
+            self.preds[str(i)] = pred
+
+    def tearDown(self):
+        self.uri_context.__exit__(None, None, None)
+        shutil.rmtree(self.tmp_dir)
+
+    def _rec_key(self, rec):
+        return "linear", rec.list_tags()["rolling"]
+
+    def test_collect(self):
+        kwargs = {"rec_key_func": self._rec_key, "params": {"model": "linear"}}
+        with mock.patch.object(
+            MLflowRecorder, "load_object", autospec=True, side_effect=MLflowRecorder.load_object
+        ) as m:
+            expected = RecorderCollector(self.EXP_NAME, max_workers=1, **kwargs).collect()
+            # the recorder of lgb is filtered before loading the artifacts
+            self.assertEqual(m.call_count, 3)
+            collected = RecorderCollector(self.EXP_NAME, max_workers=4, **kwargs).collect()
+            self.assertEqual(list(collected["pred"]), list(expected["pred"]))
+            for key, pred in collected["pred"].items():
+                pd.testing.assert_frame_equal(pred, self.preds[key[1]])
+
+            m.reset_mock()
+            # lazy handles are loaded by the ensemble
+            collector = RecorderCollector(self.EXP_NAME, lazy=True, process_list=RollingGroup(), **kwargs)
+            lazy = collector.collect()
+            self.assertEqual(m.call_count, 0)
+            self.assertTrue(all(isinstance(v, LazyObject) for v in lazy["pred"].values()))
+            ens = collector.process_collect(lazy, collector.process_list)["pred"][("linear",)]
+            self.assertEqual(m.call_count, 3)
+        pd.testing.assert_frame_equal(ens, RollingEnsemble()({k[1]: v for k, v in expected["pred"].items()}))
+
+        # a missing artifact is skipped in lazy mode as well
+        collected = RecorderCollector(
+            self.EXP_NAME, artifacts_path={"pred": "pred.pkl", "ic": "ic.pkl"}, lazy=True, tags={"rolling": "1"}
+        ).collect()
+        self.assertEqual(len(collected["pred"]), 1)
+        self.assertNotIn("ic", collected)
+
+    def test_materialize(self):
+        calls = []
+
+        def load(x):
+            calls.append(x)
+            return x * 2
+
+        objs = {"a": LazyObject(load, 1), "b": [LazyObject(load, 2), (3, LazyObject(load, 4))]}
+        self.assertEqual(materialize(objs, max_workers=2), {"a": 2, "b": [4, (3, 8)]})
+        # the loaded objects are cached
+        self.assertEqual(materialize(objs), {"a": 2, "b": [4, (3, 8)]})
+        self.assertEqual(sorted(calls), [1, 2, 4])
+        uncached = LazyObject(load, 5)
+        uncached.load(cache=False)
+        self.assertFalse(uncached.loaded)
+
+
+if __name__ == "__main__":
+    unittest.main()
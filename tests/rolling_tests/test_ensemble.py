@@ -0,0 +1,56 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from qlib.model.ens.ensemble import AverageEnsemble, RollingEnsemble
+from qlib.utils.paral import LazyObject
+
+
+def _pred(start, periods, seed, instruments=("SH600000", "SH600001", "SH600002"), columns=("score",)):
+    dates = pd.bdate_range(start, periods=periods)
+    index = pd.MultiIndex.from_product([dates, list(instruments)], names=["datetime", "instrument"])
+    rng = np.random.RandomState(seed)
+    return pd.DataFrame(rng.randn(len(index), len(columns)), index=index, columns=list(columns))
+
+
+class TestEnsemble(unittest.TestCase):
+    def test_rolling(self):
+        # overlapping periods in a shuffled order, and two artifacts with the same start
+        preds = {
+            "b": _pred("2020-02-01", 30, 1),
+            "a": _pred("2020-01-01", 30, 0),
+            "c": _pred("2020-03-01", 30, 2, instruments=("SH600001", "SH600003")),
+            "d": _pred("2020-03-01", 5, 3),
+        }
+        artifact_list = sorted(preds.values(), key=lambda x: x.index.get_level_values("datetime").min())
+        expected = pd.concat(artifact_list)
+        expected = expected[~expected.index.duplicated(keep="last")].sort_index()
+
+        pd.testing.assert_frame_equal(RollingEnsemble()(preds), expected)
+        lazy = {k: LazyObject(lambda v: v, v) for k, v in preds.items()}
+        pd.testing.assert_frame_equal(RollingEnsemble()(lazy), expected)
+        # the loaded artifacts are not cached by the ensemble
+        self.assertFalse(any(v.loaded for v in lazy.values()))
+        series = RollingEnsemble()({k: v["score"] for k, v in preds.items()})
+        pd.testing.assert_series_equal(series, expected["score"])
+
+    def test_average(self):
+        preds = {
+            "a": _pred("2020-01-01", 20, 0),
+            ("b", "c"): {"c": _pred("2020-01-10", 20, 1, columns=("score", "score_2"))},
+            "d": _pred("2020-01-01", 25, 2, instruments=("SH600001", "SH600002", "SH600003")),
+        }
+        values = [preds["a"], preds[("b", "c")]["c"], preds["d"]]
+        expected = pd.concat(values, axis=1)
+        expected = expected.groupby("datetime", group_keys=False).apply(lambda df: (df - df.mean()) / df.std())
+        expected = expected.mean(axis=1).sort_index()
+
+        res = AverageEnsemble()(preds)
+        pd.testing.assert_series_equal(res, expected)
+        lazy = {"a": LazyObject(lambda v: v, preds["a"]), "b": preds[("b", "c")], "d": preds["d"]}
+        pd.testing.assert_series_equal(AverageEnsemble()(lazy), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+import tempfile
+import unittest
+
+import pandas as pd
+import pytest
+
+from qlib.model.trainer import ParallelTrainerR, TrainerR
+from qlib.tests import TestAutoData
+from qlib.workflow import R
+from qlib.workflow.task.gen import RollingGen, task_generator
+
+TASK = {
+    "model": {
+        "class": "LinearModel",
+        "module_path": "qlib.contrib.model.linear",
+        "kwargs": {"estimator": "ols"},
+    },
+    "dataset": {
+        "class": "DatasetH",
+        "module_path": "qlib.data.dataset",
+        "kwargs": {
+            "handler": {
+                "class": "Alpha158",
+                "module_path": "qlib.contrib.data.handler",
+                "kwargs": {
+                    "start_time": "2019-03-01",
+                    "end_time": "2020-09-30",
+                    "fit_start_time": "2019-03-01",
+                    "fit_end_time": "2019-12-31",
+                    "instruments": "csi300",
+                    "infer_processors": [
+                        {
+                            "class": "RobustZScoreNorm",
+                            "kwargs": {
+                                "fields_group": "feature",
+                                "clip_outlier": True,
+                                "fit_start_time": "2019-03-01",
+                                "fit_end_time": "2019-12-31",
+                            },
+                        },
+                        {"class": "Fillna", "kwargs": {"fields_group": "feature"}},
+                    ],
+                },
+            },
+            "segments": {
+                "train": ("2019-03-01", "2019-12-31"),
+                "valid": ("2020-01-01", "2020-02-28"),
+                "test": ("2020-03-01", "2020-09-30"),
+            },
+        },
+    },
+    "record": ["qlib.workflow.record_temp.SignalRecord"],
+}
+
+
+class TestParallelTrainer(TestAutoData):
+    @pytest.mark.slow
+    def test_parallel_trainer(self):
+        tasks = task_generator(TASK, RollingGen(step=40, rtype=RollingGen.ROLL_SD))
+        self.assertGreater(len(tasks), 2)
+        with tempfile.TemporaryDirectory() as tmp_dir, R.uri_context(uri=tmp_dir):
+            expected = [rec.load_object("pred.pkl") for rec in TrainerR("expected").train(tasks)]
+            for trainer in [ParallelTrainerR("in_proc", max_workers=1), ParallelTrainerR("forked", max_workers=2)]:
+                recs = trainer.end_train(trainer.train(tasks))
+                self.assertEqual(len(recs), len(tasks))
+                for rec, exp_pred, task in zip(recs, expected, tasks):
+                    self.assertEqual(rec.list_tags()[trainer.STATUS_KEY], trainer.STATUS_END)
+                    # the original task config is logged
+                    self.assertEqual(rec.load_object("task"), task)
+                    pd.testing.assert_frame_equal(rec.load_object("pred.pkl"), exp_pred)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from qlib.contrib.model.double_ensemble import DEnsembleModel
+from qlib.contrib.model.gbdt import DatasetSequence, LGBModel
+from qlib.data.dataset import DatasetH
+from qlib.data.dataset.handler import DataHandlerLP
+from qlib.data.dataset.loader import StaticDataLoader
+
+
+def _make_dataset(n_date=60, n_inst=23, n_feat=6) -> DatasetH:
+    rng = np.random.RandomState(0)
+    index = pd.MultiIndex.from_product(
+        [pd.bdate_range("2020-01-01", periods=n_date), [f"SH600{i:03d}" for i in range(n_inst)]],
+        names=["datetime", "instrument"],
+    )
+    feature = rng.randn(len(index), n_feat).astype(np.float32)
+    feature[rng.rand(*feature.shape) < 0.05] = np.nan
+    label = np.nan_to_num(feature[:, :3]).sum(axis=1) + rng.randn(len(index)) * 0.1
+    columns = pd.MultiIndex.from_tuples(
+        [("feature", f"F{i}") for i in range(n_feat)] + [("label", "LABEL0")], names=["group", "name"]
+    )
+    df = pd.DataFrame(np.column_stack([feature, label]), index=index, columns=columns)
+    handler = DataHandlerLP(data_loader=StaticDataLoader(df))
+    dates = index.get_level_values("datetime").unique()
+    return DatasetH(
+        handler,
+        segments={
+            "train": (dates[0], dates[39]),
+            "valid": (dates[40], dates[49]),
+            "test": (dates[50], dates[59]),
+        },
+    )
+
+
+class TestGBDTDataset(unittest.TestCase):
+    def setUp(self):
+        self.dataset = _make_dataset()
+
+    def test_sequence(self):
+        df = self.dataset.prepare("train", col_set=["feature", "label"], data_key=DataHandlerLP.DK_L)
+        expected = df["feature"].to_numpy()
+        # the batches are not aligned to the days
+        seq = DatasetSequence(self.dataset, df.index, batch_size=50)
+        self.assertEqual(len(seq), len(df))
+        np.testing.assert_array_equal(seq[30:170], expected[30:170])
+        np.testing.assert_array_equal(seq[len(df) - 7 :], expected[-7:])
+        for i in [0, 3, 49, 50, 51, 400, len(df) - 1]:
+            np.testing.assert_array_equal(seq[i], expected[i])
+        np.testing.assert_array_equal(seq[[2, 60, 61]], expected[[2, 60, 61]])
+
+    def test_lgb_model(self):
+        kwargs = dict(num_boost_round=20, early_stopping_rounds=5, num_leaves=7, num_threads=1, seed=0)
+        model, chunked_model = LGBModel(**kwargs), LGBModel(chunk_size=97, **kwargs)
+        # the metrics are logged to the recorder
+        with mock.patch("qlib.contrib.model.gbdt.R"):
+            model.fit(self.dataset)
+            chunked_model.fit(self.dataset)
+        pd.testing.assert_series_equal(chunked_model.predict(self.dataset), model.predict(self.dataset))
+
+    def test_double_ensemble(self):
+        kwargs = dict(
+            num_models=3,
+            epochs=10,
+            decay=0.5,
+            bins_fs=2,
+            sample_ratios=[0.6, 0.3],
+            num_leaves=7,
+            num_threads=1,
+            seed=0,
+            verbosity=-1,
+        )
+        preds = []
+        for share_dataset in [False, True]:
+            # feature selection samples the features with numpy
+            np.random.seed(0)
+            model = DEnsembleModel(share_dataset=share_dataset, **kwargs)
+            model.fit(self.dataset)
+            preds.append(model.predict(self.dataset))
+        # different features are selected by the sub-models
+        self.assertLess(len(model.sub_features[-1]), 6)
+        pd.testing.assert_series_equal(preds[1], preds[0])
+        importance = model.get_feature_importance()
+        self.assertEqual(set(importance.index), {f"F{i}" for i in range(6)})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+import unittest
+
+import cvxpy as cp
+import numpy as np
+import pandas as pd
+
+from qlib.contrib.strategy.optimizer import EnhancedIndexingOptimizer, PortfolioOptimizer, optimize_batch
+
+
+def _gen_inputs(rs, n, k=5):
+    F = rs.randn(n, k)
+    A = rs.randn(k, k) * 0.1
+    cov_b = A @ A.T
+    var_u = rs.rand(n) * 0.01
+    r = rs.randn(n)
+    wb = rs.rand(n)
+    wb /= wb.sum()
+    w0 = (wb * (1 + 0.2 * rs.randn(n))).clip(0)
+    w0 /= w0.sum()
+    mfh = rs.rand(n) < 0.05
+    mfs = rs.rand(n) < 0.05
+    return r, F, cov_b, var_u, w0, wb, mfh, mfs
+
+
+@unittest.skipIf("CLARABEL" not in cp.installed_solvers(), "CLARABEL is not installed")
+class EnhancedIndexingOptimizerTest(unittest.TestCase):
+    KWARGS = {"solver": "CLARABEL", "f_dev": 0.2, "delta": 0.3, "b_dev": 0.02}
+
+    def test_parametrized(self):
+        rs = np.random.RandomState(0)
+        # the universe size changes
+        inputs = [_gen_inputs(rs, n) for n in [50, 60, 48, 70]]
+        inputs[1][4][:] = 0  # without turnover constraint
+        optimizer = EnhancedIndexingOptimizer(**self.KWARGS)
+        optimizer_p = EnhancedIndexingOptimizer(parametrized=True, pad_size=32, **self.KWARGS)
+        for x in inputs:
+            np.testing.assert_allclose(optimizer_p(*x), optimizer(*x), atol=1e-5)
+        self.assertEqual(set(optimizer_p._problems), {(64, 5), (96, 5)})
+
+    def test_optimize_batch(self):
+        rs = np.random.RandomState(1)
+        inputs = [_gen_inputs(rs, 40) for _ in range(6)]
+        optimizer = EnhancedIndexingOptimizer(parametrized=True, **self.KWARGS)
+        expected = [optimizer(*x) for x in inputs]
+        res = optimize_batch(optimizer, inputs, n_jobs=2)
+        self.assertEqual(len(res), len(inputs))
+        for w, exp_w in zip(res, expected):
+            np.testing.assert_allclose(w, exp_w, atol=1e-6)
+        kwargs = [dict(zip(["r", "F", "cov_b", "var_u", "w0", "wb"], x)) for x in inputs]
+        expected = [optimizer(**x) for x in kwargs]
+        res = optimize_batch(optimizer, kwargs, n_jobs=3)
+        for w, exp_w in zip(res, expected):
+            np.testing.assert_allclose(w, exp_w, atol=1e-6)
+
+
+class PortfolioOptimizerTest(unittest.TestCase):
+    def test_warm_start(self):
+        rs = np.random.RandomState(0)
+        codes = [f"SH600{i:03d}" for i in range(30)]
+        optimizer = PortfolioOptimizer(method="gmv")
+        optimizer_ws = PortfolioOptimizer(method="gmv", warm_start=True)
+        for i in range(3):
+            # the assets change on each date
+            index = codes[i : 20 + i]
+            X = rs.randn(100, len(index))
+            S = pd.DataFrame(np.cov(X.T), index=index, columns=index)
+            w, w_ws = optimizer(S), optimizer_ws(S)
+            pd.testing.assert_index_equal(w_ws.index, S.index)
+            np.testing.assert_allclose(w_ws, w, atol=1e-3)
+            self.assertAlmostEqual(w_ws @ S.values @ w_ws, w @ S.values @ w, places=6)
+        # the solution of the last call is the initial weights
+        np.testing.assert_allclose(optimizer_ws._get_init_weights(len(index), S.index), w_ws.values)
+
+
+if __name__ == "__main__":
+    unittest.main()
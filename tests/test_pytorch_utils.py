@@ -0,0 +1,71 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from qlib.contrib.model.pytorch_utils import DailyBatchFeeder
+
+
+class TestDailyBatchFeeder(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.RandomState(0)
+        # the number of the instruments varies with the days
+        index = pd.MultiIndex.from_tuples(
+            [
+                (date, f"SH600{i:03d}")
+                for date in pd.bdate_range("2020-01-01", periods=20)
+                for i in range(rng.randint(1, 9))
+            ],
+            names=["datetime", "instrument"],
+        )
+        self.x = pd.DataFrame(rng.randn(len(index), 5), index=index)
+        self.y = pd.DataFrame(rng.randn(len(index), 1), index=index, columns=["LABEL0"])
+
+    def _expected_batches(self, shuffle):
+        """the batches organized like `get_daily_inter` of the models"""
+        daily_count = self.x.groupby(level=0).size().values
+        daily_index = np.roll(np.cumsum(daily_count), 1)
+        daily_index[0] = 0
+        if shuffle:
+            daily_shuffle = list(zip(daily_index, daily_count))
+            np.random.shuffle(daily_shuffle)
+            daily_index, daily_count = zip(*daily_shuffle)
+        y_values = np.squeeze(self.y.values)
+        return [(self.x.values[i : i + n], y_values[i : i + n]) for i, n in zip(daily_index, daily_count)]
+
+    def test_batches(self):
+        for prefetch in [0, 2]:
+            feeder = DailyBatchFeeder(self.x, self.y, prefetch=prefetch)
+            self.assertEqual(len(feeder), 20)
+            for shuffle in [False, True]:
+                np.random.seed(42)
+                expected = self._expected_batches(shuffle)
+                np.random.seed(42)
+                batches = list(feeder.iter_batches(shuffle=shuffle))
+                self.assertEqual(len(batches), len(expected))
+                for (feature, label), (x, y) in zip(batches, expected):
+                    self.assertEqual(feature.dtype, label.dtype)
+                    self.assertEqual(label.dim(), 1)
+                    np.testing.assert_allclose(feature.numpy(), x, rtol=1e-6)
+                    np.testing.assert_allclose(label.numpy(), y, rtol=1e-6)
+
+    def test_zero_copy(self):
+        feeder = DailyBatchFeeder(self.x.astype(np.float32))
+        storage = feeder.tensors[0].untyped_storage().data_ptr()
+        for (feature,) in feeder.iter_batches():
+            self.assertEqual(feature.untyped_storage().data_ptr(), storage)
+
+    def test_prefetch_early_stop(self):
+        feeder = DailyBatchFeeder(self.x, self.y, prefetch=1)
+        for _ in range(3):
+            batches = feeder.iter_batches(shuffle=True)
+            next(batches)
+            # the background thread is stopped
+            batches.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from qlib.model.riskmodel import (
+    RiskDataStore,
+    RiskDataWriter,
+    StructuredCovEstimator,
+    dump_risk_data,
+    pack_risk_data,
+)
+
+
+class TestRiskDataStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def _gen_risk_data(self, rs, n_stock, n_factor=3):
+        codes = [f"SH600{i:03d}" for i in rs.choice(100, n_stock, replace=False)]
+        factor_exp = pd.DataFrame(rs.randn(n_stock, n_factor), index=codes)
+        factor_cov = pd.DataFrame(np.cov(rs.randn(n_factor, 50)))
+        specific_risk = pd.Series(rs.rand(n_stock), index=codes)
+        blacklist = pd.Series(1, index=codes[:2])
+        return factor_exp, factor_cov, specific_risk, blacklist
+
+    def test_pack_risk_data(self):
+        rs = np.random.RandomState(0)
+        dates = pd.bdate_range("2021-01-01", periods=5)
+        riskmodel_root = self.tmp_dir / "riskmodel"
+        expected = {}
+        for i, date in enumerate(dates):
+            factor_exp, factor_cov, specific_risk, blacklist = self._gen_risk_data(rs, n_stock=20 + i)
+            date_dir = riskmodel_root / date.strftime("%Y%m%d")
+            date_dir.mkdir(parents=True)
+            factor_exp.to_pickle(date_dir / "factor_exp.pkl")
+            factor_cov.to_pickle(date_dir / "factor_cov.pkl")
+            # missing specific risk is filled by the max
+            specific_risk.iloc[1:].to_pickle(date_dir / "specific_risk.pkl")
+            if i % 2 == 0:
+                blacklist.to_pickle(date_dir / "blacklist.pkl")
+            specific_risk.iloc[0] = specific_risk.iloc[1:].max()
+            expected[date] = (factor_exp, factor_cov, specific_risk, blacklist.index.tolist() if i % 2 == 0 else [])
+
+        packed_root = self.tmp_dir / "packed"
+        pack_risk_data(riskmodel_root, packed_root)
+        store = RiskDataStore(packed_root, cache_size=2)
+        for date, (factor_exp, factor_cov, specific_risk, blacklist) in expected.items():
+            outs = store.get(date)
+            self.assertIs(type(outs[0]), np.ndarray)
+            np.testing.assert_allclose(outs[0], factor_exp.values, rtol=1e-6)
+            np.testing.assert_allclose(outs[1], factor_cov.values, rtol=1e-6)
+            np.testing.assert_allclose(outs[2], specific_risk.values, rtol=1e-6)
+            self.assertEqual(outs[3], factor_exp.index.tolist())
+            self.assertEqual(outs[4], blacklist)
+            self.assertLessEqual(len(store._cache), 2)
+        self.assertIs(store.get(dates[-1]), store.get(dates[-1]))
+        self.assertIsNone(store.get(dates[-1] + pd.Timedelta(days=7)))
+
+    def test_dump_risk_data(self):
+        rs = np.random.RandomState(1)
+        codes = [f"SH600{i:03d}" for i in range(10)]
+        price = pd.DataFrame(
+            np.cumprod(1 + rs.randn(60, len(codes)) * 0.02, axis=0),
+            index=pd.bdate_range("2021-01-01", periods=60),
+            columns=codes,
+        )
+        estimator = StructuredCovEstimator(num_factors=2)
+        dump_risk_data(self.tmp_dir, estimator, price, window=20, start_time=price.index[50])
+        store = RiskDataStore(self.tmp_dir)
+        self.assertEqual(list(store.calendar), list(price.index[50:]))
+        for date in store.calendar:
+            F, cov_b, specific_risk, universe, blacklist = store.get(date)
+            i = price.index.get_loc(date)
+            exp_F, exp_cov_b, exp_var_u = estimator.predict(
+                price.iloc[i - 20 : i + 1], return_decomposed_components=True
+            )
+            np.testing.assert_allclose(F @ cov_b @ F.T, exp_F @ exp_cov_b @ exp_F.T, rtol=1e-4, atol=1e-6)
+            np.testing.assert_allclose(specific_risk**2, exp_var_u, rtol=1e-4)
+            self.assertEqual(universe, codes)
+            self.assertEqual(blacklist, [])
+
+        # the universe of each date
+        universe = pd.Series({date: codes[: 5 + k] for k, date in enumerate(price.index[40:45])})
+        root = self.tmp_dir / "universe"
+        dump_risk_data(root, estimator, price, window=20, universe=universe)
+        store = RiskDataStore(root)
+        for date, date_codes in universe.items():
+            F, _, specific_risk, date_universe, _ = store.get(date)
+            self.assertEqual(date_universe, date_codes)
+            self.assertEqual(F.shape, (len(date_codes), 2))
+            self.assertEqual(len(specific_risk), len(date_codes))
+
+    def test_empty(self):
+        with RiskDataWriter(self.tmp_dir):
+            pass
+        store = RiskDataStore(self.tmp_dir)
+        self.assertIsNone(store.get(pd.Timestamp("2021-01-04")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+import unittest
+import numpy as np
+import pandas as pd
+
+from qlib.model.riskmodel import (
+    POETCovEstimator,
+    RiskModel,
+    RunningCovariance,
+    ShrinkCovEstimator,
+    StructuredCovEstimator,
+)
+
+
+class TestRollingCovEstimator(unittest.TestCase):
+    NUM_VARIABLE = 8
+    NUM_OBSERVATION = 120
+    WINDOW = 30
+
+    def _gen_price(self, nan=True):
+        rs = np.random.RandomState(0)
+        ret = rs.randn(self.NUM_OBSERVATION, self.NUM_VARIABLE) * 0.02
+        price = pd.DataFrame(
+            np.cumprod(1 + ret, axis=0),
+            index=pd.bdate_range("2020-01-01", periods=self.NUM_OBSERVATION),
+            columns=[f"SH600{i:03d}" for i in range(self.NUM_VARIABLE)],
+        )
+        if nan:
+            price.iloc[10:15, 1] = np.nan
+            price.iloc[50:52, 3] = np.nan
+            price.iloc[:40, 5] = np.nan
+        return price
+
+    def _check_rolling(self, estimator, price, start_time=None, **kwargs):
+        res = list(estimator.rolling_predict(price, window=self.WINDOW, start_time=start_time, **kwargs))
+        dates = price.index[self.WINDOW :]
+        if start_time is not None:
+            dates = dates[dates >= start_time]
+        self.assertEqual([date for date, _ in res], list(dates))
+        for date, est in res:
+            i = price.index.get_loc(date)
+            # the same as predicting with the prices in the window
+            expected = estimator.predict(price.iloc[i - self.WINDOW : i + 1], **kwargs)
+            if isinstance(expected, tuple):
+                F, cov_b, var_u = est
+                exp_F, exp_cov_b, exp_var_u = expected
+                # the signs of the factors are arbitrary
+                np.testing.assert_allclose(F @ cov_b @ F.T, exp_F @ exp_cov_b @ exp_F.T, atol=1e-8)
+                np.testing.assert_allclose(var_u, exp_var_u, atol=1e-8)
+            else:
+                pd.testing.assert_frame_equal(est, expected, rtol=1e-7, atol=1e-8)
+
+    def test_rolling_predict(self):
+        price = self._gen_price()
+        for estimator in [
+            RiskModel(nan_option="mask"),
+            RiskModel(nan_option="fill"),
+            RiskModel(nan_option="ignore"),
+            RiskModel(nan_option="mask", assume_centered=True),
+            ShrinkCovEstimator(alpha=0.3, nan_option="fill"),
+            ShrinkCovEstimator(alpha="oas", nan_option="mask"),
+            ShrinkCovEstimator(alpha=0.3, target="const_corr", nan_option="fill"),
+            StructuredCovEstimator(num_factors=3),
+        ]:
+            self._check_rolling(estimator, price)
+        # the estimators which can't predict from the covariance
+        for estimator in [
+            ShrinkCovEstimator(alpha="lw", target="single_factor", nan_option="fill"),
+            POETCovEstimator(num_factors=2, nan_option="fill"),
+        ]:
+            self._check_rolling(estimator, self._gen_price(nan=False))
+        self._check_rolling(RiskModel(nan_option="mask"), price, return_corr=True)
+        self._check_rolling(RiskModel(nan_option="mask"), price, start_time=price.index[80])
+        self._check_rolling(StructuredCovEstimator(num_factors=3), price, return_decomposed_components=True)
+        self._check_rolling(
+            StructuredCovEstimator(factor_model="fa", num_factors=2), price, return_decomposed_components=True
+        )
+
+    def test_ewm(self):
+        price = self._gen_price(nan=False)
+        halflife = 10
+        res = dict(RiskModel(nan_option="mask").rolling_predict(price, window=self.WINDOW, halflife=halflife))
+        ret = price.pct_change().iloc[1:] * 100
+        expected = ret.ewm(halflife=halflife).cov(bias=True)
+        for date, est in res.items():
+            pd.testing.assert_frame_equal(est, expected.loc[date].rename_axis(None), rtol=1e-7, check_names=False)
+        with self.assertRaises(ValueError):
+            next(POETCovEstimator(nan_option="fill").rolling_predict(price, window=self.WINDOW, halflife=halflife))
+
+    def test_running_covariance(self):
+        rs = np.random.RandomState(1)
+        X = rs.randn(500, 5)
+        X[rs.rand(*X.shape) < 0.1] = np.nan
+        running_cov = RunningCovariance(5)
+        for i in range(len(X)):
+            running_cov.add(X[i])
+            if i >= 50:
+                running_cov.remove(X[i - 50])
+        expected = RiskModel(nan_option="mask", scale_return=False).predict(X[-50:], is_price=False)
+        np.testing.assert_allclose(running_cov.cov(), expected, atol=1e-10)
+
+
+if __name__ == "__main__":
+    unittest.main()
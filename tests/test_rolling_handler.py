@@ -0,0 +1,113 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from qlib.contrib.data.handler import check_transform_proc
+from qlib.data.dataset.handler import DataHandlerLP
+from qlib.data.dataset.processor import MinMaxNorm, RobustZScoreNorm, ZScoreNorm
+from qlib.data.dataset.rolling import RollingDataHandlerLP
+from qlib.tests import TestAutoData
+
+
+class RollingStatisticsTest(unittest.TestCase):
+    def _gen_data(self, rs, n_date=30, n_inst=7, n_col=5):
+        index = pd.MultiIndex.from_product(
+            [pd.bdate_range("2020-01-01", periods=n_date), [f"SH600{i:03d}" for i in range(n_inst)]],
+            names=["datetime", "instrument"],
+        )
+        X = rs.randn(len(index), n_col).astype(np.float32) * 10 + 100
+        X[rs.rand(*X.shape) < 0.1] = np.nan
+        X[:, -1] = np.nan  # empty column
+        X[::3, 0] = np.round(X[::3, 0])  # ties
+        return pd.DataFrame(X, index=index)
+
+    def test_statistics(self):
+        rs = np.random.RandomState(0)
+        df = self._gen_data(rs)
+        dates = df.index.get_level_values("datetime").unique()
+        date_idx = dates.get_indexer(df.index.get_level_values("datetime"))
+        for proc_cls, attrs in [
+            (ZScoreNorm, ["mean_train", "std_train"]),
+            (RobustZScoreNorm, ["mean_train", "std_train"]),
+            (MinMaxNorm, ["min_val", "max_val"]),
+        ]:
+            stats = RollingDataHandlerLP.STATISTICS[proc_cls]()
+            end = 0
+            # expanding, sliding and shrinking windows (with odd and even number of values)
+            for start, new_end in [(0, 10), (0, 15), (3, 21), (9, 22), (12, 30)]:
+                stats.remove_before(start)
+                mask = (date_idx >= end) & (date_idx < new_end)
+                stats.add(df.values[mask], date_idx[mask])
+                end = new_end
+
+                proc, expected = proc_cls(dates[start], dates[end - 1]), proc_cls(dates[start], dates[end - 1])
+                expected.fit(df)
+                stats.set_stats(proc, df.columns)
+                for attr in attrs:
+                    np.testing.assert_allclose(getattr(proc, attr), getattr(expected, attr), rtol=1e-5, atol=1e-5)
+
+
+class Handler(DataHandlerLP):
+    def __init__(self, start_time=None, end_time=None, fit_start_time=None, fit_end_time=None, processors=()):
+        data_loader = {
+            "class": "QlibDataLoader",
+            "kwargs": {
+                "config": {
+                    "feature": (["$close/Ref($close, 1) - 1", "$volume", "Mean($close, 5)/$close"], ["R0", "V", "M"]),
+                    "label": (["Ref($close, -2)/Ref($close, -1) - 1"], ["LABEL0"]),
+                },
+            },
+        }
+        super().__init__(
+            instruments="csi300",
+            start_time=start_time,
+            end_time=end_time,
+            data_loader=data_loader,
+            infer_processors=check_transform_proc(list(processors), fit_start_time, fit_end_time),
+            learn_processors=check_transform_proc(["DropnaLabel", "CSRankNorm"], fit_start_time, fit_end_time),
+        )
+
+
+class RollingHandler(Handler, RollingDataHandlerLP):
+    pass
+
+
+class RollingHandlerTest(TestAutoData):
+    PROCESSORS = [
+        # the statistics of the second learnable processor are refitted
+        ["RobustZScoreNorm", "ZScoreNorm", "Fillna"],
+        ["ZScoreNorm", "Fillna"],
+        [{"class": "MinMaxNorm", "kwargs": {"fields_group": "feature"}}, "ProcessInf"],
+    ]
+
+    def test_roll(self):
+        for processors in self.PROCESSORS:
+            kwargs = {"start_time": "2019-02-01", "end_time": "2020-10-30", "processors": processors}
+            handler = RollingHandler(fit_start_time="2019-02-01", fit_end_time="2019-08-30", **kwargs)
+            raw = handler._data
+            for fit_start_time, fit_end_time in [
+                ("2019-02-01", "2019-08-30"),
+                ("2019-02-01", "2019-10-31"),  # expanding
+                ("2019-04-01", "2019-12-31"),  # sliding
+                ("2019-03-01", "2019-12-31"),  # backward
+            ]:
+                handler.roll(fit_start_time, fit_end_time)
+                self.assertEqual(len(handler._rolling_stats), 1)
+                expected = Handler(fit_start_time=fit_start_time, fit_end_time=fit_end_time, **kwargs)
+                for selector in [slice(fit_start_time, fit_end_time), slice("2020-01-01", "2020-03-31")]:
+                    for data_key in [DataHandlerLP.DK_I, DataHandlerLP.DK_L]:
+                        pd.testing.assert_frame_equal(
+                            handler.fetch(selector, data_key=data_key),
+                            expected.fetch(selector, data_key=data_key),
+                            rtol=1e-4,
+                            atol=1e-5,
+                        )
+                self.assertEqual(handler.get_cols(), expected.get_cols())
+            # the raw data is not modified
+            self.assertIs(handler._data, raw)
+            pd.testing.assert_frame_equal(raw, expected._data)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+from qlib.config import C
+from qlib.workflow.task.manage import TaskManager, run_task
+
+
+def _task_func(task_def):
+    time.sleep(0.01)
+    return os.getpid(), task_def["id"]
+
+
+def _worker(task_pool, mongo_conf):
+    C["mongo"] = mongo_conf
+    run_task(_task_func, task_pool, fetch_n=5, lease=10)
+
+
+class TaskManagerTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = Path(tempfile.mkdtemp())
+        self.orig_mongo = C.get("mongo")
+        C["mongo"] = {"task_url": f"sqlite://{self.tmp_dir / 'tasks.db'}", "task_db_name": "test_db"}
+
+    def tearDown(self):
+        C["mongo"] = self.orig_mongo
+        shutil.rmtree(self.tmp_dir)
+
+    def test_fetch_tasks(self):
+        tm = TaskManager("pool")
+        ids = tm.create_task([{"id": i, "data": "x" * (2000 if i == 0 else 1)} for i in range(10)])
+        # the existing tasks are not created again
+        self.assertEqual(tm.create_task([{"id": 0, "data": "x" * 2000}]), ids[:1])
+        self.assertEqual(TaskManager.list(), ["pool"])
+        # compact encoding of the large task
+        raw = tm.task_pool.find_one({"_id": ids[0]})
+        self.assertTrue(raw["def"].startswith(TaskManager.COMPRESS_PREFIX))
+        self.assertEqual(tm.re_query(ids[0])["def"]["data"], "x" * 2000)
+
+        for i in [3, 5, 7]:
+            tm.prioritize({"_id": ids[i]}, i)
+        tasks = tm.fetch_tasks(n=4)
+        self.assertEqual([t["def"]["id"] for t in tasks[:3]], [7, 5, 3])
+        self.assertEqual(len(tasks), 4)
+        self.assertEqual(tm.task_stat(), {TaskManager.STATUS_WAITING: 6, TaskManager.STATUS_RUNNING: 4})
+        self.assertEqual(tm.task_stat({"_id": {"$in": ids[:4]}}), {"waiting": 2, "running": 2})
+
+        # the tasks not committed are returned when an error occurs
+        with self.assertRaises(ValueError):
+            with tm.safe_fetch_tasks(n=3) as tasks:
+                tm.commit_task_res(tasks[0], "res")
+                raise ValueError
+        self.assertEqual(tm.task_stat(), {"waiting": 5, "running": 4, "done": 1})
+        self.assertEqual(tm.re_query(tasks[0]["_id"])["res"], "res")
+        self.assertEqual(len(tm.fetch_tasks(n=10, query={"_id": {"$in": ids}})), 5)
+        self.assertEqual(tm.fetch_tasks(n=10), [])
+
+    def test_lease(self):
+        tm = TaskManager("pool")
+        tm.create_task([{"id": i} for i in range(4)])
+        tasks = tm.fetch_tasks(n=2, lease=0.2)
+        with tm.safe_fetch_tasks(n=2, lease=0.3) as renewed:
+            self.assertEqual(len(renewed), 2)
+            time.sleep(0.6)
+            # the expired tasks can be fetched again, but the renewed ones can't
+            refetched = tm.fetch_tasks(n=4)
+            self.assertEqual({t["_id"] for t in refetched}, {t["_id"] for t in tasks})
+            # the lease has been lost
+            self.assertEqual(tm.heartbeat(tasks, 10), 0)
+            self.assertEqual(tm.heartbeat(refetched, 10), 2)
+        self.assertEqual(tm.task_stat(), {TaskManager.STATUS_RUNNING: 4})
+
+    def test_run_task_multiprocess(self):
+        tm = TaskManager("pool")
+        n_tasks = 100
+        ids = tm.create_task([{"id": i} for i in range(n_tasks)])
+        ctx = multiprocessing.get_context("fork")
+        workers = [ctx.Process(target=_worker, args=("pool", C["mongo"])) for _ in range(4)]
+        for w in workers:
+            w.start()
+        for w in workers:
+            w.join()
+            self.assertEqual(w.exitcode, 0)
+        tm.wait()
+        res = [t["res"] for t in tm.query({"_id": {"$in": ids}})]
+        # each task is run exactly once
+        self.assertEqual(sorted(task_id for _, task_id in res), list(range(n_tasks)))
+        self.assertGreater(len({pid for pid, _ in res}), 1)
+        self.assertEqual(tm.task_stat(), {TaskManager.STATUS_DONE: n_tasks})
+
+
+if __name__ == "__main__":
+    unittest.main()